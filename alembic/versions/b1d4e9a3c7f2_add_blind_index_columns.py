@@ -0,0 +1,45 @@
+"""add_blind_index_columns
+
+Revision ID: b1d4e9a3c7f2
+Revises: e7307c446383
+Create Date: 2026-10-16 09:12:44.318205
+
+Adds HMAC blind-index columns next to encrypted columns that are used for
+equality lookups (users.email, documents.borrower_name, documents.borrower_lei).
+Existing rows are populated by scripts/backfill_blind_indexes.py, which needs
+the application's encryption keys and therefore runs outside of Alembic.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1d4e9a3c7f2'
+down_revision: Union[str, Sequence[str], None] = 'e7307c446383'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('email_bidx', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_users_email_bidx'), 'users', ['email_bidx'], unique=False)
+    
+    op.add_column('documents', sa.Column('borrower_name_bidx', sa.String(length=64), nullable=True))
+    op.add_column('documents', sa.Column('borrower_lei_bidx', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_documents_borrower_name_bidx'), 'documents', ['borrower_name_bidx'], unique=False)
+    op.create_index(op.f('ix_documents_borrower_lei_bidx'), 'documents', ['borrower_lei_bidx'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_documents_borrower_lei_bidx'), table_name='documents')
+    op.drop_index(op.f('ix_documents_borrower_name_bidx'), table_name='documents')
+    op.drop_column('documents', 'borrower_lei_bidx')
+    op.drop_column('documents', 'borrower_name_bidx')
+    
+    op.drop_index(op.f('ix_users_email_bidx'), table_name='users')
+    op.drop_column('users', 'email_bidx')
@@ -0,0 +1,63 @@
+"""add_detection_checkpoints
+
+Revision ID: c4e2a8f61d3b
+Revises: b1d4e9a3c7f2
+Create Date: 2026-10-16 21:20:05.114812
+
+Adds the detection_checkpoints table holding the high-water mark of the
+incremental payment default and covenant breach detection runs, and the
+indexes those set-based scans use: pending payments by creation date,
+payments by updated_at, and active loan defaults by type/deal/loan.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e2a8f61d3b'
+down_revision: Union[str, Sequence[str], None] = 'b1d4e9a3c7f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'detection_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('high_water_mark', sa.DateTime(), nullable=True),
+        sa.Column('last_run_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_detection_checkpoints_name'), 'detection_checkpoints', ['name'], unique=True)
+    
+    op.create_index(op.f('ix_payment_events_updated_at'), 'payment_events', ['updated_at'], unique=False)
+    op.create_index(
+        'ix_payment_events_pending_created_at',
+        'payment_events',
+        ['created_at'],
+        unique=False,
+        postgresql_where=sa.text("payment_status = 'pending'")
+    )
+    op.create_index(
+        'ix_loan_defaults_active_type_deal_loan',
+        'loan_defaults',
+        ['default_type', 'deal_id', 'loan_id'],
+        unique=False,
+        postgresql_where=sa.text("status IN ('open', 'in_recovery')")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_loan_defaults_active_type_deal_loan', table_name='loan_defaults')
+    op.drop_index('ix_payment_events_pending_created_at', table_name='payment_events')
+    op.drop_index(op.f('ix_payment_events_updated_at'), table_name='payment_events')
+    
+    op.drop_index(op.f('ix_detection_checkpoints_name'), table_name='detection_checkpoints')
+    op.drop_table('detection_checkpoints')
@@ -0,0 +1,30 @@
+"""add_audit_logs_keyset_index
+
+Revision ID: d7a3f1c9e5b2
+Revises: c4e2a8f61d3b
+Create Date: 2026-10-16 22:05:41.508317
+
+Adds a composite (occurred_at, id) index on audit_logs so the streaming
+export can page by keyset with an index range scan instead of OFFSET.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3f1c9e5b2'
+down_revision: Union[str, Sequence[str], None] = 'c4e2a8f61d3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_audit_logs_occurred_at_id', 'audit_logs', ['occurred_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_audit_logs_occurred_at_id', table_name='audit_logs')
@@ -0,0 +1,58 @@
+"""add_audit_log_rollups
+
+Revision ID: e2b8c5d1f4a7
+Revises: d7a3f1c9e5b2
+Create Date: 2026-10-16 23:10:12.640295
+
+Adds the audit statistics rollup tables filled by the audit rollup task:
+audit_log_rollups (hourly counts per action and target type) and
+audit_user_rollups (daily counts per user), so the statistics dashboard
+reads O(buckets) rows instead of scanning audit_logs.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b8c5d1f4a7'
+down_revision: Union[str, Sequence[str], None] = 'd7a3f1c9e5b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'audit_log_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('action', sa.String(length=50), nullable=False),
+        sa.Column('target_type', sa.String(length=50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_audit_log_rollups_bucket_start'), 'audit_log_rollups', ['bucket_start'], unique=False)
+    
+    op.create_table(
+        'audit_user_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_audit_user_rollups_bucket_start'), 'audit_user_rollups', ['bucket_start'], unique=False)
+    op.create_index(op.f('ix_audit_user_rollups_user_id'), 'audit_user_rollups', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_audit_user_rollups_user_id'), table_name='audit_user_rollups')
+    op.drop_index(op.f('ix_audit_user_rollups_bucket_start'), table_name='audit_user_rollups')
+    op.drop_table('audit_user_rollups')
+    
+    op.drop_index(op.f('ix_audit_log_rollups_bucket_start'), table_name='audit_log_rollups')
+    op.drop_table('audit_log_rollups')
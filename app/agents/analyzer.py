@@ -20,7 +20,7 @@ except ImportError:
     # Fallback if openai package structure changes
     RateLimitError = type('RateLimitError', (Exception,), {})
 
-from app.core.llm_client import get_chat_model, get_embeddings_model as get_llm_embeddings_model
+from app.core.llm_client import get_structured_chat_model, get_embeddings_model as get_llm_embeddings_model
 from app.models.spt_schema import (
     SustainabilityPerformanceTarget,
     CollateralAddress,
@@ -45,8 +45,7 @@ def create_spt_extraction_chain() -> BaseChatModel:
     Returns:
         BaseChatModel instance bound to SustainabilityPerformanceTarget schema
     """
-    llm = get_chat_model(temperature=0)
-    return llm.with_structured_output(SustainabilityPerformanceTarget)
+    return get_structured_chat_model(SustainabilityPerformanceTarget)
 
 
 def create_address_extraction_chain() -> BaseChatModel:
@@ -58,8 +57,7 @@ def create_address_extraction_chain() -> BaseChatModel:
     Returns:
         BaseChatModel instance bound to CollateralAddress schema
     """
-    llm = get_chat_model(temperature=0)
-    return llm.with_structured_output(CollateralAddress)
+    return get_structured_chat_model(CollateralAddress)
 
 
 def get_embeddings_model() -> Embeddings:
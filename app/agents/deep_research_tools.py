@@ -52,19 +52,12 @@ def create_read_url_tool() -> Tool:
     """Create URL reading tool."""
     async def read_url(url: str) -> str:
         """Read content from a URL."""
-        # TODO: Implement URL reading using Jina Reader or similar
-        # For now, use web search service to fetch content
         service = get_web_search_service()
         try:
-            # Use search to find the URL content
-            result = await service.search_web(
-                query=f"site:{url}",
-                search_type="search",
-                num_results=1,
-                rerank=False
-            )
-            if result.get("extracted_content"):
-                return result["extracted_content"][0].get("content", f"Content from: {url}")
+            # Fetch the page over the shared connection pool
+            content = await service.read_url(url)
+            if content:
+                return content.strip()
             return f"Could not fetch content from: {url}"
         except Exception as e:
             logger.warning(f"URL reading failed: {e}")
@@ -1,10 +1,12 @@
 """
 Vector Store for 'Deep Tech' Semantic Search.
 Implements a hybrid vector store that acts as a bridge between Financial States and Semantic Queries.
+Embeddings are kept in a contiguous float32 matrix for single-matmul search.
 """
 
 import logging
 import json
+import threading
 import numpy as np
 import uuid
 from typing import List, Dict, Any, Optional
@@ -20,23 +22,35 @@ logger = logging.getLogger(__name__)
 class TradeVectorStore:
     """
     Manages embedding and retrieval of Trade State definitions.
-    Uses numpy for in-memory cosine similarity (Lite Implementation).
+    
+    Embeddings live in one contiguous, L2-normalized float32 matrix that grows
+    geometrically, so a query is a single matrix-vector product followed by an
+    argpartition top-k. The matrix can be persisted with save() and reopened
+    as a read-only np.memmap with load().
     """
 
+    INITIAL_CAPACITY = 1024
+
     def __init__(self):
-        self.vectors = []
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._size = 0
+        self._lock = threading.Lock()
         self.metadata = []
         self.ids = []
         self.embeddings_model = None
         self.embedding_dim = EMBEDDING_DIM
         logger.info("Initialized In-Memory Vector Store.")
 
-    def _get_embedding(self, text: str) -> List[float]:
-        """
-        Generates an embedding for the text using the configured embeddings model.
-        Uses the LLM client abstraction to get the configured embeddings (local or API-based).
-        """
-        # Lazy initialization of embeddings model
+    @property
+    def vectors(self) -> np.ndarray:
+        """Normalized embeddings of the indexed events (one row per event)."""
+        return self._matrix[:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _ensure_embeddings_model(self) -> None:
+        """Lazily initialize the configured embeddings model."""
         if self.embeddings_model is None:
             try:
                 self.embeddings_model = get_embeddings_model()
@@ -47,6 +61,18 @@ class TradeVectorStore:
             except Exception as e:
                 logger.warning(f"Failed to initialize configured embeddings model: {e}")
                 self.embeddings_model = None
+
+    def _mock_embedding(self, text: str) -> List[float]:
+        # Fallback: Deterministic 'Mock' Embedding seeded by text definition
+        # This keeps the demo running even if embeddings fail
+        return np.random.RandomState(len(text)).rand(self.embedding_dim).tolist()
+
+    def _get_embedding(self, text: str) -> List[float]:
+        """
+        Generates an embedding for the text using the configured embeddings model.
+        Uses the LLM client abstraction to get the configured embeddings (local or API-based).
+        """
+        self._ensure_embeddings_model()
         
         # Try to use configured embeddings model
         if self.embeddings_model is not None:
@@ -56,68 +82,133 @@ class TradeVectorStore:
             except Exception as e:
                 logger.warning(f"Embedding generation failed: {e}")
         
-        # Fallback: Deterministic 'Mock' Embedding seeded by text definition
-        # This keeps the demo running even if embeddings fail
-        seed = len(text)
-        np.random.seed(seed)
-        return np.random.rand(self.embedding_dim).tolist()
+        return self._mock_embedding(text)
+
+    def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embeds several texts with a single embed_documents call."""
+        self._ensure_embeddings_model()
+        
+        if self.embeddings_model is not None:
+            try:
+                return self.embeddings_model.embed_documents(texts)
+            except Exception as e:
+                logger.warning(f"Batch embedding generation failed: {e}")
+        
+        return [self._mock_embedding(text) for text in texts]
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _append_vectors(self, vectors: np.ndarray) -> int:
+        """
+        Writes normalized rows after the published ones, doubling capacity when full.
+        
+        The rows stay invisible to readers until the caller (holding the lock)
+        has appended their metadata and ids and sets _size to the returned value.
+        """
+        count, dim = vectors.shape
+        if self._size == 0 and self._matrix.shape[1] != dim:
+            self._matrix = np.empty((0, dim), dtype=np.float32)
+        elif self._matrix.shape[1] != dim:
+            raise ValueError(f"Embedding dimension {dim} does not match index dimension {self._matrix.shape[1]}")
+        
+        required = self._size + count
+        if required > self._matrix.shape[0]:
+            capacity = max(self.INITIAL_CAPACITY, self._matrix.shape[0])
+            while capacity < required:
+                capacity *= 2
+            grown = np.empty((capacity, dim), dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            # Readers keep using the old matrix until _size moves past it
+            self._matrix = grown
+        
+        self._matrix[self._size:required] = self._normalize(vectors.astype(np.float32, copy=False))
+        return required
 
     def add_trade_event(self, event: Dict[str, Any]):
         """
         Ingests a CDM Event JSON, vectorizes its semantic content, and indexes it.
         """
-        try:
-            event_id = event.get("meta", {}).get("globalKey", str(uuid.uuid4()))
-            event_type = event.get("eventType", "Unknown")
+        self.add_trade_events([event])
+
+    def add_trade_events(self, events: List[Dict[str, Any]]) -> int:
+        """
+        Ingests several CDM Events, embedding their narratives in one batch.
+        
+        Args:
+            events: CDM event dictionaries
             
+        Returns:
+            Number of events indexed
+        """
+        if not events:
+            return 0
+        try:
             # Create Semantic Representation
             # We squash the structured JSON into a narrative string for the LLM/Embedder
-            semantic_text = self._jsonify_to_narrative(event)
+            narratives = [self._jsonify_to_narrative(event) for event in events]
             
             # Embed
-            vector = self._get_embedding(semantic_text)
+            vectors = np.asarray(self._get_embeddings(narratives), dtype=np.float32)
             
             # Store
-            self.vectors.append(vector)
-            self.metadata.append({
-                "id": event_id,
-                "type": event_type,
-                "json": event,
-                "narrative": semantic_text
-            })
-            self.ids.append(event_id)
+            with self._lock:
+                size = self._append_vectors(vectors)
+                for event, semantic_text in zip(events, narratives):
+                    event_id = event.get("meta", {}).get("globalKey", str(uuid.uuid4()))
+                    self.metadata.append({
+                        "id": event_id,
+                        "type": event.get("eventType", "Unknown"),
+                        "json": event,
+                        "narrative": semantic_text
+                    })
+                    self.ids.append(event_id)
+                # Publish last: readers index metadata by row below _size
+                self._size = size
             
-            logger.info(f"Indexed Event: {event_type} (ID: {event_id[:8]}...)")
+            logger.info(f"Indexed {len(events)} event(s) (total {self._size})")
+            return len(events)
             
         except Exception as e:
-            logger.error(f"Failed to index trade event: {e}")
+            logger.error(f"Failed to index trade events: {e}")
+            return 0
 
     def semantic_search(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
         """
         Performs Cosine Similarity search over the trade history.
         """
-        if not self.vectors:
+        # Snapshot: rows below size are never rewritten, growth swaps in a new matrix
+        size = self._size
+        matrix = self._matrix
+        if size == 0 or top_k <= 0:
             return []
 
         # Embed Query
-        query_vector = np.array(self._get_embedding(query))
+        query_vector = np.asarray(self._get_embedding(query), dtype=np.float32)
+        if query_vector.shape[0] != matrix.shape[1]:
+            logger.warning(
+                f"Query embedding dimension {query_vector.shape[0]} does not match index dimension {matrix.shape[1]}"
+            )
+            return []
         
-        # Compute Cosine Similarity
-        # Sim(A, B) = dot(A, B) / (norm(A) * norm(B))
-        scores = []
-        for idx, doc_vector in enumerate(self.vectors):
-            vec = np.array(doc_vector)
-            score = np.dot(query_vector, vec) / (np.linalg.norm(query_vector) * np.linalg.norm(vec))
-            scores.append((score, idx))
+        # Rows are pre-normalized, so cosine similarity is a single matvec
+        scores = matrix[:size] @ self._normalize(query_vector)
         
-        # Sort desc
-        scores.sort(key=lambda x: x[0], reverse=True)
+        k = min(top_k, size)
+        if k < size:
+            top = np.argpartition(scores, size - k)[size - k:]
+        else:
+            top = np.arange(size)
+        top = top[np.argsort(scores[top])[::-1]]
         
         # Return Top K
         results = []
-        for score, idx in scores[:top_k]:
+        for idx in top:
             results.append({
-                "score": float(score),
+                "score": float(scores[idx]),
                 "event": self.metadata[idx]["json"],
                 "narrative": self.metadata[idx]["narrative"]
             })
@@ -125,6 +216,51 @@ class TradeVectorStore:
         logger.info(f"Semantic Search '{query}' returned {len(results)} results.")
         return results
 
+    def save(self, path: str) -> None:
+        """
+        Persists the index as a raw float32 matrix plus a JSON metadata sidecar.
+        
+        Args:
+            path: Base path; writes ``{path}.f32`` and ``{path}.meta.json``
+        """
+        with self._lock:
+            size, dim = self._size, self._matrix.shape[1]
+            if size:
+                out = np.memmap(f"{path}.f32", dtype=np.float32, mode="w+", shape=(size, dim))
+                out[:] = self._matrix[:size]
+                out.flush()
+                del out
+            with open(f"{path}.meta.json", "w") as f:
+                json.dump({"size": size, "dim": dim, "ids": self.ids, "metadata": self.metadata}, f)
+        logger.info(f"Saved vector store ({size} events) to {path}")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "TradeVectorStore":
+        """
+        Loads an index written by save().
+        
+        Args:
+            path: Base path passed to save()
+            mmap: Map the matrix read-only instead of reading it into memory;
+                the first subsequent add copies it into a growable array
+            
+        Returns:
+            TradeVectorStore instance
+        """
+        with open(f"{path}.meta.json") as f:
+            meta = json.load(f)
+        
+        store = cls()
+        size, dim = meta["size"], meta["dim"]
+        if size:
+            matrix = np.memmap(f"{path}.f32", dtype=np.float32, mode="r", shape=(size, dim))
+            store._matrix = matrix if mmap else np.array(matrix)
+        store._size = size
+        store.ids = meta["ids"]
+        store.metadata = meta["metadata"]
+        logger.info(f"Loaded vector store ({size} events) from {path}")
+        return store
+
     def _jsonify_to_narrative(self, event: Dict[str, Any]) -> str:
         """Converts complex CDM JSON to a readable string for embedding."""
         event_type = event.get("eventType")
@@ -14,7 +14,7 @@ from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 import io
 
-from app.db import get_db
+from app.db import get_db, SessionLocal
 from app.db.models import User, AuditLog
 from app.auth.jwt_auth import require_auth
 from app.core.permissions import has_permission, PERMISSION_AUDIT_VIEW, PERMISSION_AUDIT_EXPORT
@@ -174,6 +174,7 @@ async def get_audit_logs(
     end_date: Optional[str] = Query(None, description="End date (ISO format)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum results"),
     offset: int = Query(0, ge=0, description="Pagination offset"),
+    exact_total: bool = Query(False, description="Count archived logs even when the page is filled from live logs"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_auth),
     audit_service: AuditService = Depends(get_audit_service)
@@ -212,7 +213,8 @@ async def get_audit_logs(
             start_date=start_dt,
             end_date=end_dt,
             limit=limit,
-            offset=offset
+            offset=offset,
+            exact_total=exact_total
         )
         
         # Enrich logs
@@ -600,9 +602,23 @@ async def download_audit_report(
         raise HTTPException(status_code=500, detail=f"Failed to download: {str(e)}")
 
 
+def _stream_from_own_session(stream, **kwargs):
+    """
+    Run a streaming export on its own session.
+    
+    The request-scoped session from get_db is closed before a StreamingResponse
+    body is consumed, so the generator opens and closes a dedicated one.
+    """
+    db = SessionLocal()
+    try:
+        yield from stream(db, **kwargs)
+    finally:
+        db.close()
+
+
 @router.get("/export")
 async def export_audit_data(
-    format: str = Query("csv", description="Export format: csv, excel, pdf"),
+    format: str = Query("csv", description="Export format: csv, ndjson, excel, pdf"),
     action: Optional[str] = Query(None, description="Filter by action type"),
     target_type: Optional[str] = Query(None, description="Filter by target type"),
     start_date: Optional[str] = Query(None, description="Start date (ISO format)"),
@@ -615,6 +631,10 @@ async def export_audit_data(
     """
     Export audit data to various formats.
     
+    CSV and NDJSON are streamed page by page over every matching log, archived
+    ones included (oldest first); Excel and PDF are built in memory from the
+    latest 10,000 logs.
+    
     Requires AUDIT_EXPORT permission.
     """
     # Check permissions
@@ -636,6 +656,26 @@ async def export_audit_data(
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid end_date format")
         
+        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        
+        # Stream line-oriented formats without materializing the result set
+        if format in ("csv", "ndjson"):
+            if SessionLocal is None:
+                raise HTTPException(status_code=503, detail="Database is not configured")
+            stream = export_service.stream_csv if format == "csv" else export_service.stream_ndjson
+            return StreamingResponse(
+                _stream_from_own_session(
+                    stream,
+                    include_metadata=True,
+                    action=action,
+                    target_type=target_type,
+                    start_date=start_dt,
+                    end_date=end_dt
+                ),
+                media_type="text/csv" if format == "csv" else "application/x-ndjson",
+                headers={"Content-Disposition": f"attachment; filename=audit_export_{timestamp}.{format}"}
+            )
+        
         # Get audit logs
         logs, _ = audit_service.get_audit_logs(
             db=db,
@@ -647,18 +687,14 @@ async def export_audit_data(
         )
         
         # Export based on format
-        if format == "csv":
-            content = export_service.export_to_csv(db, logs, include_metadata=True)
-            media_type = "text/csv"
-            filename = f"audit_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
-        elif format == "excel":
+        if format == "excel":
             content = export_service.export_to_excel(db, logs, include_metadata=True)
             media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            filename = f"audit_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.xlsx"
+            filename = f"audit_export_{timestamp}.xlsx"
         elif format == "pdf":
             content = export_service.export_to_pdf(db, logs, title="Audit Report")
             media_type = "application/pdf"
-            filename = f"audit_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
+            filename = f"audit_export_{timestamp}.pdf"
         else:
             raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
         
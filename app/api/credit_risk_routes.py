@@ -5,9 +5,15 @@ Provides endpoints for credit risk assessment, capital requirements,
 portfolio analysis, and stress testing.
 """
 
+import asyncio
+import dataclasses
+import hashlib
 import logging
-from typing import Dict, Any, Optional, List
+import math
+from typing import Dict, Any, Optional, List, Tuple
 from decimal import Decimal
+
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
@@ -16,6 +22,7 @@ from app.db import get_db
 from app.auth.jwt_auth import require_auth, get_current_user
 from app.db.models import User, Deal, Document
 from app.services.credit_risk_service import CreditRiskService
+from app.services.credit_loss_simulation import CreditLossSimulator, MAX_PD, STRESS_SCENARIOS
 from app.services.credit_risk_mapper import CreditRiskMapper
 from app.services.policy_service import PolicyService
 from app.services.policy_engine_factory import get_policy_engine
@@ -58,6 +65,156 @@ class StressTestRequest(BaseModel):
     market_value_shock: Optional[float] = Field(None, description="Market value shock (percentage, e.g., -0.2 for 20% decrease)")
 
 
+class PortfolioSimulationRequest(BaseModel):
+    """Request model for Monte Carlo portfolio loss simulation."""
+    deal_ids: Optional[List[int]] = Field(None, description="List of deal IDs (optional, uses all deals if not provided)")
+    user_id: Optional[int] = Field(None, description="Filter by user ID")
+    n_scenarios: int = Field(100_000, ge=1_000, le=10_000_000, description="Number of Monte Carlo scenarios")
+    seed: int = Field(42, description="Random seed (same seed, same results)")
+    confidence_levels: List[float] = Field([0.99, 0.999], description="VaR / Expected Shortfall confidence levels")
+    scenarios: List[str] = Field(
+        ["baseline", "adverse", "severe"],
+        description="Stress scenarios to simulate (baseline, adverse, severe)"
+    )
+    sector_pd_shocks: Optional[Dict[str, float]] = Field(None, description="Additional PD multipliers by sector (e.g., {'energy': 2.0})")
+    processes: int = Field(1, ge=1, le=8, description="Worker processes for the simulation")
+    tier1_capital: Optional[float] = Field(None, ge=0, description="Available capital (default: 8% of baseline RWA)")
+
+
+# Helpers
+
+def _collect_portfolio_exposures(
+    db: Session,
+    current_user: User,
+    deal_ids: Optional[List[int]],
+    user_id: Optional[int]
+) -> List[Dict[str, Any]]:
+    """
+    Map the user's deals with CDM data to per-deal risk parameters.
+    
+    Returns:
+        One dict per deal with deal, ead, pd, lgd, maturity, asset_class, approach and sector
+    """
+    query = db.query(Deal)
+    
+    if user_id:
+        query = query.filter(Deal.applicant_id == user_id)
+    elif current_user.role != "admin":
+        # Non-admins only see their own deals
+        query = query.filter(Deal.applicant_id == current_user.id)
+    
+    if deal_ids:
+        query = query.filter(Deal.id.in_(deal_ids))
+    
+    exposures = []
+    credit_risk_mapper = CreditRiskMapper()
+    for deal in query.all():
+        # Get documents with CDM data
+        document = db.query(Document).filter(
+            Document.deal_id == deal.id,
+            Document.source_cdm_data.isnot(None)
+        ).first()
+        
+        if document and document.source_cdm_data:
+            try:
+                credit_agreement = CreditAgreement(**document.source_cdm_data)
+                risk_fields = credit_risk_mapper.map_cdm_to_credit_risk_fields(
+                    credit_agreement=credit_agreement,
+                    additional_context=deal.deal_data or {}
+                )
+                
+                if "exposure_at_default" in risk_fields:
+                    exposures.append({
+                        "deal": deal,
+                        "ead": float(risk_fields["exposure_at_default"]),
+                        "pd": risk_fields.get("probability_of_default", 0.01),
+                        "lgd": risk_fields.get("loss_given_default", 0.45),
+                        "maturity": risk_fields.get("maturity_years", 1.0),
+                        "asset_class": risk_fields.get("asset_class", "corporate"),
+                        "approach": risk_fields.get("risk_model_approach", "standardized"),
+                        "sector": deal.deal_data.get("sector", "unknown") if deal.deal_data else "unknown"
+                    })
+            except Exception as e:
+                logger.warning(f"Failed to process deal {deal.id} for portfolio: {e}")
+                continue
+    
+    return exposures
+
+
+def _split_valid_exposures(
+    exposures: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Separate exposures whose risk parameters cannot enter an RWA batch.
+    
+    Returns:
+        (valid exposures, skipped deals as {"deal_id", "reason"} dicts)
+    """
+    valid = []
+    skipped = []
+    for exposure in exposures:
+        reason = None
+        try:
+            ead, pd, lgd, maturity = (
+                float(exposure[key]) for key in ("ead", "pd", "lgd", "maturity")
+            )
+        except (TypeError, ValueError):
+            reason = "non-numeric EAD, PD, LGD or maturity"
+        else:
+            if not all(math.isfinite(value) for value in (ead, pd, lgd, maturity)):
+                reason = "non-finite EAD, PD, LGD or maturity"
+            elif not 0 <= pd <= 1:
+                reason = f"PD {pd} outside [0, 1]"
+            elif not 0 <= lgd <= 1:
+                reason = f"LGD {lgd} outside [0, 1]"
+        if reason is None:
+            valid.append(exposure)
+        else:
+            logger.warning(f"Skipping deal {exposure['deal'].id} in portfolio: {reason}")
+            skipped.append({"deal_id": exposure["deal"].deal_id, "reason": reason})
+    return valid, skipped
+
+
+def _clip_pd(pd: Any) -> np.ndarray:
+    """Clip PDs into the open interval the IRB formula accepts (0 and 1 are valid inputs)."""
+    return np.clip(np.asarray(pd, dtype=np.float64), 1e-12, MAX_PD)
+
+
+def _approach_groups(exposures: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """Exposure positions by RWA approach, in approach order."""
+    groups: Dict[str, List[int]] = {}
+    for i, exposure in enumerate(exposures):
+        groups.setdefault(exposure["approach"], []).append(i)
+    return dict(sorted(groups.items()))
+
+
+def _portfolio_rwa(
+    credit_risk_service: CreditRiskService,
+    exposures: List[Dict[str, Any]],
+    pd: Any,
+    lgd: Any
+) -> float:
+    """
+    Total RWA with each deal's own approach, at the given PDs (clipped) and LGDs.
+    
+    Returns:
+        Sum of the per-approach batch RWA
+    """
+    pd = _clip_pd(pd)
+    lgd = np.asarray(lgd, dtype=np.float64)
+    total = 0.0
+    for approach, group in _approach_groups(exposures).items():
+        total += float(credit_risk_service.calculate_rwa_batch(
+            [exposures[i]["ead"] for i in group],
+            pd[group],
+            lgd[group],
+            maturity=[exposures[i]["maturity"] for i in group],
+            asset_class=[exposures[i]["asset_class"] for i in group],
+            approach=approach
+        ).sum())
+    return total
+
+
 # API Endpoints
 
 @router.post("/assess", response_model=Dict[str, Any])
@@ -244,77 +401,53 @@ async def get_portfolio_summary(
     try:
         credit_risk_service = CreditRiskService()
         
-        # Get deals
-        query = db.query(Deal)
-        
-        if request.user_id:
-            query = query.filter(Deal.applicant_id == request.user_id)
-        elif current_user.role != "admin":
-            # Non-admins only see their own deals
-            query = query.filter(Deal.applicant_id == current_user.id)
-        
-        if request.deal_ids:
-            query = query.filter(Deal.id.in_(request.deal_ids))
-        
-        deals = query.all()
-        
-        # Build portfolio data
+        exposures, skipped = _split_valid_exposures(
+            _collect_portfolio_exposures(db, current_user, request.deal_ids, request.user_id)
+        )
         portfolio = []
+        
+        # Vectorized RWA per approach; totals are rounded to Decimal once per approach
+        rwa_by_exposure = {}
         total_rwa = Decimal("0")
         total_capital_requirement = Decimal("0")
-        
-        for deal in deals:
-            # Get documents with CDM data
-            document = db.query(Document).filter(
-                Document.deal_id == deal.id,
-                Document.source_cdm_data.isnot(None)
-            ).first()
+        for approach, group in _approach_groups(exposures).items():
+            ead = [exposures[i]["ead"] for i in group]
+            try:
+                rwas = credit_risk_service.calculate_rwa_batch(
+                    exposure=ead,
+                    pd=_clip_pd([exposures[i]["pd"] for i in group]),
+                    lgd=[exposures[i]["lgd"] for i in group],
+                    maturity=[exposures[i]["maturity"] for i in group],
+                    asset_class=[exposures[i]["asset_class"] for i in group],
+                    approach=approach
+                )
+            except Exception as e:
+                logger.warning(f"Failed to calculate RWA for {len(group)} {approach} deals in portfolio summary: {e}")
+                skipped.extend(
+                    {"deal_id": exposures[i]["deal"].deal_id, "reason": f"RWA calculation failed: {e}"}
+                    for i in group
+                )
+                continue
             
-            if document and document.source_cdm_data:
-                try:
-                    credit_agreement = CreditAgreement(**document.source_cdm_data)
-                    
-                    # Calculate RWA for this deal
-                    credit_risk_mapper = CreditRiskMapper()
-                    risk_fields = credit_risk_mapper.map_cdm_to_credit_risk_fields(
-                        credit_agreement=credit_agreement,
-                        additional_context=deal.deal_data or {}
-                    )
-                    
-                    if "exposure_at_default" in risk_fields:
-                        ead = Decimal(str(risk_fields["exposure_at_default"]))
-                        pd = risk_fields.get("probability_of_default", 0.01)
-                        lgd = risk_fields.get("loss_given_default", 0.45)
-                        maturity = risk_fields.get("maturity_years", 1.0)
-                        asset_class = risk_fields.get("asset_class", "corporate")
-                        approach = risk_fields.get("risk_model_approach", "standardized")
-                        
-                        rwa = credit_risk_service.calculate_rwa(
-                            exposure=ead,
-                            pd=pd,
-                            lgd=lgd,
-                            maturity=maturity,
-                            asset_class=asset_class,
-                            approach=approach
-                        )
-                        
-                        capital_req = credit_risk_service.calculate_capital_requirement(rwa)
-                        
-                        portfolio.append({
-                            "deal_id": deal.deal_id,
-                            "deal_type": deal.deal_type,
-                            "amount": float(ead),
-                            "rwa": float(rwa),
-                            "capital_requirement": float(capital_req),
-                            "sector": deal.deal_data.get("sector", "unknown") if deal.deal_data else "unknown",
-                            "borrower_id": deal.applicant_id
-                        })
-                        
-                        total_rwa += rwa
-                        total_capital_requirement += capital_req
-                except Exception as e:
-                    logger.warning(f"Failed to process deal {deal.id} for portfolio summary: {e}")
-                    continue
+            capital = credit_risk_service.summarize_portfolio_rwa(ead, rwas)
+            total_rwa += capital["total_rwa"]
+            total_capital_requirement += capital["capital_requirement"]
+            rwa_by_exposure.update(zip(group, rwas.tolist()))
+        
+        for i, exposure in enumerate(exposures):
+            if i not in rwa_by_exposure:
+                continue
+            deal = exposure["deal"]
+            rwa = rwa_by_exposure[i]
+            portfolio.append({
+                "deal_id": deal.deal_id,
+                "deal_type": deal.deal_type,
+                "amount": exposure["ead"],
+                "rwa": round(rwa, 2),
+                "capital_requirement": round(rwa * float(credit_risk_service.MIN_CAPITAL_RATIO), 2),
+                "sector": exposure["sector"],
+                "borrower_id": deal.applicant_id
+            })
         
         # Calculate concentration metrics
         concentration = credit_risk_service.calculate_portfolio_concentration(portfolio)
@@ -333,7 +466,8 @@ async def get_portfolio_summary(
                     "borrower_count": concentration.get("borrower_count", 0)
                 }
             },
-            "deals": portfolio[:100]  # Limit to first 100 deals
+            "deals": portfolio[:100],  # Limit to first 100 deals
+            "skipped_deals": skipped
         }
     
     except Exception as e:
@@ -462,3 +596,127 @@ async def run_stress_test(
     except Exception as e:
         logger.error(f"Error running stress test: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error running stress test: {str(e)}")
+
+
+def _portfolio_id(deal_ids: List[str]) -> str:
+    """Identify a simulated portfolio by its deals (the deal ID itself for a single deal)."""
+    if len(deal_ids) == 1:
+        return deal_ids[0]
+    return f"portfolio_{hashlib.sha256(','.join(deal_ids).encode()).hexdigest()[:12]}"
+
+
+def _simulate_portfolio(exposures: List[Dict[str, Any]], request: PortfolioSimulationRequest) -> Dict[str, Any]:
+    """Simulate every requested stress scenario and evaluate it against the stress testing rules."""
+    credit_risk_service = CreditRiskService()
+    simulator = CreditLossSimulator(credit_risk_service)
+    policy_service = PolicyService(get_policy_engine())
+    
+    ead = [e["ead"] for e in exposures]
+    pd = [e["pd"] for e in exposures]
+    lgd = [e["lgd"] for e in exposures]
+    asset_class = [e["asset_class"] for e in exposures]
+    sector = [e["sector"] for e in exposures]
+    
+    results = []
+    stressed_rwa = []
+    for name in request.scenarios:
+        scenario = STRESS_SCENARIOS[name]
+        if request.sector_pd_shocks:
+            scenario = dataclasses.replace(scenario, sector_pd_multipliers=request.sector_pd_shocks)
+        result = simulator.simulate(
+            ead, pd, lgd,
+            asset_class=asset_class,
+            sector=sector,
+            scenario=scenario,
+            n_scenarios=request.n_scenarios,
+            seed=request.seed,
+            confidence_levels=request.confidence_levels,
+            processes=request.processes
+        )
+        # Regulatory RWA under the same shocks, for the stressed capital ratio
+        stressed_pd, stressed_lgd = simulator.stressed_parameters(pd, lgd, sector, scenario, (len(ead),))
+        result["risk_weighted_assets"] = _portfolio_rwa(
+            credit_risk_service, exposures, stressed_pd, stressed_lgd
+        )
+        results.append(result)
+        stressed_rwa.append(result["risk_weighted_assets"])
+    
+    baseline_rwa = _portfolio_rwa(credit_risk_service, exposures, pd, lgd)
+    capital = request.tier1_capital
+    if capital is None:
+        capital = baseline_rwa * float(credit_risk_service.MIN_CAPITAL_RATIO)
+    
+    deal_ids = sorted(str(e["deal"].deal_id) for e in exposures)
+    portfolio_id = _portfolio_id(deal_ids)
+    decisions = policy_service.evaluate_stress_test_results(
+        portfolio_id=portfolio_id,
+        scenario_results=results,
+        capital=capital,
+        stressed_rwa=stressed_rwa,
+        deal_ids=deal_ids
+    )
+    for result, decision in zip(results, decisions):
+        result["policy_decision"] = decision.decision
+        result["policy_rule"] = decision.rule_applied
+        result["stressed_capital_ratio"] = decision.metadata["stress_test_capital_ratio"]
+    
+    return {
+        "portfolio_id": portfolio_id,
+        "deal_ids": deal_ids,
+        "capital": capital,
+        "baseline_rwa": baseline_rwa,
+        "scenarios": results
+    }
+
+
+@router.post("/portfolio-simulation", response_model=Dict[str, Any])
+async def simulate_portfolio_losses(
+    request: PortfolioSimulationRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_auth)
+):
+    """
+    Simulate portfolio credit losses (Vasicek one-factor Monte Carlo) under stress scenarios.
+    
+    Args:
+        request: PortfolioSimulationRequest with deal filters, scenario count and stress scenarios
+        db: Database session
+        current_user: Authenticated user
+        
+    Returns:
+        Per scenario: expected loss, VaR, Expected Shortfall, economic capital,
+        sector concentration and the stress testing policy decision
+    """
+    unknown = [name for name in request.scenarios if name not in STRESS_SCENARIOS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown stress scenarios {unknown}; available: {sorted(STRESS_SCENARIOS)}"
+        )
+    if any(not 0 < q < 1 for q in request.confidence_levels):
+        raise HTTPException(status_code=400, detail="Confidence levels must be between 0 and 1")
+    
+    try:
+        exposures, skipped = _split_valid_exposures(
+            _collect_portfolio_exposures(db, current_user, request.deal_ids, request.user_id)
+        )
+        if not exposures:
+            raise HTTPException(status_code=400, detail="No deals with CDM data to simulate")
+        
+        # CPU-bound: keep the event loop free while the simulation runs
+        simulation = await asyncio.to_thread(_simulate_portfolio, exposures, request)
+        
+        return {
+            "status": "success",
+            "total_deals": len(exposures),
+            "n_scenarios": request.n_scenarios,
+            "seed": request.seed,
+            **simulation,
+            "skipped_deals": skipped
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error simulating portfolio losses: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error simulating portfolio losses: {str(e)}")
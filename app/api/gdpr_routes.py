@@ -295,7 +295,7 @@ async def export_user_data_endpoint(
     Users can export their own data. Admins can export any user's data.
     """
     # Check if user is requesting their own data or is admin
-    target_user = db.query(User).filter(User.email == request.email).first()
+    target_user = db.query(User).filter(User.email_bidx == request.email).first()
     
     if not target_user:
         raise HTTPException(
@@ -356,7 +356,7 @@ async def delete_user_data_endpoint(
         )
     
     # Check if user is requesting their own data or is admin
-    target_user = db.query(User).filter(User.email == request.email).first()
+    target_user = db.query(User).filter(User.email_bidx == request.email).first()
     
     if not target_user:
         raise HTTPException(
@@ -5,14 +5,14 @@ import io
 import json
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Query, Request, Form, Body
 from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel, Field, model_validator
 from sqlalchemy.orm import Session, joinedload
 import pandas as pd
 
-from app.chains.extraction_chain import extract_data, extract_data_smart
+from app.chains.extraction_chain import extract_data, extract_data_from_pages, extract_data_smart
 from app.models.cdm import ExtractionResult, CreditAgreement
 from app.db import get_db
 from app.db.models import StagedExtraction, ExtractionStatus, Document, DocumentVersion, Workflow, WorkflowState, User, AuditLog, AuditAction, PolicyDecision as PolicyDecisionModel, ClauseCache, LMATemplate, Deal, DealNote, GreenFinanceAssessment
@@ -81,19 +81,21 @@ def get_x402_payment_service(request: Request) -> Optional[X402PaymentService]:
 
 MAX_FILE_SIZE_MB = 20
 
-def extract_text_from_pdf(file_content: bytes) -> str:
-    """Extract text from a PDF file using PyMuPDF.
+def iter_pdf_text(file_content: bytes) -> Iterator[str]:
+    """Validate a PDF upload and stream the text of its pages.
     
     Args:
         file_content: The raw bytes of the PDF file.
         
     Returns:
-        Extracted text from all pages.
+        Iterator over page texts, in page order; pages are extracted in
+        parallel and cached by (file hash, page number) as it is consumed.
         
     Raises:
-        ValueError: If file is not a valid PDF, too large, or corrupted.
+        ValueError: If the file is too large or not a PDF (immediately), or
+            if the PDF is corrupted or a page fails (while iterating).
     """
-    import fitz
+    from app.utils.pdf_extractor import iter_pdf_pages
     
     # Validate file size first
     file_size_mb = len(file_content) / (1024 * 1024)
@@ -104,24 +106,30 @@ def extract_text_from_pdf(file_content: bytes) -> str:
     if not file_content.startswith(b'%PDF-'):
         raise ValueError("Invalid PDF file: File does not start with PDF magic bytes.")
     
-    # Validate PDF structure by attempting to open it
-    doc = None
-    text_parts = []
-    try:
-        doc = fitz.open(stream=file_content, filetype="pdf")
-        # Additional validation: check if document has pages
-        if doc.page_count == 0:
-            raise ValueError("Invalid PDF file: Document has no pages.")
-        for page in doc:
-            text_parts.append(page.get_text())
-    except Exception as e:
-        logger.error(f"Error extracting text from PDF: {e}")
-        raise ValueError(f"Failed to parse PDF file: {str(e)}")
-    finally:
-        if doc:
-            doc.close()
+    def pages() -> Iterator[str]:
+        try:
+            for page in iter_pdf_pages(file_content):
+                yield page.text
+        except Exception as e:
+            logger.error(f"Error extracting text from PDF: {e}")
+            raise ValueError(f"Failed to parse PDF file: {str(e)}") from e
+    
+    return pages()
+
+
+def extract_text_from_pdf(file_content: bytes) -> str:
+    """Extract text from a PDF file using PyMuPDF.
     
-    return "\n".join(text_parts)
+    Args:
+        file_content: The raw bytes of the PDF file.
+        
+    Returns:
+        Extracted text from all pages.
+        
+    Raises:
+        ValueError: If file is not a valid PDF, too large, or corrupted.
+    """
+    return "\n".join(iter_pdf_text(file_content))
 
 
 def extract_text_from_file(file_content: bytes, filename: Optional[str] = None) -> str:
@@ -426,19 +434,33 @@ async def upload_and_extract(file: UploadFile = File(...)):
         content = await file.read()
         
         if file_type == "pdf":
-            text = extract_text_from_pdf(content)
+            # Pages are extracted in the process pool and dispatched by
+            # length (simple, Map-Reduce or agentic pipeline); the text is
+            # kept for the response as it passes through
+            pdf_pages = iter_pdf_text(content)  # Size and magic bytes are checked here
+            page_texts: List[str] = []
+            
+            def pages() -> Iterator[str]:
+                for page_text in pdf_pages:
+                    page_texts.append(page_text)
+                    yield page_text
+            
+            # A document without text raises ValueError (422 below)
+            result = extract_data_from_pages(pages())
+            text = "\n".join(page_texts)
+            logger.info(f"Extracted {len(text)} characters from uploaded PDF file ({len(page_texts)} pages)")
         else:
             text = content.decode("utf-8", errors="replace")
-        
-        if not text.strip():
-            raise HTTPException(
-                status_code=422,
-                detail={"status": "error", "message": "The uploaded file contains no extractable text."}
-            )
-        
-        logger.info(f"Extracted {len(text)} characters from uploaded {file_type.upper()} file")
-        
-        result = extract_data_smart(text=text, force_map_reduce=False)
+            
+            if not text.strip():
+                raise HTTPException(
+                    status_code=422,
+                    detail={"status": "error", "message": "The uploaded file contains no extractable text."}
+                )
+            
+            logger.info(f"Extracted {len(text)} characters from uploaded TXT file")
+            
+            result = extract_data_smart(text=text, force_map_reduce=False)
         
         if result is None:
             raise HTTPException(
@@ -2002,6 +2024,40 @@ async def health_check():
     return JSONResponse(content=status, status_code=status_code)
 
 
+@router.get("/health/embedding-cache")
+async def health_check_embedding_cache():
+    """Report embedding cache metrics (hit rate, tier sizes, evictions)."""
+    from app.core.config import settings
+    
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return {"enabled": False}
+    
+    from app.services.embedding_cache import get_embedding_cache
+    return {"enabled": True, **get_embedding_cache().get_stats()}
+
+
+@router.get("/health/extraction-cache")
+async def health_check_extraction_cache():
+    """Report chunk extraction cache metrics (hit rate, estimated tokens saved)."""
+    from app.services.extraction_cache import get_extraction_cache
+    
+    cache = get_extraction_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.get_stats()}
+
+
+@router.get("/health/llm-response-cache")
+async def health_check_llm_response_cache():
+    """Report deterministic LLM response cache metrics (hit rate, tokens saved)."""
+    from app.core.llm_response_cache import get_llm_response_cache
+    
+    cache = get_llm_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.get_stats()}
+
+
 @router.get("/health/database/ssl")
 async def health_check_database_ssl():
     """Check SSL status of database connection.
@@ -6737,19 +6793,20 @@ async def get_cdm_events(trade_id: str):
     # ---------------------------------------------------------
     # INFRASTRUCTURE LAYER: Vector Indexing (Side Effect)
     # ---------------------------------------------------------
-    GLOBAL_VECTOR_STORE.add_trade_event(execution)
-    GLOBAL_VECTOR_STORE.add_trade_event(observation)
-    GLOBAL_VECTOR_STORE.add_trade_event(terms_change)
+    GLOBAL_VECTOR_STORE.add_trade_events([execution, observation, terms_change])
     
     return [execution, observation, terms_change]
 
 @router.get("/search")
-async def semantic_search_trades(q: str):
+def semantic_search_trades(q: str, top_k: int = Query(3, ge=1, le=100)):
     """
     Semantic Search over Trade Lifecycle Events.
     Demonstrates "Hybrid Search" capabilities.
+    
+    Declared sync so FastAPI runs the query embedding and matrix search in
+    its threadpool instead of on the event loop.
     """
-    results = GLOBAL_VECTOR_STORE.semantic_search(q)
+    results = GLOBAL_VECTOR_STORE.semantic_search(q, top_k=top_k)
     return results
 
 @router.post("/classify")
@@ -8387,9 +8444,9 @@ async def execute_trade(
         
         # Step 4: Store trade event in vector store for later retrieval
         try:
-            GLOBAL_VECTOR_STORE.add_trade_event(trade_event)
-            if policy_evaluation_event:
-                GLOBAL_VECTOR_STORE.add_trade_event(policy_evaluation_event)
+            GLOBAL_VECTOR_STORE.add_trade_events(
+                [trade_event, policy_evaluation_event] if policy_evaluation_event else [trade_event]
+            )
             logger.debug(f"Stored trade event {trade_request.trade_id} in vector store")
         except Exception as e:
             logger.warning(f"Failed to store trade event in vector store: {e}")
@@ -8816,6 +8873,89 @@ async def generate_document(
         raise HTTPException(status_code=500, detail=f"Document generation failed: {str(e)}")
 
 
+class BulkGenerateItem(BaseModel):
+    """One document in a bulk generation request."""
+    template_id: int = Field(..., description="Template ID")
+    document_id: Optional[int] = Field(None, description="Document ID to load CDM data from library")
+    deal_id: Optional[int] = Field(None, description="Deal ID for deal context and linking; CDM data is loaded from the deal's latest document if neither cdm_data nor document_id is given")
+    cdm_data: Optional[dict] = Field(None, description="CDM CreditAgreement data (document_id takes precedence)")
+    source_document_id: Optional[int] = Field(None, description="Optional source document ID for tracking")
+    field_overrides: Optional[Dict[str, Any]] = Field(None, description="Optional field overrides to apply to CDM data before generation")
+    
+    @model_validator(mode='after')
+    def validate_cdm_source(self) -> 'BulkGenerateItem':
+        """Ensure the item has a CDM source."""
+        if not self.cdm_data and not self.document_id and not self.deal_id:
+            raise ValueError("Each item requires 'cdm_data', 'document_id' or 'deal_id'")
+        return self
+
+
+class BulkGenerateRequest(BaseModel):
+    """Request model for bulk document generation."""
+    items: List[BulkGenerateItem] = Field(..., min_length=1, description="Documents to generate")
+
+
+def _stream_bulk_generation(items, user_id: int):
+    """
+    Run a bulk generation job on its own session and stream its events as NDJSON.
+    
+    The request-scoped session from get_db is closed before a StreamingResponse
+    body is consumed, so the generator opens and closes a dedicated one.
+    """
+    from app.db import SessionLocal
+    from app.generation.bulk import BulkDocumentGenerationService
+    
+    db = SessionLocal()
+    try:
+        for event in BulkDocumentGenerationService().generate(db, items, user_id=user_id):
+            yield json.dumps(event, default=str) + "\n"
+    except Exception as e:
+        logger.error(f"Bulk document generation failed: {e}", exc_info=True)
+        yield json.dumps({"event": "error", "error": str(e)}) + "\n"
+    finally:
+        db.close()
+
+
+@router.post("/templates/generate/bulk")
+async def generate_documents_bulk(
+    request: BulkGenerateRequest,
+    current_user: User = Depends(require_auth)
+):
+    """
+    Generate many documents from templates in one job (e.g. a deal closing pack).
+    
+    Templates, field mappings, deal context and CDM data are loaded once and
+    shared across items; rendering runs in a process pool and documents are
+    written in batches. The response streams newline-delimited JSON events:
+    "started", one "result" per item (generated or failed), "progress" after
+    each written batch, and "completed".
+    
+    Args:
+        request: BulkGenerateRequest with the items to generate
+        current_user: Authenticated user
+        
+    Returns:
+        Streaming NDJSON response of job events
+    """
+    from app.core.config import settings
+    from app.db import SessionLocal
+    from app.generation.bulk import BulkGenerationItem
+    
+    if SessionLocal is None:
+        raise HTTPException(status_code=503, detail="Database is not configured")
+    if len(request.items) > settings.DOCUMENT_GENERATION_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many items: {len(request.items)} (maximum {settings.DOCUMENT_GENERATION_BULK_MAX_ITEMS})"
+        )
+    
+    items = [BulkGenerationItem(**item.model_dump()) for item in request.items]
+    return StreamingResponse(
+        _stream_bulk_generation(items, current_user.id),
+        media_type="application/x-ndjson"
+    )
+
+
 # ============================================================================
 # Clause Cache Management API
 # ============================================================================
@@ -10245,7 +10385,7 @@ async def wallet_signup(
                 detail="Invalid email format"
             )
         # Check if email is already in use
-        email_user = db.query(User).filter(User.email == email.lower()).first()
+        email_user = db.query(User).filter(User.email_bidx == email).first()
         if email_user:
             raise HTTPException(
                 status_code=409,
@@ -12118,7 +12258,7 @@ async def reset_demo_data(
                 "applicant@creditnexus.app"
             ]
             users_deleted = db.query(User).filter(
-                User.email.in_(demo_user_emails)
+                User.email_bidx.in_(demo_user_emails)
             ).delete(synchronize_session=False)
             deleted_counts["users"] = users_deleted
         
@@ -1,5 +1,6 @@
 """Securitization API routes for structured finance products."""
 
+import asyncio
 import logging
 from decimal import Decimal
 from typing import Optional, List, Dict, Any
@@ -17,6 +18,7 @@ from app.db.models import (
 )
 from app.auth.jwt_auth import get_current_user, require_auth
 from app.services.securitization_service import SecuritizationService
+from app.services.securitization_waterfall import WaterfallAssumptions
 from app.services.wallet_service import WalletService
 from app.services.blockchain_service import BlockchainService
 from app.services.x402_payment_service import X402PaymentService, get_x402_payment_service
@@ -30,6 +32,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/securitization", tags=["securitization"])
 
+# Upper bound on scenarios per waterfall request
+MAX_WATERFALL_SCENARIOS = 50_000
+
 
 # ============================================================================
 # Request/Response Models
@@ -83,7 +88,18 @@ class DistributePaymentsRequest(BaseModel):
     """Request model for distributing payments to tranche holders."""
     payment_amount: Decimal = Field(..., description="Total payment amount to distribute")
     payment_type: str = Field(..., description="Payment type: 'interest' or 'principal'")
-    payment_payloads: Optional[List[Dict[str, Any]]] = Field(None, description="x402 payment payloads (one per tranche)")
+    payment_payload: Optional[Dict[str, Any]] = Field(None, description="x402 payment payload settling all holder payouts for the period")
+    principal_mode: str = Field("sequential", description="Principal allocation: 'sequential' or 'pro_rata'")
+
+
+class WaterfallScenarioRequest(BaseModel):
+    """Request model for running pool cash-flow waterfall scenarios."""
+    cpr: List[float] = Field([0.0], description="Annual prepayment rates (e.g., 0.1 for 10% CPR), one per scenario or a single value")
+    cdr: List[float] = Field([0.0], description="Annual default rates (e.g., 0.02 for 2% CDR), one per scenario or a single value")
+    severity: List[float] = Field([0.4], description="Loss severities (1 - recovery rate), one per scenario or a single value")
+    recovery_lag: int = Field(6, ge=0, le=60, description="Months between default and recovery")
+    principal_mode: str = Field("sequential", description="Principal allocation: 'sequential' or 'pro_rata'")
+    percentiles: List[float] = Field([50, 95, 99], description="Tranche loss percentiles to report")
 
 
 class NotarizeSecuritizationRequest(BaseModel):
@@ -663,16 +679,18 @@ async def distribute_payments(
         if not pool:
             raise HTTPException(status_code=404, detail="Securitization pool not found")
         
-        distributions = service.distribute_payments(
+        result = await service.distribute_payments(
             pool_id=pool.pool_id,
             total_payment_amount=request.payment_amount,
             payment_type=request.payment_type,
-            payment_service=payment_service
+            payment_service=payment_service,
+            payment_payload=request.payment_payload,
+            principal_mode=request.principal_mode
         )
         
         return {
             "status": "success",
-            "distributions": distributions
+            **result
         }
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -692,6 +710,51 @@ async def distribute_payments(
         raise HTTPException(status_code=500, detail=f"Failed to distribute payments: {str(e)}")
 
 
+@router.post("/pools/{pool_id}/waterfall-scenarios")
+async def run_waterfall_scenarios(
+    pool_id: int,
+    request: WaterfallScenarioRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_auth)
+):
+    """Project the pool's cash flows under CPR/CDR/severity scenarios and run the tranche waterfall.
+    
+    Scenario lists broadcast against each other, so a single CDR with 1,000 CPRs
+    runs 1,000 scenarios.
+    """
+    try:
+        pool = db.query(SecuritizationPool).filter(SecuritizationPool.id == pool_id).first()
+        if not pool:
+            raise HTTPException(status_code=404, detail="Securitization pool not found")
+        
+        assumptions = WaterfallAssumptions(
+            cpr=request.cpr,
+            cdr=request.cdr,
+            severity=request.severity,
+            recovery_lag=request.recovery_lag
+        )
+        n_scenarios = assumptions.arrays()[0].size
+        if n_scenarios > MAX_WATERFALL_SCENARIOS:
+            raise ValueError(f"At most {MAX_WATERFALL_SCENARIOS} scenarios per request, got {n_scenarios}")
+        
+        service = SecuritizationService(db)
+        # Numerical work runs off the event loop
+        return await asyncio.to_thread(
+            service.run_waterfall_scenarios,
+            pool.pool_id,
+            assumptions,
+            request.principal_mode,
+            request.percentiles
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to run waterfall scenarios: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to run waterfall scenarios: {str(e)}")
+
+
 # ============================================================================
 # Notarization Endpoints
 # ============================================================================
@@ -26,7 +26,7 @@ import hashlib
 from app.db import get_db
 from app.db.models import User, AuditLog, AuditAction, UserRole, RefreshToken
 from app.core.config import settings
-from app.utils import get_debug_log_path
+from app.core.tracing import start_trace, span
 
 logger = logging.getLogger(__name__)
 
@@ -297,25 +297,6 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 def create_refresh_token(data: dict, db: Session, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT refresh token and store it in the database."""
-    # #region agent log
-    import json
-
-    log_data = {
-        "sessionId": "debug-session",
-        "runId": "login-attempt",
-        "hypothesisId": "F",
-        "location": "jwt_auth.py:create_refresh_token:entry",
-        "message": "create_refresh_token called",
-        "data": {"user_id": data.get("sub")},
-        "timestamp": int(datetime.utcnow().timestamp() * 1000),
-    }
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
     logger.debug("create_refresh_token called", extra={"user_id": data.get("sub")})
 
     to_encode = data.copy()
@@ -323,103 +304,17 @@ def create_refresh_token(data: dict, db: Session, expires_delta: Optional[timede
     jti = secrets.token_urlsafe(16)
     to_encode.update({"exp": expire, "iat": datetime.utcnow(), "type": "refresh", "jti": jti})
 
-    # #region agent log
-    log_data["location"] = "jwt_auth.py:create_refresh_token:before_db_add"
-    log_data["message"] = "Before RefreshToken creation"
-    log_data["data"] = {
-        "jti": jti,
-        "user_id": data.get("sub"),
-        "user_id_int": int(data.get("sub")) if data.get("sub") else None,
-    }
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
-    try:
+    with span("refresh_token_persist"):
         token_record = RefreshToken(
             jti=jti, user_id=int(data.get("sub")), expires_at=expire, is_revoked=False
         )
         db.add(token_record)
-    except Exception as e:
-        # #region agent log
-        log_data["location"] = "jwt_auth.py:create_refresh_token:db_add_error"
-        log_data["message"] = "RefreshToken creation/add failed"
-        log_data["data"] = {"error": str(e), "error_type": type(e).__name__}
-        try:
-            with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-                f.write(json.dumps(log_data) + "\n")
-        except Exception:
-            pass
-        # #endregion
-        raise
-
-    # #region agent log
-    log_data["location"] = "jwt_auth.py:create_refresh_token:before_commit"
-    log_data["message"] = "Before db.commit()"
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
-    try:
         db.commit()
-    except Exception as e:
-        # #region agent log
-        log_data["location"] = "jwt_auth.py:create_refresh_token:commit_error"
-        log_data["message"] = "db.commit() failed"
-        log_data["data"] = {"error": str(e), "error_type": type(e).__name__}
-        try:
-            with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-                f.write(json.dumps(log_data) + "\n")
-        except Exception:
-            pass
-        # #endregion
-        raise
 
     logger.debug("Refresh token created", extra={"jti": jti, "user_id": data.get("sub")})
 
-    # #region agent log
-    log_data["location"] = "jwt_auth.py:create_refresh_token:before_jwt_encode"
-    log_data["message"] = "Before JWT encoding"
-    log_data["data"] = {"has_refresh_secret": bool(JWT_REFRESH_SECRET_KEY)}
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
-    try:
-        token = jwt.encode(to_encode, JWT_REFRESH_SECRET_KEY, algorithm=JWT_ALGORITHM)
-    except Exception as e:
-        # #region agent log
-        log_data["location"] = "jwt_auth.py:create_refresh_token:jwt_encode_error"
-        log_data["message"] = "JWT encoding failed"
-        log_data["data"] = {"error": str(e), "error_type": type(e).__name__}
-        try:
-            with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-                f.write(json.dumps(log_data) + "\n")
-        except Exception:
-            pass
-        # #endregion
-        raise
-
-    # #region agent log
-    log_data["location"] = "jwt_auth.py:create_refresh_token:success"
-    log_data["message"] = "Refresh token created successfully"
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
-    return token
+    with span("refresh_token_encode"):
+        return jwt.encode(to_encode, JWT_REFRESH_SECRET_KEY, algorithm=JWT_ALGORITHM)
 
 
 def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
@@ -503,86 +398,49 @@ async def require_auth(
     credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)
 ) -> User:
     """Require valid authentication - raises exception if not authenticated."""
-    # #region agent log
-    import json
-    from datetime import datetime
-
-    log_data = {
-        "sessionId": "debug-session",
-        "runId": "auth-check",
-        "hypothesisId": "JWT persistence",
-        "location": "jwt_auth.py:require_auth",
-        "message": "Checking authentication",
-        "data": {"has_credentials": credentials is not None},
-        "timestamp": int(datetime.now().timestamp() * 1000),
-    }
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
-    if not credentials:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    payload = decode_access_token(credentials.credentials)
-
-    # #region agent log
-    log_data["message"] = "Decoded token"
-    log_data["data"] = {
-        "payload_found": payload is not None,
-        "token_start": credentials.credentials[:10] if credentials.credentials else None,
-    }
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
+    with start_trace("auth.require_auth", has_credentials=credentials is not None):
+        if not credentials:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
 
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        with span("token_decode") as decode_span:
+            payload = decode_access_token(credentials.credentials)
+            decode_span.set(payload_found=payload is not None)
 
-    user_id = payload.get("sub")
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token payload",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        if not payload:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+        user_id = payload.get("sub")
+        if not user_id:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token payload",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
 
-    # #region agent log
-    log_data["message"] = "User lookup"
-    log_data["data"] = {"user_found": user is not None, "user_id": user_id}
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
+        with span("user_lookup", user_id=user_id) as lookup_span:
+            user = db.query(User).filter(User.id == int(user_id)).first()
+            lookup_span.set(user_found=user is not None)
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        with span("permission_check"):
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
 
-    if not user.is_active:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account is deactivated")
+            if not user.is_active:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account is deactivated")
 
-    return user
+        return user
 
 
 def check_account_lockout(user: User) -> None:
@@ -624,7 +482,7 @@ async def register(request: Request, user_data: UserRegister, db: Session = Depe
     - At least one number
     - At least one special character
     """
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = db.query(User).filter(User.email_bidx == user_data.email).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
@@ -677,7 +535,7 @@ async def signup_step1(request: Request, user_data: UserSignupStep1, db: Session
     Returns a temporary signup token (expires in 1 hour) for step 2.
     """
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = db.query(User).filter(User.email_bidx == user_data.email).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
@@ -760,7 +618,7 @@ async def save_signup_progress(
     if progress_data.email:
         # Check if email is already taken by another user
         existing_user = (
-            db.query(User).filter(User.email == progress_data.email, User.id != user.id).first()
+            db.query(User).filter(User.email_bidx == progress_data.email, User.id != user.id).first()
         )
         if existing_user:
             raise HTTPException(
@@ -905,420 +763,80 @@ async def login(request: Request, credentials: UserLogin, db: Session = Depends(
     Rate limited via slowapi default_limits (60/minute) with additional
     account lockout protection (5 failed attempts = 30 min lockout).
     """
-    # #region agent log
-    import json
-
-    log_data = {
-        "sessionId": "debug-session",
-        "runId": "login-attempt",
-        "hypothesisId": "A",
-        "location": "jwt_auth.py:login:entry",
-        "message": "Login endpoint called",
-        "data": {"email": credentials.email, "has_password": bool(credentials.password)},
-        "timestamp": int(datetime.utcnow().timestamp() * 1000),
-    }
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
     # Rate limiting is handled by slowapi's default_limits (60/minute)
     # Additional protection via account lockout mechanism (5 failed attempts)
     logger.debug("Login attempt", extra={"email": credentials.email})
 
-    # #region agent log
-    log_data["hypothesisId"] = "A"
-    log_data["location"] = "jwt_auth.py:login:before_query"
-    log_data["message"] = "Before database query"
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
-    # Fix for encrypted email query: The EncryptedString type encrypts to bytes via process_bind_param,
-    # but the database column is VARCHAR, causing a type mismatch error (character varying = bytea).
-    # Workaround: Query all users and filter in Python by decrypting emails.
-    # This is inefficient but works around the schema/type mismatch.
-    # TODO: Fix by either migrating email column to BYTEA/TEXT or updating EncryptedString to handle VARCHAR properly.
-    from app.services.encryption_service import get_encryption_service
+    with start_trace("auth.login") as trace:
+        # Email is encrypted with randomized Fernet tokens, so look the user up
+        # through its HMAC blind index (an indexed equality query)
+        with span("user_lookup") as lookup_span:
+            user = db.query(User).filter(User.email_bidx == credentials.email).first()
+            lookup_span.set(user_found=user is not None)
 
-    try:
-        # If encryption is disabled, use normal query
-        if not settings.ENCRYPTION_ENABLED:
-            user = db.query(User).filter(User.email == credentials.email).first()
-        else:
-            # #region agent log
-            log_data["hypothesisId"] = "A"
-            log_data["location"] = "jwt_auth.py:login:encrypted_email_workaround"
-            log_data["message"] = "Using workaround for encrypted email query"
-            try:
-                with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-                    f.write(json.dumps(log_data) + "\n")
-            except Exception:
-                pass
-            # #endregion
-
-            # Workaround: Query all users and filter by comparing decrypted emails
-            # This is not ideal for performance but works around the type mismatch
-            all_users = db.query(User).all()
-            user = None
-            for u in all_users:
-                try:
-                    # Accessing u.email will trigger process_result_value which decrypts
-                    if u.email == credentials.email:
-                        user = u
-                        break
-                except Exception as email_error:
-                    # If decryption fails for this user, skip it
-                    # #region agent log
-                    log_data["hypothesisId"] = "A"
-                    log_data["location"] = "jwt_auth.py:login:decrypt_error"
-                    log_data["message"] = "Failed to decrypt email for user"
-                    log_data["data"] = {"user_id": u.id, "error": str(email_error)}
-                    try:
-                        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-                            f.write(json.dumps(log_data) + "\n")
-                    except Exception:
-                        pass
-                    # #endregion
-                    continue
-    except Exception as e:
-        # #region agent log
-        log_data["hypothesisId"] = "A"
-        log_data["location"] = "jwt_auth.py:login:query_error"
-        log_data["message"] = "Database query failed"
-        log_data["data"] = {"error": str(e), "error_type": type(e).__name__}
-        try:
-            with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-                f.write(json.dumps(log_data) + "\n")
-        except Exception:
-            pass
-        # #endregion
-        raise
-
-    # #region agent log
-    log_data["hypothesisId"] = "A"
-    log_data["location"] = "jwt_auth.py:login:after_query"
-    log_data["message"] = "After database query"
-    log_data["data"] = {"user_found": user is not None, "user_id": user.id if user else None}
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
-    if not user:
-        logger.warning("Login failed: user not found", extra={"email": credentials.email})
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password"
-        )
-
-    # #region agent log
-    log_data["hypothesisId"] = "B"
-    log_data["location"] = "jwt_auth.py:login:before_lockout_check"
-    log_data["message"] = "Before account lockout check"
-    log_data["data"] = {"locked_until": str(user.locked_until) if user.locked_until else None}
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
-    try:
-        check_account_lockout(user)
-    except Exception as e:
-        # #region agent log
-        log_data["hypothesisId"] = "B"
-        log_data["location"] = "jwt_auth.py:login:lockout_error"
-        log_data["message"] = "Account lockout check failed"
-        log_data["data"] = {"error": str(e), "error_type": type(e).__name__}
-        try:
-            with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-                f.write(json.dumps(log_data) + "\n")
-        except Exception:
-            pass
-        # #endregion
-        raise
-
-    # #region agent log
-    log_data["hypothesisId"] = "B"
-    log_data["location"] = "jwt_auth.py:login:after_lockout_check"
-    log_data["message"] = "After account lockout check"
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
-    if not user.password_hash:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Password login not configured for this account. Use OAuth instead.",
-        )
-
-    # #region agent log
-    log_data["hypothesisId"] = "C"
-    log_data["location"] = "jwt_auth.py:login:before_password_verify"
-    log_data["message"] = "Before password verification"
-    log_data["data"] = {
-        "has_password_hash": bool(user.password_hash),
-        "hash_length": len(user.password_hash) if user.password_hash else 0,
-    }
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
+        if not user:
+            logger.warning("Login failed: user not found", extra={"email": credentials.email})
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password"
+            )
+        trace.set(user_id=user.id)
 
-    try:
-        password_valid = verify_password(credentials.password, user.password_hash)
-    except Exception as e:
-        # #region agent log
-        log_data["hypothesisId"] = "C"
-        log_data["location"] = "jwt_auth.py:login:password_verify_error"
-        log_data["message"] = "Password verification failed with exception"
-        log_data["data"] = {"error": str(e), "error_type": type(e).__name__}
-        try:
-            with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-                f.write(json.dumps(log_data) + "\n")
-        except Exception:
-            pass
-        # #endregion
-        raise
-
-    # #region agent log
-    log_data["hypothesisId"] = "C"
-    log_data["location"] = "jwt_auth.py:login:after_password_verify"
-    log_data["message"] = "After password verification"
-    log_data["data"] = {"password_valid": password_valid}
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
-    if not password_valid:
-        handle_failed_login(user, db)
-        remaining_attempts = MAX_LOGIN_ATTEMPTS - user.failed_login_attempts
-        if remaining_attempts > 0:
-            detail = f"Invalid email or password. {remaining_attempts} attempts remaining."
-        else:
-            detail = f"Account locked for {LOCKOUT_DURATION_MINUTES} minutes due to too many failed attempts."
-        logger.warning(
-            "Login failed: invalid password",
-            extra={"email": credentials.email, "remaining_attempts": remaining_attempts},
-        )
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+        with span("lockout_check"):
+            check_account_lockout(user)
 
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail="Account is deactivated. Contact support."
-        )
+        if not user.password_hash:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Password login not configured for this account. Use OAuth instead.",
+            )
 
-    # #region agent log
-    log_data["hypothesisId"] = "D"
-    log_data["location"] = "jwt_auth.py:login:before_reset_attempts"
-    log_data["message"] = "Before reset login attempts"
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
+        with span("password_verify") as verify_span:
+            password_valid = verify_password(credentials.password, user.password_hash)
+            verify_span.set(password_valid=password_valid)
+
+        if not password_valid:
+            handle_failed_login(user, db)
+            remaining_attempts = MAX_LOGIN_ATTEMPTS - user.failed_login_attempts
+            if remaining_attempts > 0:
+                detail = f"Invalid email or password. {remaining_attempts} attempts remaining."
+            else:
+                detail = f"Account locked for {LOCKOUT_DURATION_MINUTES} minutes due to too many failed attempts."
+            logger.warning(
+                "Login failed: invalid password",
+                extra={"email": credentials.email, "remaining_attempts": remaining_attempts},
+            )
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
 
-    try:
-        reset_login_attempts(user, db)
-    except Exception as e:
-        # #region agent log
-        log_data["hypothesisId"] = "D"
-        log_data["location"] = "jwt_auth.py:login:reset_attempts_error"
-        log_data["message"] = "Reset login attempts failed"
-        log_data["data"] = {"error": str(e), "error_type": type(e).__name__}
-        try:
-            with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-                f.write(json.dumps(log_data) + "\n")
-        except Exception:
-            pass
-        # #endregion
-        raise
-
-    # #region agent log
-    log_data["hypothesisId"] = "D"
-    log_data["location"] = "jwt_auth.py:login:after_reset_attempts"
-    log_data["message"] = "After reset login attempts"
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
-    # #region agent log
-    log_data["hypothesisId"] = "E"
-    log_data["location"] = "jwt_auth.py:login:before_audit_log"
-    log_data["message"] = "Before audit log creation"
-    log_data["data"] = {"user_id": user.id}
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
+        if not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Account is deactivated. Contact support."
+            )
 
-    try:
-        audit_log = AuditLog(
-            user_id=user.id,
-            action=AuditAction.LOGIN.value,
-            target_type="user",
-            target_id=user.id,
-            action_metadata={"method": "jwt_login"},
-            ip_address=request.client.host if request.client else None,
-            user_agent=request.headers.get("user-agent"),
-        )
-        db.add(audit_log)
-        db.commit()
-    except Exception as e:
-        # #region agent log
-        log_data["hypothesisId"] = "E"
-        log_data["location"] = "jwt_auth.py:login:audit_log_error"
-        log_data["message"] = "Audit log creation/commit failed"
-        log_data["data"] = {"error": str(e), "error_type": type(e).__name__}
-        try:
-            with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-                f.write(json.dumps(log_data) + "\n")
-        except Exception:
-            pass
-        # #endregion
-        raise
-
-    # #region agent log
-    log_data["hypothesisId"] = "E"
-    log_data["location"] = "jwt_auth.py:login:after_audit_log"
-    log_data["message"] = "After audit log commit"
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
-    # #region agent log
-    log_data["hypothesisId"] = "F"
-    log_data["location"] = "jwt_auth.py:login:before_token_creation"
-    log_data["message"] = "Before token creation"
-    log_data["data"] = {
-        "has_jwt_secret": bool(JWT_SECRET_KEY),
-        "has_refresh_secret": bool(JWT_REFRESH_SECRET_KEY),
-        "user_id": user.id,
-    }
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
+        with span("audit_log"):
+            reset_login_attempts(user, db)
+            audit_log = AuditLog(
+                user_id=user.id,
+                action=AuditAction.LOGIN.value,
+                target_type="user",
+                target_id=user.id,
+                action_metadata={"method": "jwt_login"},
+                ip_address=request.client.host if request.client else None,
+                user_agent=request.headers.get("user-agent"),
+            )
+            db.add(audit_log)
+            db.commit()
 
-    try:
-        access_token = create_access_token({"sub": str(user.id), "email": user.email})
-    except Exception as e:
-        # #region agent log
-        log_data["hypothesisId"] = "F"
-        log_data["location"] = "jwt_auth.py:login:access_token_error"
-        log_data["message"] = "Access token creation failed"
-        log_data["data"] = {"error": str(e), "error_type": type(e).__name__}
-        try:
-            with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-                f.write(json.dumps(log_data) + "\n")
-        except Exception:
-            pass
-        # #endregion
-        raise
+        with span("token_issue"):
+            access_token = create_access_token({"sub": str(user.id), "email": user.email})
+            refresh_token = create_refresh_token({"sub": str(user.id)}, db)
 
-    try:
-        refresh_token = create_refresh_token({"sub": str(user.id)}, db)
-    except Exception as e:
-        # #region agent log
-        log_data["hypothesisId"] = "F"
-        log_data["location"] = "jwt_auth.py:login:refresh_token_error"
-        log_data["message"] = "Refresh token creation failed"
-        log_data["data"] = {"error": str(e), "error_type": type(e).__name__}
-        try:
-            with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-                f.write(json.dumps(log_data) + "\n")
-        except Exception:
-            pass
-        # #endregion
-        raise
-
-    # #region agent log
-    log_data["hypothesisId"] = "F"
-    log_data["location"] = "jwt_auth.py:login:after_token_creation"
-    log_data["message"] = "After token creation"
-    log_data["data"] = {
-        "has_access_token": bool(access_token),
-        "has_refresh_token": bool(refresh_token),
-    }
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
-    logger.info("Login successful", extra={"user_id": user.id, "email": user.email})
-
-    # #region agent log
-    log_data["hypothesisId"] = "G"
-    log_data["location"] = "jwt_auth.py:login:before_response"
-    log_data["message"] = "Before TokenResponse creation"
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
+        logger.info("Login successful", extra={"user_id": user.id, "email": user.email})
 
-    try:
-        response = TokenResponse(
+        return TokenResponse(
             access_token=access_token,
             refresh_token=refresh_token,
             expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
         )
-    except Exception as e:
-        # #region agent log
-        log_data["hypothesisId"] = "G"
-        log_data["location"] = "jwt_auth.py:login:response_error"
-        log_data["message"] = "TokenResponse creation failed"
-        log_data["data"] = {"error": str(e), "error_type": type(e).__name__}
-        try:
-            with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-                f.write(json.dumps(log_data) + "\n")
-        except Exception:
-            pass
-        # #endregion
-        raise
-
-    # #region agent log
-    log_data["hypothesisId"] = "G"
-    log_data["location"] = "jwt_auth.py:login:success"
-    log_data["message"] = "Login successful, returning response"
-    try:
-        with open("c:\\Users\\MeMyself\\creditnexus\\.cursor\\debug.log", "a") as f:
-            f.write(json.dumps(log_data) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
-    return response
 
 
 @jwt_router.post("/refresh", response_model=TokenResponse)
@@ -11,7 +11,7 @@ from pydantic import ValidationError
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 
-from app.core.llm_client import get_chat_model
+from app.core.llm_client import get_structured_chat_model
 from app.models.accounting_document import (
     BalanceSheet,
     IncomeStatement,
@@ -39,11 +39,9 @@ def create_accounting_extraction_chain() -> BaseChatModel:
         BaseChatModel instance configured with structured output
         bound to AccountingExtractionResult Pydantic model.
     """
-    # Use global LLM configuration (set at startup)
-    llm = get_chat_model(temperature=0)  # Deterministic extraction
-    
+    # Use global LLM configuration (set at startup); temperature 0 for deterministic extraction
     # Bind the Pydantic model as a structured output tool
-    structured_llm = llm.with_structured_output(AccountingExtractionResult)
+    structured_llm = get_structured_chat_model(AccountingExtractionResult)
     
     return structured_llm
 
@@ -323,8 +321,7 @@ def create_partial_accounting_extraction_chain() -> BaseChatModel:
         BaseChatModel instance configured with structured output
         bound to AccountingExtractionResult (with partial data).
     """
-    llm = get_chat_model(temperature=0)
-    structured_llm = llm.with_structured_output(AccountingExtractionResult)
+    structured_llm = get_structured_chat_model(AccountingExtractionResult)
     return structured_llm
 
 
@@ -380,8 +377,7 @@ def create_accounting_reducer_chain() -> BaseChatModel:
         BaseChatModel instance configured with structured output
         bound to AccountingExtractionResult.
     """
-    llm = get_chat_model(temperature=0)
-    structured_llm = llm.with_structured_output(AccountingExtractionResult)
+    structured_llm = get_structured_chat_model(AccountingExtractionResult)
     return structured_llm
 
 
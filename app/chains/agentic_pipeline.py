@@ -47,6 +47,8 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from app.core.config import settings
 from app.core.llm_client import get_chat_model
+from app.services.extraction_cache import current_model_id, get_extraction_cache, prompt_version
+from app.utils.document_splitter import CreditAgreementSplitter
 from langchain_core.messages import HumanMessage, SystemMessage
 
 logger = logging.getLogger(__name__)
@@ -214,26 +216,26 @@ class DocumentStructureAnalyzer:
                     importance=0.95  # Critical for parties & dates
                 ))
         
-        # 2. Extract Articles
+        # 2. Extract Articles (long articles are windowed, not truncated)
         article_matches = list(self.PATTERNS["article"].finditer(text))
         for i, match in enumerate(article_matches):
             start = match.start()
             end = article_matches[i + 1].start() if i + 1 < len(article_matches) else len(text)
             
             title = f"Article {match.group(1)}: {match.group(2).strip()}"
-            content = text[start:end]
+            parts = self.windows(text[start:end], start, overlap=False)
             
-            # Score importance based on keywords
-            importance = self._score_importance(title, content)
-            
-            sections.append(DocumentSection(
-                title=title,
-                content=content[:Config.MAX_CHUNK_CHARS],
-                section_type="article",
-                start_char=start,
-                end_char=end,
-                importance=importance
-            ))
+            for part, (content, part_start, part_end) in enumerate(parts, 1):
+                part_title = title if len(parts) == 1 else f"{title} (part {part})"
+                sections.append(DocumentSection(
+                    title=part_title,
+                    content=content,
+                    section_type="article",
+                    start_char=part_start,
+                    end_char=part_end,
+                    # Score importance based on keywords
+                    importance=self._score_importance(part_title, content)
+                ))
         
         # 3. Extract Exhibits and Schedules (often have commitment tables)
         for match in self.PATTERNS["exhibit"].finditer(text):
@@ -291,6 +293,16 @@ class DocumentStructureAnalyzer:
         
         return sections
     
+    @staticmethod
+    def windows(text: str, base: int = 0, overlap: bool = True) -> List[Tuple[str, int, int]]:
+        """Split text into token-budgeted (content, start, end) windows of ~Config.MAX_CHUNK_CHARS."""
+        splitter = CreditAgreementSplitter(max_chunk_size=Config.MAX_CHUNK_CHARS)
+        return [
+            (text[a:b], base + a, base + b)
+            for a, b in splitter.window_spans(text, overlap=overlap)
+            if text[a:b].strip()
+        ]
+    
     def _score_importance(self, title: str, content: str) -> float:
         """Score section importance based on keywords."""
         combined = (title + " " + content[:2000]).lower()
@@ -321,7 +333,24 @@ class EntityExtractor:
         
         Note: model parameter is kept for compatibility but LLM provider/model
         is configured via environment variables (LLM_PROVIDER, LLM_MODEL).
+        
+        Successful results are cached per (prompt, model, section content), so
+        unchanged sections of a re-uploaded agreement are not re-extracted.
         """
+        cache = get_extraction_cache()
+        if cache is not None:
+            version, model_id = prompt_version(prompt), current_model_id()
+            cached = cache.get("agentic.entity", version, model_id, content)
+            if cached is not None:
+                return cached
+        
+        result = self._invoke_llm(prompt, content)
+        if cache is not None and "error" not in result:
+            cache.set("agentic.entity", version, model_id, content, result)
+        return result
+    
+    def _invoke_llm(self, prompt: str, content: str) -> Dict[str, Any]:
+        """Invoke the LLM with retries and parse its JSON response."""
         for attempt in range(Config.MAX_RETRIES + 1):
             try:
                 # Use LangChain message format
@@ -734,15 +763,19 @@ class AgenticExtractionPipeline:
             agreement.extraction_stages_completed.append("structure_analysis")
             
             if not sections:
-                # Fallback: treat as single chunk
-                sections = [DocumentSection(
-                    title="Full Document",
-                    content=text[:Config.MAX_CHUNK_CHARS],
-                    section_type="unknown",
-                    start_char=0,
-                    end_char=len(text),
-                    importance=1.0
-                )]
+                # Fallback: no structure found, use overlapping windows over the whole text
+                windows = self.structure_analyzer.windows(text)
+                sections = [
+                    DocumentSection(
+                        title="Full Document" if len(windows) == 1 else f"Full Document (part {part})",
+                        content=content,
+                        section_type="unknown",
+                        start_char=start,
+                        end_char=end,
+                        importance=1.0
+                    )
+                    for part, (content, start, end) in enumerate(windows, 1)
+                ]
             
             # ─────────────────────────────────────────────────────────────
             # STAGE 2: Entity-Focused Extraction (Parallel)
@@ -11,7 +11,7 @@ from typing import Optional, Dict, Any
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 
-from app.core.llm_client import get_chat_model
+from app.core.llm_client import get_structured_chat_model
 from app.models.cdm import CreditAgreement, ExtractionResult
 from app.chains.multimodal_fusion_chain import fuse_multimodal_inputs
 
@@ -25,8 +25,7 @@ def create_cdm_add_chain() -> BaseChatModel:
         A BaseChatModel instance configured with structured output
         bound to the ExtractionResult Pydantic model.
     """
-    llm = get_chat_model(temperature=0)
-    structured_llm = llm.with_structured_output(ExtractionResult)
+    structured_llm = get_structured_chat_model(ExtractionResult)
     return structured_llm
 
 
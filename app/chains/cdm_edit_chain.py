@@ -9,7 +9,7 @@ import logging
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 
-from app.core.llm_client import get_chat_model
+from app.core.llm_client import get_structured_chat_model
 from app.models.cdm import CreditAgreement
 
 logger = logging.getLogger(__name__)
@@ -22,8 +22,7 @@ def create_cdm_edit_chain() -> BaseChatModel:
         A BaseChatModel instance configured with structured output
         bound to the CreditAgreement Pydantic model.
     """
-    llm = get_chat_model(temperature=0)
-    structured_llm = llm.with_structured_output(CreditAgreement)
+    structured_llm = get_structured_chat_model(CreditAgreement)
     return structured_llm
 
 
@@ -11,7 +11,7 @@ from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel
 
-from app.core.llm_client import get_chat_model
+from app.core.llm_client import get_structured_chat_model
 
 logger = logging.getLogger(__name__)
 
@@ -30,8 +30,7 @@ def create_cdm_remove_chain() -> BaseChatModel:
         A BaseChatModel instance configured with structured output
         bound to the RemovalDecision Pydantic model.
     """
-    llm = get_chat_model(temperature=0)
-    structured_llm = llm.with_structured_output(RemovalDecision)
+    structured_llm = get_structured_chat_model(RemovalDecision)
     return structured_llm
 
 
@@ -6,13 +6,13 @@ unstructured legal text.
 """
 
 import logging
-from typing import Optional
+from typing import Iterable, Optional
 from pydantic import ValidationError
 
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 
-from app.core.llm_client import get_chat_model
+from app.core.llm_client import get_structured_chat_model
 from app.models.cdm import CreditAgreement, ExtractionResult
 from app.chains.map_reduce_chain import extract_data_map_reduce
 
@@ -37,12 +37,10 @@ def create_extraction_chain() -> BaseChatModel:
         bound to the CreditAgreement Pydantic model.
     """
     # Use global LLM configuration (set at startup)
-    # Temperature defaults to 0 for deterministic extraction
-    llm = get_chat_model(temperature=0)
-    
+    # Temperature defaults to 0 for deterministic extraction (responses are cacheable)
     # Bind the Pydantic model as a structured output tool
     # This ensures the LLM always returns data conforming to ExtractionResult schema
-    structured_llm = llm.with_structured_output(ExtractionResult)
+    structured_llm = get_structured_chat_model(ExtractionResult)
     
     return structured_llm
 
@@ -354,3 +352,38 @@ def extract_data_smart(text: str, force_map_reduce: bool = False, max_retries: i
         logger.info(f"Document length ({text_length} chars) within threshold, using simple extraction")
         return extract_data(text, max_retries=max_retries)
 
+
+def extract_data_from_pages(pages: Iterable[str], max_retries: int = 3) -> ExtractionResult:
+    """Extract structured data from a document delivered page by page.
+    
+    Pages are buffered until the document is known to exceed
+    AGENTIC_PIPELINE_THRESHOLD; the agentic pipeline needs the whole text up
+    front, so the remaining pages are then drained in one go. The joined text
+    is dispatched by extract_data_smart exactly as an uploaded text file
+    would be.
+    
+    Args:
+        pages: Page texts in document order (e.g. from iter_pdf_pages).
+        max_retries: Maximum number of validation retries for simple extraction.
+        
+    Returns:
+        An ExtractionResult Pydantic model instance containing the extracted data.
+        
+    Raises:
+        ValueError: If the document has no text or extraction fails.
+    """
+    pages = iter(pages)
+    buffered = []
+    length = 0
+    for page in pages:
+        buffered.append(page)
+        length += len(page) + 1
+        if length > AGENTIC_PIPELINE_THRESHOLD:
+            logger.info(f"Document exceeds {AGENTIC_PIPELINE_THRESHOLD} chars, reading remaining pages")
+            buffered.extend(pages)
+            break
+    
+    text = "\n".join(buffered)
+    if not text.strip():
+        raise ValueError("The document contains no extractable text.")
+    return extract_data_smart(text, max_retries=max_retries)
@@ -7,7 +7,7 @@ from pydantic import ValidationError
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 
-from app.core.llm_client import get_chat_model
+from app.core.llm_client import get_structured_chat_model
 from app.models.filing_forms import FilingFormData
 from app.models.cdm import CreditAgreement
 from app.models.filing_requirements import FilingRequirement
@@ -22,8 +22,7 @@ def create_filing_form_chain() -> BaseChatModel:
         A BaseChatModel instance configured with structured output
         bound to the FilingFormData Pydantic model.
     """
-    llm = get_chat_model(temperature=0)
-    structured_llm = llm.with_structured_output(FilingFormData)
+    structured_llm = get_structured_chat_model(FilingFormData)
     return structured_llm
 
 
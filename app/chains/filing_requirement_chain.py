@@ -7,7 +7,7 @@ from pydantic import ValidationError
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 
-from app.core.llm_client import get_chat_model
+from app.core.llm_client import get_structured_chat_model
 from app.models.filing_requirements import FilingRequirementEvaluation
 from app.models.cdm import CreditAgreement
 
@@ -24,8 +24,7 @@ def create_filing_requirement_chain() -> BaseChatModel:
         A BaseChatModel instance configured with structured output
         bound to the FilingRequirementEvaluation Pydantic model.
     """
-    llm = get_chat_model(temperature=0)
-    structured_llm = llm.with_structured_output(FilingRequirementEvaluation)
+    structured_llm = get_structured_chat_model(FilingRequirementEvaluation)
     return structured_llm
 
 
@@ -2,19 +2,28 @@
 
 This module implements the Map-Reduce strategy for handling documents that
 exceed token limits. It splits documents by Articles, extracts partial data
-from each section, then merges the results into a complete CreditAgreement.
+from each section concurrently, then merges the results into a complete
+CreditAgreement. When the partials are too large for a single reducer prompt
+they are first tree-merged in groups.
+
+Partial extractions are cached per chunk (see app.services.extraction_cache),
+so re-extracting a revised agreement only sends changed articles to the LLM.
 """
 
 import logging
-from typing import List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, List, Optional, Union
 from pydantic import ValidationError
 
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
 
-from app.core.llm_client import get_chat_model
+from app.core.config import settings
+from app.core.llm_client import get_structured_chat_model
 from app.models.cdm import CreditAgreement, ExtractionResult
 from app.models.partial_cdm import PartialCreditAgreement
+from app.services.extraction_cache import current_model_id, get_extraction_cache, prompt_version
 from app.utils.document_splitter import CreditAgreementSplitter, DocumentChunk
 
 logger = logging.getLogger(__name__)
@@ -29,8 +38,7 @@ def create_partial_extraction_chain() -> BaseChatModel:
         A BaseChatModel instance configured with structured output
         bound to the PartialCreditAgreement model.
     """
-    llm = get_chat_model(temperature=0)
-    structured_llm = llm.with_structured_output(PartialCreditAgreement)
+    structured_llm = get_structured_chat_model(PartialCreditAgreement)
     return structured_llm
 
 
@@ -83,8 +91,7 @@ def create_reducer_chain() -> BaseChatModel:
         A BaseChatModel instance configured with structured output
         bound to the CreditAgreement model.
     """
-    llm = get_chat_model(temperature=0)
-    structured_llm = llm.with_structured_output(ExtractionResult)
+    structured_llm = get_structured_chat_model(ExtractionResult)
     return structured_llm
 
 
@@ -128,16 +135,244 @@ Ensure all required fields are present and valid."""
     return prompt
 
 
-def extract_data_map_reduce(text: str) -> ExtractionResult:
+def create_partial_merge_chain() -> BaseChatModel:
+    """Create a chain for merging a group of partial extractions into one partial.
+    
+    Used for the intermediate levels of the hierarchical reduce.
+    
+    Returns:
+        A BaseChatModel instance configured with structured output
+        bound to the PartialCreditAgreement model.
+    """
+    structured_llm = get_structured_chat_model(PartialCreditAgreement)
+    return structured_llm
+
+
+def create_partial_merge_prompt() -> ChatPromptTemplate:
+    """Create prompt for merging a group of partial extractions.
+    
+    Returns:
+        A ChatPromptTemplate for merging partials without requiring completeness.
+    """
+    system_prompt = """You are an expert Credit Analyst MERGING partial extractions from consecutive sections of a credit agreement.
+
+The result is still PARTIAL: other sections will be merged in later.
+
+Your task:
+1. Merge all parties, removing duplicates (match by name, keep the most complete)
+2. Combine all facilities, merging duplicates (keep the most complete version)
+3. Keep agreement_date and governing_law if any section states them (prefer the earliest section for dates)
+
+CRITICAL RULES:
+- Only keep values present in the input partials
+- Return None/Null for fields no section provides
+- Do not infer or guess values
+"""
+
+    user_prompt = """Partial Extractions from Document Sections:
+
+{partial_extractions}
+
+Merge these partial extractions into a single partial extraction."""
+    
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", system_prompt),
+        ("user", user_prompt)
+    ])
+    
+    return prompt
+
+
+def _with_retry(chain: Runnable, max_attempts: int) -> Runnable:
+    """Wrap a chain with exponential-backoff retries."""
+    if max_attempts <= 1:
+        return chain
+    return chain.with_retry(stop_after_attempt=max_attempts, wait_exponential_jitter=True)
+
+
+def _format_partials(partials: List[PartialCreditAgreement]) -> str:
+    """Serialize partial extractions for a reducer prompt."""
+    return "\n\n---\n\n".join([
+        f"Section: {p.source_section}\n{p.model_dump_json(indent=2)}"
+        for p in partials
+    ])
+
+
+def _group_partials(partials: List[PartialCreditAgreement], max_chars: int) -> List[List[PartialCreditAgreement]]:
+    """Split partials, in document order, into groups whose serialized size fits max_chars.
+    
+    Every group holds at least two partials so each merge level shrinks the list.
+    """
+    groups: List[List[PartialCreditAgreement]] = []
+    current: List[PartialCreditAgreement] = []
+    current_size = 0
+    for partial in partials:
+        size = len(_format_partials([partial]))
+        if len(current) >= 2 and current_size + size > max_chars:
+            groups.append(current)
+            current, current_size = [], 0
+        current.append(partial)
+        current_size += size
+    if current:
+        if len(current) == 1 and groups:
+            groups[-1].extend(current)
+        else:
+            groups.append(current)
+    return groups
+
+
+PARTIAL_EXTRACTION_CACHE_NAMESPACE = "map_reduce.partial"
+
+
+def _partial_prompt_version() -> str:
+    """Version of the partial-extraction prompt and output schema (cache key component)."""
+    prompt = create_partial_extraction_prompt()
+    return prompt_version(
+        [(type(m).__name__, getattr(getattr(m, "prompt", None), "template", str(m))) for m in prompt.messages],
+        PartialCreditAgreement.model_json_schema()
+    )
+
+
+def map_partial_extractions(
+    chunks: Iterable[DocumentChunk],
+    max_concurrency: Optional[int] = None,
+    max_retries: Optional[int] = None
+) -> List[PartialCreditAgreement]:
+    """Run the MAP phase: extract a partial from every chunk concurrently.
+    
+    Chunks are dispatched as they are produced, so a streaming splitter
+    (CreditAgreementSplitter.iter_chunks) overlaps LLM calls with reading
+    the rest of the document.
+    
+    Args:
+        chunks: Document chunks in document order (list or iterator).
+        max_concurrency: Max in-flight LLM calls (defaults to MAP_REDUCE_MAX_CONCURRENCY).
+        max_retries: Attempts per chunk (defaults to MAP_REDUCE_MAX_RETRIES).
+        
+    Returns:
+        Successful partial extractions, in document order.
+    """
+    max_concurrency = max_concurrency or settings.MAP_REDUCE_MAX_CONCURRENCY
+    max_retries = max_retries or settings.MAP_REDUCE_MAX_RETRIES
+    
+    cache = get_extraction_cache()
+    if cache is not None:
+        version, model = _partial_prompt_version(), current_model_id()
+    partial_chain = None
+    
+    def extract(chunk: DocumentChunk) -> PartialCreditAgreement:
+        partial = partial_chain.invoke({"text": chunk.text})
+        if cache is not None:
+            cache.set(
+                PARTIAL_EXTRACTION_CACHE_NAMESPACE, version, model, chunk.text,
+                partial.model_dump(mode="json", exclude={"source_section"})
+            )
+        return partial
+    
+    # Outputs stay in document order: a cached partial or the future of its LLM call
+    seen: List[DocumentChunk] = []
+    outputs: List[Union[PartialCreditAgreement, Future]] = []
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        for chunk in chunks:
+            seen.append(chunk)
+            # Serve unchanged chunks from the extraction cache
+            cached = cache.get(PARTIAL_EXTRACTION_CACHE_NAMESPACE, version, model, chunk.text) if cache is not None else None
+            if cached is not None:
+                outputs.append(PartialCreditAgreement.model_validate(cached))
+                continue
+            if partial_chain is None:
+                partial_chain = _with_retry(
+                    create_partial_extraction_prompt() | create_partial_extraction_chain(),
+                    max_retries
+                )
+            outputs.append(executor.submit(extract, chunk))
+        
+        pending = sum(isinstance(output, Future) for output in outputs)
+        logger.info(
+            f"MAP phase: extracting {pending}/{len(seen)} chunks "
+            f"({len(seen) - pending} cached, max_concurrency={max_concurrency})"
+        )
+        
+        partial_extractions: List[PartialCreditAgreement] = []
+        for idx, (chunk, output) in enumerate(zip(seen, outputs)):
+            try:
+                partial = output.result() if isinstance(output, Future) else output
+            except Exception as e:
+                logger.warning(f"Failed to extract from chunk {idx + 1}: {e}")
+                # Continue with other chunks even if one fails
+                continue
+            
+            # Add source section info
+            section_name = f"Article {chunk.article_number}" if chunk.article_number else f"Section {chunk.chunk_index + 1}"
+            partial.source_section = section_name
+            partial_extractions.append(partial)
+            
+            logger.debug(f"Extracted from {section_name}: parties={len(partial.parties) if partial.parties else 0}, "
+                       f"facilities={len(partial.facilities) if partial.facilities else 0}")
+    
+    return partial_extractions
+
+
+def tree_merge_partials(
+    partials: List[PartialCreditAgreement],
+    max_chars: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    max_retries: Optional[int] = None
+) -> List[PartialCreditAgreement]:
+    """Merge partials level by level until they fit in one reducer prompt.
+    
+    Args:
+        partials: Partial extractions in document order.
+        max_chars: Serialized size budget for one prompt (defaults to MAP_REDUCE_REDUCER_MAX_CHARS).
+        max_concurrency: Max concurrent merge calls per level.
+        max_retries: Attempts per merge call.
+        
+    Returns:
+        Partials (in document order) whose serialized size fits max_chars,
+        or a single partial if no further merging is possible.
+    """
+    max_chars = max_chars or settings.MAP_REDUCE_REDUCER_MAX_CHARS
+    max_concurrency = max_concurrency or settings.MAP_REDUCE_MAX_CONCURRENCY
+    max_retries = max_retries or settings.MAP_REDUCE_MAX_RETRIES
+    
+    merge_chain = None
+    level = 0
+    while len(partials) > 1 and len(_format_partials(partials)) > max_chars:
+        level += 1
+        if merge_chain is None:
+            merge_chain = _with_retry(
+                create_partial_merge_prompt() | create_partial_merge_chain(),
+                max_retries
+            )
+        groups = _group_partials(partials, max_chars)
+        logger.info(f"Tree-merge level {level}: {len(partials)} partials -> {len(groups)} groups")
+        
+        merged = merge_chain.batch(
+            [{"partial_extractions": _format_partials(group)} for group in groups],
+            config={"max_concurrency": max_concurrency}
+        )
+        for group, partial in zip(groups, merged):
+            first, last = group[0].source_section, group[-1].source_section
+            partial.source_section = first if first == last else f"{first} - {last}"
+        partials = merged
+    
+    return partials
+
+
+def extract_data_map_reduce(text: Union[str, Iterable[str]]) -> ExtractionResult:
     """Extract structured data from a long document using Map-Reduce strategy.
     
     This function:
     1. Splits the document into sections (by Articles)
-    2. Extracts partial data from each section (MAP phase)
-    3. Merges all partials into a complete CreditAgreement (REDUCE phase)
+    2. Extracts partial data from each section concurrently (MAP phase)
+    3. Tree-merges partials that do not fit one prompt, then merges them
+       into a complete CreditAgreement (REDUCE phase)
+    
+    When given an iterable of pages (e.g. from iter_pdf_pages), sections are
+    dispatched to the MAP phase while later pages are still being read.
     
     Args:
-        text: The full text content of a credit agreement document.
+        text: The full text of a credit agreement document, or its pages in order.
         
     Returns:
         A complete CreditAgreement Pydantic model instance.
@@ -150,47 +385,29 @@ def extract_data_map_reduce(text: str) -> ExtractionResult:
         
         # Step 1: Split document into chunks
         splitter = CreditAgreementSplitter()
-        chunks: List[DocumentChunk] = splitter.split_by_articles(text)
-        logger.info(f"Document split into {len(chunks)} chunks")
+        if isinstance(text, str):
+            chunks: List[DocumentChunk] = splitter.split_by_articles(text)
+            logger.info(f"Document split into {len(chunks)} chunks")
+        else:
+            chunks = splitter.iter_chunks(text)
         
-        # Step 2: MAP phase - Extract partial data from each chunk
-        partial_chain = create_partial_extraction_prompt() | create_partial_extraction_chain()
-        partial_extractions: List[PartialCreditAgreement] = []
-        
-        for idx, chunk in enumerate(chunks):
-            logger.info(f"Processing chunk {idx + 1}/{len(chunks)}: {chunk.article_title or 'Unknown Section'}")
-            
-            try:
-                # Add source section info
-                section_name = f"Article {chunk.article_number}" if chunk.article_number else f"Section {chunk.chunk_index + 1}"
-                
-                partial = partial_chain.invoke({"text": chunk.text})
-                partial.source_section = section_name
-                partial_extractions.append(partial)
-                
-                logger.debug(f"Extracted from {section_name}: parties={len(partial.parties) if partial.parties else 0}, "
-                           f"facilities={len(partial.facilities) if partial.facilities else 0}")
-            except Exception as e:
-                logger.warning(f"Failed to extract from chunk {idx + 1}: {e}")
-                # Continue with other chunks even if one fails
-                continue
+        # Step 2: MAP phase - Extract partial data from each chunk concurrently
+        partial_extractions = map_partial_extractions(chunks)
         
         if not partial_extractions:
             raise ValueError("No partial extractions were successful")
         
         logger.info(f"MAP phase complete: {len(partial_extractions)} partial extractions")
         
-        # Step 3: REDUCE phase - Merge partial extractions
+        # Step 3: REDUCE phase - Tree-merge if needed, then merge into a CreditAgreement
         logger.info("Starting REDUCE phase: merging partial extractions...")
+        partial_extractions = tree_merge_partials(partial_extractions)
         
-        # Format partial extractions as JSON for the reducer
-        partial_extractions_json = "\n\n---\n\n".join([
-            f"Section: {p.source_section}\n{p.model_dump_json(indent=2)}"
-            for p in partial_extractions
-        ])
-        
-        reducer_chain = create_reducer_prompt() | create_reducer_chain()
-        result = reducer_chain.invoke({"partial_extractions": partial_extractions_json})
+        reducer_chain = _with_retry(
+            create_reducer_prompt() | create_reducer_chain(),
+            settings.MAP_REDUCE_MAX_RETRIES
+        )
+        result = reducer_chain.invoke({"partial_extractions": _format_partials(partial_extractions)})
         
         logger.info("REDUCE phase complete: merged into complete ExtractionResult")
         if result.agreement:
@@ -24,7 +24,7 @@ from pydantic import ValidationError
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 
-from app.core.llm_client import get_chat_model
+from app.core.llm_client import get_structured_chat_model
 from app.models.cdm import CreditAgreement, ExtractionResult, ExtractionStatus
 from app.chains.extraction_chain import extract_data_smart
 
@@ -146,8 +146,7 @@ def create_fusion_chain() -> BaseChatModel:
         A BaseChatModel instance configured with structured output
         bound to the ExtractionResult model.
     """
-    llm = get_chat_model(temperature=0)
-    structured_llm = llm.with_structured_output(ExtractionResult)
+    structured_llm = get_structured_chat_model(ExtractionResult)
     return structured_llm
 
 
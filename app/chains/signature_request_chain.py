@@ -7,7 +7,7 @@ from pydantic import ValidationError
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 
-from app.core.llm_client import get_chat_model
+from app.core.llm_client import get_structured_chat_model
 from app.models.signature_requests import SignatureRequestGeneration
 from app.models.cdm import CreditAgreement
 
@@ -21,8 +21,7 @@ def create_signature_request_chain() -> BaseChatModel:
         A BaseChatModel instance configured with structured output
         bound to the SignatureRequestGeneration Pydantic model.
     """
-    llm = get_chat_model(temperature=0)
-    structured_llm = llm.with_structured_output(SignatureRequestGeneration)
+    structured_llm = get_structured_chat_model(SignatureRequestGeneration)
     return structured_llm
 
 
@@ -12,7 +12,7 @@ from sqlalchemy.orm import Session
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.language_models import BaseChatModel
 
-from app.core.llm_client import get_chat_model
+from app.core.llm_client import get_structured_chat_model
 from app.models.cdm import CreditAgreement, ExtractionResult
 from app.templates.registry import TemplateRegistry
 from app.db.models import LMATemplate
@@ -213,8 +213,7 @@ CRITICAL RULES:
         
         # Use template-aware prompt for simple extraction
         prompt = self.create_template_aware_prompt()
-        llm = get_chat_model(temperature=0)
-        structured_llm = llm.with_structured_output(ExtractionResult)
+        structured_llm = get_structured_chat_model(ExtractionResult)
         extraction_chain = prompt | structured_llm
         
         logger.info(f"Extracting with template awareness (template_id: {self.template_id}, length: {text_length})")
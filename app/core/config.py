@@ -57,6 +57,10 @@ class Settings(BaseSettings):
     # - "microsoft/Phi-3.5-mini-instruct" or "microsoft/Phi-3.5-mini-instruct:novita"
     # - "deepseek-ai/DeepSeek-V3.2-Exp:novita" (example from user config)
     LLM_TEMPERATURE: float = 0.0
+    LLM_RESPONSE_CACHE_ENABLED: bool = False  # Cache temperature-0 structured-output responses (get_structured_chat_model)
+    LLM_RESPONSE_CACHE_PATH: Optional[str] = "./cache/llm_responses.sqlite3"  # SQLite cache file (None = in-memory only)
+    LLM_RESPONSE_CACHE_TTL: int = 7 * 86400  # Cache TTL in seconds (default: 7 days)
+    LLM_RESPONSE_CACHE_MAX_ENTRIES: int = 20000  # Max cached responses (least recently used evicted first)
 
     # vLLM-specific settings
     VLLM_BASE_URL: Optional[str] = None  # e.g., "http://localhost:8000"
@@ -104,21 +108,48 @@ class Settings(BaseSettings):
     EMBEDDINGS_MODEL_KWARGS: Optional[str] = (
         None  # JSON string for additional model_kwargs (e.g., '{"device_map":"auto"}')
     )
+    # Embedding cache (shared by every get_embeddings_model() consumer)
+    EMBEDDING_CACHE_ENABLED: bool = True  # Cache embeddings by (model, sha256(text))
+    EMBEDDING_CACHE_PATH: Optional[str] = "./cache/embeddings.sqlite3"  # SQLite cache file (None = in-memory only)
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 200000  # Max embeddings kept on disk (least recently used evicted first)
+    EMBEDDING_CACHE_TTL: int = 90 * 86400  # Cache TTL in seconds (default: 90 days)
+    EMBEDDING_CACHE_MEMORY_ENTRIES: int = 10000  # Max embeddings kept in the in-memory LRU tier
 
     # Policy Engine Configuration
     POLICY_ENABLED: bool = True  # Feature flag to enable/disable policy engine
     POLICY_RULES_DIR: Path = Path("app/policies")  # Directory containing YAML policy files
     POLICY_RULES_PATTERN: str = "*.yaml"  # File pattern for policy rule files
     POLICY_ENGINE_VENDOR: Optional[str] = (
-        None  # Policy engine implementation (e.g., "aspasia", "custom")
+        None  # Policy engine implementation ("default" compiled engine, "mock", "aspasia", "custom")
     )
     POLICY_AUTO_RELOAD: bool = False  # Auto-reload policies on file change (development only)
 
+    # Sanctions / high-risk jurisdiction screening (app/services/sanctions_screening.py)
+    SANCTIONS_SCREENING_ENABLED: bool = True  # Load local sanctions list files for screening
+    SANCTIONS_LISTS_DIR: Path = Path("data/sanctions")  # OFAC/UN/EU-style CSV/XML list files
+    SANCTIONS_NAME_MATCH_THRESHOLD: float = 0.85  # Minimum fuzzy score (0-1) for a party-name hit
+    SANCTIONS_REFRESH_INTERVAL: int = 300  # Seconds between list-file change checks (0 = load once)
+
     # LangChain Configuration for Filing/Signature Chains
     FILING_CHAIN_TEMPERATURE: float = Field(default=0.0, description="Temperature for filing chains")
     SIGNATURE_CHAIN_TEMPERATURE: float = Field(default=0.0, description="Temperature for signature chains")
     FILING_CHAIN_MAX_RETRIES: int = Field(default=3, description="Max retries for filing chains")
     SIGNATURE_CHAIN_MAX_RETRIES: int = Field(default=3, description="Max retries for signature chains")
+    
+    # Map-Reduce Extraction Configuration (long documents)
+    MAP_REDUCE_MAX_CONCURRENCY: int = Field(default=8, description="Max article chunks extracted concurrently in the MAP phase")
+    MAP_REDUCE_MAX_RETRIES: int = Field(default=3, description="Attempts per chunk/merge call (exponential backoff with jitter)")
+    MAP_REDUCE_REDUCER_MAX_CHARS: int = Field(default=60000, description="Max serialized partials per reducer prompt before tree-merging")
+    EXTRACTION_CACHE_ENABLED: bool = True  # Cache per-chunk extraction results by (prompt version, model, sha256(chunk))
+    EXTRACTION_CACHE_PATH: Optional[str] = "./cache/extraction_cache.sqlite3"  # SQLite cache file (None = in-memory only)
+    EXTRACTION_CACHE_TTL: int = 30 * 86400  # Cache TTL in seconds (default: 30 days)
+    EXTRACTION_CACHE_MAX_ENTRIES: int = 50000  # Max cached chunk results (least recently used evicted first)
+
+    # Document Generation Configuration
+    DOCUMENT_GENERATION_MAX_CONCURRENCY: int = Field(default=5, description="Max AI template sections generated concurrently")
+    DOCUMENT_GENERATION_PROCESSES: int = Field(default=0, description="Worker processes rendering bulk generation jobs (0 = CPU count, capped at 8; 1 = in-process)")
+    DOCUMENT_GENERATION_WRITE_BATCH_SIZE: int = Field(default=50, description="Generated documents written and committed per batch in bulk jobs")
+    DOCUMENT_GENERATION_BULK_MAX_ITEMS: int = Field(default=1000, description="Max items accepted in one bulk generation request")
 
     # DigiSigner API Configuration
     DIGISIGNER_API_KEY: Optional[SecretStr] = Field(
@@ -224,6 +255,18 @@ class Settings(BaseSettings):
     RERANKING_DEVICE: str = "cpu"  # Device for local reranking: "cpu", "cuda", "cuda:0"
     RERANKING_API_URL: Optional[str] = None  # Remote reranking API URL (e.g., Cohere, Jina)
     RERANKING_API_KEY: Optional[SecretStr] = None  # Remote reranking API key
+    RERANKING_BATCH_WINDOW_MS: float = 5.0  # Time to collect pairs from concurrent searches into one predict call
+    RERANKING_MAX_BATCH_PAIRS: int = 128  # Flush a rerank batch early once it holds this many pairs
+    RERANKING_WORKERS: int = 1  # Threads running reranker predictions (off the event loop)
+
+    # Shared HTTP Client Pool Configuration (app.core.http_client)
+    HTTP_POOL_MAX_CONNECTIONS: int = 100  # Max open connections per pooled client
+    HTTP_POOL_MAX_KEEPALIVE: int = 20  # Idle keep-alive connections retained for reuse
+    HTTP_POOL_KEEPALIVE_EXPIRY_SECONDS: float = 30.0  # Idle time before a pooled connection is closed
+    HTTP_CLIENT_TIMEOUT_SECONDS: float = 30.0  # Default timeout when a caller passes none
+
+    # Shared Process Pool Configuration (app.core.process_pool)
+    PROCESS_POOL_WORKERS: int = 0  # Processes in the shared CPU pool (0 = CPU count, capped at 8)
 
     # LangAlpha Quantitative Analysis Configuration
     POLYGON_API_KEY: Optional[SecretStr] = Field(
@@ -394,10 +437,26 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: Optional[SecretStr] = None  # JWT secret key (required in production)
     JWT_REFRESH_SECRET_KEY: Optional[SecretStr] = None  # JWT refresh secret key (required in production)
     
+    # Request Tracing Configuration
+    TRACE_SAMPLE_RATE: float = 0.01  # Fraction of traced requests recorded (0.0 disables, 1.0 records all)
+    TRACE_BUFFER_SIZE: int = 10000  # Max finished traces held in memory before the oldest are dropped
+    TRACE_FLUSH_INTERVAL_SECONDS: float = 2.0  # Interval between background trace flushes
+    TRACE_LOG_PATH: Optional[str] = None  # JSONL file for traces (None = emit via the app.core.tracing logger)
+    
+    # Metrics Configuration (app.core.metrics)
+    METRICS_STORE_PATH: str = "./data/metrics.sqlite3"  # Append-only SQLite (WAL) store shared by all workers
+    METRICS_FLUSH_INTERVAL_SECONDS: float = 10.0  # Interval between background metric flushes
+    METRICS_BUCKET_SECONDS: int = 60  # Resolution of stored metric aggregates
+    
+    # Audit Log Archive Configuration
+    AUDIT_ARCHIVE_DIR: str = "./storage/audit_archive"  # Root of the compressed, day-partitioned audit log segments
+    AUDIT_ARCHIVE_BATCH_SIZE: int = 10000  # Expired audit logs moved per archive batch
+    
     # Encryption at Rest Configuration
     ENCRYPTION_KEY: Optional[SecretStr] = None  # Master encryption key for data at rest (Fernet key or password)
     ENCRYPTION_ENABLED: bool = True  # Enable encryption for sensitive fields
     ENCRYPTION_AUTO_ENCRYPT_FIELDS: bool = True  # Automatically encrypt sensitive fields in JSONB
+    BLIND_INDEX_KEY: Optional[SecretStr] = None  # HMAC key for searchable blind indexes (derived from ENCRYPTION_KEY if unset)
     
     @field_validator('DATABASE_URL', mode='before')
     @classmethod
@@ -0,0 +1,165 @@
+"""
+Application-lifetime HTTP connection pools.
+
+Outbound calls (Serper search and result pages, Companies House, the x402
+facilitator, document downloads) go through shared clients so repeated
+requests to the same host reuse keep-alive connections instead of paying a
+TCP + TLS handshake each time.
+
+Callers pass per-request ``timeout`` (and ``follow_redirects``) arguments
+rather than configuring their own client, and must not close the shared
+clients; ``close_http_clients`` is called once on application shutdown.
+
+URLs that come from users, agents or search results must be fetched with
+``fetch_public_url``, which refuses hosts that resolve to private, loopback,
+link-local or otherwise non-public addresses and re-checks every redirect hop.
+
+Usage:
+    client = get_async_http_client()
+    response = await client.post(url, json=payload, timeout=15)
+    page = await fetch_public_url(client, untrusted_url, timeout=20)
+"""
+
+import asyncio
+import ipaddress
+import logging
+import socket
+import threading
+import weakref
+from typing import List, Optional, Union
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# One async client per event loop: pooled connections are bound to the loop
+# that opened them, and background jobs may run their own loops
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_sync_client: Optional[httpx.Client] = None
+_lock = threading.Lock()
+
+
+# Redirect hops followed by fetch_public_url
+MAX_REDIRECTS = 5
+
+
+def _client_options() -> dict:
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_POOL_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        "timeout": httpx.Timeout(settings.HTTP_CLIENT_TIMEOUT_SECONDS),
+    }
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get the shared async client for the running event loop.
+
+    Returns:
+        Pooled ``httpx.AsyncClient`` (do not close it)
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(**_client_options())
+            _async_clients[loop] = client
+            logger.debug("Created pooled async HTTP client")
+        return client
+
+
+def get_http_client() -> httpx.Client:
+    """Get the shared synchronous client (thread-safe).
+
+    Returns:
+        Pooled ``httpx.Client`` (do not close it)
+    """
+    global _sync_client
+    with _lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = httpx.Client(**_client_options())
+        return _sync_client
+
+
+async def close_http_clients() -> None:
+    """Close the shared clients (e.g. on application shutdown)."""
+    global _sync_client
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.pop(loop, None)
+        sync_client, _sync_client = _sync_client, None
+    if client is not None:
+        await client.aclose()
+    if sync_client is not None:
+        sync_client.close()
+
+
+def is_public_address(address: str) -> bool:
+    """Whether an IP address is globally routable (not private, loopback, link-local, ...)."""
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+async def _resolve(host: str, port: int) -> List[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+async def ensure_public_url(url: Union[str, httpx.URL]) -> httpx.URL:
+    """Check that a URL is http(s) and its host resolves only to public addresses.
+
+    Args:
+        url: URL to check
+
+    Returns:
+        Parsed URL
+
+    Raises:
+        ValueError: If the scheme is unsupported, the host cannot be resolved,
+            or any resolved address is not public
+    """
+    url = httpx.URL(url)
+    if url.scheme not in ("http", "https") or not url.host:
+        raise ValueError(f"Unsupported URL: {url}")
+    try:
+        addresses = await _resolve(url.host, url.port or (443 if url.scheme == "https" else 80))
+    except (socket.gaierror, UnicodeError) as e:
+        raise ValueError(f"Could not resolve host {url.host}: {e}") from e
+    blocked = [address for address in addresses if not is_public_address(address)]
+    if not addresses or blocked:
+        raise ValueError(f"Refusing to fetch {url.host}: resolves to a non-public address")
+    return url
+
+
+async def fetch_public_url(client: httpx.AsyncClient, url: Union[str, httpx.URL], **kwargs) -> httpx.Response:
+    """GET an untrusted URL, following redirects only to public hosts.
+
+    Args:
+        client: Pooled HTTP client
+        url: URL to fetch
+        **kwargs: Extra ``client.get`` arguments (e.g. ``timeout``)
+
+    Returns:
+        Final (non-redirect) response
+
+    Raises:
+        ValueError: If any hop targets a non-public host, or there are more
+            than MAX_REDIRECTS redirects
+    """
+    url = await ensure_public_url(url)
+    for _ in range(MAX_REDIRECTS + 1):
+        response = await client.get(url, follow_redirects=False, **kwargs)
+        location = response.headers.get("location")
+        if not response.is_redirect or not location:
+            return response
+        await response.aclose()
+        url = await ensure_public_url(response.url.join(location))
+    raise ValueError(f"Too many redirects fetching {url}")
@@ -4,22 +4,40 @@ LLM Client Abstraction for CreditNexus.
 Provides a unified interface for multiple LLM providers (OpenAI, vLLM, HuggingFace)
 while maintaining LangChain compatibility. All LLM operations should use this
 abstraction instead of directly instantiating provider-specific clients.
+
+Clients are pooled per process, keyed by (model, temperature, output schema,
+constructor arguments), so repeated get_chat_model() calls reuse one client and
+its HTTP connection pool. Every pooled chat model reports call latency and
+token usage to the shared metrics registry (app.core.metrics).
 """
 
 import logging
 import json
-from typing import Optional, Dict, Any
+import threading
+import time
+from typing import Optional, Dict, Any, Tuple
+from uuid import UUID
 from enum import Enum
 
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.language_models import BaseChatModel
 from langchain_core.embeddings import Embeddings
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import Runnable
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
+from app.core.metrics import get_metrics
+from app.core.llm_response_cache import CACHE_HIT_KEY, get_llm_response_cache
+
 logger = logging.getLogger(__name__)
 
 # Global LLM configuration (set at startup)
 _llm_config: Optional[Dict[str, Any]] = None
 
+# Process-wide client pools (see _pool_key); cleared by init_llm_config()
+_client_pool: Dict[Tuple, Any] = {}
+_pool_lock = threading.RLock()
+
 
 class LLMProvider(str, Enum):
     """Supported LLM providers."""
@@ -28,6 +46,99 @@ class LLMProvider(str, Enum):
     HUGGINGFACE = "huggingface"
 
 
+class LLMMetricsCallback(BaseCallbackHandler):
+    """
+    Record per-call latency and token usage of a chat model.
+
+    Emits (labelled by provider and model):
+    - llm.calls / llm.errors / llm.cache_hits counters
+    - llm.latency_seconds histogram
+    - llm.prompt_tokens / llm.completion_tokens counters
+    """
+
+    # Only touches the in-memory metrics registry, so no need for an executor
+    run_inline = True
+
+    def __init__(self, provider: str, model: str):
+        self.labels = {"provider": provider, "model": model}
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        metrics = get_metrics()
+        generations = [generation for batch in response.generations for generation in batch]
+        if generations and all((g.generation_info or {}).get(CACHE_HIT_KEY) for g in generations):
+            metrics.increment("llm.cache_hits", **self.labels)
+            return
+
+        metrics.increment("llm.calls", **self.labels)
+        if started is not None:
+            metrics.observe("llm.latency_seconds", time.perf_counter() - started, **self.labels)
+        prompt_tokens, completion_tokens = _token_usage(response, generations)
+        if prompt_tokens:
+            metrics.increment("llm.prompt_tokens", value=prompt_tokens, **self.labels)
+        if completion_tokens:
+            metrics.increment("llm.completion_tokens", value=completion_tokens, **self.labels)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started.pop(run_id, None)
+        get_metrics().increment("llm.errors", **self.labels)
+
+
+def _token_usage(response: LLMResult, generations) -> Tuple[int, int]:
+    """Sum (prompt, completion) tokens from message usage metadata or provider output."""
+    prompt_tokens = completion_tokens = 0
+    for generation in generations:
+        usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+        if usage:
+            prompt_tokens += usage.get("input_tokens", 0)
+            completion_tokens += usage.get("output_tokens", 0)
+    if not (prompt_tokens or completion_tokens):
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = token_usage.get("prompt_tokens", 0)
+        completion_tokens = token_usage.get("completion_tokens", 0)
+    return prompt_tokens, completion_tokens
+
+
+def _pool_key(kind: str, *parts: Any, **kwargs: Any) -> Optional[Tuple]:
+    """Build a client pool key, or None when kwargs are not plain (JSON) values."""
+    try:
+        frozen_kwargs = json.dumps(kwargs, sort_keys=True)
+    except TypeError:
+        return None
+    return (kind, *parts, frozen_kwargs)
+
+
+def _schema_id(schema: Any) -> str:
+    """Stable identifier for a structured-output schema (Pydantic model or JSON schema)."""
+    if isinstance(schema, type):
+        return f"{schema.__module__}.{schema.__qualname__}"
+    return json.dumps(schema, sort_keys=True, default=str)
+
+
+def _pooled(key: Optional[Tuple], factory):
+    """Return the pooled client for key, creating it with factory() on first use."""
+    if key is None:
+        return factory()
+    with _pool_lock:
+        client = _client_pool.get(key)
+        if client is None:
+            client = _client_pool[key] = factory()
+        return client
+
+
+def clear_llm_client_pool() -> None:
+    """Drop all pooled chat and embeddings clients (e.g. after a configuration change)."""
+    with _pool_lock:
+        _client_pool.clear()
+
+
 def create_chat_model(
     provider: str,
     model: str,
@@ -329,6 +440,8 @@ def init_llm_config(settings) -> None:
     """
     global _llm_config
     
+    clear_llm_client_pool()
+    
     # Validate provider-specific settings
     provider = settings.LLM_PROVIDER.value if hasattr(settings.LLM_PROVIDER, 'value') else settings.LLM_PROVIDER
     
@@ -432,7 +545,8 @@ def get_chat_model(
     Get a chat model instance using the global configuration.
     
     This is the main function to use throughout the codebase instead of
-    directly instantiating ChatOpenAI.
+    directly instantiating ChatOpenAI. Instances are pooled: calls with the
+    same model, temperature and constructor arguments share one client.
     
     Args:
         model: Override default model (uses LLM_MODEL from config if not provided)
@@ -450,14 +564,74 @@ def get_chat_model(
             "LLM configuration not initialized. Call init_llm_config() at startup."
         )
     
+    model = model or _llm_config["model"]
+    temperature = temperature if temperature is not None else _llm_config["temperature"]
+    return _get_pooled_chat_model(model, temperature, None, **kwargs)
+
+
+def get_structured_chat_model(
+    schema: Any,
+    model: Optional[str] = None,
+    temperature: float = 0,
+    **kwargs
+) -> Runnable:
+    """
+    Get a chat model bound to a structured-output schema.
+    
+    The bound runnable is pooled per (schema, model, temperature). At
+    temperature 0, when LLM_RESPONSE_CACHE_ENABLED is set, responses are
+    served from the persistent LLM response cache, keyed by the exact prompt
+    messages, model parameters and schema.
+    
+    Args:
+        schema: Pydantic model (or JSON schema) passed to with_structured_output()
+        model: Override default model (uses LLM_MODEL from config if not provided)
+        temperature: Sampling temperature (default: 0, deterministic)
+        **kwargs: Additional arguments passed to the model constructor
+    
+    Returns:
+        Runnable returning instances of schema
+        
+    Raises:
+        RuntimeError: If LLM configuration has not been initialized
+    """
+    if _llm_config is None:
+        raise RuntimeError(
+            "LLM configuration not initialized. Call init_llm_config() at startup."
+        )
+    
+    model = model or _llm_config["model"]
+    response_cache = get_llm_response_cache() if temperature == 0 else None
+    
+    return _pooled(
+        _pool_key("structured", _schema_id(schema), model, temperature, response_cache is not None, **kwargs),
+        lambda: _get_pooled_chat_model(model, temperature, response_cache, **kwargs).with_structured_output(schema)
+    )
+
+
+def _get_pooled_chat_model(model: str, temperature: float, response_cache, **kwargs) -> BaseChatModel:
+    """Return the pooled chat model for these arguments, creating it on first use."""
+    return _pooled(
+        _pool_key("chat", model, temperature, response_cache is not None, **kwargs),
+        lambda: _create_configured_chat_model(model, temperature, response_cache, **kwargs)
+    )
+
+
+def _create_configured_chat_model(model: str, temperature: float, response_cache, **kwargs) -> BaseChatModel:
+    """Create a chat model from the global configuration with metrics (and optional response cache)."""
+    callbacks = list(kwargs.pop("callbacks", None) or [])
+    callbacks.append(LLMMetricsCallback(_llm_config["provider"], model))
+    if response_cache is not None:
+        kwargs["cache"] = response_cache
     return create_chat_model(
         provider=_llm_config["provider"],
-        model=model or _llm_config["model"],
-        temperature=temperature if temperature is not None else _llm_config["temperature"],
+        model=model,
+        temperature=temperature,
         api_key=_llm_config["api_key"],
         base_url=_llm_config["base_url"],
         inference_provider=_llm_config.get("inference_provider"),
         use_local=_llm_config.get("use_local", False),
+        callbacks=callbacks,
         **kwargs
     )
 
@@ -469,6 +643,10 @@ def get_embeddings_model(
     """
     Get an embeddings model instance using the global configuration.
     
+    When EMBEDDING_CACHE_ENABLED is set, the model is wrapped in
+    CachedEmbeddings so unchanged texts are never re-embedded. Instances are
+    pooled per model and constructor arguments.
+    
     Args:
         model: Override default model (uses EMBEDDINGS_MODEL from config if not provided)
         **kwargs: Additional arguments passed to the embeddings constructor
@@ -485,15 +663,32 @@ def get_embeddings_model(
         )
     
     embeddings_config = _llm_config["embeddings"]
-    return create_embeddings_model(
-        provider=embeddings_config["provider"],
-        model=model or embeddings_config["model"],
-        api_key=embeddings_config["api_key"],
-        use_local=embeddings_config.get("use_local", False),
-        device=embeddings_config.get("device", "cpu"),
-        model_kwargs=embeddings_config.get("model_kwargs"),
-        **kwargs
-    )
+    model_name = model or embeddings_config["model"]
+    from app.core.config import settings
+    cache_enabled = settings.EMBEDDING_CACHE_ENABLED
+    
+    def factory() -> Embeddings:
+        embeddings = create_embeddings_model(
+            provider=embeddings_config["provider"],
+            model=model_name,
+            api_key=embeddings_config["api_key"],
+            use_local=embeddings_config.get("use_local", False),
+            device=embeddings_config.get("device", "cpu"),
+            model_kwargs=embeddings_config.get("model_kwargs"),
+            **kwargs
+        )
+        
+        # Serve repeated texts from the shared, persistent embedding cache
+        if cache_enabled:
+            from app.services.embedding_cache import CachedEmbeddings, get_embedding_cache
+            return CachedEmbeddings(
+                embeddings,
+                get_embedding_cache(),
+                model_name=f"{embeddings_config['provider']}/{model_name}"
+            )
+        return embeddings
+    
+    return _pooled(_pool_key("embeddings", model_name, cache_enabled, **kwargs), factory)
 
 
 
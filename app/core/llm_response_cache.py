@@ -0,0 +1,126 @@
+"""
+Deterministic LLM response cache for CreditNexus.
+
+A LangChain ``BaseCache`` backed by SQLite, attached to the temperature-0
+structured-output models handed out by ``get_structured_chat_model()``
+(extraction, classification, filing requirements, ...). LangChain keys each
+lookup by the serialized prompt messages and the model's parameter string,
+which includes the model name, temperature and the bound output schema, so a
+prompt or schema change never returns a stale answer. Storage, TTL expiry and
+LRU eviction come from app.core.sqlite_cache.
+"""
+
+import hashlib
+import logging
+import threading
+from typing import Any, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+from app.core.sqlite_cache import SQLiteCache
+
+logger = logging.getLogger(__name__)
+
+# Global cache instance
+_cache_instance: Optional['LLMResponseCache'] = None
+_cache_lock = threading.Lock()
+
+# Marker set on generations served from the cache (see LLMMetricsCallback)
+CACHE_HIT_KEY = "response_cache_hit"
+
+
+class LLMResponseCache(SQLiteCache, BaseCache):
+    """Cache service for deterministic LLM responses using SQLite."""
+
+    table = "llm_response_cache"
+    payload_column = "generations"
+    index_prefix = "llm_response"
+
+    def __init__(
+        self,
+        cache_db_path: Optional[str] = None,
+        ttl_seconds: int = 7 * 86400,
+        max_entries: int = 20_000
+    ):
+        """
+        Initialize LLM response cache.
+
+        Args:
+            cache_db_path: Path to SQLite cache database (default: in-memory)
+            ttl_seconds: Time-to-live in seconds (default: 7 days)
+            max_entries: Maximum cached responses before LRU eviction
+        """
+        super().__init__(cache_db_path, ttl_seconds, max_entries)
+
+    @staticmethod
+    def _make_key(prompt: str, llm_string: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{llm_string}|{prompt_hash}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _count_tokens(return_val: Sequence[Generation]) -> int:
+        tokens = 0
+        for generation in return_val:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            tokens += usage.get("total_tokens", 0)
+        return tokens
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        """
+        Get cached generations for a prompt.
+
+        Args:
+            prompt: Serialized prompt messages
+            llm_string: Serialized model parameters (model, temperature, bound tools)
+
+        Returns:
+            Cached generations, or None on a miss
+        """
+        payload = self._get_payload(self._make_key(prompt, llm_string))
+        if payload is None:
+            return None
+
+        try:
+            generations = loads(payload, allowed_objects="core")
+        except Exception as e:
+            logger.warning(f"Discarding unreadable LLM response cache entry: {e}")
+            return None
+        for generation in generations:
+            generation.generation_info = {**(generation.generation_info or {}), CACHE_HIT_KEY: True}
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        """
+        Store generations for a prompt.
+
+        Args:
+            prompt: Serialized prompt messages
+            llm_string: Serialized model parameters (model, temperature, bound tools)
+            return_val: Generations returned by the model
+        """
+        self._put_payload(
+            self._make_key(prompt, llm_string), dumps(list(return_val)), self._count_tokens(return_val)
+        )
+
+    def clear(self, **kwargs: Any) -> None:
+        """Remove all cached responses."""
+        super().clear()
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Get or create the global LLM response cache instance (None if disabled)."""
+    global _cache_instance
+    from app.core.config import settings
+    if not settings.LLM_RESPONSE_CACHE_ENABLED:
+        return None
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = LLMResponseCache(
+                    cache_db_path=settings.LLM_RESPONSE_CACHE_PATH,
+                    ttl_seconds=settings.LLM_RESPONSE_CACHE_TTL,
+                    max_entries=settings.LLM_RESPONSE_CACHE_MAX_ENTRIES
+                )
+    return _cache_instance
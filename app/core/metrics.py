@@ -0,0 +1,430 @@
+"""
+Buffered in-process metrics with an append-only SQLite store.
+
+Services record counters and histograms into a process-wide ``MetricsRegistry``;
+recording only updates an in-memory aggregate for the current time bucket
+under a lock, so it is safe (and cheap) from async handlers and worker
+threads alike. ``MetricsWriter`` periodically drains the registry and appends
+one row per (bucket, metric, labels) to a SQLite database in WAL mode, so
+several worker processes can share one store without serializing on a file
+lock. Closed buckets are compacted into a single row, which keeps reads over
+long ranges proportional to the number of buckets rather than to traffic.
+
+Usage:
+    metrics = get_metrics()
+    metrics.increment("filings.submitted", jurisdiction="UK")
+    metrics.observe("llm.latency_seconds", elapsed, provider="openai")
+
+    get_metrics_store().aggregate("filings.submitted", start, end, interval="day")
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (inclusive) of histogram buckets; values above the last bound
+# land in a final overflow bucket. Suited to latencies in seconds.
+HISTOGRAM_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+INTERVALS = {"minute": 60, "hour": 3600, "day": 86400}
+
+# Closed buckets are re-compacted for this long to pick up late flushes
+COMPACTION_LOOKBACK_SECONDS = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metric_points (
+    bucket_start INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    sum REAL NOT NULL,
+    min REAL,
+    max REAL,
+    histogram TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_metric_points_name_bucket ON metric_points (name, bucket_start);
+CREATE INDEX IF NOT EXISTS ix_metric_points_bucket ON metric_points (bucket_start);
+"""
+
+
+class _Aggregate:
+    """Running count/sum/min/max (and optional histogram) for one series in one bucket."""
+
+    __slots__ = ("count", "sum", "min", "max", "histogram")
+
+    def __init__(self, histogram: bool):
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.histogram: Optional[List[int]] = [0] * (len(HISTOGRAM_BOUNDS) + 1) if histogram else None
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if self.histogram is not None:
+            self.histogram[bisect.bisect_left(HISTOGRAM_BOUNDS, value)] += 1
+
+    def merge(self, other: "_Aggregate") -> None:
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(x for x in (self.min, other.min) if x is not None) if other.min is not None else self.min
+        self.max = max(x for x in (self.max, other.max) if x is not None) if other.max is not None else self.max
+        if self.histogram is not None and other.histogram is not None:
+            self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+
+
+SeriesKey = Tuple[int, str, str]
+
+
+def _labels_key(labels: Dict[str, Any]) -> str:
+    return json.dumps(labels, sort_keys=True, separators=(",", ":"), default=str) if labels else "{}"
+
+
+class MetricsRegistry:
+    """In-memory counters and histograms, aggregated per time bucket until drained."""
+
+    def __init__(self, bucket_seconds: int = 60):
+        """
+        Initialize the registry.
+
+        Args:
+            bucket_seconds: Width of the time buckets values are aggregated into
+        """
+        self.bucket_seconds = bucket_seconds
+        self._lock = threading.Lock()
+        self._series: Dict[SeriesKey, _Aggregate] = {}
+
+    def _record(self, name: str, value: float, histogram: bool, labels: Dict[str, Any], at: Optional[float]):
+        now = time.time() if at is None else at
+        key = (int(now // self.bucket_seconds) * self.bucket_seconds, name, _labels_key(labels))
+        with self._lock:
+            aggregate = self._series.get(key)
+            if aggregate is None:
+                aggregate = self._series[key] = _Aggregate(histogram)
+            aggregate.add(value)
+
+    def increment(self, name: str, value: float = 1, at: Optional[float] = None, **labels: Any) -> None:
+        """
+        Add to a counter.
+
+        Args:
+            name: Metric name (e.g. "web_search.requests")
+            value: Amount to add
+            at: Event time as a UNIX timestamp (default: now)
+            **labels: Series labels (e.g. provider="openai")
+        """
+        self._record(name, value, False, labels, at)
+
+    def observe(self, name: str, value: float, at: Optional[float] = None, **labels: Any) -> None:
+        """
+        Record one observation in a histogram.
+
+        Args:
+            name: Metric name (e.g. "web_search.duration_seconds")
+            value: Observed value
+            at: Event time as a UNIX timestamp (default: now)
+            **labels: Series labels
+        """
+        self._record(name, value, True, labels, at)
+
+    def drain(self) -> List[Tuple[SeriesKey, _Aggregate]]:
+        """Remove and return all buffered aggregates."""
+        with self._lock:
+            series, self._series = self._series, {}
+        return list(series.items())
+
+    def restore(self, series: List[Tuple[SeriesKey, _Aggregate]]) -> None:
+        """Merge drained aggregates back in (e.g. after a failed write)."""
+        with self._lock:
+            for key, aggregate in series:
+                current = self._series.get(key)
+                if current is None:
+                    self._series[key] = aggregate
+                else:
+                    current.merge(aggregate)
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+
+class MetricsStore:
+    """Append-only SQLite store of bucketed metric aggregates."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the store.
+
+        Args:
+            path: SQLite database file (None = in-memory only)
+        """
+        self.path = path or ":memory:"
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def append(self, series: List[Tuple[SeriesKey, _Aggregate]]) -> int:
+        """
+        Append drained aggregates.
+
+        Args:
+            series: Output of ``MetricsRegistry.drain``
+
+        Returns:
+            Number of rows written
+        """
+        if not series:
+            return 0
+        rows = [
+            (bucket, name, labels, agg.count, agg.sum, agg.min, agg.max,
+             json.dumps(agg.histogram) if agg.histogram is not None else None)
+            for (bucket, name, labels), agg in series
+        ]
+        with self._lock, self._conn as conn:
+            conn.executemany("INSERT INTO metric_points VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def compact(self, before: float, after: float = 0) -> int:
+        """
+        Merge the rows of each closed bucket into one.
+
+        Args:
+            before: Only buckets starting before this UNIX timestamp are compacted
+            after: Only buckets starting at or after this UNIX timestamp are compacted
+
+        Returns:
+            Number of rows removed
+        """
+        removed = 0
+        with self._lock, self._conn as conn:
+            groups = conn.execute(
+                "SELECT bucket_start, name, labels FROM metric_points WHERE bucket_start >= ? AND bucket_start < ? "
+                "GROUP BY bucket_start, name, labels HAVING COUNT(*) > 1",
+                (int(after), int(before)),
+            ).fetchall()
+            for bucket, name, labels in groups:
+                key = (bucket, name, labels)
+                rows = conn.execute(
+                    "SELECT count, sum, min, max, histogram FROM metric_points "
+                    "WHERE bucket_start = ? AND name = ? AND labels = ?", key
+                ).fetchall()
+                count, total, lows, highs, histogram = 0, 0.0, [], [], None
+                for row_count, row_sum, row_min, row_max, row_histogram in rows:
+                    count += row_count
+                    total += row_sum
+                    lows += [] if row_min is None else [row_min]
+                    highs += [] if row_max is None else [row_max]
+                    if row_histogram is not None:
+                        counts = json.loads(row_histogram)
+                        histogram = counts if histogram is None else [a + b for a, b in zip(histogram, counts)]
+                conn.execute(
+                    "DELETE FROM metric_points WHERE bucket_start = ? AND name = ? AND labels = ?", key
+                )
+                conn.execute(
+                    "INSERT INTO metric_points VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*key, count, total, min(lows, default=None), max(highs, default=None),
+                     json.dumps(histogram) if histogram is not None else None),
+                )
+                removed += len(rows) - 1
+        return removed
+
+    def aggregate(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        interval: Optional[str] = "day",
+        **labels: Any
+    ) -> List[Dict[str, Any]]:
+        """
+        Sum a metric over [start, end), optionally per interval.
+
+        Args:
+            name: Metric name
+            start: Range start as a UNIX timestamp
+            end: Range end as a UNIX timestamp (exclusive)
+            interval: "minute", "hour", "day" or None for a single total
+            **labels: Only include series with exactly these labels (default: all series)
+
+        Returns:
+            Rows with bucket_start (UNIX timestamp, UTC-aligned), count, sum, min and max,
+            ordered by bucket; empty intervals are omitted
+        """
+        size = INTERVALS[interval] if interval else None
+        bucket_expr = f"(bucket_start / {size}) * {size}" if size else "0"
+        query = (
+            f"SELECT {bucket_expr} AS bucket, SUM(count), SUM(sum), MIN(min), MAX(max) FROM metric_points "
+            "WHERE name = ? AND bucket_start >= ? AND bucket_start < ?"
+        )
+        params: List[Any] = [name, int(start), int(end)]
+        if labels:
+            query += " AND labels = ?"
+            params.append(_labels_key(labels))
+        query += " GROUP BY bucket ORDER BY bucket"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {"bucket_start": bucket if size else int(start), "count": count, "sum": total, "min": low, "max": high}
+            for bucket, count, total, low, high in rows
+            if count
+        ]
+
+    def histogram(self, name: str, start: float, end: float, **labels: Any) -> Dict[str, Any]:
+        """
+        Merge a histogram over [start, end).
+
+        Args:
+            name: Metric name
+            start: Range start as a UNIX timestamp
+            end: Range end as a UNIX timestamp (exclusive)
+            **labels: Only include series with exactly these labels (default: all series)
+
+        Returns:
+            Dict with bounds, counts (one more than bounds, the last is overflow),
+            count and approximate p50/p95/p99 (bucket upper bounds)
+        """
+        query = "SELECT histogram FROM metric_points WHERE name = ? AND bucket_start >= ? AND bucket_start < ? AND histogram IS NOT NULL"
+        params: List[Any] = [name, int(start), int(end)]
+        if labels:
+            query += " AND labels = ?"
+            params.append(_labels_key(labels))
+        counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        for (row,) in rows:
+            counts = [a + b for a, b in zip(counts, json.loads(row))]
+        total = sum(counts)
+        result: Dict[str, Any] = {"bounds": list(HISTOGRAM_BOUNDS), "counts": counts, "count": total}
+        for label, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            result[label] = _quantile_bound(counts, total, q)
+        return result
+
+
+def _quantile_bound(counts: List[int], total: int, q: float) -> Optional[float]:
+    if not total:
+        return None
+    seen = 0
+    for index, count in enumerate(counts):
+        seen += count
+        if seen >= q * total:
+            return HISTOGRAM_BOUNDS[index] if index < len(HISTOGRAM_BOUNDS) else float("inf")
+    return float("inf")
+
+
+class MetricsWriter:
+    """Background task that periodically drains the registry into the store."""
+
+    def __init__(
+        self,
+        registry: Optional["MetricsRegistry"] = None,
+        store: Optional[MetricsStore] = None,
+        interval: Optional[float] = None
+    ):
+        """
+        Initialize metrics writer.
+
+        Args:
+            registry: Registry to drain (defaults to the global registry)
+            store: Destination store (defaults to the global store)
+            interval: Seconds between flushes (defaults to settings.METRICS_FLUSH_INTERVAL_SECONDS)
+        """
+        self.registry = registry or get_metrics()
+        self.store = store or get_metrics_store()
+        self.interval = interval or settings.METRICS_FLUSH_INTERVAL_SECONDS
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = threading.Lock()
+        # Compaction revisits recent buckets in case other processes flushed
+        # into them late; anything older was compacted by an earlier flush
+        self._compacted_until = 0.0
+
+    def start(self) -> None:
+        """Start the periodic flush task on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task and write any remaining metrics."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write buffered metrics off the event loop.
+
+        Returns:
+            Number of rows written
+        """
+        return await asyncio.to_thread(self.flush_sync)
+
+    def flush_sync(self) -> int:
+        """Write buffered metrics and compact closed buckets (blocking)."""
+        with self._flush_lock:
+            series = self.registry.drain()
+            try:
+                written = self.store.append(series)
+            except Exception:
+                # Keep the data for the next attempt
+                self.registry.restore(series)
+                raise
+            before = time.time() - self.registry.bucket_seconds
+            self.store.compact(before=before, after=self._compacted_until - COMPACTION_LOOKBACK_SECONDS)
+            self._compacted_until = before
+            return written
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Failed to flush metrics: {e}")
+
+
+_metrics = MetricsRegistry(settings.METRICS_BUCKET_SECONDS)
+_metrics_store: Optional[MetricsStore] = None
+_metrics_writer: Optional[MetricsWriter] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the global metrics registry."""
+    return _metrics
+
+
+def get_metrics_store() -> MetricsStore:
+    """Get or create the global metrics store."""
+    global _metrics_store
+    if _metrics_store is None:
+        _metrics_store = MetricsStore(settings.METRICS_STORE_PATH)
+    return _metrics_store
+
+
+def get_metrics_writer() -> MetricsWriter:
+    """Get or create the global metrics writer."""
+    global _metrics_writer
+    if _metrics_writer is None:
+        _metrics_writer = MetricsWriter()
+    return _metrics_writer
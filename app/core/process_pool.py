@@ -0,0 +1,63 @@
+"""
+Application-lifetime process pool for CPU-bound work.
+
+PDF page extraction, bulk document rendering and Monte Carlo credit loss
+simulation share one ProcessPoolExecutor instead of each starting their own
+workers. Processes are started with ``spawn``: forking a threaded server
+process is unsafe.
+
+The pool is sized once, when it is first used (PROCESS_POOL_WORKERS). Callers
+that want fewer workers bound their own concurrency by limiting how many tasks
+they keep in flight, so one caller never resizes the pool under another
+caller's pending work. ``shutdown_process_pool`` is called once on application
+shutdown.
+
+Usage:
+    pool = get_process_pool()
+    future = pool.submit(task, *args)
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def default_workers() -> int:
+    """CPU count, capped at 8."""
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Get the shared process pool, creating it on first use (thread-safe).
+
+    Returns:
+        Shared ``ProcessPoolExecutor`` (do not shut it down)
+    """
+    global _pool
+    from app.core.config import settings
+    with _lock:
+        if _pool is None:
+            workers = settings.PROCESS_POOL_WORKERS or default_workers()
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.debug(f"Created shared process pool with {workers} workers")
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    """Shut down the shared process pool (e.g. on application shutdown)."""
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
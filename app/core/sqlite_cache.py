@@ -0,0 +1,241 @@
+"""
+SQLite-backed TTL/LRU cache base for CreditNexus.
+
+Shared storage for the result caches (chunk extraction results, deterministic
+LLM responses, embeddings). Each subclass names its table and payload column
+and decides how keys and payloads are built; this class owns the schema, TTL
+expiry, size-bounded least-recently-used eviction and hit/miss statistics.
+
+The number of rows is tracked in memory so a write never has to count the
+table; get_stats() resyncs it in case another process shares the file.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+class SQLiteCache:
+    """TTL + LRU bounded key/payload cache stored in one SQLite table."""
+
+    # Table and payload column names, and any extra NOT NULL columns
+    table: str = ""
+    payload_column: str = "payload"
+    payload_type: str = "TEXT"
+    extra_columns: Tuple[str, ...] = ()
+    index_prefix: str = ""
+
+    def __init__(
+        self,
+        cache_db_path: Optional[str] = None,
+        ttl_seconds: int = 7 * 86400,
+        max_entries: int = 20_000
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_db_path: Path to SQLite cache database (default: in-memory)
+            ttl_seconds: Time-to-live in seconds
+            max_entries: Maximum cached rows before LRU eviction
+        """
+        self.cache_db_path = cache_db_path or ":memory:"
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expired": 0, "tokens_saved": 0}
+        self._entries = 0
+
+        if self.cache_db_path != ":memory:":
+            Path(self.cache_db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.cache_db_path, check_same_thread=False)
+        self._init_cache_db()
+
+    def _init_cache_db(self):
+        """Initialize cache database schema."""
+        index_prefix = self.index_prefix or self.table
+        extra = "".join(f"{column} TEXT NOT NULL, " for column in self.extra_columns)
+        with self._lock:
+            if self.cache_db_path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    cache_key TEXT PRIMARY KEY,
+                    {extra}{self.payload_column} {self.payload_type} NOT NULL,
+                    tokens INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_{index_prefix}_last_used ON {self.table}(last_used)
+            """)
+            self._conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_{index_prefix}_expires_at ON {self.table}(expires_at)
+            """)
+            self._conn.commit()
+            (self._entries,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+
+    def _get_payload(self, key: str) -> Optional[Any]:
+        """
+        Read a payload and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Stored payload, or None on a miss or expired entry
+        """
+        return self._get_payloads([key]).get(key)
+
+    def _get_payloads(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """
+        Read several payloads and mark them as recently used.
+
+        Args:
+            keys: Cache keys (repeated keys count as separate lookups)
+
+        Returns:
+            Stored payloads by key; misses and expired entries are left out
+        """
+        distinct = list(dict.fromkeys(keys))
+        now = time.time()
+        found: Dict[str, Any] = {}
+        tokens: Dict[str, int] = {}
+        expired: List[str] = []
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(distinct), 500):
+                chunk = distinct[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT cache_key, {self.payload_column}, tokens, expires_at "
+                    f"FROM {self.table} WHERE cache_key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, payload, row_tokens, expires_at in rows:
+                    if expires_at <= now:
+                        expired.append(key)
+                    else:
+                        found[key] = payload
+                        tokens[key] = row_tokens
+            if expired:
+                self._conn.executemany(
+                    f"DELETE FROM {self.table} WHERE cache_key = ?", [(key,) for key in expired]
+                )
+                self._entries -= len(expired)
+                self._stats["expired"] += len(expired)
+            if found:
+                self._conn.executemany(
+                    f"UPDATE {self.table} SET last_used = ? WHERE cache_key = ?",
+                    [(now, key) for key in found]
+                )
+            if expired or found:
+                self._conn.commit()
+            for key in keys:
+                if key in found:
+                    self._stats["hits"] += 1
+                    self._stats["tokens_saved"] += tokens[key]
+                else:
+                    self._stats["misses"] += 1
+        return found
+
+    def _put_payload(self, key: str, payload: Any, tokens: int, *extra_values: str) -> None:
+        """
+        Store a payload, then evict expired and least recently used rows.
+
+        Args:
+            key: Cache key
+            payload: Serialized value
+            tokens: Tokens a hit on this entry saves
+            extra_values: Values for extra_columns, in order
+        """
+        self._put_payloads([(key, payload, tokens, *extra_values)])
+
+    def _put_payloads(self, rows: Sequence[Tuple[Any, ...]]) -> None:
+        """
+        Store several payloads, then evict expired and least recently used rows.
+
+        Args:
+            rows: (key, payload, tokens, *extra_values) tuples, as for _put_payload
+        """
+        if not rows:
+            return
+        columns = (
+            ("cache_key",) + self.extra_columns
+            + (self.payload_column, "tokens", "created_at", "expires_at", "last_used")
+        )
+        placeholders = ", ".join("?" for _ in columns)
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        values = [
+            (key, *extra_values, payload, tokens, now, expires_at, now)
+            for key, payload, tokens, *extra_values in rows
+        ]
+        keys = list(dict.fromkeys(row[0] for row in rows))
+        with self._lock:
+            existing = 0
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                (count,) = self._conn.execute(
+                    f"SELECT COUNT(*) FROM {self.table} "
+                    f"WHERE cache_key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchone()
+                existing += count
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} ({', '.join(columns)}) VALUES ({placeholders})",
+                values
+            )
+            self._entries += len(keys) - existing
+            self._stats["writes"] += len(rows)
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then the least recently used rows beyond max_entries."""
+        expired = self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,)).rowcount
+        expired = max(expired, 0)
+        self._entries -= expired
+        self._stats["expired"] += expired
+        excess = self._entries - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE cache_key IN "
+                f"(SELECT cache_key FROM {self.table} ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+            self._entries -= excess
+            self._stats["evictions"] += excess
+
+    def clear(self) -> None:
+        """Remove all cached rows."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+            self._entries = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Hit/miss counters, estimated tokens saved and entry count
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            # Resync the running count (another process may share the file)
+            (entries,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+            self._entries = entries
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({
+            "lookups": lookups,
+            "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        })
+        return stats
@@ -0,0 +1,295 @@
+"""
+Lightweight, sampled request tracing.
+
+Traces are scoped with a ContextVar, so spans opened anywhere below a
+``start_trace`` block (including synchronous helpers) attach to the trace of
+the request that is currently running. The sampling decision is made once per
+trace; unsampled traces cost one ``random()`` call plus a ContextVar lookup
+per span.
+
+Finished traces are appended to a bounded in-memory buffer and written out by
+``TraceWriter`` from a background task, so request handlers never perform
+filesystem I/O.
+
+Usage:
+    with start_trace("auth.require_auth"):
+        with span("token_decode") as s:
+            payload = decode_access_token(token)
+            s.set(payload_found=payload is not None)
+"""
+
+import asyncio
+import json
+import logging
+import random
+import secrets
+import time
+from collections import deque
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("creditnexus_trace", default=None)
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ("name", "offset_ms", "duration_ms", "status", "attributes", "_start")
+
+    def __init__(self, name: str, trace_start: float, attributes: Dict[str, Any]):
+        self._start = time.perf_counter()
+        self.name = name
+        self.offset_ms = (self._start - trace_start) * 1000
+        self.duration_ms: Optional[float] = None
+        self.status = "ok"
+        self.attributes = attributes
+
+    def set(self, **attributes: Any) -> None:
+        """Attach attributes to the span."""
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        if exc_type is not None:
+            self.status = "error"
+            self.attributes["error_type"] = exc_type.__name__
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "offset_ms": round(self.offset_ms, 3),
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Span stand-in used when the current request is not sampled."""
+
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """A sampled trace: a named root operation plus its spans."""
+
+    __slots__ = ("name", "trace_id", "started_at", "duration_ms", "status", "attributes", "spans", "_start", "_token")
+
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = secrets.token_hex(8)
+        self.started_at = time.time()
+        self.duration_ms: Optional[float] = None
+        self.status = "ok"
+        self.attributes = attributes
+        self.spans: List[Span] = []
+        self._start = time.perf_counter()
+        self._token = None
+
+    def set(self, **attributes: Any) -> None:
+        """Attach attributes to the trace."""
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Trace":
+        self._token = _current_trace.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        if exc_type is not None:
+            self.status = "error"
+            self.attributes["error_type"] = exc_type.__name__
+            status_code = getattr(exc, "status_code", None)
+            if status_code is not None:
+                self.attributes["status_code"] = status_code
+        _current_trace.reset(self._token)
+        _trace_buffer.append(self)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "status": self.status,
+            "attributes": self.attributes,
+            "spans": [s.to_dict() for s in self.spans],
+        }
+
+
+class TraceBuffer:
+    """Bounded FIFO of finished traces; the oldest are dropped when full."""
+
+    def __init__(self, max_size: int):
+        self._traces: Deque[Trace] = deque(maxlen=max(1, max_size))
+        self.dropped = 0
+
+    def append(self, trace: Trace) -> None:
+        if len(self._traces) == self._traces.maxlen:
+            self.dropped += 1
+        self._traces.append(trace)
+
+    def drain(self) -> List[Trace]:
+        """Remove and return all buffered traces."""
+        traces = []
+        while True:
+            try:
+                traces.append(self._traces.popleft())
+            except IndexError:
+                return traces
+
+    def __len__(self) -> int:
+        return len(self._traces)
+
+
+_trace_buffer = TraceBuffer(settings.TRACE_BUFFER_SIZE)
+
+
+def get_trace_buffer() -> TraceBuffer:
+    """Get the global buffer of finished traces."""
+    return _trace_buffer
+
+
+def start_trace(name: str, sample_rate: Optional[float] = None, **attributes: Any):
+    """
+    Start a trace for the current context if it is sampled.
+
+    Args:
+        name: Root operation name (e.g. "auth.login")
+        sample_rate: Override for settings.TRACE_SAMPLE_RATE
+        **attributes: Initial trace attributes
+
+    Returns:
+        Context manager yielding the Trace, or a no-op stand-in when unsampled
+    """
+    rate = settings.TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        return _NOOP_SPAN
+    return Trace(name, attributes)
+
+
+def span(name: str, **attributes: Any):
+    """
+    Open a span in the current trace.
+
+    Args:
+        name: Span name (e.g. "user_lookup")
+        **attributes: Initial span attributes
+
+    Returns:
+        Context manager yielding the Span, or a no-op stand-in outside a sampled trace
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    new_span = Span(name, trace._start, attributes)
+    trace.spans.append(new_span)
+    return new_span
+
+
+def current_trace() -> Optional[Trace]:
+    """Get the sampled trace for the current context, if any."""
+    return _current_trace.get()
+
+
+class TraceWriter:
+    """Background task that periodically drains the trace buffer to storage."""
+
+    def __init__(
+        self,
+        buffer: Optional[TraceBuffer] = None,
+        path: Optional[str] = None,
+        interval: Optional[float] = None
+    ):
+        """
+        Initialize trace writer.
+
+        Args:
+            buffer: Trace buffer to drain (defaults to the global buffer)
+            path: JSONL output file (defaults to settings.TRACE_LOG_PATH; None logs instead)
+            interval: Seconds between flushes (defaults to settings.TRACE_FLUSH_INTERVAL_SECONDS)
+        """
+        self.buffer = buffer or _trace_buffer
+        self.path = Path(path or settings.TRACE_LOG_PATH) if (path or settings.TRACE_LOG_PATH) else None
+        self.interval = interval or settings.TRACE_FLUSH_INTERVAL_SECONDS
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the periodic flush task on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task and write any remaining traces."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write all buffered traces off the event loop.
+
+        Returns:
+            Number of traces written
+        """
+        traces = self.buffer.drain()
+        if not traces:
+            return 0
+        lines = [json.dumps(trace.to_dict(), default=str) for trace in traces]
+        await asyncio.to_thread(self._write, lines)
+        return len(lines)
+
+    def _write(self, lines: List[str]) -> None:
+        if self.path is None:
+            for line in lines:
+                logger.info(line)
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Failed to flush traces: {e}")
+
+
+_trace_writer: Optional[TraceWriter] = None
+
+
+def get_trace_writer() -> TraceWriter:
+    """Get or create the global trace writer."""
+    global _trace_writer
+    if _trace_writer is None:
+        _trace_writer = TraceWriter()
+    return _trace_writer
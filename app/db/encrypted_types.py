@@ -8,6 +8,8 @@ Supports:
 - EncryptedString: For String columns (email, names, etc.)
 - EncryptedText: For Text columns (large text fields like document content)
 - EncryptedJSON: For JSONB columns (profile_data, cdm_events, etc.)
+- BlindIndex: Keyed HMAC digest column enabling equality lookups on an
+  encrypted column (kept in sync via maintain_blind_index)
 
 Grace Period Support:
 - During migration, can handle both plain text and encrypted data
@@ -17,11 +19,11 @@ Grace Period Support:
 import logging
 import json
 from typing import Optional, Any, Dict
-from sqlalchemy import TypeDecorator, String, Text
+from sqlalchemy import TypeDecorator, String, Text, event
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.types import TypeEngine, TEXT
 
-from app.services.encryption_service import get_encryption_service
+from app.services.encryption_service import get_encryption_service, get_blind_index_service
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -499,3 +501,78 @@ class EncryptedJSON(TypeDecorator):
         else:
             # SQLite and others: Use TEXT
             return dialect.type_descriptor(Text())
+
+
+class BlindIndexDigest(str):
+    """A string that already holds a blind-index digest and must not be re-hashed."""
+
+
+class BlindIndex(TypeDecorator):
+    """SQLAlchemy type storing a keyed HMAC blind index of a plaintext value.
+    
+    Usage:
+        email = Column(EncryptedString(255), nullable=False)
+        email_bidx = Column(BlindIndex("users.email", normalizer="email"), index=True)
+        maintain_blind_index(User.email, User.email_bidx)
+    
+    Plain strings bound to this type (inserts, updates and query parameters)
+    are hashed automatically, so lookups read naturally:
+        db.query(User).filter(User.email_bidx == "jane@example.com")
+    
+    Values loaded from the database are returned as BlindIndexDigest and pass
+    through unchanged when written back.
+    """
+    
+    impl = String
+    cache_ok = True
+    
+    def __init__(self, context: str, normalizer: str = "exact", **kwargs):
+        """Initialize blind index type.
+        
+        Args:
+            context: Column identifier mixed into the HMAC key (e.g. "users.email")
+            normalizer: Normalization applied before hashing ("email", "name", "identifier", "exact")
+            **kwargs: Additional arguments passed to String type
+        """
+        super().__init__(length=64, **kwargs)
+        self.context = context
+        self.normalizer = normalizer
+    
+    def digest(self, value: Optional[str]) -> Optional[BlindIndexDigest]:
+        """Compute the blind index of a plaintext value (digests pass through)."""
+        if value is None or isinstance(value, BlindIndexDigest):
+            return value
+        return BlindIndexDigest(
+            get_blind_index_service().compute(value, self.context, self.normalizer)
+        )
+    
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[str]:
+        """Hash plaintext values before they reach the database."""
+        digest = self.digest(value)
+        return str(digest) if digest is not None else None
+    
+    def process_result_value(self, value: Optional[str], dialect) -> Optional[BlindIndexDigest]:
+        """Mark loaded values as digests."""
+        if value is None:
+            return None
+        return BlindIndexDigest(value)
+
+
+def maintain_blind_index(source_attribute, index_attribute) -> None:
+    """Keep a BlindIndex column in sync with the encrypted column it indexes.
+    
+    Registers an attribute "set" listener so that assigning the plaintext
+    (including via the model constructor) also assigns its digest.
+    
+    Args:
+        source_attribute: Instrumented encrypted attribute (e.g. User.email)
+        index_attribute: Instrumented BlindIndex attribute (e.g. User.email_bidx)
+    """
+    index_type = index_attribute.property.columns[0].type
+    index_key = index_attribute.key
+    
+    def sync_blind_index(target, value, oldvalue, initiator):
+        setattr(target, index_key, index_type.digest(value))
+    
+    event.listen(source_attribute, "set", sync_blind_index, propagate=True)
+
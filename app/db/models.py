@@ -8,7 +8,7 @@ import enum
 import sqlalchemy as sa
 
 from app.db import Base
-from app.db.encrypted_types import EncryptedString, EncryptedJSON, EncryptedText
+from app.db.encrypted_types import EncryptedString, EncryptedJSON, EncryptedText, BlindIndex, maintain_blind_index
 
 
 class UserRole(str, enum.Enum):
@@ -164,6 +164,8 @@ class User(Base):
 
     email = Column(EncryptedString(255), unique=True, nullable=False, index=True)  # Encrypted PII
 
+    email_bidx = Column(BlindIndex("users.email", normalizer="email"), nullable=True, index=True)  # HMAC blind index for lookups
+
     password_hash = Column(String(255), nullable=True)  # Already hashed, don't encrypt
 
     display_name = Column(EncryptedString(255), nullable=False)  # Encrypted PII
@@ -254,6 +256,10 @@ class Document(Base):
 
     borrower_lei = Column(EncryptedString(20), nullable=True, index=True)  # Encrypted PII
 
+    borrower_name_bidx = Column(BlindIndex("documents.borrower_name", normalizer="name"), nullable=True, index=True)  # HMAC blind index for lookups
+
+    borrower_lei_bidx = Column(BlindIndex("documents.borrower_lei", normalizer="identifier"), nullable=True, index=True)  # HMAC blind index for lookups
+
     governing_law = Column(String(50), nullable=True)
 
     total_commitment = Column(Numeric(20, 2), nullable=True)
@@ -320,6 +326,12 @@ class Document(Base):
         }
 
 
+# Keep blind indexes in sync with the encrypted columns they index
+maintain_blind_index(User.email, User.email_bidx)
+maintain_blind_index(Document.borrower_name, Document.borrower_name_bidx)
+maintain_blind_index(Document.borrower_lei, Document.borrower_lei_bidx)
+
+
 class RemoteAppProfile(Base):
     """Remote application profile for API access control."""
 
@@ -491,6 +503,55 @@ class AuditLog(Base):
         }
 
 
+class AuditLogRollup(Base):
+    """Hourly audit log counts per action and target type, maintained by the rollup task."""
+
+    __tablename__ = "audit_log_rollups"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    bucket_start = Column(DateTime, nullable=False, index=True)  # Start of the hour (UTC)
+
+    action = Column(String(50), nullable=False)
+
+    target_type = Column(String(50), nullable=False)
+
+    count = Column(Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            "id": self.id,
+            "bucket_start": self.bucket_start.isoformat() if self.bucket_start else None,
+            "action": self.action,
+            "target_type": self.target_type,
+            "count": self.count,
+        }
+
+
+class AuditUserRollup(Base):
+    """Daily audit log counts per user, maintained by the rollup task."""
+
+    __tablename__ = "audit_user_rollups"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    bucket_start = Column(DateTime, nullable=False, index=True)  # Start of the day (UTC)
+
+    user_id = Column(Integer, nullable=False, index=True)  # No FK: counts outlive deleted users
+
+    count = Column(Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            "id": self.id,
+            "bucket_start": self.bucket_start.isoformat() if self.bucket_start else None,
+            "user_id": self.user_id,
+            "count": self.count,
+        }
+
+
 class GeneratedReport(Base):
     """Storage for generated audit reports."""
 
@@ -2411,7 +2472,7 @@ class PaymentEvent(Base):
     related_loan_id = Column(Integer, nullable=True)
     payment_metadata = Column(JSONB, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)  # Incremental default detection scans by updated_at
     
     # Relationships
     payer = relationship("User", foreign_keys=[payer_id])
@@ -2589,6 +2650,28 @@ class BorrowerContact(Base):
         }
 
 
+class DetectionCheckpoint(Base):
+    """High-water mark for incremental background runs (default detection, audit rollups)."""
+    
+    __tablename__ = "detection_checkpoints"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), unique=True, nullable=False, index=True)  # payment_defaults, covenant_breaches, audit_log_rollup, audit_user_rollup
+    high_water_mark = Column(DateTime, nullable=True)  # Start time of the last successful run (rollups: end of the last rolled-up bucket)
+    last_run_count = Column(Integer, nullable=False, default=0)  # Records produced by the last run
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "high_water_mark": self.high_water_mark.isoformat() if self.high_water_mark else None,
+            "last_run_count": self.last_run_count,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
 class AccountingDocument(Base):
     """Accounting document model for storing extracted accounting data."""
     
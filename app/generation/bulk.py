@@ -0,0 +1,507 @@
+"""
+Bulk document generation for whole-deal and portfolio packs.
+
+A bulk job takes a list of (template, CDM source, overrides) items and
+generates one GeneratedDocument per item:
+
+1. Preparation (calling thread, one database session): templates, field
+   mappings, template files, deal context, user profile, parsed CDM data and
+   mapped/AI fields are loaded once and shared by every item that uses them.
+2. Rendering: compiled-template rendering and placeholder validation run in a
+   shared process pool (app.core.process_pool), with a bounded number of
+   items in flight.
+3. Persistence: rendered files are written through TemplateStorage and the
+   GeneratedDocument rows are committed in batches.
+
+BulkDocumentGenerationService.generate() is a generator of progress and
+result events so callers can stream them as the job runs.
+"""
+
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.process_pool import default_workers, get_process_pool
+from app.db.models import Document, DocumentVersion, GeneratedDocument, LMATemplate
+from app.generation.mapper import FieldMapper
+from app.generation.populator import AIFieldPopulator
+from app.generation.renderer import DocumentRenderer
+from app.generation.service import DocumentGenerationService
+from app.models.cdm import CreditAgreement
+from app.templates.registry import TemplateRegistry
+from app.utils.audit import AuditAction, log_audit_action
+from app.utils.json_serializer import serialize_cdm_data
+
+logger = logging.getLogger(__name__)
+
+# Rendered items submitted to the pool per worker ahead of persistence
+IN_FLIGHT_PER_WORKER = 4
+
+# Per-worker-process renderer (keeps its compiled templates between tasks)
+_worker_renderer: Optional[DocumentRenderer] = None
+
+
+@dataclass
+class BulkGenerationItem:
+    """One document to generate in a bulk job."""
+    template_id: int
+    document_id: Optional[int] = None  # Load CDM data from this library document
+    deal_id: Optional[int] = None  # Deal context and link target; CDM source when no document_id/cdm_data
+    cdm_data: Optional[Dict[str, Any]] = None  # Inline CDM data (document_id takes precedence)
+    source_document_id: Optional[int] = None
+    field_overrides: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class _TemplateContext:
+    template: LMATemplate
+    field_mapper: FieldMapper
+    template_path: str
+
+
+@dataclass
+class _PreparedItem:
+    index: int
+    item: BulkGenerationItem
+    template: _TemplateContext
+    cdm_data: CreditAgreement
+    cdm_data_dict: Dict[str, Any]
+    mapped_fields: Dict[str, Any]
+    ai_fields: Dict[str, str]
+    missing_fields: List[str]
+
+    @property
+    def field_values(self) -> Dict[str, Any]:
+        return {**self.mapped_fields, **self.ai_fields}
+
+
+@dataclass
+class _RenderedItem:
+    prepared: _PreparedItem
+    content: bytes
+    validation_result: Dict[str, Any]
+
+
+@dataclass
+class _JobState:
+    """Everything loaded once per job and shared across items."""
+    job_id: str
+    user_id: Optional[int]
+    populator: AIFieldPopulator
+    user_profile: Optional[Dict[str, Any]] = None
+    templates: Dict[int, Any] = field(default_factory=dict)  # template_id -> _TemplateContext or Exception
+    sources: Dict[Tuple[str, int], Any] = field(default_factory=dict)  # (kind, id) -> (cdm, dict) or Exception
+    deal_contexts: Dict[int, Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]] = field(default_factory=dict)
+    fields: Dict[Tuple, Tuple[Dict[str, Any], Dict[str, str], List[str]]] = field(default_factory=dict)
+    generated: int = 0
+    failed: int = 0
+
+
+def _render_in_worker(
+    template_path: str,
+    field_values: Dict[str, Any],
+    cdm_data: CreditAgreement
+) -> Tuple[bytes, Dict[str, Any]]:
+    """Pool task: render one document and validate it for remaining placeholders."""
+    global _worker_renderer
+    if _worker_renderer is None:
+        _worker_renderer = DocumentRenderer()
+    return _worker_renderer.render_template_with_validation(template_path, field_values, cdm_data)
+
+
+class BulkDocumentGenerationService:
+    """
+    Generates many documents in one job, sharing loaded state across items.
+
+    Items fail independently: a missing template, inaccessible document or
+    render error produces a failed result for that item and the job continues.
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        generation_service: Optional[DocumentGenerationService] = None
+    ):
+        """
+        Initialize bulk generation service.
+
+        Args:
+            processes: Rendering processes (default: DOCUMENT_GENERATION_PROCESSES; 0 = CPU count
+                capped at 8, 1 renders in-process)
+            batch_size: Generated documents written and committed per batch
+                (default: DOCUMENT_GENERATION_WRITE_BATCH_SIZE)
+            generation_service: Single-document service whose context loaders and storage are reused
+        """
+        processes = settings.DOCUMENT_GENERATION_PROCESSES if processes is None else processes
+        self.processes = processes or default_workers()
+        self.batch_size = max(1, batch_size or settings.DOCUMENT_GENERATION_WRITE_BATCH_SIZE)
+        self.generation_service = generation_service or DocumentGenerationService()
+        self.template_storage = self.generation_service.template_storage
+        self.renderer = self.generation_service.renderer
+
+    def generate(
+        self,
+        db: Session,
+        items: List[BulkGenerationItem],
+        user_id: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Run a bulk generation job, yielding events as it progresses.
+
+        Args:
+            db: Database session (used from the calling thread only)
+            items: Documents to generate
+            user_id: Optional user ID generating the documents
+
+        Yields:
+            Event dictionaries, in this order:
+            - {"event": "started", "job_id", "total"}
+            - {"event": "result", "index", "status": "generated" | "failed", ...} per item
+            - {"event": "progress", "completed", "generated", "failed", "total"} after each batch
+            - {"event": "completed", "generated", "failed", "total", "elapsed_seconds"}
+        """
+        started = time.perf_counter()
+        job = _JobState(
+            job_id=uuid.uuid4().hex[:12],
+            user_id=user_id,
+            populator=AIFieldPopulator(db=db),
+        )
+        if user_id:
+            job.user_profile = self.generation_service.load_user_profile(db, user_id)
+
+        total = len(items)
+        logger.info(f"Bulk generation job {job.job_id}: {total} item(s) on {self.processes} process(es)")
+        yield {"event": "started", "job_id": job.job_id, "total": total}
+
+        pool = get_process_pool() if self.processes > 1 and total > 1 else None
+        max_in_flight = self.processes * IN_FLIGHT_PER_WORKER
+        in_flight: Deque[Tuple[_PreparedItem, Future]] = deque()
+        batch: List[_RenderedItem] = []
+
+        def collect(prepared: _PreparedItem, future: Future) -> Iterator[Dict[str, Any]]:
+            try:
+                content, validation_result = future.result()
+            except Exception as e:
+                yield self._failure(job, prepared.index, f"Failed to render template: {e}")
+                return
+            batch.append(_RenderedItem(prepared, content, validation_result))
+            if len(batch) >= self.batch_size:
+                yield from self._flush(db, job, batch, total)
+                batch.clear()
+
+        for index, item in enumerate(items):
+            try:
+                prepared = self._prepare(db, job, index, item)
+            except Exception as e:
+                yield self._failure(job, index, str(e))
+                continue
+
+            if pool is not None:
+                future = pool.submit(
+                    _render_in_worker, prepared.template.template_path, prepared.field_values, prepared.cdm_data
+                )
+            else:
+                future = Future()
+                try:
+                    future.set_result(self.renderer.render_template_with_validation(
+                        prepared.template.template_path, prepared.field_values, prepared.cdm_data
+                    ))
+                except Exception as e:
+                    future.set_exception(e)
+            in_flight.append((prepared, future))
+
+            while len(in_flight) > max_in_flight or (in_flight and in_flight[0][1].done()):
+                yield from collect(*in_flight.popleft())
+
+        while in_flight:
+            yield from collect(*in_flight.popleft())
+        if batch:
+            yield from self._flush(db, job, batch, total)
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Bulk generation job {job.job_id} finished in {elapsed:.1f}s: "
+            f"{job.generated} generated, {job.failed} failed"
+        )
+        yield {
+            "event": "completed",
+            "job_id": job.job_id,
+            "generated": job.generated,
+            "failed": job.failed,
+            "total": total,
+            "elapsed_seconds": round(elapsed, 3),
+        }
+
+    def _prepare(self, db: Session, job: _JobState, index: int, item: BulkGenerationItem) -> _PreparedItem:
+        """Resolve an item's template, CDM data and field values from the job's shared state."""
+        template_ctx = self._get_template(db, job, item.template_id)
+
+        if item.document_id:
+            source_key = ("document", item.document_id)
+        elif item.cdm_data:
+            source_key = None
+        elif item.deal_id:
+            source_key = ("deal", item.deal_id)
+        else:
+            raise ValueError("Each item requires 'document_id', 'cdm_data' or 'deal_id'")
+
+        if source_key is None:
+            cdm_data = CreditAgreement(**item.cdm_data)
+            cdm_data_dict = serialize_cdm_data(cdm_data)
+        else:
+            cdm_data, cdm_data_dict = self._get_source(db, job, source_key)
+
+        if item.field_overrides:
+            cdm_data = self.generation_service._apply_field_overrides(cdm_data, item.field_overrides)
+            cdm_data_dict = serialize_cdm_data(cdm_data)
+            source_key = None
+
+        # Items with the same template, CDM data and deal share mapped and AI fields
+        fields_key = (item.template_id, source_key, item.deal_id) if source_key else None
+        if fields_key in job.fields:
+            mapped_fields, ai_fields, missing_fields = job.fields[fields_key]
+        else:
+            field_mapper = template_ctx.field_mapper
+            missing_fields = field_mapper.validate_required_fields(cdm_data)
+            mapped_fields = field_mapper.map_cdm_to_template(cdm_data)
+
+            deal_context, related_documents = None, []
+            if item.deal_id:
+                if item.deal_id not in job.deal_contexts:
+                    job.deal_contexts[item.deal_id] = self.generation_service.load_deal_context(db, item.deal_id)
+                deal_context, related_documents = job.deal_contexts[item.deal_id]
+
+            ai_fields = job.populator.populate_ai_fields(
+                cdm_data=cdm_data,
+                template=template_ctx.template,
+                mapped_fields=mapped_fields,
+                user_id=job.user_id,
+                deal_context=deal_context,
+                user_profile=job.user_profile,
+                related_documents=related_documents
+            )
+            if fields_key:
+                job.fields[fields_key] = (mapped_fields, ai_fields, missing_fields)
+
+        if missing_fields:
+            logger.debug(f"Bulk item {index}: missing required fields {missing_fields}")
+
+        return _PreparedItem(
+            index=index,
+            item=item,
+            template=template_ctx,
+            cdm_data=cdm_data,
+            cdm_data_dict=cdm_data_dict,
+            mapped_fields=mapped_fields,
+            ai_fields=ai_fields,
+            missing_fields=missing_fields,
+        )
+
+    def _get_template(self, db: Session, job: _JobState, template_id: int) -> _TemplateContext:
+        if template_id not in job.templates:
+            try:
+                template = TemplateRegistry.get_template(db, template_id)
+                mappings = TemplateRegistry.get_field_mappings(db, template_id)
+                job.templates[template_id] = _TemplateContext(
+                    template=template,
+                    field_mapper=FieldMapper(template, field_mappings=mappings),
+                    template_path=self.generation_service.resolve_template_path(template),
+                )
+            except Exception as e:
+                job.templates[template_id] = e
+        context = job.templates[template_id]
+        if isinstance(context, Exception):
+            raise context
+        return context
+
+    def _get_source(
+        self,
+        db: Session,
+        job: _JobState,
+        source_key: Tuple[str, int]
+    ) -> Tuple[CreditAgreement, Dict[str, Any]]:
+        if source_key not in job.sources:
+            kind, source_id = source_key
+            try:
+                if kind == "document":
+                    cdm_data = self._load_document_cdm(db, source_id, job.user_id)
+                else:
+                    cdm_data = self._load_deal_cdm(db, source_id, job.user_id)
+                job.sources[source_key] = (cdm_data, serialize_cdm_data(cdm_data))
+            except Exception as e:
+                job.sources[source_key] = e
+        source = job.sources[source_key]
+        if isinstance(source, Exception):
+            raise source
+        return source
+
+    def _load_document_cdm(self, db: Session, document_id: int, user_id: Optional[int]) -> CreditAgreement:
+        """
+        Load CDM data from a library document, with the same access rules as single generation.
+
+        Raises:
+            ValueError: If the document is not found or has no CDM data
+            PermissionError: If the user may not use the document
+        """
+        document = db.query(Document).filter(Document.id == document_id).first()
+        if not document:
+            raise ValueError(f"Document with ID {document_id} not found")
+        return self._document_cdm(db, document, user_id)
+
+    def _load_deal_cdm(self, db: Session, deal_id: int, user_id: Optional[int]) -> CreditAgreement:
+        """Load CDM data from the most recent document in a deal that has it."""
+        documents = db.query(Document).filter(
+            Document.deal_id == deal_id
+        ).order_by(Document.created_at.desc()).all()
+        for document in documents:
+            if document.source_cdm_data or document.current_version_id:
+                try:
+                    return self._document_cdm(db, document, user_id)
+                except ValueError:
+                    continue
+        raise ValueError(f"Deal {deal_id} has no document with CDM data available")
+
+    @staticmethod
+    def _document_cdm(db: Session, document: Document, user_id: Optional[int]) -> CreditAgreement:
+        # Demo documents may not have uploaded_by set
+        if user_id is not None and document.uploaded_by is not None and document.uploaded_by != user_id:
+            if not (document.deal and getattr(document.deal, "is_demo", False)):
+                raise PermissionError(f"You do not have access to document {document.id}")
+
+        cdm_data_dict = document.source_cdm_data
+        if not cdm_data_dict and document.current_version_id:
+            version = db.query(DocumentVersion).filter(
+                DocumentVersion.id == document.current_version_id
+            ).first()
+            cdm_data_dict = version.extracted_data if version else None
+        if not cdm_data_dict:
+            raise ValueError(f"Document {document.id} has no CDM data available")
+
+        try:
+            return CreditAgreement(**cdm_data_dict)
+        except Exception as e:
+            raise ValueError(f"Invalid CDM data in document {document.id}: {e}") from e
+
+    def _flush(
+        self,
+        db: Session,
+        job: _JobState,
+        batch: List[_RenderedItem],
+        total: int
+    ) -> Iterator[Dict[str, Any]]:
+        """Write a batch of rendered documents and commit their records in one transaction."""
+        written: List[Tuple[_RenderedItem, str]] = []
+        for rendered in batch:
+            prepared = rendered.prepared
+            filename = f"bulk_{job.job_id}/generated_{prepared.template.template.template_code}_{prepared.index:04d}.docx"
+            try:
+                file_path = self.template_storage.save_generated_document(content=rendered.content, filename=filename)
+            except Exception as e:
+                yield self._failure(job, prepared.index, f"Failed to save generated document: {e}")
+                continue
+            written.append((rendered, file_path))
+        if not written:
+            return
+
+        records = []
+        try:
+            for rendered, file_path in written:
+                prepared = rendered.prepared
+                item = prepared.item
+                template = prepared.template.template
+                generation_summary = self.generation_service.get_generation_summary(
+                    prepared.mapped_fields,
+                    prepared.ai_fields,
+                    prepared.missing_fields,
+                    validation_result=rendered.validation_result
+                )
+                generation_summary["bulk_job_id"] = job.job_id
+                generated_doc = GeneratedDocument(
+                    template_id=template.id,
+                    source_document_id=item.source_document_id or item.document_id,
+                    cdm_data=prepared.cdm_data_dict,
+                    generated_content=None,
+                    file_path=file_path,
+                    status="draft",
+                    generation_summary=generation_summary,
+                    created_by=job.user_id,
+                )
+                deal_document = None
+                if item.deal_id:
+                    deal_document = Document(
+                        title=os.path.basename(file_path),
+                        uploaded_by=job.user_id,
+                        deal_id=item.deal_id,
+                        is_generated=True,
+                        template_id=template.id,
+                        source_cdm_data=prepared.cdm_data_dict,
+                    )
+                records.append((rendered, generated_doc, deal_document))
+
+            db.add_all([r for _, generated_doc, deal_document in records for r in (generated_doc, deal_document) if r])
+            db.flush()
+            for _, _, deal_document in records:
+                if deal_document is not None:
+                    log_audit_action(
+                        db,
+                        AuditAction.UPDATE,
+                        "document",
+                        deal_document.id,
+                        job.user_id,
+                        metadata={"deal_id": deal_document.deal_id, "action": "attach_to_deal", "bulk_job_id": job.job_id}
+                    )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Bulk generation job {job.job_id}: failed to commit batch: {e}", exc_info=True)
+            for rendered, file_path in written:
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+                yield self._failure(job, rendered.prepared.index, f"Failed to save generated document: {e}")
+            yield self._progress(job, total)
+            return
+
+        for rendered, generated_doc, deal_document in records:
+            job.generated += 1
+            validation_result = rendered.validation_result
+            yield {
+                "event": "result",
+                "index": rendered.prepared.index,
+                "status": "generated",
+                "id": generated_doc.id,
+                "template_id": generated_doc.template_id,
+                "source_document_id": generated_doc.source_document_id,
+                "deal_document_id": deal_document.id if deal_document is not None else None,
+                "file_path": generated_doc.file_path,
+                "valid": validation_result["valid"],
+                "remaining_placeholders": validation_result["remaining_placeholders"],
+            }
+        yield self._progress(job, total)
+
+    @staticmethod
+    def _failure(job: _JobState, index: int, error: str) -> Dict[str, Any]:
+        job.failed += 1
+        logger.warning(f"Bulk generation job {job.job_id}: item {index} failed: {error}")
+        return {"event": "result", "index": index, "status": "failed", "error": error}
+
+    @staticmethod
+    def _progress(job: _JobState, total: int) -> Dict[str, Any]:
+        return {
+            "event": "progress",
+            "job_id": job.job_id,
+            "completed": job.generated + job.failed,
+            "generated": job.generated,
+            "failed": job.failed,
+            "total": total,
+        }
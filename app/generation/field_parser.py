@@ -6,11 +6,15 @@ Supports paths like:
 - "facilities[0].commitment_amount.amount"
 - "agreement_date"
 - "governing_law"
+
+Paths are compiled once into accessor closures (compile_field_path) and
+cached, and FieldPathSet resolves a whole mapping set in one pass.
 """
 
 import re
 import logging
-from typing import List, Any, Optional, Dict, Union
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
@@ -143,7 +147,8 @@ class FieldPathParser:
         
         Args:
             obj: Root object (e.g., CreditAgreement instance)
-            path: Field path (e.g., "parties[role='Borrower'].name")
+            path: Field path (e.g., "parties[role='Borrower'].name"), compiled
+                on first use and cached
             
         Returns:
             Value at path or None if not found
@@ -158,54 +163,7 @@ class FieldPathParser:
         if not obj or not path:
             return None
         
-        segments = FieldPathParser.parse_field_path(path)
-        
-        current = obj
-        
-        for segment in segments:
-            if current is None:
-                return None
-            
-            if isinstance(segment, dict):
-                if "filter" in segment:
-                    # List filter: find item matching filter criteria
-                    filter_dict = segment["filter"]
-                    if isinstance(current, list):
-                        # Find first item matching all filter criteria
-                        for item in current:
-                            if isinstance(item, dict):
-                                match = all(
-                                    str(getattr(item, key, None)).lower() == str(value).lower()
-                                    for key, value in filter_dict.items()
-                                )
-                            else:
-                                # Pydantic model
-                                match = all(
-                                    str(getattr(item, key, None)).lower() == str(value).lower()
-                                    for key, value in filter_dict.items()
-                                )
-                            if match:
-                                current = item
-                                break
-                        else:
-                            return None  # No match found
-                    else:
-                        return None
-                elif "index" in segment:
-                    # Array index
-                    index = segment["index"]
-                    if isinstance(current, list) and 0 <= index < len(current):
-                        current = current[index]
-                    else:
-                        return None
-            else:
-                # Attribute access
-                if isinstance(current, dict):
-                    current = current.get(segment)
-                else:
-                    current = getattr(current, segment, None)
-        
-        return current
+        return compile_field_path(path).get(obj)
     
     @staticmethod
     def set_nested_value(obj: Any, path: str, value: Any) -> None:
@@ -224,7 +182,9 @@ class FieldPathParser:
         if not obj or not path:
             return
         
-        segments = FieldPathParser.parse_field_path(path)
+        segments = compile_field_path(path).segments
+        if not segments:
+            return
         current = obj
         
         # Navigate to parent of target
@@ -237,7 +197,7 @@ class FieldPathParser:
                     filter_dict = segment["filter"]
                     if isinstance(current, list):
                         found_item = None
-                        for idx, item in enumerate(current):
+                        for item in current:
                             if isinstance(item, dict):
                                 match = all(
                                     str(item.get(key)).lower() == str(value).lower()
@@ -249,13 +209,8 @@ class FieldPathParser:
                                     for key, value in filter_dict.items()
                                 )
                             if match:
+                                # Items are updated in place, so the list itself needs no bookkeeping
                                 found_item = item
-                                # Store reference to the list and index for later modification
-                                # We need to track this so we can update the item in place
-                                if not hasattr(obj, '_field_parser_context'):
-                                    obj._field_parser_context = {}
-                                obj._field_parser_context['current_list'] = current
-                                obj._field_parser_context['current_index'] = idx
                                 current = item
                                 break
                         if found_item is None:
@@ -264,10 +219,6 @@ class FieldPathParser:
                                 new_item = filter_dict.copy()  # Start with filter criteria
                                 current.append(new_item)
                                 current = new_item
-                                if not hasattr(obj, '_field_parser_context'):
-                                    obj._field_parser_context = {}
-                                obj._field_parser_context['current_list'] = current
-                                obj._field_parser_context['current_index'] = len(current) - 1
                 elif "index" in segment:
                     # Array index
                     index = segment["index"]
@@ -350,17 +301,158 @@ class FieldPathParser:
         return None
 
 
+# Compiled paths kept in the LRU below. Mapping sets are small (a few dozen paths
+# per template) and shared across templates, so this comfortably holds them all.
+FIELD_PATH_CACHE_SIZE = 1024
 
 
+def _attribute_step(name: str) -> Callable[[Any], Any]:
+    def step(current: Any) -> Any:
+        if isinstance(current, dict):
+            return current.get(name)
+        return getattr(current, name, None)
+    return step
 
 
+def _index_step(index: int) -> Callable[[Any], Any]:
+    def step(current: Any) -> Any:
+        if isinstance(current, list) and 0 <= index < len(current):
+            return current[index]
+        return None
+    return step
 
 
+def _filter_step(criteria: Tuple[Tuple[str, str], ...]) -> Callable[[Any], Any]:
+    def step(current: Any) -> Any:
+        if not isinstance(current, list):
+            return None
+        for item in current:
+            if isinstance(item, dict):
+                match = all(str(item.get(key)).lower() == value for key, value in criteria)
+            else:
+                match = all(str(getattr(item, key, None)).lower() == value for key, value in criteria)
+            if match:
+                return item
+        return None
+    return step
 
 
+class CompiledFieldPath:
+    """
+    A field path parsed once into a chain of accessor steps.
+    
+    Each step is a closure for one segment (attribute, index or list filter)
+    that returns None when the segment cannot be resolved, so get() never
+    re-tokenizes the path. Obtain instances through compile_field_path().
+    """
+    
+    __slots__ = ("path", "segments", "steps")
+    
+    def __init__(self, path: str):
+        self.path = path
+        segments = FieldPathParser.parse_field_path(path)
+        self.segments: Tuple[Union[str, Dict[str, Any]], ...] = tuple(segments)
+        steps = []
+        for segment in segments:
+            if isinstance(segment, str):
+                steps.append((segment, _attribute_step(segment)))
+            elif "filter" in segment:
+                criteria = tuple((key, str(value).lower()) for key, value in segment["filter"].items())
+                steps.append((("filter", criteria), _filter_step(criteria)))
+            elif "index" in segment:
+                steps.append((("index", segment["index"]), _index_step(segment["index"])))
+        # (key, step) pairs; keys identify equal steps so FieldPathSet can share prefixes
+        self.steps: Tuple[Tuple[Hashable, Callable[[Any], Any]], ...] = tuple(steps)
+    
+    def get(self, obj: Any) -> Optional[Any]:
+        """
+        Resolve the path against an object.
+        
+        Args:
+            obj: Root object (e.g., CreditAgreement instance or dict)
+            
+        Returns:
+            Value at path or None if not found
+        """
+        current = obj
+        for _, step in self.steps:
+            if current is None:
+                return None
+            current = step(current)
+        return current
 
 
+@lru_cache(maxsize=FIELD_PATH_CACHE_SIZE)
+def compile_field_path(path: str) -> CompiledFieldPath:
+    """
+    Compile a field path, reusing the cached accessor for paths seen before.
+    
+    Args:
+        path: Field path (e.g., "parties[role='Borrower'].name")
+        
+    Returns:
+        CompiledFieldPath for the path
+    """
+    return CompiledFieldPath(path)
 
 
+class _PathNode:
+    __slots__ = ("step", "children", "paths")
+    
+    def __init__(self, step: Optional[Callable[[Any], Any]] = None):
+        self.step = step
+        self.children: Dict[Hashable, "_PathNode"] = {}
+        self.paths: List[str] = []
 
 
+class FieldPathSet:
+    """
+    A set of field paths evaluated against an object in one pass.
+    
+    Paths are merged into a prefix tree of compiled steps, so a shared prefix
+    such as "facilities[0].commitment_amount" is resolved once for all the
+    paths below it rather than once per path.
+    """
+    
+    def __init__(self, paths: Iterable[str]):
+        """
+        Initialize the path set.
+        
+        Args:
+            paths: Field paths to evaluate; empty and duplicate paths are ignored
+        """
+        self.paths = tuple(dict.fromkeys(path for path in paths if path))
+        self._root = _PathNode()
+        for path in self.paths:
+            node = self._root
+            for key, step in compile_field_path(path).steps:
+                child = node.children.get(key)
+                if child is None:
+                    child = node.children[key] = _PathNode(step)
+                node = child
+            node.paths.append(path)
+    
+    def evaluate(self, obj: Any) -> Dict[str, Any]:
+        """
+        Resolve every path in the set against an object.
+        
+        Args:
+            obj: Root object (e.g., CreditAgreement instance or dict)
+            
+        Returns:
+            Dictionary mapping each path to its value (None if not found), the
+            same values FieldPathParser.get_nested_value() returns
+        """
+        values = dict.fromkeys(self.paths)
+        if not obj:
+            return values
+        pending = [(self._root, obj)]
+        while pending:
+            node, current = pending.pop()
+            for path in node.paths:
+                values[path] = current
+            for child in node.children.values():
+                value = child.step(current)
+                if value is not None:
+                    pending.append((child, value))
+        return values
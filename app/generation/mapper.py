@@ -7,11 +7,11 @@ Maps CDM CreditAgreement data to template placeholder values.
 import logging
 from decimal import Decimal
 from datetime import date
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
 from app.models.cdm import CreditAgreement, Frequency, PeriodEnum, Currency
 from app.db.models import LMATemplate, TemplateFieldMapping
-from app.generation.field_parser import FieldPathParser
+from app.generation.field_parser import FieldPathParser, FieldPathSet
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +38,10 @@ class FieldMapper:
         self.template = template
         self.field_mappings = field_mappings or []
         self.parser = FieldPathParser()
+        # Every CDM path the mapping set reads, compiled on first use
+        self._path_set: Optional[FieldPathSet] = None
+        # (cdm_data, values) from the last one-pass evaluation
+        self._resolved: Optional[Tuple[Any, Dict[str, Any]]] = None
         
         logger.debug(f"Initialized FieldMapper for template {template.template_code}")
     
@@ -91,6 +95,56 @@ class FieldMapper:
         
         return result
     
+    def resolve_fields(self, cdm_data: CreditAgreement) -> Dict[str, Any]:
+        """
+        Resolve every CDM path used by the mapping set in one pass.
+        
+        Covers mapped fields, their currency companions and required fields.
+        The result is reused while the same CDM object is passed in, so
+        validate_required_fields() followed by map_cdm_to_template() walks
+        the CDM data once.
+        
+        Args:
+            cdm_data: CreditAgreement instance
+            
+        Returns:
+            Dictionary mapping CDM field paths to raw values (None if not found)
+        """
+        if self._resolved is not None and self._resolved[0] is cdm_data:
+            return self._resolved[1]
+        
+        if self._path_set is None:
+            if not self.field_mappings:
+                self.field_mappings = self.template.field_mappings
+            paths = self._required_field_paths()
+            for mapping in self.field_mappings:
+                if mapping.mapping_type == "ai_generated" or not mapping.cdm_field:
+                    continue
+                paths.append(mapping.cdm_field)
+                if "amount" in mapping.cdm_field:
+                    paths.append(mapping.cdm_field.replace(".amount", ".currency"))
+            self._path_set = FieldPathSet(paths)
+        
+        values = self._path_set.evaluate(cdm_data)
+        self._resolved = (cdm_data, values)
+        return values
+    
+    def _get_value(self, cdm_data: CreditAgreement, cdm_field_path: str) -> Optional[Any]:
+        """
+        Get a CDM value, from the one-pass evaluation when the path is part of it.
+        
+        Args:
+            cdm_data: CreditAgreement instance
+            cdm_field_path: CDM field path
+            
+        Returns:
+            Value at path or None if not found
+        """
+        values = self.resolve_fields(cdm_data)
+        if cdm_field_path in values:
+            return values[cdm_field_path]
+        return self.parser.get_nested_value(cdm_data, cdm_field_path)
+    
     def _map_direct_field(self, cdm_data: CreditAgreement, cdm_field_path: str) -> Optional[Any]:
         """
         Map a direct field from CDM data with fallback logic for missing fields.
@@ -105,7 +159,7 @@ class FieldMapper:
         if not cdm_field_path:
             return None
         
-        value = self.parser.get_nested_value(cdm_data, cdm_field_path)
+        value = self._get_value(cdm_data, cdm_field_path)
         
         # Fallback logic for missing critical fields
         if value is None:
@@ -118,10 +172,7 @@ class FieldMapper:
             # Check if this is a currency amount
             # Try to get currency from context
             if "commitment_amount" in cdm_field_path or "amount" in cdm_field_path:
-                currency = self.parser.get_nested_value(
-                    cdm_data, 
-                    cdm_field_path.replace(".amount", ".currency")
-                )
+                currency = self._get_value(cdm_data, cdm_field_path.replace(".amount", ".currency"))
                 if currency:
                     return self._format_currency(value, currency.value if hasattr(currency, 'value') else str(currency))
             return str(value)
@@ -161,7 +212,7 @@ class FieldMapper:
         if "period_multiplier" in cdm_field_path:
             # Try to get the Frequency object
             frequency_path = cdm_field_path.replace(".period_multiplier", "")
-            frequency = self.parser.get_nested_value(cdm_data, frequency_path)
+            frequency = self._get_value(cdm_data, frequency_path)
             
             if frequency and hasattr(frequency, 'period'):
                 # Default to 1 if period is specified but multiplier is missing
@@ -171,7 +222,7 @@ class FieldMapper:
         
         # Fallback for payment_frequency - handle missing period_multiplier
         if "payment_frequency" in cdm_field_path:
-            frequency = self.parser.get_nested_value(cdm_data, cdm_field_path)
+            frequency = self._get_value(cdm_data, cdm_field_path)
             
             if frequency and isinstance(frequency, Frequency):
                 # If period_multiplier is None, create a temporary Frequency with default
@@ -210,22 +261,22 @@ class FieldMapper:
         
         # Handle common transformation rules
         if transformation_rule == "format_currency":
-            amount = self.parser.get_nested_value(cdm_data, cdm_field_path)
+            amount = self._get_value(cdm_data, cdm_field_path)
             if amount and isinstance(amount, Decimal):
                 # Try to get currency
                 currency_path = cdm_field_path.replace(".amount", ".currency")
-                currency = self.parser.get_nested_value(cdm_data, currency_path)
+                currency = self._get_value(cdm_data, currency_path)
                 if currency:
                     return self._format_currency(amount, currency.value if hasattr(currency, 'value') else str(currency))
                 return str(amount)
         
         elif transformation_rule == "format_date":
-            date_value = self.parser.get_nested_value(cdm_data, cdm_field_path)
+            date_value = self._get_value(cdm_data, cdm_field_path)
             if date_value and isinstance(date_value, date):
                 return self._format_date(date_value)
         
         elif transformation_rule == "format_spread":
-            spread_bps = self.parser.get_nested_value(cdm_data, cdm_field_path)
+            spread_bps = self._get_value(cdm_data, cdm_field_path)
             if spread_bps is not None:
                 return self._format_spread(float(spread_bps))
         
@@ -245,7 +296,7 @@ class FieldMapper:
         
         elif transformation_rule == "extract_facility_type":
             # Extract facility type from facility name
-            facility_name = self.parser.get_nested_value(cdm_data, cdm_field_path)
+            facility_name = self._get_value(cdm_data, cdm_field_path)
             if facility_name:
                 # Simple extraction: "Term Loan B" -> "Term Loan"
                 parts = str(facility_name).split()
@@ -255,7 +306,7 @@ class FieldMapper:
         
         elif transformation_rule == "format_pricing":
             # Format interest rate option as "Benchmark + Spread"
-            rate_option = self.parser.get_nested_value(cdm_data, cdm_field_path)
+            rate_option = self._get_value(cdm_data, cdm_field_path)
             if rate_option and hasattr(rate_option, 'benchmark') and hasattr(rate_option, 'spread_bps'):
                 benchmark = rate_option.benchmark
                 spread = self._format_spread(rate_option.spread_bps)
@@ -375,12 +426,21 @@ class FieldMapper:
         Returns:
             List of missing required field paths
         """
-        missing_fields = []
+        values = self.resolve_fields(cdm_data)
+        return [field_path for field_path in self._required_field_paths() if values.get(field_path) is None]
+    
+    def _required_field_paths(self) -> List[str]:
+        """
+        Collect required CDM field paths from the template and required mappings.
         
-        # Get required fields from template
+        Returns:
+            List of required field paths
+        """
+        # Copy, so the template's own required_fields value is never extended
         required_fields = self.template.required_fields or []
         if isinstance(required_fields, dict):
             required_fields = required_fields.get("fields", [])
+        required_fields = list(required_fields)
         
         # Also check field mappings marked as required
         for mapping in self.field_mappings:
@@ -388,26 +448,4 @@ class FieldMapper:
                 if mapping.cdm_field not in required_fields:
                     required_fields.append(mapping.cdm_field)
         
-        # Validate each required field
-        for field_path in required_fields:
-            value = self.parser.get_nested_value(cdm_data, field_path)
-            if value is None:
-                missing_fields.append(field_path)
-        
-        return missing_fields
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+        return required_fields
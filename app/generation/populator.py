@@ -4,10 +4,13 @@ AI field population engine for LMA template generation.
 Uses LLM to generate AI-populated sections like representations, covenants,
 conditions precedent, events of default, and ESG clauses.
 
-Integrates with clause caching to reduce LLM costs.
+Integrates with clause caching to reduce LLM costs: cached sections are
+resolved in one query, the rest are generated concurrently (bounded by
+DOCUMENT_GENERATION_MAX_CONCURRENCY), and cache writes are batched.
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
 from decimal import Decimal
 
@@ -15,6 +18,7 @@ from sqlalchemy.orm import Session
 
 from app.models.cdm import CreditAgreement
 from app.db.models import LMATemplate
+from app.core.config import settings
 from app.core.llm_client import get_chat_model
 from app.prompts.templates.loader import PromptLoader
 from app.services.clause_cache_service import ClauseCacheService
@@ -80,66 +84,108 @@ class AIFieldPopulator:
             logger.debug(f"No AI-generated sections specified for template {template.template_code}")
             return ai_fields
         
-        # Generate each section
+        # Map section names to template field placeholders
+        template_fields = {section_name: f"[{section_name.upper()}]" for section_name in ai_sections}
+        
+        # Resolve all cache lookups in one query
+        cached_clauses = {}
+        if self.cache_service and self.db:
+            try:
+                cached_clauses = self.cache_service.get_cached_clauses(
+                    db=self.db,
+                    template_id=template.id,
+                    field_names=template_fields.values(),
+                    cdm_data=cdm_data
+                )
+            except Exception as e:
+                logger.warning(f"Clause cache lookup failed, generating all sections: {e}")
+        
+        # Generate the cache misses concurrently
+        misses = [name for name in ai_sections if template_fields[name] not in cached_clauses]
+        generated = self._generate_sections(
+            misses,
+            cdm_data=cdm_data,
+            template=template,
+            mapped_fields=mapped_fields,
+            deal_context=deal_context,
+            user_profile=user_profile,
+            related_documents=related_documents
+        )
+        
         for section_name in ai_sections:
+            template_field = template_fields[section_name]
+            cached_clause = cached_clauses.get(template_field)
+            if cached_clause:
+                generated_content = cached_clause.clause_content
+                logger.debug(f"Using cached clause for {section_name} (usage count: {cached_clause.usage_count})")
+            else:
+                generated_content = generated.get(section_name)
+            
+            if generated_content:
+                ai_fields[template_field] = generated_content
+                logger.debug(f"Generated {section_name} ({len(generated_content)} chars)")
+            else:
+                logger.warning(f"Failed to generate content for section {section_name}")
+        
+        # Batched cache writes: one usage-count update, one insert for new clauses
+        if self.cache_service and self.db:
             try:
-                # Map section name to template field placeholder
-                template_field = f"[{section_name.upper().replace('_', '_')}]"
-                
-                # Check cache first if available
-                cached_clause = None
-                if self.cache_service and self.db:
-                    cached_clause = self.cache_service.get_cached_clause(
-                        db=self.db,
-                        template_id=template.id,
-                        field_name=template_field,
-                        cdm_data=cdm_data
-                    )
-                
-                if cached_clause:
-                    # Use cached clause
-                    generated_content = cached_clause.clause_content
-                    logger.debug(f"Using cached clause for {section_name} (usage count: {cached_clause.usage_count})")
-                else:
-                    # Generate new clause
-                    generated_content = self._generate_section(
-                        section_name=section_name,
-                        cdm_data=cdm_data,
-                        template=template,
-                        mapped_fields=mapped_fields,
-                        deal_context=deal_context,
-                        user_profile=user_profile,
-                        related_documents=related_documents
-                    )
-                    
-                    # Save to cache if available
-                    if generated_content and self.cache_service and self.db:
-                        try:
-                            self.cache_service.save_clause(
-                                db=self.db,
-                                template_id=template.id,
-                                field_name=template_field,
-                                clause_content=generated_content,
-                                cdm_data=cdm_data,
-                                created_by=user_id
-                            )
-                            logger.debug(f"Cached generated clause for {section_name}")
-                        except Exception as e:
-                            logger.warning(f"Failed to cache clause for {section_name}: {e}")
-                
-                if generated_content:
-                    ai_fields[template_field] = generated_content
-                    logger.debug(f"Generated {section_name} ({len(generated_content)} chars)")
-                else:
-                    logger.warning(f"Failed to generate content for section {section_name}")
-                    
+                self.cache_service.record_usage(self.db, cached_clauses.values())
             except Exception as e:
-                logger.error(f"Error generating section {section_name}: {e}", exc_info=True)
-                continue
+                self.db.rollback()
+                logger.warning(f"Failed to record clause cache usage: {e}")
+            try:
+                self.cache_service.save_clauses(
+                    db=self.db,
+                    template_id=template.id,
+                    clauses={template_fields[name]: content for name, content in generated.items() if content},
+                    cdm_data=cdm_data,
+                    created_by=user_id
+                )
+            except Exception as e:
+                self.db.rollback()
+                logger.warning(f"Failed to cache generated clauses: {e}")
         
-        logger.info(f"Generated {len(ai_fields)} AI field(s) for template {template.template_code}")
+        logger.info(
+            f"Generated {len(ai_fields)} AI field(s) for template {template.template_code} "
+            f"({len(cached_clauses)} cached, {len(misses)} generated)"
+        )
         return ai_fields
     
+    def _generate_sections(
+        self,
+        section_names: List[str],
+        max_concurrency: Optional[int] = None,
+        **section_kwargs: Any
+    ) -> Dict[str, Optional[str]]:
+        """
+        Generate several sections concurrently.
+        
+        Each section is an independent LLM call, so a template's sections take
+        roughly as long as the slowest one rather than the sum of all of them.
+        
+        Args:
+            section_names: Section names to generate
+            max_concurrency: Max in-flight LLM calls (defaults to DOCUMENT_GENERATION_MAX_CONCURRENCY)
+            **section_kwargs: Arguments passed to _generate_section()
+            
+        Returns:
+            Dictionary mapping section name to generated content (None if generation failed)
+        """
+        if not section_names:
+            return {}
+        max_concurrency = max_concurrency or settings.DOCUMENT_GENERATION_MAX_CONCURRENCY
+        
+        def generate(section_name: str) -> Optional[str]:
+            try:
+                return self._generate_section(section_name=section_name, **section_kwargs)
+            except Exception as e:
+                logger.error(f"Error generating section {section_name}: {e}", exc_info=True)
+                return None
+        
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(section_names))) as executor:
+            return dict(zip(section_names, executor.map(generate, section_names)))
+    
     def _generate_section(
         self,
         section_name: str,
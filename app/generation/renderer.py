@@ -3,21 +3,35 @@ Word document renderer for LMA template generation.
 
 Handles placeholder replacement in Word documents including paragraphs,
 tables, headers, and footers.
+
+Templates are compiled once per (file path, mtime, size): the compiled form
+keeps the untouched package parts pre-zipped and, for the XML parts that
+contain placeholders, the parsed tree plus the index paths of every paragraph
+or text node that can change. Rendering copies only those trees, patches the
+recorded nodes with the same replacement rules as a full traversal, and
+appends the patched parts to the pre-zipped package.
 """
 
+import copy
 import logging
 import re
 import json
+import threading
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, Iterable, Iterator, List, Tuple
 from io import BytesIO
 
 from docx import Document
+from docx.oxml.parser import parse_xml
+from lxml import etree
 from docx.document import Document as DocumentType
 from docx.oxml.text.paragraph import CT_P
 from docx.oxml.table import CT_Tbl
 from docx.oxml.ns import qn
-from docx.table import Table
+from docx.table import Table, _Cell
 from docx.text.paragraph import Paragraph
 
 from app.generation.field_parser import FieldPathParser
@@ -25,6 +39,50 @@ from app.models.cdm import CreditAgreement
 
 logger = logging.getLogger(__name__)
 
+# Compiled templates kept in memory (least recently used evicted first)
+COMPILED_TEMPLATE_CACHE_SIZE = 32
+
+# Rendering steps, in the order a full traversal applies them
+STEP_PARAGRAPHS = "paragraphs"
+STEP_TABLES = "tables"
+STEP_HEADERS_FOOTERS = "headers_footers"
+STEP_CONTENT_CONTROLS = "content_controls"
+STEP_TEXTBOXES = "textboxes"
+# Steps whose failures are logged and skipped rather than failing the render
+TOLERANT_STEPS = (STEP_CONTENT_CONTROLS, STEP_TEXTBOXES)
+
+# Placeholder checks applied by validate_rendered_document, per kind of block
+CHECK_PARAGRAPH = "paragraph"
+CHECK_TABLE_CELL = "table_cell"
+CHECK_HEADER_FOOTER = "header_footer"
+
+
+@dataclass(frozen=True)
+class _Site:
+    """A paragraph (w:p) or text node (w:t / a:t) that may contain placeholders."""
+    step: str
+    part_name: str
+    path: Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class _ValidationBlock:
+    """A paragraph or table cell whose text validation must inspect after rendering."""
+    check: str
+    location: str
+    part_name: Optional[str] = None
+    path: Optional[Tuple[int, ...]] = None  # None: unchanged by rendering, text recorded at compile time
+    text: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class _CompiledTemplate:
+    """Template package split into pre-zipped static parts and patchable XML parts."""
+    static_zip: bytes
+    parts: Dict[str, Any]
+    sites: Tuple[_Site, ...]
+    validation_blocks: Tuple[_ValidationBlock, ...] = ()
+
 
 class DocumentRenderer:
     """
@@ -45,6 +103,10 @@ class DocumentRenderer:
     # Pattern to match single curly brace placeholders like {facilities[0].facility_name}
     SINGLE_CURLY_PLACEHOLDER_PATTERN = re.compile(r'\{([^}]+)\}')
     
+    # Process-wide compiled template cache, keyed by (resolved path, mtime, size)
+    _compiled_templates: "OrderedDict[Tuple[str, int, int], _CompiledTemplate]" = OrderedDict()
+    _compile_lock = threading.Lock()
+    
     def __init__(self):
         """Initialize document renderer."""
         self.parser = FieldPathParser()
@@ -71,26 +133,200 @@ class DocumentRenderer:
             FileNotFoundError: If template file doesn't exist
             IOError: If template cannot be read
         """
-        template_file = Path(template_path)
-        if not template_file.exists():
-            raise FileNotFoundError(f"Template file not found: {template_path}")
+        return Document(BytesIO(self.render_template_to_bytes(template_path, field_values, cdm_data)))
+    
+    def render_document(
+        self,
+        doc: DocumentType,
+        field_values: Dict[str, str],
+        cdm_data: Optional[CreditAgreement] = None
+    ) -> DocumentType:
+        """
+        Replace placeholders in an already loaded document, in place.
         
-        try:
-            # Load template document
-            doc = Document(str(template_file))
+        Walks every paragraph, table, header/footer, content control and text
+        box. Prefer render_template() for template files, which only touches
+        the nodes recorded when the template was compiled.
+        
+        Args:
+            doc: Document instance
+            field_values: Dictionary mapping placeholder names to values
+            cdm_data: Optional CDM data for direct path evaluation
             
-            # Replace placeholders in all document elements
-            self._replace_placeholders(doc, field_values, cdm_data)
-            self._replace_in_tables(doc, field_values, cdm_data)
-            self._replace_in_headers_footers(doc, field_values, cdm_data)
-            self._replace_in_content_controls(doc, field_values, cdm_data)
-            self._replace_in_textboxes_shapes(doc, field_values, cdm_data)
+        Returns:
+            The same Document instance
+        """
+        self._replace_placeholders(doc, field_values, cdm_data)
+        self._replace_in_tables(doc, field_values, cdm_data)
+        self._replace_in_headers_footers(doc, field_values, cdm_data)
+        self._replace_in_content_controls(doc, field_values, cdm_data)
+        self._replace_in_textboxes_shapes(doc, field_values, cdm_data)
+        return doc
+    
+    def compile_template(self, template_path: str) -> _CompiledTemplate:
+        """
+        Get the compiled form of a template, compiling it on first use.
+        
+        Compiled templates are cached per (resolved path, mtime, size), so an
+        edited or re-uploaded template file is recompiled automatically.
+        
+        Args:
+            template_path: Path to template Word document
             
-            logger.info(f"Rendered template {template_path} with {len(field_values)} field(s)")
-            return doc
+        Returns:
+            Compiled template
             
-        except Exception as e:
-            raise IOError(f"Failed to render template {template_path}: {e}") from e
+        Raises:
+            FileNotFoundError: If template file doesn't exist
+        """
+        template_file = Path(template_path)
+        if not template_file.exists():
+            raise FileNotFoundError(f"Template file not found: {template_path}")
+        stat = template_file.stat()
+        key = (str(template_file.resolve()), stat.st_mtime_ns, stat.st_size)
+        
+        cache = DocumentRenderer._compiled_templates
+        with DocumentRenderer._compile_lock:
+            compiled = cache.get(key)
+            if compiled is not None:
+                cache.move_to_end(key)
+                return compiled
+        
+        compiled = self._compile(template_file)
+        with DocumentRenderer._compile_lock:
+            cache[key] = compiled
+            cache.move_to_end(key)
+            while len(cache) > COMPILED_TEMPLATE_CACHE_SIZE:
+                cache.popitem(last=False)
+        logger.info(
+            f"Compiled template {template_path}: {len(compiled.sites)} placeholder site(s) "
+            f"in {len(compiled.parts)} part(s)"
+        )
+        return compiled
+    
+    def _compile(self, template_file: Path) -> _CompiledTemplate:
+        """Record every node a full traversal could change and split the package."""
+        doc = Document(str(template_file))
+        found: List[Tuple[str, Any]] = []
+        
+        # Same traversal as render_document(); accessing header/footer
+        # paragraphs adds their (empty) definitions, as a full render does
+        for paragraph in doc.paragraphs:
+            found.append((STEP_PARAGRAPHS, paragraph))
+        for table in doc.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    for paragraph in cell.paragraphs:
+                        found.append((STEP_TABLES, paragraph))
+        for section in doc.sections:
+            for header_footer in (section.header, section.footer, section.first_page_header, section.first_page_footer):
+                if header_footer:
+                    for paragraph in header_footer.paragraphs:
+                        found.append((STEP_HEADERS_FOOTERS, paragraph))
+        document_xml = doc.part.element
+        for sdt in document_xml.iter(qn('w:sdt')):
+            for text_elem in sdt.iter(qn('w:t')):
+                found.append((STEP_CONTENT_CONTROLS, text_elem))
+        for tx_body in document_xml.iter(qn('a:txBody')):
+            for text_elem in tx_body.iter(qn('a:t')):
+                found.append((STEP_TEXTBOXES, text_elem))
+        
+        part_names = {
+            id(part.element): part.partname.membername
+            for part in doc.part.package.iter_parts()
+            if hasattr(part, "element")
+        }
+        sites = []
+        site_ancestors = {}  # id -> element; holding the proxies keeps their ids stable
+        for step, node in found:
+            if isinstance(node, Paragraph):
+                text, element = node.text, node._p
+            else:
+                text, element = node.text, node
+            if not text or not self.SINGLE_CURLY_PLACEHOLDER_PATTERN.search(text) and not self.PLACEHOLDER_PATTERN.search(text):
+                continue
+            path, root = self._element_path(element)
+            sites.append(_Site(step, part_names[id(root)], path))
+            site_ancestors.update((id(e), e) for e in (element, *element.iterancestors()))
+        
+        # Blocks without sites render unchanged: keep only those that still fail validation
+        validation_blocks = []
+        for check, location, block in self._validation_blocks(doc):
+            element = block._element
+            if id(element) in site_ancestors:
+                path, root = self._element_path(element)
+                validation_blocks.append(_ValidationBlock(check, location, part_names[id(root)], path))
+            elif self._find_placeholders(check, block.text):
+                validation_blocks.append(_ValidationBlock(check, location, text=block.text))
+        
+        package = BytesIO()
+        doc.save(package)
+        dynamic = {site.part_name for site in sites}
+        parts = {}
+        static_zip = BytesIO()
+        with zipfile.ZipFile(package) as source, zipfile.ZipFile(static_zip, "w", zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                data = source.read(info)
+                if info.filename in dynamic:
+                    parts[info.filename] = parse_xml(data)
+                else:
+                    target.writestr(info.filename, data)
+        return _CompiledTemplate(static_zip.getvalue(), parts, tuple(sites), tuple(validation_blocks))
+    
+    @staticmethod
+    def _element_path(element) -> Tuple[Tuple[int, ...], Any]:
+        """Child-index path from the part root to element, and the root."""
+        path = []
+        parent = element.getparent()
+        while parent is not None:
+            path.append(parent.index(element))
+            element, parent = parent, parent.getparent()
+        return tuple(reversed(path)), element
+    
+    def _patch_compiled(
+        self,
+        compiled: _CompiledTemplate,
+        field_values: Dict[str, str],
+        cdm_data: Optional[CreditAgreement] = None
+    ) -> Dict[str, Any]:
+        """Apply field values to copies of the compiled parts; returns the patched part roots."""
+        roots = {name: copy.deepcopy(root) for name, root in compiled.parts.items()}
+        
+        # Resolve every site before any paragraph is rewritten
+        resolved = []
+        for site in compiled.sites:
+            element = roots[site.part_name]
+            for index in site.path:
+                element = element[index]
+            resolved.append((site.step, roots[site.part_name], element))
+        
+        failed_step = None
+        for step, root, element in resolved:
+            if step == failed_step:
+                continue
+            if step == STEP_PARAGRAPHS:
+                self._replace_in_paragraph(Paragraph(element, None), field_values, cdm_data)
+            elif step in (STEP_TABLES, STEP_HEADERS_FOOTERS):
+                self._replace_in_paragraph(Paragraph(element, None), field_values)
+            elif step in TOLERANT_STEPS:
+                try:
+                    # Text nodes inside a rewritten paragraph are gone from the document
+                    if element.text and self._is_attached(element, root):
+                        replaced_text = self._replace_placeholders_in_text(element.text, field_values, cdm_data)
+                        if replaced_text != element.text:
+                            element.text = replaced_text
+                except Exception as e:
+                    logger.debug(f"Could not process {step.replace('_', ' ')}: {e}")
+                    failed_step = step
+        return roots
+    
+    @staticmethod
+    def _is_attached(element, root) -> bool:
+        while element is not None:
+            if element is root:
+                return True
+            element = element.getparent()
+        return False
     
     def _replace_placeholders(
         self,
@@ -450,94 +686,58 @@ class DocumentRenderer:
             - placeholder_locations: Dict[str, List[str]] - Mapping of placeholder to locations
             - total_placeholders_found: int - Total count of remaining placeholders
         """
-        remaining_placeholders = []
-        placeholder_locations = {}
-        
-        # Check paragraphs
+        return self._validation_result(
+            (check, location, block.text) for check, location, block in self._validation_blocks(doc)
+        )
+    
+    @staticmethod
+    def _validation_blocks(doc: DocumentType) -> Iterator[Tuple[str, str, Any]]:
+        """Yield (check, location, paragraph or cell) for every block validation inspects, in order."""
         for para_idx, para in enumerate(doc.paragraphs):
-            text = para.text
-            # Check for bracket placeholders [FIELD_NAME]
-            for match in self.PLACEHOLDER_PATTERN.finditer(text):
-                placeholder = match.group(0)
-                if placeholder not in placeholder_locations:
-                    placeholder_locations[placeholder] = []
-                placeholder_locations[placeholder].append(f"paragraph_{para_idx}")
-                if placeholder not in remaining_placeholders:
-                    remaining_placeholders.append(placeholder)
-            
-            # Check for double curly placeholders {{field}}
-            for match in self.CURLY_PLACEHOLDER_PATTERN.finditer(text):
-                placeholder = match.group(0)
-                if placeholder not in placeholder_locations:
-                    placeholder_locations[placeholder] = []
-                placeholder_locations[placeholder].append(f"paragraph_{para_idx}")
-                if placeholder not in remaining_placeholders:
-                    remaining_placeholders.append(placeholder)
-            
-            # Check for single curly placeholders {field}
-            for match in self.SINGLE_CURLY_PLACEHOLDER_PATTERN.finditer(text):
-                # Filter out matches that are inside double curly braces
-                is_inside_double = False
-                for dc_match in self.CURLY_PLACEHOLDER_PATTERN.finditer(text):
-                    if dc_match.start() <= match.start() and match.end() <= dc_match.end():
-                        is_inside_double = True
-                        break
-                if not is_inside_double:
-                    placeholder = match.group(0)
-                    if placeholder not in placeholder_locations:
-                        placeholder_locations[placeholder] = []
-                    placeholder_locations[placeholder].append(f"paragraph_{para_idx}")
-                    if placeholder not in remaining_placeholders:
-                        remaining_placeholders.append(placeholder)
-        
-        # Check tables
+            yield CHECK_PARAGRAPH, f"paragraph_{para_idx}", para
         for table_idx, table in enumerate(doc.tables):
             for row_idx, row in enumerate(table.rows):
                 for cell_idx, cell in enumerate(row.cells):
-                    text = cell.text
-                    # Check for bracket placeholders
-                    for match in self.PLACEHOLDER_PATTERN.finditer(text):
-                        placeholder = match.group(0)
-                        if placeholder not in placeholder_locations:
-                            placeholder_locations[placeholder] = []
-                        placeholder_locations[placeholder].append(f"table_{table_idx}_row_{row_idx}_cell_{cell_idx}")
-                        if placeholder not in remaining_placeholders:
-                            remaining_placeholders.append(placeholder)
-                    
-                    # Check for curly placeholders
-                    for match in self.CURLY_PLACEHOLDER_PATTERN.finditer(text):
-                        placeholder = match.group(0)
-                        if placeholder not in placeholder_locations:
-                            placeholder_locations[placeholder] = []
-                        placeholder_locations[placeholder].append(f"table_{table_idx}_row_{row_idx}_cell_{cell_idx}")
-                        if placeholder not in remaining_placeholders:
-                            remaining_placeholders.append(placeholder)
-        
-        # Check headers and footers
+                    yield CHECK_TABLE_CELL, f"table_{table_idx}_row_{row_idx}_cell_{cell_idx}", cell
         for section in doc.sections:
-            # Header
             if section.header:
                 for para_idx, para in enumerate(section.header.paragraphs):
-                    text = para.text
-                    for match in self.PLACEHOLDER_PATTERN.finditer(text):
-                        placeholder = match.group(0)
-                        if placeholder not in placeholder_locations:
-                            placeholder_locations[placeholder] = []
-                        placeholder_locations[placeholder].append(f"header_para_{para_idx}")
-                        if placeholder not in remaining_placeholders:
-                            remaining_placeholders.append(placeholder)
-            
-            # Footer
+                    yield CHECK_HEADER_FOOTER, f"header_para_{para_idx}", para
             if section.footer:
                 for para_idx, para in enumerate(section.footer.paragraphs):
-                    text = para.text
-                    for match in self.PLACEHOLDER_PATTERN.finditer(text):
-                        placeholder = match.group(0)
-                        if placeholder not in placeholder_locations:
-                            placeholder_locations[placeholder] = []
-                        placeholder_locations[placeholder].append(f"footer_para_{para_idx}")
-                        if placeholder not in remaining_placeholders:
-                            remaining_placeholders.append(placeholder)
+                    yield CHECK_HEADER_FOOTER, f"footer_para_{para_idx}", para
+    
+    def _find_placeholders(self, check: str, text: str) -> List[str]:
+        """Placeholders a validation check reports in a block's text, in report order."""
+        # Bracket placeholders [FIELD_NAME] are checked everywhere
+        found = [match.group(0) for match in self.PLACEHOLDER_PATTERN.finditer(text)]
+        if check == CHECK_HEADER_FOOTER:
+            return found
+        
+        # Double curly placeholders {{field}} in paragraphs and tables
+        double_curly = list(self.CURLY_PLACEHOLDER_PATTERN.finditer(text))
+        found.extend(match.group(0) for match in double_curly)
+        if check == CHECK_TABLE_CELL:
+            return found
+        
+        # Single curly placeholders {field} in paragraphs, unless inside double curly braces
+        for match in self.SINGLE_CURLY_PLACEHOLDER_PATTERN.finditer(text):
+            if not any(dc.start() <= match.start() and match.end() <= dc.end() for dc in double_curly):
+                found.append(match.group(0))
+        return found
+    
+    def _validation_result(self, blocks: Iterable[Tuple[str, str, str]]) -> Dict[str, Any]:
+        """Build the validation result from (check, location, text) blocks."""
+        remaining_placeholders = []
+        placeholder_locations = {}
+        
+        for check, location, text in blocks:
+            for placeholder in self._find_placeholders(check, text):
+                if placeholder not in placeholder_locations:
+                    placeholder_locations[placeholder] = []
+                placeholder_locations[placeholder].append(location)
+                if placeholder not in remaining_placeholders:
+                    remaining_placeholders.append(placeholder)
         
         total_count = sum(len(locs) for locs in placeholder_locations.values())
         
@@ -571,12 +771,12 @@ class DocumentRenderer:
             
             # Find all content controls (w:sdt elements)
             # Content controls use the w:sdt namespace element
-            sdt_elements = document_xml.xpath('.//w:sdt', namespaces={'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'})
+            sdt_elements = list(document_xml.iter(qn('w:sdt')))
             
             for sdt in sdt_elements:
                 # Get text content from content control
                 # Content control text is typically in w:t elements within w:sdtContent
-                text_elements = sdt.xpath('.//w:t', namespaces={'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'})
+                text_elements = list(sdt.iter(qn('w:t')))
                 
                 for text_elem in text_elements:
                     if text_elem.text:
@@ -616,21 +816,12 @@ class DocumentRenderer:
             
             # Find all text boxes and shapes (a:txBody elements in drawingML)
             # Text boxes use drawingML namespace
-            tx_body_elements = document_xml.xpath(
-                './/a:txBody',
-                namespaces={
-                    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
-                    'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
-                }
-            )
+            tx_body_elements = list(document_xml.iter(qn('a:txBody')))
             
             for tx_body in tx_body_elements:
                 # Get text content from text box/shape
                 # Text is in a:p (paragraph) -> a:r (run) -> a:t (text) elements
-                text_elements = tx_body.xpath(
-                    './/a:t',
-                    namespaces={'a': 'http://schemas.openxmlformats.org/drawingml/2006/main'}
-                )
+                text_elements = list(tx_body.iter(qn('a:t')))
                 
                 for text_elem in text_elements:
                     if text_elem.text:
@@ -768,14 +959,70 @@ class DocumentRenderer:
         Returns:
             Document content as bytes
         """
-        doc = self.render_template(template_path, field_values, cdm_data)
+        content, _ = self._render_compiled(template_path, field_values, cdm_data, validate=False)
+        return content
+    
+    def render_template_with_validation(
+        self,
+        template_path: str,
+        field_values: Dict[str, str],
+        cdm_data: Optional[CreditAgreement] = None
+    ) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        Render template to bytes and validate it for remaining placeholders.
         
-        # Save to BytesIO
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
+        Gives the same result as validate_rendered_document() on the rendered
+        document, without reloading it: only blocks that contain placeholder
+        sites are re-read.
         
-        return buffer.getvalue()
+        Args:
+            template_path: Path to template Word document
+            field_values: Dictionary of placeholder to value mappings
+            cdm_data: Optional CDM data for direct path evaluation
+            
+        Returns:
+            Tuple of (document content as bytes, validation result)
+        """
+        return self._render_compiled(template_path, field_values, cdm_data, validate=True)
+    
+    def _render_compiled(
+        self,
+        template_path: str,
+        field_values: Dict[str, str],
+        cdm_data: Optional[CreditAgreement],
+        validate: bool
+    ) -> Tuple[bytes, Optional[Dict[str, Any]]]:
+        try:
+            compiled = self.compile_template(template_path)
+            roots = self._patch_compiled(compiled, field_values, cdm_data)
+            validation_result = self._validate_compiled(compiled, roots) if validate else None
+            
+            # Append the patched parts to the pre-zipped static parts
+            buffer = BytesIO(compiled.static_zip)
+            with zipfile.ZipFile(buffer, "a", zipfile.ZIP_DEFLATED) as package:
+                for part_name, root in roots.items():
+                    package.writestr(part_name, etree.tostring(root, encoding="UTF-8", standalone=True))
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            raise IOError(f"Failed to render template {template_path}: {e}") from e
+        
+        logger.info(f"Rendered template {template_path} with {len(field_values)} field(s)")
+        return buffer.getvalue(), validation_result
+    
+    def _validate_compiled(self, compiled: _CompiledTemplate, roots: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate patched parts using the blocks recorded at compile time."""
+        blocks = []
+        for block in compiled.validation_blocks:
+            if block.path is None:
+                blocks.append((block.check, block.location, block.text))
+                continue
+            element = roots[block.part_name]
+            for index in block.path:
+                element = element[index]
+            wrapper = _Cell(element, None) if block.check == CHECK_TABLE_CELL else Paragraph(element, None)
+            blocks.append((block.check, block.location, wrapper.text))
+        return self._validation_result(blocks)
 
 
 
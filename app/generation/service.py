@@ -12,7 +12,7 @@ Orchestrates the complete document generation workflow:
 import logging
 import json
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
 from sqlalchemy.orm import Session
@@ -111,75 +111,9 @@ class DocumentGenerationService:
         mapped_fields = field_mapper.map_cdm_to_template(cdm_data)
         logger.debug(f"Mapped {len(mapped_fields)} field(s) from CDM data")
         
-        # Load deal context if deal_id provided
-        deal_context = None
-        related_documents = []
-        if deal_id:
-            try:
-                from app.services.deal_service import DealService
-                deal_service = DealService(db)
-                deal = deal_service.get_deal(deal_id)
-                if deal:
-                    deal_context = {
-                        "deal_id": deal.deal_id,
-                        "status": deal.status,
-                        "deal_type": deal.deal_type,
-                        "deal_data": deal.deal_data,
-                    }
-                    
-                    # Load related documents from database
-                    from app.db.models import Document
-                    db_docs = db.query(Document).filter(
-                        Document.deal_id == deal_id
-                    ).order_by(Document.created_at.desc()).limit(5).all()
-                    
-                    for doc in db_docs:
-                        related_documents.append({
-                            "document_id": doc.id,
-                            "title": doc.title,
-                            "subdirectory": "documents",
-                            "source": "database",
-                        })
-                    
-                    # Try to load from ChromaDB for semantically similar documents
-                    try:
-                        from app.chains.document_retrieval_chain import DocumentRetrievalService
-                        doc_retrieval = DocumentRetrievalService(collection_name="creditnexus_documents")
-                        search_query = f"deal {deal.deal_id} {deal.deal_type or ''} {deal.status or ''}"
-                        
-                        similar_docs = doc_retrieval.retrieve_similar_documents(
-                            query=search_query,
-                            top_k=5,
-                            filter_metadata={"deal_id": str(deal_id)} if deal_id else None
-                        )
-                        
-                        # Merge with database documents, avoiding duplicates
-                        existing_ids = {doc["document_id"] for doc in related_documents if "document_id" in doc}
-                        for doc in similar_docs:
-                            if doc.get("document_id") not in existing_ids:
-                                related_documents.append(doc)
-                    except Exception as e:
-                        logger.warning(f"Failed to load related documents from ChromaDB: {e}")
-                    
-                    logger.info(f"Loaded deal context for deal {deal_id}: {deal.deal_id}")
-            except Exception as e:
-                logger.warning(f"Failed to load deal context: {e}")
-        
-        # Load user profile if user_id provided
-        user_profile = None
-        if user_id:
-            try:
-                from app.db.models import User
-                user = db.query(User).filter(User.id == user_id).first()
-                if user:
-                    user_profile = {
-                        "role": user.role,
-                        "display_name": user.display_name,
-                        "profile_data": user.profile_data,
-                    }
-                    logger.debug(f"Loaded user profile for user {user_id}")
-            except Exception as e:
-                logger.warning(f"Failed to load user profile: {e}")
+        # Load deal and user context
+        deal_context, related_documents = self.load_deal_context(db, deal_id) if deal_id else (None, [])
+        user_profile = self.load_user_profile(db, user_id) if user_id else None
         
         # Generate AI-populated fields with context
         ai_populator = AIFieldPopulator(db=db)
@@ -198,21 +132,11 @@ class DocumentGenerationService:
         all_field_values = {**mapped_fields, **ai_fields}
         
         # Load template file
-        try:
-            template_path = self.template_storage.get_template_path(
-                template_code=template.template_code,
-                version=template.version
-            )
-        except FileNotFoundError:
-            # Try using file_path from template metadata
-            template_path = template.file_path
-            template_file = Path(template_path)
-            if not template_file.exists():
-                raise IOError(f"Template file not found: {template_path}")
+        template_path = self.resolve_template_path(template)
         
-        # Render document
+        # Render document and validate it for remaining placeholders
         try:
-            rendered_doc = self.renderer.render_template(
+            content, validation_result = self.renderer.render_template_with_validation(
                 template_path=template_path,
                 field_values=all_field_values,
                 cdm_data=cdm_data
@@ -220,9 +144,6 @@ class DocumentGenerationService:
         except Exception as e:
             raise IOError(f"Failed to render template: {e}") from e
         
-        # Validate rendered document for remaining placeholders
-        validation_result = self.renderer.validate_rendered_document(rendered_doc)
-        
         if not validation_result["valid"]:
             logger.warning(
                 f"Document rendered with {validation_result['total_placeholders_found']} remaining placeholder(s): "
@@ -233,7 +154,7 @@ class DocumentGenerationService:
         filename = f"generated_{template.template_code}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.docx"
         try:
             file_path = self.template_storage.save_generated_document(
-                content=self.renderer.render_template_to_bytes(template_path, all_field_values, cdm_data),
+                content=content,
                 filename=filename
             )
         except Exception as e:
@@ -301,6 +222,120 @@ class DocumentGenerationService:
         logger.info(f"Generated document ID {generated_doc.id} from template {template.template_code}")
         return generated_doc
     
+    def load_deal_context(self, db: Session, deal_id: int) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Load deal context and related documents for AI field population.
+        
+        Args:
+            db: Database session
+            deal_id: Deal ID
+            
+        Returns:
+            Tuple of (deal context dictionary or None, list of related document dictionaries)
+        """
+        deal_context = None
+        related_documents = []
+        try:
+            from app.services.deal_service import DealService
+            deal_service = DealService(db)
+            deal = deal_service.get_deal(deal_id)
+            if deal:
+                deal_context = {
+                    "deal_id": deal.deal_id,
+                    "status": deal.status,
+                    "deal_type": deal.deal_type,
+                    "deal_data": deal.deal_data,
+                }
+                
+                # Load related documents from database
+                from app.db.models import Document
+                db_docs = db.query(Document).filter(
+                    Document.deal_id == deal_id
+                ).order_by(Document.created_at.desc()).limit(5).all()
+                
+                for doc in db_docs:
+                    related_documents.append({
+                        "document_id": doc.id,
+                        "title": doc.title,
+                        "subdirectory": "documents",
+                        "source": "database",
+                    })
+                
+                # Try to load from ChromaDB for semantically similar documents
+                try:
+                    from app.chains.document_retrieval_chain import DocumentRetrievalService
+                    doc_retrieval = DocumentRetrievalService(collection_name="creditnexus_documents")
+                    search_query = f"deal {deal.deal_id} {deal.deal_type or ''} {deal.status or ''}"
+                    
+                    similar_docs = doc_retrieval.retrieve_similar_documents(
+                        query=search_query,
+                        top_k=5,
+                        filter_metadata={"deal_id": str(deal_id)}
+                    )
+                    
+                    # Merge with database documents, avoiding duplicates
+                    existing_ids = {doc["document_id"] for doc in related_documents if "document_id" in doc}
+                    for doc in similar_docs:
+                        if doc.get("document_id") not in existing_ids:
+                            related_documents.append(doc)
+                except Exception as e:
+                    logger.warning(f"Failed to load related documents from ChromaDB: {e}")
+                
+                logger.info(f"Loaded deal context for deal {deal_id}: {deal.deal_id}")
+        except Exception as e:
+            logger.warning(f"Failed to load deal context: {e}")
+        return deal_context, related_documents
+    
+    def load_user_profile(self, db: Session, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Load the generating user's profile for AI field population.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            
+        Returns:
+            Profile dictionary, or None if the user cannot be loaded
+        """
+        try:
+            user = db.query(User).filter(User.id == user_id).first()
+            if user:
+                logger.debug(f"Loaded user profile for user {user_id}")
+                return {
+                    "role": user.role,
+                    "display_name": user.display_name,
+                    "profile_data": user.profile_data,
+                }
+        except Exception as e:
+            logger.warning(f"Failed to load user profile: {e}")
+        return None
+    
+    def resolve_template_path(self, template: LMATemplate) -> str:
+        """
+        Resolve the template file for a template record.
+        
+        Args:
+            template: LMATemplate instance
+            
+        Returns:
+            Path to the template .docx file
+            
+        Raises:
+            IOError: If the template file cannot be found
+        """
+        try:
+            return self.template_storage.get_template_path(
+                template_code=template.template_code,
+                version=template.version
+            )
+        except FileNotFoundError:
+            # Try using file_path from template metadata
+            template_path = template.file_path
+            template_file = Path(template_path)
+            if not template_file.exists():
+                raise IOError(f"Template file not found: {template_path}")
+            return template_path
+    
     def get_generation_summary(
         self,
         mapped_fields: Dict[str, Any],
@@ -603,9 +603,10 @@ class CreditAgreement(BaseModel):
         # Note: High-risk jurisdictions are flagged by policy engine, not blocked here
         # This validation ensures data quality but doesn't block creation
         if self.governing_law:
+            from app.services.sanctions_screening import normalize_jurisdiction
             high_risk = self._get_high_risk_jurisdictions()
             gov_law_str = self.governing_law.value if hasattr(self.governing_law, 'value') else str(self.governing_law)
-            if gov_law_str in high_risk:
+            if high_risk and normalize_jurisdiction(gov_law_str) in high_risk:
                 # Log warning but don't block (policy engine will flag)
                 import logging
                 logger = logging.getLogger(__name__)
@@ -618,12 +619,13 @@ class CreditAgreement(BaseModel):
     
     def _is_sanctioned(self, lei: str) -> bool:
         """
-        Check if LEI is on sanctions list (external data source).
+        Check if LEI is on a sanctions list.
         
-        This is a placeholder implementation. In production, this would:
-        - Query external sanctions database (OFAC, UN, EU sanctions lists)
-        - Cache results for performance
-        - Update cache periodically
+        Looks the LEI up in the exact LEI set of the sanctions screening
+        index (OFAC, UN, EU lists loaded from SANCTIONS_LISTS_DIR, see
+        app.services.sanctions_screening). Fuzzy name screening is left to
+        the policy engine, which flags or blocks rather than rejecting the
+        agreement outright.
         
         Args:
             lei: Legal Entity Identifier to check
@@ -631,28 +633,19 @@ class CreditAgreement(BaseModel):
         Returns:
             True if entity is sanctioned, False otherwise
         """
-        # Placeholder: In production, query external sanctions database
-        # For now, return False (no sanctions detected)
-        # Example implementation:
-        # SANCTIONED_LEIS = {"12345678901234567890", "09876543210987654321"}
-        # return lei in SANCTIONED_LEIS
-        return False
+        from app.services.sanctions_screening import get_sanctions_screener
+        return get_sanctions_screener().is_sanctioned_lei(lei)
     
     def _get_high_risk_jurisdictions(self) -> List[str]:
         """
         Get list of high-risk jurisdictions (FATF blacklist, etc.).
         
-        This is a placeholder implementation. In production, this would:
-        - Query FATF high-risk jurisdictions list
-        - Query country risk databases
-        - Update periodically
-        
         Returns:
-            List of high-risk jurisdiction identifiers
+            Normalized (uppercase) high-risk jurisdiction names and codes from
+            the sanctions screening index
         """
-        # Placeholder: In production, query external risk databases
-        # FATF high-risk jurisdictions, etc.
-        return []  # Empty list for now
+        from app.services.sanctions_screening import get_sanctions_screener
+        return sorted(get_sanctions_screener().high_risk_jurisdictions)
 
 
 class ExtractionResult(BaseModel):
@@ -0,0 +1,531 @@
+"""
+Audit Log Archive for CreditNexus.
+
+Moves expired audit logs out of the hot audit_logs table into append-only,
+gzip-compressed NDJSON segment files partitioned by the day they occurred:
+
+    {root}/audit_logs/YYYY/MM/DD/segment-000042.ndjson.gz
+    {root}/audit_logs/YYYY/MM/DD/segment-000042.manifest.json
+    {root}/audit_logs/HEAD.json
+
+Rows are stored exactly as they are in the database, so encrypted columns
+stay encrypted at rest. Each manifest records its segment's SHA-256, row
+counts per action/target type/user and the target IDs it holds (so filtered
+queries can count or skip segments without reading them), and links into a
+hash chain (chain_hash =
+sha256(prev_chain_hash + canonical manifest)); verify() detects any edited,
+removed or reordered segment. Segment, manifest and HEAD are written to a
+temporary file, fsynced and renamed into place before the archived rows are
+deleted from the database.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import JSON, String, delete, select, type_coerce
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+from app.db.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+GENESIS_HASH = "0" * 64
+
+# AuditLog columns as stored (encrypted columns are not decrypted)
+RAW_COLUMNS = [
+    AuditLog.id,
+    AuditLog.user_id,
+    AuditLog.action,
+    AuditLog.target_type,
+    AuditLog.target_id,
+    type_coerce(AuditLog.action_metadata, JSON).label("action_metadata"),
+    type_coerce(AuditLog.ip_address, String).label("ip_address"),
+    AuditLog.user_agent,
+    AuditLog.occurred_at,
+]
+
+
+class ArchiveIntegrityError(Exception):
+    """Raised when an archived segment does not match its manifest."""
+
+
+def _canonical(data: Dict[str, Any]) -> bytes:
+    """Canonical JSON encoding used for hashing manifests."""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _fsync_dir(path: Path) -> None:
+    """Persist a directory entry (rename/create) where the platform supports it."""
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_durable(path: Path, data: bytes) -> None:
+    """Write a file via temp file + fsync + rename so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path.parent)
+
+
+class AuditLogArchive:
+    """Append-only, hash-chained segment store for archived audit logs."""
+    
+    def __init__(self, root: Optional[str] = None):
+        """
+        Initialize the archive.
+        
+        Args:
+            root: Archive root directory (defaults to settings.AUDIT_ARCHIVE_DIR)
+        """
+        self.root = Path(root or settings.AUDIT_ARCHIVE_DIR) / "audit_logs"
+        # (HEAD sequence, manifests by sequence); reloaded when HEAD moves on
+        self._manifest_cache: Optional[Tuple[int, List[Dict[str, Any]]]] = None
+    
+    def read_head(self) -> Optional[Dict[str, Any]]:
+        """Return the HEAD record (last sequence, chain hash, last batch) or None if empty."""
+        head_path = self.root / "HEAD.json"
+        if not head_path.exists():
+            return None
+        return json.loads(head_path.read_text())
+    
+    def append_batch(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Write rows as one segment per day, fsync them and advance HEAD.
+        
+        Args:
+            rows: Raw audit log rows (RAW_COLUMNS), ordered by occurred_at
+        
+        Returns:
+            Manifests of the segments written
+        """
+        head = self.read_head() or {"sequence": 0, "chain_hash": GENESIS_HASH, "max_occurred_at": None}
+        sequence, chain_hash = head["sequence"], head["chain_hash"]
+        
+        by_day: Dict[date, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            by_day[row["occurred_at"].date()].append(row)
+        
+        manifests = []
+        for day in sorted(by_day):
+            sequence += 1
+            manifest = self._write_segment(day, sequence, chain_hash, by_day[day])
+            chain_hash = manifest["chain_hash"]
+            manifests.append(manifest)
+        self._manifest_cache = None
+        
+        max_occurred_at = max(row["occurred_at"] for row in rows).isoformat()
+        _write_durable(self.root / "HEAD.json", _canonical({
+            "sequence": sequence,
+            "chain_hash": chain_hash,
+            "last_batch": [m["sequence"] for m in manifests],
+            "max_occurred_at": max(filter(None, [head["max_occurred_at"], max_occurred_at])),
+        }))
+        return manifests
+    
+    def _write_segment(
+        self,
+        day: date,
+        sequence: int,
+        prev_chain_hash: str,
+        rows: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Write one segment file and its manifest; returns the manifest."""
+        directory = self.root / f"{day:%Y}" / f"{day:%m}" / f"{day:%d}"
+        name = f"segment-{sequence:06d}"
+        
+        lines = []
+        for row in rows:
+            record = dict(row)
+            record["occurred_at"] = row["occurred_at"].isoformat()
+            lines.append(json.dumps(record, default=str))
+        data = gzip.compress(("\n".join(lines) + "\n").encode("utf-8"), compresslevel=6, mtime=0)
+        _write_durable(directory / f"{name}.ndjson.gz", data)
+        
+        counts = Counter((row["action"], row["target_type"], row["user_id"]) for row in rows)
+        manifest = {
+            "sequence": sequence,
+            "partition": day.isoformat(),
+            "segment": f"{name}.ndjson.gz",
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "row_count": len(rows),
+            "min_id": min(row["id"] for row in rows),
+            "max_id": max(row["id"] for row in rows),
+            "min_occurred_at": min(row["occurred_at"] for row in rows).isoformat(),
+            "max_occurred_at": max(row["occurred_at"] for row in rows).isoformat(),
+            "counts": sorted(
+                ([action, target_type, user_id, n] for (action, target_type, user_id), n in counts.items()),
+                key=lambda c: (c[0], c[1] or "", -1 if c[2] is None else c[2])
+            ),
+            "target_ids": sorted({row["target_id"] for row in rows if row["target_id"] is not None}),
+            "created_at": datetime.utcnow().isoformat(),
+            "prev_chain_hash": prev_chain_hash,
+        }
+        manifest["chain_hash"] = hashlib.sha256(prev_chain_hash.encode() + _canonical(manifest)).hexdigest()
+        _write_durable(directory / f"{name}.manifest.json", _canonical(manifest))
+        return manifest
+    
+    def archive_expired(self, db: Session, cutoff_date: datetime, batch_size: int) -> Tuple[int, int]:
+        """
+        Move audit logs older than cutoff_date into the archive in batches.
+        
+        Each batch is written and fsynced before its rows are deleted and the
+        deletion committed. If a previous run stopped in between, the rows of
+        its last (durably archived) batch are deleted first.
+        
+        Args:
+            db: Database session
+            cutoff_date: Archive logs that occurred before this time
+            batch_size: Rows per batch
+        
+        Returns:
+            Tuple of (rows archived, segments written)
+        """
+        self.recover(db)
+        archived = segments = 0
+        while True:
+            rows = [
+                dict(row) for row in db.execute(
+                    select(*RAW_COLUMNS)
+                    .where(AuditLog.occurred_at < cutoff_date)
+                    .order_by(AuditLog.occurred_at, AuditLog.id)
+                    .limit(batch_size)
+                ).mappings()
+            ]
+            if not rows:
+                break
+            manifests = self.append_batch(rows)
+            db.execute(delete(AuditLog).where(AuditLog.id.in_([row["id"] for row in rows])))
+            db.commit()
+            archived += len(rows)
+            segments += len(manifests)
+            logger.info(f"Archived {len(rows)} audit logs into {len(manifests)} segments")
+        return archived, segments
+    
+    def recover(self, db: Session) -> int:
+        """Delete rows of the last archived batch that are still in the database."""
+        head = self.read_head()
+        if not head or not head.get("last_batch"):
+            return 0
+        wanted = set(head["last_batch"])
+        ids = [
+            record["id"]
+            for manifest in self.manifests()
+            if manifest["sequence"] in wanted
+            for record in self.read_segment(manifest)
+        ]
+        deleted = db.execute(delete(AuditLog).where(AuditLog.id.in_(ids))).rowcount if ids else 0
+        db.commit()
+        if deleted:
+            logger.warning(f"Deleted {deleted} audit logs left behind by an interrupted archive run")
+        return deleted
+    
+    def manifests(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        List segment manifests (by sequence) whose partition day overlaps a date range.
+        
+        Args:
+            start_date: Filter from date
+            end_date: Filter to date
+        
+        Returns:
+            Manifest dicts, each with a "path" to its segment file
+        """
+        head = self.read_head()
+        sequence = head["sequence"] if head else 0
+        if self._manifest_cache is None or self._manifest_cache[0] != sequence:
+            self._manifest_cache = (sequence, self._load_manifests())
+        manifests = self._manifest_cache[1]
+        if start_date:
+            manifests = [m for m in manifests if m["partition"] >= start_date.date().isoformat()]
+        if end_date:
+            manifests = [m for m in manifests if m["partition"] <= end_date.date().isoformat()]
+        return list(manifests)
+    
+    def _load_manifests(self) -> List[Dict[str, Any]]:
+        """Read every manifest from disk, ordered by sequence."""
+        manifests = []
+        for path in self.root.glob("*/*/*/segment-*.manifest.json"):
+            manifest = json.loads(path.read_text())
+            manifest["path"] = str(path.with_name(manifest["segment"]))
+            manifests.append(manifest)
+        return sorted(manifests, key=lambda m: m["sequence"])
+    
+    def read_segment(self, manifest: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Read a segment's raw rows, checking it against the manifest hash.
+        
+        Raises:
+            ArchiveIntegrityError: If the file does not match its manifest
+        """
+        data = Path(manifest["path"]).read_bytes()
+        if hashlib.sha256(data).hexdigest() != manifest["sha256"]:
+            raise ArchiveIntegrityError(f"Segment {manifest['path']} does not match its manifest")
+        records = []
+        for line in gzip.decompress(data).decode("utf-8").splitlines():
+            record = json.loads(line)
+            record["occurred_at"] = datetime.fromisoformat(record["occurred_at"])
+            records.append(record)
+        return records
+    
+    def overlaps(self, start_date: Optional[datetime] = None) -> bool:
+        """Whether any archived log could occur at or after start_date."""
+        head = self.read_head()
+        if not head:
+            return False
+        return start_date is None or start_date <= datetime.fromisoformat(head["max_occurred_at"])
+    
+    @staticmethod
+    def to_audit_log(record: Dict[str, Any]) -> AuditLog:
+        """
+        Rehydrate a raw archived row as a detached AuditLog.
+        
+        Values are set as committed state, so encrypted columns are decrypted
+        once and the instance never flushes if it is attached to a session.
+        """
+        log = AuditLog()
+        for key, value in record.items():
+            if key == "action_metadata":
+                value = AuditLog.action_metadata.type.process_result_value(value, None)
+            elif key == "ip_address":
+                value = AuditLog.ip_address.type.process_result_value(value, None)
+            set_committed_value(log, key, value)
+        set_committed_value(log, "user", None)
+        return log
+    
+    def query(
+        self,
+        action: Optional[str] = None,
+        target_type: Optional[str] = None,
+        target_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> Tuple[List[AuditLog], int]:
+        """
+        Query archived audit logs, newest first, with AuditService.get_audit_logs filters.
+        
+        Day partitions are visited newest first. Segments that do not hold the
+        requested user or target are skipped. A day whose matches can be
+        counted from its manifests (fully inside the date range, no target or
+        metadata filter) is only read if it overlaps the requested page, so
+        with limit=0 totals are mostly O(manifests). Only rows on the page
+        are decrypted, plus the metadata of candidates when filtering on it.
+        
+        Returns:
+            Tuple of (audit logs list, total count)
+        """
+        by_day: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for manifest in self.manifests(start_date, end_date):
+            by_day[manifest["partition"]].append(manifest)
+        
+        logs: List[AuditLog] = []
+        total = 0
+        for day in sorted(by_day, reverse=True):
+            day_manifests = [m for m in by_day[day] if self._may_contain(m, target_id, user_id)]
+            if not day_manifests:
+                continue
+            count = self._manifest_count(day_manifests, action, target_type, target_id, user_id,
+                                         start_date, end_date, metadata_filter)
+            if count is not None and not (total < offset + limit and total + count > offset):
+                total += count
+                continue
+            
+            records = [
+                record
+                for manifest in day_manifests
+                for record in self.read_segment(manifest)
+                if self._matches(record, action, target_type, target_id, user_id, start_date, end_date)
+            ]
+            if metadata_filter:
+                decode = AuditLog.action_metadata.type.process_result_value
+                records = [
+                    record for record in records
+                    if self._matches_metadata(decode(record["action_metadata"], None), metadata_filter)
+                ]
+            records.sort(key=lambda record: (record["occurred_at"], record["id"]), reverse=True)
+            
+            logs.extend(
+                self.to_audit_log(record)
+                for record in records[max(0, offset - total):max(0, offset + limit - total)]
+            )
+            total += len(records)
+        
+        return logs, total
+    
+    def iter_pages(
+        self,
+        action: Optional[str] = None,
+        target_type: Optional[str] = None,
+        user_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        page_size: int = 1000
+    ) -> Iterator[List[AuditLog]]:
+        """
+        Page through archived audit logs oldest first by (occurred_at, id).
+        
+        Day partitions are read one at a time, so memory is bounded by the
+        largest day rather than the archive. Segments that do not hold the
+        requested user are skipped.
+        
+        Yields:
+            Lists of at most page_size detached AuditLog instances
+        """
+        by_day: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for manifest in self.manifests(start_date, end_date):
+            if self._may_contain(manifest, None, user_id):
+                by_day[manifest["partition"]].append(manifest)
+        
+        page: List[AuditLog] = []
+        for day in sorted(by_day):
+            records = [
+                record
+                for manifest in by_day[day]
+                for record in self.read_segment(manifest)
+                if self._matches(record, action, target_type, None, user_id, start_date, end_date)
+            ]
+            records.sort(key=lambda record: (record["occurred_at"], record["id"]))
+            for record in records:
+                page.append(self.to_audit_log(record))
+                if len(page) == page_size:
+                    yield page
+                    page = []
+        if page:
+            yield page
+    
+    @staticmethod
+    def _may_contain(manifest, target_id, user_id) -> bool:
+        """Whether a segment can hold rows for the target/user (manifests without keys always can)."""
+        if target_id and "target_ids" in manifest:
+            target_ids = manifest["target_ids"]
+            at = bisect_left(target_ids, target_id)
+            if at == len(target_ids) or target_ids[at] != target_id:
+                return False
+        if user_id and "target_ids" in manifest:
+            return any(count[2] == user_id for count in manifest["counts"])
+        return True
+    
+    @staticmethod
+    def _manifest_count(manifests, action, target_type, target_id, user_id, start_date, end_date, metadata_filter):
+        """Matching rows of a day from manifest counts, or None if rows must be read."""
+        if target_id or metadata_filter:
+            return None
+        for manifest in manifests:
+            if user_id and "target_ids" not in manifest:
+                return None  # Written before per-user counts were recorded
+            if start_date and datetime.fromisoformat(manifest["min_occurred_at"]) < start_date:
+                return None
+            if end_date and datetime.fromisoformat(manifest["max_occurred_at"]) > end_date:
+                return None
+        return sum(
+            count[-1]
+            for manifest in manifests
+            for count in manifest["counts"]
+            if (not action or count[0] == action)
+            and (not target_type or count[1] == target_type)
+            and (not user_id or count[2] == user_id)
+        )
+    
+    @staticmethod
+    def _matches(record, action, target_type, target_id, user_id, start_date, end_date) -> bool:
+        """Apply the column filters of get_audit_logs to a raw record."""
+        return (
+            (not action or record["action"] == action)
+            and (not target_type or record["target_type"] == target_type)
+            and (not target_id or record["target_id"] == target_id)
+            and (not user_id or record["user_id"] == user_id)
+            and (not start_date or record["occurred_at"] >= start_date)
+            and (not end_date or record["occurred_at"] <= end_date)
+        )
+    
+    @staticmethod
+    def _matches_metadata(metadata: Optional[Dict[str, Any]], metadata_filter: Dict[str, Any]) -> bool:
+        """Apply the key / key=value metadata filter of get_audit_logs."""
+        if not isinstance(metadata, dict):
+            return False
+        for key, value in metadata_filter.items():
+            if key not in metadata:
+                return False
+            if value is not None and str(metadata[key]) != str(value):
+                return False
+        return True
+    
+    def verify(self) -> Dict[str, Any]:
+        """
+        Verify every segment against its manifest and the hash chain.
+        
+        Returns:
+            Dictionary with segment/row counts, validity and any errors found
+        """
+        errors = []
+        prev_chain_hash = GENESIS_HASH
+        rows = 0
+        manifests = self._load_manifests()  # From disk, not the in-memory cache
+        for expected_sequence, manifest in enumerate(manifests, start=1):
+            body = {k: v for k, v in manifest.items() if k not in ("chain_hash", "path")}
+            if manifest["sequence"] != expected_sequence:
+                errors.append(f"Segment {expected_sequence} is missing (found {manifest['sequence']})")
+            if manifest["prev_chain_hash"] != prev_chain_hash:
+                errors.append(f"Segment {manifest['sequence']} does not link to its predecessor")
+            if hashlib.sha256(manifest["prev_chain_hash"].encode() + _canonical(body)).hexdigest() != manifest["chain_hash"]:
+                errors.append(f"Manifest of segment {manifest['sequence']} was modified")
+            try:
+                rows += len(self.read_segment(manifest))
+            except (ArchiveIntegrityError, OSError) as e:
+                errors.append(str(e))
+            prev_chain_hash = manifest["chain_hash"]
+        
+        head = self.read_head()
+        if head and head["chain_hash"] != prev_chain_hash:
+            errors.append("HEAD does not match the last segment (segments were removed or appended out of band)")
+        
+        return {
+            "segments": len(manifests),
+            "rows": rows,
+            "valid": not errors,
+            "errors": errors,
+        }
+
+
+# Global archive instance
+_audit_archive: Optional[AuditLogArchive] = None
+
+
+def get_audit_archive() -> AuditLogArchive:
+    """
+    Get or create the global audit log archive instance.
+    
+    Returns:
+        AuditLogArchive rooted at settings.AUDIT_ARCHIVE_DIR
+    """
+    global _audit_archive
+    if _audit_archive is None:
+        _audit_archive = AuditLogArchive()
+    return _audit_archive
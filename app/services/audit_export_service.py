@@ -7,15 +7,30 @@ Provides export functionality for audit data in various formats (CSV, Excel, PDF
 import logging
 import csv
 import io
-from typing import List, Dict, Any, Optional
+import json
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from datetime import datetime
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
+from app.services.audit_archive_service import get_audit_archive
 from app.services.audit_service import AuditService
-from app.db.models import AuditLog
+from app.db.models import AuditLog, User
 
 logger = logging.getLogger(__name__)
 
+# Audit logs fetched per keyset page while streaming exports
+EXPORT_PAGE_SIZE = 1000
+# Decrypted users kept across the pages of one export
+EXPORT_USER_CACHE_SIZE = 10_000
+
+CSV_HEADERS = [
+    "ID", "User ID", "User Name", "User Email", "Action",
+    "Target Type", "Target ID", "IP Address", "User Agent",
+    "Occurred At"
+]
+
 
 class AuditExportService:
     """Service for exporting audit data to various formats."""
@@ -24,6 +39,218 @@ class AuditExportService:
         """Initialize audit export service."""
         self.audit_service = AuditService()
     
+    def iter_audit_log_pages(
+        self,
+        db: Session,
+        action: Optional[str] = None,
+        target_type: Optional[str] = None,
+        user_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        page_size: int = EXPORT_PAGE_SIZE,
+        include_archived: bool = True
+    ) -> Iterator[List[Any]]:
+        """
+        Page through audit logs oldest first by keyset on (occurred_at, id).
+        
+        Archived logs (see audit_archive_service) come first, read one day
+        partition at a time with the same filters; the live table follows.
+        Each live page is a bounded index range scan (no OFFSET) that starts
+        after the last archived row, so rows of an interrupted archive run
+        that are still in the table are not exported twice. Live rows are
+        selected as plain column tuples rather than ORM instances, so nothing
+        accumulates in the session's identity map and memory stays constant
+        however many rows match.
+        
+        Args:
+            db: Database session
+            action: Filter by action type
+            target_type: Filter by target type
+            user_id: Filter by user ID
+            start_date: Filter from date
+            end_date: Filter to date
+            page_size: Rows per page
+            include_archived: Whether to export archived logs ahead of live ones
+            
+        Yields:
+            Lists of rows carrying the AuditLog column attributes
+        """
+        last_occurred_at, last_id = None, None
+        archive = get_audit_archive() if include_archived else None
+        if archive is not None and archive.overlaps(start_date):
+            for page in archive.iter_pages(
+                action=action, target_type=target_type, user_id=user_id,
+                start_date=start_date, end_date=end_date, page_size=page_size
+            ):
+                last_occurred_at, last_id = page[-1].occurred_at, page[-1].id
+                yield page
+        
+        query = db.query(*AuditLog.__table__.columns)
+        if action:
+            query = query.filter(AuditLog.action == action)
+        if target_type:
+            query = query.filter(AuditLog.target_type == target_type)
+        if user_id:
+            query = query.filter(AuditLog.user_id == user_id)
+        if start_date:
+            query = query.filter(AuditLog.occurred_at >= start_date)
+        if end_date:
+            query = query.filter(AuditLog.occurred_at <= end_date)
+        query = query.order_by(AuditLog.occurred_at.asc(), AuditLog.id.asc())
+        
+        while True:
+            page_query = query
+            if last_id is not None:
+                page_query = page_query.filter(or_(
+                    AuditLog.occurred_at > last_occurred_at,
+                    and_(AuditLog.occurred_at == last_occurred_at, AuditLog.id > last_id)
+                ))
+            page = page_query.limit(page_size).all()
+            if not page:
+                return
+            last_occurred_at, last_id = page[-1].occurred_at, page[-1].id
+            yield page
+            if len(page) < page_size:
+                return
+    
+    def _lookup_users(
+        self,
+        db: Session,
+        user_ids: Iterable[Optional[int]],
+        cache: "OrderedDict[int, Optional[Dict[str, Any]]]",
+        cache_size: int = EXPORT_USER_CACHE_SIZE
+    ) -> Dict[int, Optional[Dict[str, Any]]]:
+        """
+        Resolve user summaries with one query for the ids missing from an LRU cache.
+        
+        Args:
+            db: Database session
+            user_ids: User IDs referenced by a page of audit logs
+            cache: LRU of user_id -> {"name", "email"} (None for deleted users)
+            cache_size: Maximum users kept in the cache
+            
+        Returns:
+            Dictionary of user_id -> user summary for the requested ids
+        """
+        wanted = {user_id for user_id in user_ids if user_id}
+        missing = [user_id for user_id in wanted if user_id not in cache]
+        if missing:
+            found = {
+                row.id: {"name": row.display_name, "email": row.email}
+                for row in db.query(User.id, User.display_name, User.email).filter(User.id.in_(missing))
+            }
+            for user_id in missing:
+                cache[user_id] = found.get(user_id)
+        
+        users = {}
+        for user_id in wanted:
+            cache.move_to_end(user_id)
+            users[user_id] = cache[user_id]
+        while len(cache) > cache_size:
+            cache.popitem(last=False)
+        return users
+    
+    def _export_rows(
+        self,
+        db: Session,
+        audit_logs: List[Any],
+        user_cache: Optional["OrderedDict[int, Optional[Dict[str, Any]]]"] = None
+    ) -> List[Dict[str, Any]]:
+        """Flatten audit logs for export, enriching users with one batched lookup."""
+        users = self._lookup_users(
+            db, (log.user_id for log in audit_logs), user_cache if user_cache is not None else OrderedDict()
+        )
+        rows = []
+        for log in audit_logs:
+            user = users.get(log.user_id) or {}
+            rows.append({
+                "id": log.id,
+                "user_id": log.user_id,
+                "user_name": user.get("name"),
+                "user_email": user.get("email"),
+                "action": log.action,
+                "target_type": log.target_type,
+                "target_id": log.target_id,
+                "ip_address": log.ip_address,
+                "user_agent": log.user_agent,
+                "occurred_at": log.occurred_at.isoformat() if log.occurred_at else None,
+                "metadata": log.action_metadata,
+            })
+        return rows
+    
+    @staticmethod
+    def _csv_row(row: Dict[str, Any], include_metadata: bool) -> List[Any]:
+        """Order an export row as CSV_HEADERS (plus Metadata)."""
+        values = [
+            row["id"], row["user_id"], row["user_name"], row["user_email"], row["action"],
+            row["target_type"], row["target_id"], row["ip_address"], row["user_agent"],
+            row["occurred_at"],
+        ]
+        if include_metadata:
+            values.append(json.dumps(row["metadata"]) if row["metadata"] else "")
+        return values
+    
+    def stream_csv(
+        self,
+        db: Session,
+        include_metadata: bool = True,
+        page_size: int = EXPORT_PAGE_SIZE,
+        **filters: Any
+    ) -> Iterator[bytes]:
+        """
+        Stream audit logs as CSV, one encoded chunk per page.
+        
+        Args:
+            db: Database session (must stay open until the stream is exhausted)
+            include_metadata: Whether to include metadata column
+            page_size: Rows per page
+            **filters: action, target_type, user_id, start_date, end_date, include_archived
+            
+        Yields:
+            UTF-8 CSV chunks, header first
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADERS + (["Metadata"] if include_metadata else []))
+        yield buffer.getvalue().encode('utf-8')
+        
+        user_cache = OrderedDict()
+        for page in self.iter_audit_log_pages(db, page_size=page_size, **filters):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(
+                self._csv_row(row, include_metadata) for row in self._export_rows(db, page, user_cache)
+            )
+            yield buffer.getvalue().encode('utf-8')
+    
+    def stream_ndjson(
+        self,
+        db: Session,
+        include_metadata: bool = True,
+        page_size: int = EXPORT_PAGE_SIZE,
+        **filters: Any
+    ) -> Iterator[bytes]:
+        """
+        Stream audit logs as newline-delimited JSON, one encoded chunk per page.
+        
+        Args:
+            db: Database session (must stay open until the stream is exhausted)
+            include_metadata: Whether to include the metadata field
+            page_size: Rows per page
+            **filters: action, target_type, user_id, start_date, end_date, include_archived
+            
+        Yields:
+            UTF-8 NDJSON chunks, one object per audit log
+        """
+        user_cache = OrderedDict()
+        for page in self.iter_audit_log_pages(db, page_size=page_size, **filters):
+            lines = []
+            for row in self._export_rows(db, page, user_cache):
+                if not include_metadata:
+                    row.pop("metadata")
+                lines.append(json.dumps(row, default=str))
+            yield ("\n".join(lines) + "\n").encode('utf-8')
+    
     def export_to_csv(
         self,
         db: Session,
@@ -46,36 +273,15 @@ class AuditExportService:
             writer = csv.writer(output)
             
             # Write header
-            headers = [
-                "ID", "User ID", "User Name", "User Email", "Action",
-                "Target Type", "Target ID", "IP Address", "User Agent",
-                "Occurred At"
-            ]
+            headers = list(CSV_HEADERS)
             if include_metadata:
                 headers.append("Metadata")
             
             writer.writerow(headers)
             
-            # Write rows
-            for log in audit_logs:
-                enriched = self.audit_service.enrich_audit_log(db, log)
-                row = [
-                    log.id,
-                    log.user_id,
-                    enriched.get("user", {}).get("name") if enriched.get("user") else None,
-                    enriched.get("user", {}).get("email") if enriched.get("user") else None,
-                    log.action,
-                    log.target_type,
-                    log.target_id,
-                    log.ip_address,
-                    log.user_agent,
-                    log.occurred_at.isoformat() if log.occurred_at else None,
-                ]
-                if include_metadata:
-                    import json
-                    row.append(json.dumps(log.action_metadata) if log.action_metadata else "")
-                
-                writer.writerow(row)
+            # Write rows (users resolved with one batched lookup)
+            for row in self._export_rows(db, audit_logs):
+                writer.writerow(self._csv_row(row, include_metadata))
             
             # Convert to bytes
             output.seek(0)
@@ -118,27 +324,13 @@ class AuditExportService:
             # Sheet 1: Audit Logs
             ws_logs = wb.create_sheet("Audit Logs")
             
-            # Prepare data
+            # Prepare data (users resolved with one batched lookup)
             data = []
-            for log in audit_logs:
-                enriched = self.audit_service.enrich_audit_log(db, log)
-                row = {
-                    "ID": log.id,
-                    "User ID": log.user_id,
-                    "User Name": enriched.get("user", {}).get("name") if enriched.get("user") else None,
-                    "User Email": enriched.get("user", {}).get("email") if enriched.get("user") else None,
-                    "Action": log.action,
-                    "Target Type": log.target_type,
-                    "Target ID": log.target_id,
-                    "IP Address": log.ip_address,
-                    "User Agent": log.user_agent,
-                    "Occurred At": log.occurred_at.isoformat() if log.occurred_at else None,
-                }
-                if include_metadata:
-                    import json
-                    row["Metadata"] = json.dumps(log.action_metadata) if log.action_metadata else ""
-                
-                data.append(row)
+            for row in self._export_rows(db, audit_logs):
+                data.append(dict(zip(
+                    CSV_HEADERS + (["Metadata"] if include_metadata else []),
+                    self._csv_row(row, include_metadata)
+                )))
             
             # Write to sheet
             df = pd.DataFrame(data)
@@ -310,7 +502,6 @@ class AuditExportService:
             enriched = self.audit_service.enrich_audit_log(db, audit_log)
             
             if format == "json":
-                import json
                 return json.dumps(enriched, indent=2, default=str).encode('utf-8')
             
             elif format == "csv":
@@ -345,7 +345,8 @@ class AuditReportService:
                 db=db,
                 start_date=start_date,
                 end_date=end_date,
-                limit=1000
+                limit=1000,
+                exact_total=True  # Reports quote the total, archived logs included
             )
             
             # Get anomalies
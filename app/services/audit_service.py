@@ -21,6 +21,7 @@ from app.db.models import (
     User
 )
 from app.models.loan_asset import LoanAsset
+from app.services.audit_archive_service import get_audit_archive
 from app.utils.audit import AuditAction
 
 logger = logging.getLogger(__name__)
@@ -40,11 +41,18 @@ class AuditService:
         end_date: Optional[datetime] = None,
         metadata_filter: Optional[Dict[str, Any]] = None,
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        exact_total: bool = False
     ) -> Tuple[List[AuditLog], int]:
         """
         Query audit logs with advanced filtering.
         
+        Logs moved to cold storage by the retention job are included
+        transparently: they are older than every live log, so they follow the
+        live results (newest first) in the same offset/limit window. The
+        archive is only read when the live page is short; a full live page
+        reports the live total unless exact_total is set.
+        
         Args:
             db: Database session
             action: Filter by action type
@@ -56,6 +64,8 @@ class AuditService:
             metadata_filter: Filter by metadata (JSONB key-value pairs)
             limit: Maximum results
             offset: Pagination offset
+            exact_total: Include archived logs in the total even when the
+                page is filled from the live table
             
         Returns:
             Tuple of (audit logs list, total count)
@@ -106,6 +116,24 @@ class AuditService:
             # Apply pagination and ordering
             logs = query.order_by(AuditLog.occurred_at.desc()).offset(offset).limit(limit).all()
             
+            # Continue into archived segments when the page needs them (or the
+            # caller wants them counted) and the date range reaches them
+            archive = get_audit_archive()
+            if (len(logs) < limit or exact_total) and archive.overlaps(start_date):
+                archived_logs, archived_total = archive.query(
+                    action=action,
+                    target_type=target_type,
+                    target_id=target_id,
+                    user_id=user_id,
+                    start_date=start_date,
+                    end_date=end_date,
+                    metadata_filter=metadata_filter,
+                    limit=limit - len(logs),
+                    offset=max(0, offset - total)
+                )
+                logs.extend(archived_logs)
+                total += archived_total
+            
             return logs, total
             
         except Exception as e:
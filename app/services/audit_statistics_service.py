@@ -2,20 +2,53 @@
 Audit Statistics Service for CreditNexus.
 
 Provides aggregated statistics and analytics for audit data.
+
+Counts are served from rollup tables maintained by roll_up_audit_logs:
+hourly counts per action/target type (AuditLogRollup) and daily counts per
+user (AuditUserRollup). Only raw AuditLog rows after a rollup's watermark,
+and any partial bucket at the edges of the requested range, are scanned, so
+dashboard queries are O(buckets) rather than O(rows).
 """
 
 import logging
-from typing import Optional, List, Dict, Any
+from collections import Counter
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, insert
 
 from app.services.audit_service import AuditService
 from app.services.policy_audit import get_policy_statistics
-from app.db.models import AuditLog, User
+from app.db.models import AuditLog, AuditLogRollup, AuditUserRollup, DetectionCheckpoint, User
 
 logger = logging.getLogger(__name__)
 
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+# Rollup model -> (bucket size, checkpoint name, grouped AuditLog columns)
+ROLLUPS = {
+    AuditLogRollup: (HOUR, "audit_log_rollup", ("action", "target_type")),
+    AuditUserRollup: (DAY, "audit_user_rollup", ("user_id",)),
+}
+
+# Buckets are only rolled up once this long has passed since they closed, so
+# audit logs flushed by slow transactions still land in the raw tail
+ROLLUP_SETTLE = timedelta(minutes=10)
+
+
+def floor_bucket(value: datetime, size: timedelta = HOUR) -> datetime:
+    """Truncate a datetime to the start of its hour (or day)."""
+    if size == DAY:
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_bucket(value: datetime, size: timedelta = HOUR) -> datetime:
+    """Round a datetime up to the next hour (or day) boundary, unchanged if already on one."""
+    floored = floor_bucket(value, size)
+    return floored if floored == value else floored + size
+
 
 class AuditStatisticsService:
     """Service for generating audit statistics and analytics."""
@@ -24,6 +57,152 @@ class AuditStatisticsService:
         """Initialize audit statistics service."""
         self.audit_service = AuditService()
     
+    def _bucket(self, db: Session, size: timedelta):
+        """SQL expression truncating AuditLog.occurred_at to the hour or day."""
+        if db.get_bind().dialect.name == "sqlite":
+            return func.strftime('%Y-%m-%d 00:00:00' if size == DAY else '%Y-%m-%d %H:00:00', AuditLog.occurred_at)
+        return func.date_trunc('day' if size == DAY else 'hour', AuditLog.occurred_at)
+    
+    @staticmethod
+    def _as_datetime(value: Any) -> datetime:
+        """Normalize a bucket start (SQLite returns it as text)."""
+        return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    
+    def get_rollup_watermark(self, db: Session, rollup=AuditLogRollup) -> Optional[datetime]:
+        """End of the last bucket covered by a rollup table, or None if never rolled up."""
+        return (
+            db.query(DetectionCheckpoint.high_water_mark)
+            .filter(DetectionCheckpoint.name == ROLLUPS[rollup][1])
+            .scalar()
+        )
+    
+    def roll_up_audit_logs(self, db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Fold every closed bucket since each rollup's watermark into the rollup tables.
+        
+        Each bucket is rolled up exactly once: its rows are grouped, inserted
+        in one batch, and the watermark advanced in the same transaction. The
+        checkpoint rows are locked so concurrent runs cannot double count.
+        
+        Args:
+            db: Database session
+            now: Current time (defaults to utcnow)
+            
+        Returns:
+            Dictionary keyed by rollup table with the new watermark and the
+            buckets/logs added
+        """
+        now = now or datetime.utcnow()
+        results = {}
+        
+        for rollup, (size, checkpoint_name, dims) in ROLLUPS.items():
+            target = floor_bucket(now - ROLLUP_SETTLE, size)
+            checkpoint = (
+                db.query(DetectionCheckpoint)
+                .filter(DetectionCheckpoint.name == checkpoint_name)
+                .with_for_update()
+                .first()
+            )
+            if not checkpoint:
+                checkpoint = DetectionCheckpoint(name=checkpoint_name, last_run_count=0)
+                db.add(checkpoint)
+            
+            start = checkpoint.high_water_mark
+            rows = []
+            if start is None or start < target:
+                bucket = self._bucket(db, size).label("bucket")
+                columns = [getattr(AuditLog, dim) for dim in dims]
+                query = db.query(bucket, *columns, func.count(AuditLog.id)).filter(AuditLog.occurred_at < target)
+                if start is not None:
+                    query = query.filter(AuditLog.occurred_at >= start)
+                if "user_id" in dims:
+                    query = query.filter(AuditLog.user_id.isnot(None))
+                for bucket_start, *key, count in query.group_by(bucket, *columns):
+                    rows.append({"bucket_start": self._as_datetime(bucket_start), **dict(zip(dims, key)), "count": count})
+                if rows:
+                    db.execute(insert(rollup), rows)
+                checkpoint.high_water_mark = target
+                checkpoint.last_run_count = sum(row["count"] for row in rows)
+            
+            results[rollup.__tablename__] = {
+                "watermark": checkpoint.high_water_mark.isoformat(),
+                "buckets": len(rows),
+                "logs": sum(row["count"] for row in rows),
+            }
+        
+        db.commit()
+        logger.info(f"Audit statistics rollup completed: {results}")
+        return results
+    
+    def _grouped_counts(
+        self,
+        db: Session,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        rollup,
+        dims: Tuple[str, ...] = (),
+        by_bucket: bool = False
+    ) -> Counter:
+        """
+        Count audit logs in [start_date, end_date] grouped by AuditLog columns.
+        
+        Whole buckets before the rollup's watermark are summed from the rollup
+        table; the partial bucket after start_date and everything after the
+        watermark (or after the last whole bucket before end_date) come from
+        AuditLog. Logs without a user are skipped when grouping by user_id.
+        
+        Args:
+            db: Database session
+            start_date: Filter from date (inclusive)
+            end_date: Filter to date (inclusive)
+            rollup: AuditLogRollup or AuditUserRollup
+            dims: Columns of that rollup to group by
+            by_bucket: Prefix each key with the start of its hour/day
+            
+        Returns:
+            Counter of key tuple -> log count
+        """
+        size = ROLLUPS[rollup][0]
+        counts = Counter()
+        
+        lo = ceil_bucket(start_date, size) if start_date else None
+        hi = self.get_rollup_watermark(db, rollup)
+        if hi is not None and end_date is not None:
+            hi = min(hi, floor_bucket(end_date, size))
+        
+        if hi is not None and (lo is None or lo < hi):
+            columns = [getattr(rollup, dim) for dim in dims]
+            if by_bucket:
+                columns.insert(0, rollup.bucket_start)
+            query = db.query(*columns, func.sum(rollup.count)).filter(rollup.bucket_start < hi)
+            if lo is not None:
+                query = query.filter(rollup.bucket_start >= lo)
+            for *key, count in query.group_by(*columns):
+                counts[tuple(key)] += int(count)
+            raw_ranges = [(start_date, lo), (hi, None)] if start_date and start_date < lo else [(hi, None)]
+        else:
+            raw_ranges = [(start_date, None)]
+        
+        for raw_start, raw_end in raw_ranges:
+            columns = [getattr(AuditLog, dim) for dim in dims]
+            if by_bucket:
+                columns.insert(0, self._bucket(db, size))
+            query = db.query(*columns, func.count(AuditLog.id))
+            if raw_start is not None:
+                query = query.filter(AuditLog.occurred_at >= raw_start)
+            if raw_end is not None:
+                query = query.filter(AuditLog.occurred_at < raw_end)
+            elif end_date is not None:
+                query = query.filter(AuditLog.occurred_at <= end_date)
+            if "user_id" in dims:
+                query = query.filter(AuditLog.user_id.isnot(None))
+            for *key, count in query.group_by(*columns):
+                if by_bucket:
+                    key[0] = self._as_datetime(key[0])
+                counts[tuple(key)] += count
+        
+        return counts
+    
     def get_overview_statistics(
         self,
         db: Session,
@@ -42,52 +221,20 @@ class AuditStatisticsService:
             Dictionary with overview statistics
         """
         try:
-            # Build base query
-            query = db.query(AuditLog)
-            
-            # Apply date filters
-            if start_date:
-                query = query.filter(AuditLog.occurred_at >= start_date)
-            if end_date:
-                query = query.filter(AuditLog.occurred_at <= end_date)
+            counts = self._grouped_counts(db, start_date, end_date, AuditLogRollup, ("action", "target_type"))
+            users = self._grouped_counts(db, start_date, end_date, AuditUserRollup, ("user_id",))
             
-            # Total audit logs
-            total_logs = query.count()
-            
-            # Count by action type
-            action_counts = (
-                query.with_entities(
-                    AuditLog.action,
-                    func.count(AuditLog.id).label('count')
-                )
-                .group_by(AuditLog.action)
-                .all()
-            )
-            actions = {action: count for action, count in action_counts}
-            
-            # Count by target type
-            target_type_counts = (
-                query.with_entities(
-                    AuditLog.target_type,
-                    func.count(AuditLog.id).label('count')
-                )
-                .group_by(AuditLog.target_type)
-                .all()
-            )
-            target_types = {target_type: count for target_type, count in target_type_counts}
-            
-            # Unique users
-            unique_users = (
-                query.filter(AuditLog.user_id.isnot(None))
-                .with_entities(func.count(func.distinct(AuditLog.user_id)))
-                .scalar() or 0
-            )
+            actions = Counter()
+            target_types = Counter()
+            for (action, target_type), count in counts.items():
+                actions[action] += count
+                target_types[target_type] += count
             
             return {
-                "total_logs": total_logs,
-                "actions": actions,
-                "target_types": target_types,
-                "unique_users": unique_users,
+                "total_logs": sum(counts.values()),
+                "actions": dict(actions),
+                "target_types": dict(target_types),
+                "unique_users": len(users),
                 "date_range": {
                     "start": start_date.isoformat() if start_date else None,
                     "end": end_date.isoformat() if end_date else None,
@@ -108,6 +255,9 @@ class AuditStatisticsService:
         """
         Get activity timeline over time.
         
+        Hour buckets are aligned to clock hours and week buckets start at
+        midnight of start_date; counts are clipped to [start_date, end_date].
+        
         Args:
             db: Database session
             start_date: Filter from date
@@ -124,71 +274,46 @@ class AuditStatisticsService:
             if not start_date:
                 start_date = end_date - timedelta(days=30)
             
-            # Build base query
-            query = db.query(AuditLog).filter(
-                and_(
-                    AuditLog.occurred_at >= start_date,
-                    AuditLog.occurred_at <= end_date
-                )
-            )
+            hourly = {
+                hour: count
+                for (hour,), count in self._grouped_counts(db, start_date, end_date, AuditLogRollup, by_bucket=True).items()
+            }
             
             timeline = []
-            current_date = start_date
             
             if interval == "day":
-                while current_date <= end_date:
-                    day_start = datetime.combine(current_date.date(), datetime.min.time())
-                    day_end = datetime.combine(current_date.date(), datetime.max.time())
-                    
-                    day_count = query.filter(
-                        and_(
-                            AuditLog.occurred_at >= day_start,
-                            AuditLog.occurred_at <= day_end
-                        )
-                    ).count()
-                    
+                daily = Counter()
+                for hour, count in hourly.items():
+                    daily[hour.date()] += count
+                current_date = start_date.date()
+                while current_date <= end_date.date():
                     timeline.append({
-                        "date": current_date.date().isoformat(),
-                        "count": day_count
+                        "date": current_date.isoformat(),
+                        "count": daily[current_date]
                     })
-                    
                     current_date += timedelta(days=1)
             
             elif interval == "hour":
-                while current_date <= end_date:
-                    hour_end = current_date + timedelta(hours=1)
-                    
-                    hour_count = query.filter(
-                        and_(
-                            AuditLog.occurred_at >= current_date,
-                            AuditLog.occurred_at < hour_end
-                        )
-                    ).count()
-                    
+                current_hour = floor_bucket(start_date)
+                while current_hour <= end_date:
                     timeline.append({
-                        "date": current_date.isoformat(),
-                        "count": hour_count
+                        "date": current_hour.isoformat(),
+                        "count": hourly.get(current_hour, 0)
                     })
-                    
-                    current_date = hour_end
+                    current_hour += HOUR
             
             elif interval == "week":
-                while current_date <= end_date:
-                    week_end = current_date + timedelta(weeks=1)
-                    
-                    week_count = query.filter(
-                        and_(
-                            AuditLog.occurred_at >= current_date,
-                            AuditLog.occurred_at < week_end
-                        )
-                    ).count()
-                    
+                week_start = datetime.combine(start_date.date(), datetime.min.time())
+                weekly = Counter()
+                for hour, count in hourly.items():
+                    weekly[(hour - week_start) // timedelta(weeks=1)] += count
+                index = 0
+                while week_start + timedelta(weeks=index) <= end_date:
                     timeline.append({
-                        "date": current_date.date().isoformat(),
-                        "count": week_count
+                        "date": (week_start + timedelta(weeks=index)).date().isoformat(),
+                        "count": weekly[index]
                     })
-                    
-                    current_date = week_end
+                    index += 1
             
             return timeline
             
@@ -216,31 +341,18 @@ class AuditStatisticsService:
             List of user statistics
         """
         try:
-            # Build base query
-            query = db.query(AuditLog).filter(AuditLog.user_id.isnot(None))
-            
-            # Apply date filters
-            if start_date:
-                query = query.filter(AuditLog.occurred_at >= start_date)
-            if end_date:
-                query = query.filter(AuditLog.occurred_at <= end_date)
+            counts = self._grouped_counts(db, start_date, end_date, AuditUserRollup, ("user_id",))
+            user_counts = [(user_id, count) for (user_id,), count in counts.most_common(limit)]
             
-            # Count by user
-            user_counts = (
-                query.with_entities(
-                    AuditLog.user_id,
-                    func.count(AuditLog.id).label('count')
-                )
-                .group_by(AuditLog.user_id)
-                .order_by(func.count(AuditLog.id).desc())
-                .limit(limit)
-                .all()
-            )
+            # Enrich with user information (one lookup for the whole page)
+            users = {
+                user.id: user
+                for user in db.query(User).filter(User.id.in_([user_id for user_id, _ in user_counts]))
+            } if user_counts else {}
             
-            # Enrich with user information
             top_users = []
             for user_id, count in user_counts:
-                user = db.query(User).filter(User.id == user_id).first()
+                user = users.get(user_id)
                 top_users.append({
                     "user_id": user_id,
                     "user_name": user.display_name if user else "Unknown",
@@ -274,30 +386,10 @@ class AuditStatisticsService:
             List of action statistics
         """
         try:
-            # Build base query
-            query = db.query(AuditLog)
-            
-            # Apply date filters
-            if start_date:
-                query = query.filter(AuditLog.occurred_at >= start_date)
-            if end_date:
-                query = query.filter(AuditLog.occurred_at <= end_date)
-            
-            # Count by action
-            action_counts = (
-                query.with_entities(
-                    AuditLog.action,
-                    func.count(AuditLog.id).label('count')
-                )
-                .group_by(AuditLog.action)
-                .order_by(func.count(AuditLog.id).desc())
-                .limit(limit)
-                .all()
-            )
-            
+            counts = self._grouped_counts(db, start_date, end_date, AuditLogRollup, ("action",))
             return [
                 {"action": action, "count": count}
-                for action, count in action_counts
+                for (action,), count in counts.most_common(limit)
             ]
             
         except Exception as e:
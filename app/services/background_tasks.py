@@ -7,6 +7,8 @@ This module contains scheduled background tasks for:
 3. Filing status verification (daily)
 4. Loan default detection (daily at 9 AM)
 5. Recovery action processing (hourly)
+6. Portfolio policy re-screening (nightly at 2 AM)
+7. Audit statistics rollup (hourly)
 """
 
 import logging
@@ -215,12 +217,12 @@ async def detect_loan_defaults_task() -> Dict[str, Any]:
         db = next(get_db())
         recovery_service = LoanRecoveryService(db)
         
-        # Detect payment defaults
-        payment_defaults = recovery_service.detect_payment_defaults()
+        # Detect payment defaults (only payments due or changed since the last run)
+        payment_defaults = recovery_service.detect_payment_defaults(incremental=True)
         payment_count = len(payment_defaults)
         
-        # Detect covenant breaches
-        covenant_breaches = recovery_service.detect_covenant_breaches()
+        # Detect covenant breaches (only assets verified since the last run)
+        covenant_breaches = recovery_service.detect_covenant_breaches(incremental=True)
         covenant_count = len(covenant_breaches)
         
         total_defaults = payment_count + covenant_count
@@ -290,6 +292,107 @@ async def process_recovery_actions_task() -> Dict[str, Any]:
         db.close()
 
 
+async def rescreen_loan_assets_task(batch_size: int = 5000) -> Dict[str, Any]:
+    """
+    Background task to re-screen every loan asset against the current policy rules.
+    
+    Runs nightly at 2 AM. Loan assets are paged by primary key and each page
+    is evaluated with PolicyService.evaluate_loan_asset_batch, which
+    bulk-inserts its PolicyDecision rows in one transaction.
+    
+    Args:
+        batch_size: Loan assets per evaluation batch
+    
+    Returns:
+        Task execution result with decision counts
+    """
+    from app.models.loan_asset import LoanAsset
+    from app.services.policy_engine_factory import get_policy_engine
+    from app.services.policy_service import PolicyService
+    
+    logger.info("Starting loan asset policy re-screening task")
+    
+    try:
+        db = next(get_db())
+        policy_service = PolicyService(get_policy_engine())
+        counts = {"ALLOW": 0, "BLOCK": 0, "FLAG": 0}
+        last_id = 0
+        
+        while True:
+            loan_assets = (
+                db.query(LoanAsset)
+                .filter(LoanAsset.id > last_id)
+                .order_by(LoanAsset.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not loan_assets:
+                break
+            
+            decisions = policy_service.evaluate_loan_asset_batch(loan_assets, db=db)
+            for decision in decisions:
+                counts[decision.decision] = counts.get(decision.decision, 0) + 1
+            
+            last_id = loan_assets[-1].id
+            db.expunge_all()
+        
+        total = sum(counts.values())
+        logger.info(
+            f"Loan asset re-screening completed: {total} evaluated, "
+            f"{counts['BLOCK']} blocked, {counts['FLAG']} flagged"
+        )
+        
+        return {
+            "status": "success",
+            "timestamp": datetime.utcnow().isoformat(),
+            "evaluated": total,
+            "decisions": counts
+        }
+    except Exception as e:
+        logger.error(f"Error in loan asset re-screening task: {e}", exc_info=True)
+        return {
+            "status": "error",
+            "timestamp": datetime.utcnow().isoformat(),
+            "error": str(e)
+        }
+    finally:
+        db.close()
+
+
+async def roll_up_audit_statistics_task() -> Dict[str, Any]:
+    """
+    Background task to fold closed hours of audit logs into AuditLogRollup.
+    
+    Runs hourly; the audit statistics dashboard reads the rollups up to the
+    watermark and only scans raw audit logs after it.
+    
+    Returns:
+        Task execution result with the new watermark and rolled-up counts
+    """
+    from app.services.audit_statistics_service import AuditStatisticsService
+    
+    logger.info("Starting audit statistics rollup task")
+    
+    try:
+        db = next(get_db())
+        result = AuditStatisticsService().roll_up_audit_logs(db)
+        
+        return {
+            "status": "success",
+            "timestamp": datetime.utcnow().isoformat(),
+            **result
+        }
+    except Exception as e:
+        logger.error(f"Error in audit statistics rollup task: {e}", exc_info=True)
+        return {
+            "status": "error",
+            "timestamp": datetime.utcnow().isoformat(),
+            "error": str(e)
+        }
+    finally:
+        db.close()
+
+
 # Task schedule configuration
 TASK_SCHEDULE = {
     "deadline_monitoring": {
@@ -319,5 +422,16 @@ TASK_SCHEDULE = {
         "task": process_recovery_actions_task,
         "schedule": "hourly",
         "enabled": True
+    },
+    "loan_asset_policy_rescreening": {
+        "task": rescreen_loan_assets_task,
+        "schedule": "daily",
+        "time": time(2, 0),  # 2 AM
+        "enabled": True
+    },
+    "audit_statistics_rollup": {
+        "task": roll_up_audit_statistics_task,
+        "schedule": "hourly",
+        "enabled": True
     }
 }
@@ -8,11 +8,11 @@ the context is similar.
 import logging
 import hashlib
 import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List
 from datetime import datetime
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, update
 
 from app.db.models import ClauseCache, LMATemplate
 from app.models.cdm import CreditAgreement
@@ -78,6 +78,119 @@ class ClauseCacheService:
         
         return clause
     
+    def get_cached_clauses(
+        self,
+        db: Session,
+        template_id: int,
+        field_names: Iterable[str],
+        cdm_data: CreditAgreement
+    ) -> Dict[str, ClauseCache]:
+        """
+        Get cached clauses for several fields of a template in one query.
+        
+        Unlike get_cached_clause(), usage statistics are not updated; pass
+        the clauses actually used to record_usage() once they are.
+        
+        Args:
+            db: Database session
+            template_id: Template ID
+            field_names: Field names (e.g., "[REPRESENTATIONS_AND_WARRANTIES]")
+            cdm_data: CDM data used to compute each field's context hash
+            
+        Returns:
+            Dictionary mapping field name to ClauseCache for the fields with a cached clause
+        """
+        hashes = {field_name: self._compute_context_hash(cdm_data, field_name) for field_name in field_names}
+        if not hashes:
+            return {}
+        
+        clauses = db.query(ClauseCache).filter(
+            and_(
+                ClauseCache.template_id == template_id,
+                ClauseCache.field_name.in_(list(hashes)),
+                ClauseCache.context_hash.in_(list(hashes.values()))
+            )
+        ).all()
+        return {
+            clause.field_name: clause
+            for clause in clauses
+            if hashes.get(clause.field_name) == clause.context_hash
+        }
+    
+    def record_usage(self, db: Session, clauses: Iterable[ClauseCache]) -> int:
+        """
+        Bump usage statistics for clauses served from the cache in one write.
+        
+        Args:
+            db: Database session
+            clauses: Clauses that were used
+            
+        Returns:
+            Number of clauses updated
+        """
+        clause_ids = [clause.id for clause in clauses]
+        if not clause_ids:
+            return 0
+        
+        db.execute(
+            update(ClauseCache)
+            .where(ClauseCache.id.in_(clause_ids))
+            .values(usage_count=ClauseCache.usage_count + 1, last_used_at=datetime.utcnow())
+            .execution_options(synchronize_session="fetch")
+        )
+        db.commit()
+        logger.debug(f"Recorded usage of {len(clause_ids)} cached clause(s)")
+        return len(clause_ids)
+    
+    def save_clauses(
+        self,
+        db: Session,
+        template_id: int,
+        clauses: Dict[str, str],
+        cdm_data: CreditAgreement,
+        created_by: Optional[int] = None
+    ) -> List[ClauseCache]:
+        """
+        Save several generated clauses to the cache in one transaction.
+        
+        Args:
+            db: Database session
+            template_id: Template ID
+            clauses: Dictionary mapping field name to generated clause content
+            cdm_data: CDM data for context summary and hash
+            created_by: Optional user ID who generated the clauses
+            
+        Returns:
+            Created or updated ClauseCache instances
+        """
+        if not clauses:
+            return []
+        
+        context_summary = self._create_context_summary(cdm_data)
+        existing = self.get_cached_clauses(db, template_id, clauses, cdm_data)
+        saved = []
+        for field_name, clause_content in clauses.items():
+            clause = existing.get(field_name)
+            if clause is not None:
+                clause.clause_content = clause_content
+                clause.context_summary = context_summary
+                clause.updated_at = datetime.utcnow()
+            else:
+                clause = ClauseCache(
+                    template_id=template_id,
+                    field_name=field_name,
+                    clause_content=clause_content,
+                    context_hash=self._compute_context_hash(cdm_data, field_name),
+                    context_summary=context_summary,
+                    usage_count=0,
+                    created_by=created_by
+                )
+                db.add(clause)
+            saved.append(clause)
+        db.commit()
+        logger.info(f"Cached {len(saved)} clause(s) (template_id: {template_id})")
+        return saved
+    
     def save_clause(
         self,
         db: Session,
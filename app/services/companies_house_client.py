@@ -8,12 +8,13 @@ for the UK Companies House API (charge filings).
 import logging
 from typing import Dict, Any, Optional
 from datetime import datetime
-import requests
+import httpx
 
 from app.models.cdm import CreditAgreement
 from app.services.policy_service import FilingRequirement as PolicyFilingRequirement
 from app.services.filing_exceptions import FilingAPIError
 from app.core.config import settings
+from app.core.http_client import get_http_client
 from app.utils.rate_limiter import COMPANIES_HOUSE_LIMITER
 
 logger = logging.getLogger(__name__)
@@ -169,7 +170,7 @@ class CompaniesHouseAPIClient:
             
             # Make API request
             logger.info(f"Submitting charge filing to Companies House for company {company_number}")
-            response = requests.post(
+            response = get_http_client().post(
                 api_url,
                 json=payload,
                 headers=self._get_headers(),
@@ -196,9 +197,9 @@ class CompaniesHouseAPIClient:
                 "raw_response": result
             }
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             error_msg = f"Companies House API error: {e}"
-            if hasattr(e, 'response') and e.response is not None:
+            if isinstance(e, httpx.HTTPStatusError):
                 try:
                     error_detail = e.response.json()
                     error_msg += f" - {error_detail}"
@@ -234,7 +235,7 @@ class CompaniesHouseAPIClient:
             # Apply rate limiting
             COMPANIES_HOUSE_LIMITER.wait_if_needed()
             
-            response = requests.get(
+            response = get_http_client().get(
                 api_url,
                 headers=self._get_headers(),
                 timeout=30
@@ -243,7 +244,7 @@ class CompaniesHouseAPIClient:
             response.raise_for_status()
             return response.json()
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             error_msg = f"Companies House API error getting filing status: {e}"
             logger.error(error_msg)
             raise FilingAPIError(error_msg) from e
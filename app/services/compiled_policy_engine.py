@@ -0,0 +1,924 @@
+"""
+Compiled, indexed policy engine for CreditNexus.
+
+Compiles the ``when: {all/any: [{field, op, value}]}`` rules loaded from
+``app/policies/**/*.yaml`` into Python predicate closures once at load time,
+indexes rules by discriminating fields (``transaction_type``, ``jurisdiction``,
+...) so a transaction is only matched against its candidate rules, and
+resolves the decision by rule priority. ``in`` values that name a registered
+reference list (see ``register_reference_list``; the sanctions lists
+``SANCTIONED_LEI_LIST``, ``SANCTIONED_NAMES_LIST``, ... are registered by
+``app.services.sanctions_screening`` when it loads) are tested against the
+list instead of as literals.
+"""
+
+import gc
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import yaml
+
+from app.services.policy_engine_interface import PolicyEngineInterface
+
+logger = logging.getLogger(__name__)
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+# Sentinel for fields that are not present in the transaction
+_MISSING = object()
+
+# Reference lists usable as ``in`` values: placeholder name -> membership test
+_reference_lists: Dict[str, Callable[[Any], bool]] = {}
+_reference_lists_lock = threading.Lock()
+
+
+def register_reference_list(name: str, is_listed: Callable[[Any], bool]) -> None:
+    """
+    Register a reference list that rules can name as an ``in`` value.
+
+    Rules compiled after registration call ``is_listed`` for that value
+    instead of comparing against the literal string, so the test should
+    resolve the current list on every call.
+
+    Args:
+        name: Placeholder used in rule values, e.g. "SANCTIONED_LEI_LIST"
+        is_listed: Callable returning True if a value is on the list
+    """
+    with _reference_lists_lock:
+        _reference_lists[name] = is_listed
+
+# Tie-break for rules with equal priority: the more restrictive action wins
+ACTION_SEVERITY = {"block": 2, "flag": 1, "allow": 0}
+
+# Fields used to pre-select candidate rules (checked in this order)
+DEFAULT_INDEX_FIELDS: Tuple[str, ...] = ("transaction_type", "profile_type", "jurisdiction")
+
+# Upper bound on memoized candidate lists (distinct index-field value combinations)
+CANDIDATE_CACHE_SIZE = 4096
+
+# Smallest candidate group evaluate_batch evaluates column-wise
+COLUMNAR_MIN_GROUP = 16
+
+# Operator aliases used across the shipped YAML rules
+OPERATOR_ALIASES = {
+    "equals": "eq",
+    "not_equals": "ne",
+    "greater_than": "gt",
+    "greater_than_or_equal": "gte",
+    "less_than": "lt",
+    "less_than_or_equal": "lte",
+}
+
+SUPPORTED_OPERATORS = frozenset({
+    "eq", "ne", "gt", "gte", "lt", "lte", "in", "not_in",
+    "contains", "not_contains", "exists", "between",
+})
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """A policy rule compiled into a predicate closure."""
+    name: str
+    action: str
+    priority: int
+    predicate: Predicate
+    order: int  # Position in the source YAML (stable tie-break)
+    # (index_field, required values) if the rule can be pre-selected by index
+    index_key: Optional[Tuple[str, Tuple[Any, ...]]] = None
+    # Condition tree for column-wise batch evaluation (see _compile_plan)
+    plan: Tuple[Any, ...] = ("always",)
+
+    @cached_property
+    def decision(self) -> str:
+        return self.action.upper()
+
+    @cached_property
+    def reason(self) -> str:
+        return f"Rule '{self.name}' (priority {self.priority}) matched"
+
+    @property
+    def sort_key(self) -> Tuple[int, int, int]:
+        return (-self.priority, -ACTION_SEVERITY[self.action], self.order)
+
+
+@dataclass(frozen=True)
+class _RuleIndex:
+    """Immutable snapshot of compiled rules; swapped atomically on reload."""
+    rules: Tuple[CompiledRule, ...]
+    index_fields: Tuple[Tuple[str, Callable[[Dict[str, Any]], Any]], ...]
+    # index_field -> value -> rules constrained to that value
+    buckets: Dict[str, Dict[Any, Tuple[CompiledRule, ...]]]
+    # Rules with no equality constraint on any index field
+    unindexed: Tuple[CompiledRule, ...]
+    # Index-field values -> ordered candidate rules (bounded memo)
+    candidate_cache: Dict[Tuple[Any, ...], Tuple[CompiledRule, ...]] = field(default_factory=dict)
+
+
+def _compile_getter(path: str) -> Callable[[Dict[str, Any]], Any]:
+    """Compile a dotted field path (e.g. ``originator.lei``) into a getter."""
+    parts = path.split(".")
+
+    if len(parts) == 1:
+        key = parts[0]
+
+        def get_flat(tx: Dict[str, Any]) -> Any:
+            return tx.get(key, _MISSING)
+
+        return get_flat
+
+    if len(parts) == 2:
+        outer, inner = parts
+
+        def get_pair(tx: Dict[str, Any]) -> Any:
+            parent = tx.get(outer)
+            if isinstance(parent, dict):
+                return parent.get(inner, _MISSING)
+            if parent is None:
+                return _MISSING
+            return getattr(parent, inner, _MISSING)
+
+        return get_pair
+
+    def get_nested(tx: Dict[str, Any]) -> Any:
+        current: Any = tx
+        for part in parts:
+            if isinstance(current, dict):
+                current = current.get(part, _MISSING)
+            else:
+                current = getattr(current, part, _MISSING) if current is not None else _MISSING
+            if current is _MISSING:
+                return _MISSING
+        return current
+
+    return get_nested
+
+
+def _as_lookup(values: Any) -> Tuple[Optional[FrozenSet[Any]], Tuple[Any, ...]]:
+    """Split a list value into a hashable set (fast path) and the original tuple."""
+    items = tuple(values) if isinstance(values, (list, tuple, set, frozenset)) else (values,)
+    try:
+        return frozenset(items), items
+    except TypeError:
+        return None, items
+
+
+def _list_references(values: Any) -> Tuple[str, ...]:
+    """Registered reference list placeholders (e.g. ``SANCTIONED_LEI_LIST``) among ``in`` values."""
+    items = values if isinstance(values, (list, tuple, set, frozenset)) else (values,)
+    return tuple(v for v in items if isinstance(v, str) and v in _reference_lists)
+
+
+def _compile_membership(values: Any) -> Callable[[Any], bool]:
+    """
+    Compile an ``in`` test; list-valued fields match if any element is a member.
+
+    Values naming a registered reference list (see ``register_reference_list``)
+    are tested against the list instead of as literals.
+    """
+    references = _list_references(values)
+    if references:
+        literals = [v for v in (values if isinstance(values, (list, tuple, set, frozenset)) else (values,))
+                    if v not in references]
+        literal_test = _compile_membership(literals) if literals else None
+        listed = tuple(_reference_lists[name] for name in references)
+
+        def test_listed(actual: Any) -> bool:
+            if isinstance(actual, (list, tuple, set)):
+                return any(test_listed(a) for a in actual)
+            if literal_test is not None and literal_test(actual):
+                return True
+            return any(is_listed(actual) for is_listed in listed)
+
+        return test_listed
+
+    lookup, items = _as_lookup(values)
+    container = lookup if lookup is not None else items
+
+    def test(actual: Any) -> bool:
+        if isinstance(actual, (list, tuple, set)):
+            return any(test(a) for a in actual)
+        try:
+            return actual in container
+        except TypeError:
+            # Unhashable value against a set lookup
+            return actual in items
+
+    return test
+
+
+def _compile_condition(condition: Dict[str, Any], context: str) -> Predicate:
+    """Compile a single ``{field, op, value}`` condition."""
+    if "field" not in condition or "op" not in condition:
+        raise RuntimeError(f"{context}: condition requires 'field' and 'op'")
+
+    op = OPERATOR_ALIASES.get(condition["op"], condition["op"])
+    value = condition.get("value")
+    get = _compile_getter(condition["field"])
+
+    if op not in SUPPORTED_OPERATORS:
+        raise RuntimeError(f"{context}: unsupported operator '{condition['op']}'")
+
+    if op == "exists":
+        expected = value is None or bool(value)
+
+        def exists(tx: Dict[str, Any]) -> bool:
+            actual = get(tx)
+            return (actual is not _MISSING and actual is not None) == expected
+
+        return exists
+
+    if op == "eq":
+        def eq(tx: Dict[str, Any]) -> bool:
+            actual = get(tx)
+            if actual is _MISSING:
+                return value is None
+            return actual == value
+
+        return eq
+
+    if op == "ne":
+        def ne(tx: Dict[str, Any]) -> bool:
+            actual = get(tx)
+            if actual is _MISSING:
+                return value is not None
+            return actual != value
+
+        return ne
+
+    if op in ("gt", "gte", "lt", "lte"):
+        compare = {
+            "gt": lambda a: a > value,
+            "gte": lambda a: a >= value,
+            "lt": lambda a: a < value,
+            "lte": lambda a: a <= value,
+        }[op]
+
+        def ordered(tx: Dict[str, Any]) -> bool:
+            actual = get(tx)
+            if actual is _MISSING or actual is None:
+                return False
+            try:
+                return compare(actual)
+            except TypeError:
+                return False
+
+        return ordered
+
+    if op == "between":
+        if not isinstance(value, (list, tuple)) or len(value) != 2:
+            raise RuntimeError(f"{context}: 'between' requires a [low, high] value")
+        low, high = value
+
+        def between(tx: Dict[str, Any]) -> bool:
+            actual = get(tx)
+            if actual is _MISSING or actual is None:
+                return False
+            try:
+                return low <= actual <= high
+            except TypeError:
+                return False
+
+        return between
+
+    if op in ("in", "not_in"):
+        member = _compile_membership(value)
+        negate = op == "not_in"
+
+        def membership(tx: Dict[str, Any]) -> bool:
+            actual = get(tx)
+            if actual is _MISSING or actual is None:
+                return negate
+            return member(actual) != negate
+
+        return membership
+
+    # contains / not_contains
+    negate = op == "not_contains"
+
+    def contains(tx: Dict[str, Any]) -> bool:
+        actual = get(tx)
+        if actual is _MISSING or actual is None:
+            return negate
+        try:
+            if isinstance(actual, str) and isinstance(value, str):
+                found = value.lower() in actual.lower()
+            else:
+                found = value in actual
+        except TypeError:
+            found = False
+        return found != negate
+
+    return contains
+
+
+def _all_of(predicates: Tuple[Predicate, ...]) -> Predicate:
+    """Conjunction that stops at the first failing predicate."""
+    def check_all(tx: Dict[str, Any]) -> bool:
+        for predicate in predicates:
+            if not predicate(tx):
+                return False
+        return True
+
+    return check_all
+
+
+def _any_of(predicates: Tuple[Predicate, ...]) -> Predicate:
+    """Disjunction that stops at the first passing predicate."""
+    def check_any(tx: Dict[str, Any]) -> bool:
+        for predicate in predicates:
+            if predicate(tx):
+                return True
+        return False
+
+    return check_any
+
+
+def _always(tx: Dict[str, Any]) -> bool:
+    return True
+
+
+def _compile_tree(node: Any, context: str, skip: Optional[Dict[str, Any]] = None) -> Predicate:
+    """
+    Compile an ``all``/``any``/``not`` condition tree with short-circuiting.
+
+    Args:
+        node: Condition tree from the rule's ``when`` block
+        context: Rule description used in error messages
+        skip: Top-level ``all`` condition already guaranteed by the rule index;
+            it is left out of the compiled predicate
+    """
+    if not node:
+        return _always
+
+    if not isinstance(node, dict):
+        raise RuntimeError(f"{context}: condition must be a mapping, got {type(node).__name__}")
+
+    if "field" in node:
+        return _compile_condition(node, context)
+
+    predicates: List[Predicate] = []
+    for key, children in node.items():
+        if key == "not":
+            inner = _compile_tree(children, f"{context}.not")
+            predicates.append(lambda tx, inner=inner: not inner(tx))
+            continue
+        if key not in ("all", "any"):
+            raise RuntimeError(f"{context}: unknown condition key '{key}'")
+        if not isinstance(children, list):
+            raise RuntimeError(f"{context}.{key}: expected a list of conditions")
+
+        compiled = tuple(
+            _compile_tree(child, f"{context}.{key}[{i}]")
+            for i, child in enumerate(children)
+            if not (key == "all" and child is skip)
+        )
+        if not compiled:
+            if key == "any" and children:
+                predicates.append(lambda tx: False)
+        elif len(compiled) == 1:
+            predicates.append(compiled[0])
+        elif key == "all":
+            predicates.append(_all_of(compiled))
+        else:
+            predicates.append(_any_of(compiled))
+
+    if not predicates:
+        return _always
+    if len(predicates) == 1:
+        return predicates[0]
+    return _all_of(tuple(predicates))
+
+
+def _compile_plan(node: Any, skip: Optional[Dict[str, Any]] = None) -> Tuple[Any, ...]:
+    """
+    Compile the same condition tree as ``_compile_tree`` into a column plan.
+
+    Plans are nested tuples used by ``evaluate_batch``: ``("always",)``,
+    ``("never",)``, ``("leaf", path, getter, predicate)``, ``("not", plan)``,
+    ``("all", plans)`` and ``("any", plans)``. Leaves keep the per-transaction
+    predicate of their condition, which the batch path runs once per distinct
+    field value. The tree must already have been validated by _compile_tree.
+    """
+    if not node:
+        return ("always",)
+    if "field" in node:
+        path = node["field"]
+        return ("leaf", path, _compile_getter(path), _compile_condition(node, path))
+
+    plans: List[Tuple[Any, ...]] = []
+    for key, children in node.items():
+        if key == "not":
+            plans.append(("not", _compile_plan(children)))
+            continue
+        compiled = tuple(
+            _compile_plan(child) for child in children if not (key == "all" and child is skip)
+        )
+        if not compiled:
+            if key == "any" and children:
+                plans.append(("never",))
+        elif len(compiled) == 1:
+            plans.append(compiled[0])
+        else:
+            plans.append((key, compiled))
+
+    if not plans:
+        return ("always",)
+    if len(plans) == 1:
+        return plans[0]
+    return ("all", tuple(plans))
+
+
+def _probe(path: str, value: Any) -> Dict[str, Any]:
+    """Minimal transaction holding ``value`` at a dotted path (absent for _MISSING)."""
+    if value is _MISSING:
+        return {}
+    for part in reversed(path.split(".")):
+        value = {part: value}
+    return value
+
+
+class _ColumnEvaluator:
+    """
+    Evaluate rule plans over a group of transactions as byte masks.
+
+    A mask is an int whose little-endian bytes are 1 for matching transactions
+    and 0 otherwise, so ``all``/``any``/``not`` are single big-int operations.
+    Each field is read once per transaction (columns are shared by every rule
+    in the group) and each leaf predicate runs once per distinct field value.
+    """
+
+    def __init__(self, transactions: List[Dict[str, Any]]):
+        self.transactions = transactions
+        self.size = len(transactions)
+        self.ones = int.from_bytes(b"\x01" * self.size, "little")
+        self._columns: Dict[str, List[Any]] = {}
+
+    def mask(self, plan: Tuple[Any, ...]) -> int:
+        """Mask of the transactions matching a plan (leaf errors propagate)."""
+        kind = plan[0]
+        if kind == "leaf":
+            return self._leaf_mask(plan[1], plan[2], plan[3])
+        if kind == "all":
+            result = self.ones
+            for child in plan[1]:
+                result &= self.mask(child)
+                if not result:
+                    break
+            return result
+        if kind == "any":
+            result = 0
+            for child in plan[1]:
+                result |= self.mask(child)
+                if result == self.ones:
+                    break
+            return result
+        if kind == "not":
+            return self.ones ^ self.mask(plan[1])
+        return self.ones if kind == "always" else 0
+
+    def _leaf_mask(
+        self, path: str, get: Callable[[Dict[str, Any]], Any], predicate: Predicate
+    ) -> int:
+        column = self._columns.get(path)
+        if column is None:
+            column = self._columns[path] = self._read_column(path, get)
+        try:
+            distinct = dict.fromkeys(column)
+        except TypeError:
+            distinct = None
+        if distinct is None or len(distinct) * 2 > self.size:
+            # Unhashable or mostly distinct values: nothing to share, test each transaction
+            flags = bytes([1 if predicate(tx) else 0 for tx in self.transactions])
+        else:
+            for value in distinct:
+                distinct[value] = 1 if predicate(_probe(path, value)) else 0
+            flags = bytes(map(distinct.__getitem__, column))
+        return int.from_bytes(flags, "little")
+
+    def _read_column(self, path: str, get: Callable[[Dict[str, Any]], Any]) -> List[Any]:
+        """Values of one field for every transaction (inlined for one- and two-part paths)."""
+        parts = path.split(".")
+        if len(parts) == 1:
+            key = parts[0]
+            return [tx.get(key, _MISSING) for tx in self.transactions]
+        if len(parts) == 2:
+            outer, inner = parts
+            return [
+                _MISSING if (parent := tx.get(outer)) is None
+                else parent.get(inner, _MISSING) if isinstance(parent, dict) else get(tx)
+                for tx in self.transactions
+            ]
+        return list(map(get, self.transactions))
+
+
+def _index_values(
+    when: Any,
+    field_name: str
+) -> Optional[Tuple[Tuple[Any, ...], Dict[str, Any]]]:
+    """
+    Return the values a rule requires ``field_name`` to equal, if any.
+
+    Only top-level ``all`` conditions with ``eq``/``in`` qualify, since those
+    must hold for the rule to match at all. Returns the values together with
+    the condition they came from.
+    """
+    if not isinstance(when, dict):
+        return None
+    for condition in when.get("all") or []:
+        if not isinstance(condition, dict) or condition.get("field") != field_name:
+            continue
+        op = OPERATOR_ALIASES.get(condition.get("op"), condition.get("op"))
+        value = condition.get("value")
+        values: Tuple[Any, ...]
+        if op == "eq":
+            values = (value,)
+        elif op == "in" and isinstance(value, list) and None not in value and not _list_references(value):
+            # Missing fields never satisfy "in", but would be looked up as null;
+            # reference list placeholders are not literal values to bucket on
+            values = tuple(value)
+        else:
+            continue
+        try:
+            return tuple(dict.fromkeys(values)), condition
+        except TypeError:
+            continue
+    return None
+
+
+
+
+class CompiledPolicyEngine(PolicyEngineInterface):
+    """
+    In-process policy engine backed by compiled, indexed rules.
+
+    Rules are compiled once in ``load_rules`` and published as an immutable
+    snapshot, so evaluation is lock-free and hot-reloads are atomic.
+
+    Decision resolution:
+    - Candidate rules are selected through the index fields
+    - Candidates are tried in (priority desc, severity desc, file order)
+    - The first matching rule determines the decision; with ``short_circuit``
+      (the default) evaluation stops there and ``matched_rules`` holds only
+      that rule, otherwise every matching rule is collected for audit
+    - If no rule matches, the decision is ALLOW
+    """
+
+    def __init__(
+        self,
+        index_fields: Tuple[str, ...] = DEFAULT_INDEX_FIELDS,
+        short_circuit: bool = True
+    ):
+        """
+        Initialize compiled policy engine.
+
+        Args:
+            index_fields: Transaction fields used to pre-select candidate rules
+            short_circuit: Stop at the first (highest-priority) matching rule
+                instead of collecting every matching rule
+        """
+        self.index_fields = tuple(index_fields)
+        self.short_circuit = short_circuit
+        self._index = self._build_index([])
+        self._lock = threading.Lock()
+        self._stats = {
+            "total_processed": 0,
+            "decisions": {
+                "ALLOW": 0,
+                "BLOCK": 0,
+                "FLAG": 0
+            },
+            "rules_loaded": 0,
+            "last_evaluation_time_ms": None
+        }
+
+    def evaluate(self, transaction: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Evaluate a transaction against the compiled rules.
+
+        Raises:
+            ValueError: If transaction structure is invalid
+        """
+        start_time = time.perf_counter()
+
+        if not isinstance(transaction, dict):
+            raise ValueError("Transaction must be a dictionary")
+
+        if "transaction_id" not in transaction:
+            raise ValueError("Transaction must have 'transaction_id' field")
+
+        candidates = self._select_candidates(self._index, transaction)
+        result = self._match(candidates, transaction)
+
+        decision = result["decision"]
+        self._stats["total_processed"] += 1
+        self._stats["decisions"][decision] += 1
+        self._stats["last_evaluation_time_ms"] = (time.perf_counter() - start_time) * 1000
+
+        return result
+
+    def evaluate_batch(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Evaluate many transactions column-wise.
+
+        Transactions are grouped by their candidate rule set. In groups of at
+        least COLUMNAR_MIN_GROUP transactions each field is read once per
+        transaction and each condition is tested once per distinct field
+        value; rules are then resolved on byte masks (see _ColumnEvaluator).
+        Smaller groups, and groups where a condition raises, are matched one
+        transaction at a time exactly like ``evaluate``. Results are identical
+        to calling ``evaluate`` per item.
+
+        Raises:
+            ValueError: If any transaction structure is invalid
+        """
+        start_time = time.perf_counter()
+
+        for i, transaction in enumerate(transactions):
+            if not isinstance(transaction, dict):
+                raise ValueError(f"Transaction {i} must be a dictionary")
+            if "transaction_id" not in transaction:
+                raise ValueError(f"Transaction {i} must have 'transaction_id' field")
+
+        index = self._index
+        groups: Dict[int, Tuple[Tuple[CompiledRule, ...], List[int]]] = {}
+        for i, transaction in enumerate(transactions):
+            candidates = self._select_candidates(index, transaction)
+            # Candidate tuples are memoized per key, so identity groups them
+            groups.setdefault(id(candidates), (candidates, []))[1].append(i)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(transactions)
+        # The results are acyclic, so cyclic GC passes over the growing result
+        # list would only rescan it; pause collection while it is built
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for candidates, members in groups.values():
+                group = [transactions[i] for i in members]
+                group_results = None
+                if len(group) >= COLUMNAR_MIN_GROUP and candidates:
+                    try:
+                        group_results = self._match_columns(candidates, group)
+                    except Exception:
+                        # Report condition errors per transaction, as evaluate does
+                        group_results = None
+                if group_results is None:
+                    group_results = [self._match(candidates, transaction) for transaction in group]
+                for i, result in zip(members, group_results):
+                    results[i] = result
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        decisions = self._stats["decisions"]
+        for result in results:
+            decisions[result["decision"]] += 1
+        self._stats["total_processed"] += len(results)
+        self._stats["last_evaluation_time_ms"] = (time.perf_counter() - start_time) * 1000
+
+        return results
+
+    def load_rules(self, rules_yaml: str) -> None:
+        """
+        Parse, validate and compile rules from a YAML string.
+
+        The new rule set replaces the previous one atomically; in-flight
+        evaluations finish against the snapshot they started with.
+
+        Raises:
+            ValueError: If YAML structure is invalid
+            RuntimeError: If a rule condition cannot be compiled
+        """
+        rules: Any = []
+        if rules_yaml and rules_yaml.strip():
+            try:
+                rules = yaml.safe_load(rules_yaml) or []
+            except yaml.YAMLError as e:
+                raise ValueError(f"Invalid YAML in policy rules: {e}") from e
+
+        if isinstance(rules, dict):
+            rules = [rules]
+        if not isinstance(rules, list):
+            raise ValueError("Policy rules must be a list")
+
+        compiled = [self._compile_rule(rule, i) for i, rule in enumerate(rules)]
+        index = self._build_index(compiled)
+
+        with self._lock:
+            self._index = index
+            self._stats["rules_loaded"] = len(compiled)
+
+        logger.info(
+            f"Compiled {len(compiled)} policy rule(s) "
+            f"({len(compiled) - len(index.unindexed)} indexed by {', '.join(self.index_fields)})"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get engine statistics."""
+        stats = self._stats.copy()
+        stats["decisions"] = dict(stats["decisions"])
+        stats["indexed_rules"] = len(self._index.rules) - len(self._index.unindexed)
+        return stats
+
+    def _compile_rule(self, rule: Any, position: int) -> CompiledRule:
+        """Validate and compile a single rule definition."""
+        if not isinstance(rule, dict):
+            raise ValueError(f"Rule {position} must be a dictionary")
+
+        for required in ("name", "action", "priority"):
+            if required not in rule:
+                raise ValueError(f"Rule {position} missing required field: {required}")
+
+        action = str(rule["action"]).lower()
+        if action not in ACTION_SEVERITY:
+            raise ValueError(f"Rule {position} has invalid action: {rule['action']}")
+
+        try:
+            priority = int(rule["priority"])
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Rule {position} has invalid priority: {rule['priority']}") from e
+
+        name = str(rule["name"])
+        when = rule.get("when")
+
+        index_key = None
+        indexed_condition = None
+        for index_field in self.index_fields:
+            found = _index_values(when, index_field)
+            if found is not None:
+                values, indexed_condition = found
+                index_key = (index_field, values)
+                break
+
+        return CompiledRule(
+            name=name,
+            action=action,
+            priority=priority,
+            # The indexed condition holds for every candidate, so don't re-check it
+            predicate=_compile_tree(when, f"Rule '{name}'", skip=indexed_condition),
+            order=position,
+            index_key=index_key,
+            plan=_compile_plan(when, skip=indexed_condition)
+        )
+
+    def _build_index(self, rules: List[CompiledRule]) -> _RuleIndex:
+        """Bucket each rule under the first index field it constrains."""
+        buckets: Dict[str, Dict[Any, List[CompiledRule]]] = {f: {} for f in self.index_fields}
+        unindexed: List[CompiledRule] = []
+
+        for rule in rules:
+            if rule.index_key is None:
+                unindexed.append(rule)
+                continue
+            index_field, values = rule.index_key
+            for value in values:
+                buckets[index_field].setdefault(value, []).append(rule)
+
+        return _RuleIndex(
+            rules=tuple(sorted(rules, key=lambda r: r.sort_key)),
+            index_fields=tuple((f, _compile_getter(f)) for f in self.index_fields),
+            buckets={
+                f: {value: tuple(rs) for value, rs in by_value.items()}
+                for f, by_value in buckets.items()
+            },
+            unindexed=tuple(unindexed)
+        )
+
+    def _candidate_key(self, index: _RuleIndex, transaction: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Values of the index fields for a transaction (the candidate-set key)."""
+        return tuple(get(transaction) for _, get in index.index_fields)
+
+    def _select_candidates(
+        self,
+        index: _RuleIndex,
+        transaction: Dict[str, Any],
+        key: Optional[Tuple[Any, ...]] = None
+    ) -> Tuple[CompiledRule, ...]:
+        """Return the candidate rules for a transaction, in resolution order."""
+        if key is None:
+            key = self._candidate_key(index, transaction)
+
+        try:
+            cached = index.candidate_cache.get(key)
+            memoizable = True
+        except TypeError:
+            # Unhashable index-field value (e.g. a list); skip the memo
+            cached, memoizable = None, False
+        if cached is not None:
+            return cached
+
+        selected = list(index.unindexed)
+        for (index_field, _), value in zip(index.index_fields, key):
+            if value is _MISSING:
+                # Absent fields compare equal to null in the predicates
+                value = None
+            try:
+                selected.extend(index.buckets[index_field].get(value, ()))
+            except TypeError:
+                continue
+
+        candidates = tuple(sorted(selected, key=lambda r: r.sort_key))
+        if memoizable and len(index.candidate_cache) < CANDIDATE_CACHE_SIZE:
+            index.candidate_cache[key] = candidates
+        return candidates
+
+    def _match(
+        self,
+        candidates: Tuple[CompiledRule, ...],
+        transaction: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Run candidate predicates and resolve the decision by priority."""
+        winner: Optional[CompiledRule] = None
+        matched_rules: List[str] = []
+        errors: List[Dict[str, Any]] = []
+        checked = 0
+
+        for rule in candidates:
+            checked += 1
+            try:
+                matched = rule.predicate(transaction)
+            except Exception as e:
+                errors.append({"rule": rule.name, "error": str(e)})
+                continue
+            if not matched:
+                continue
+            matched_rules.append(rule.name)
+            if winner is None:
+                winner = rule
+                if self.short_circuit:
+                    break
+
+        return self._build_result(winner, matched_rules, errors, checked)
+
+    def _match_columns(
+        self,
+        candidates: Tuple[CompiledRule, ...],
+        transactions: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Resolve a group sharing one candidate set with the same ordering as _match."""
+        columns = _ColumnEvaluator(transactions)
+        size = columns.size
+        winners: List[Optional[CompiledRule]] = [None] * size
+        matched: List[List[str]] = [[] for _ in range(size)]
+        checked = [len(candidates)] * size
+        undecided = columns.ones
+
+        for position, rule in enumerate(candidates, start=1):
+            if self.short_circuit:
+                if not undecided:
+                    break
+                hits = columns.mask(rule.plan) & undecided
+                undecided ^= hits
+            else:
+                hits = columns.mask(rule.plan)
+            if not hits:
+                continue
+            flags = hits.to_bytes(size, "little")
+            i = flags.find(1)
+            while i != -1:
+                matched[i].append(rule.name)
+                if winners[i] is None:
+                    winners[i] = rule
+                    if self.short_circuit:
+                        checked[i] = position
+                i = flags.find(1, i + 1)
+
+        return [
+            self._build_result(winners[i], matched[i], [], checked[i])
+            for i in range(size)
+        ]
+
+    def _build_result(
+        self,
+        winner: Optional[CompiledRule],
+        matched_rules: List[str],
+        errors: List[Dict[str, Any]],
+        rules_checked: int
+    ) -> Dict[str, Any]:
+        """Assemble the decision dictionary returned by evaluate."""
+        decision = winner.decision if winner else "ALLOW"
+        trace: List[Dict[str, Any]] = [
+            {
+                "step": "rule_matching",
+                "rules_loaded": len(self._index.rules),
+                "rules_checked": rules_checked,
+                "matched": len(matched_rules)
+            },
+            {
+                "step": "decision",
+                "result": decision,
+                "reason": winner.reason if winner else "No rules matched"
+            }
+        ]
+        if errors:
+            trace.insert(1, {"step": "rule_errors", "errors": errors})
+
+        return {
+            "decision": decision,
+            "rule": winner.name if winner else None,
+            "matched_rules": matched_rules,
+            "trace": trace
+        }
@@ -7,12 +7,20 @@ and credit risk metrics including RWA, PD, LGD, EAD.
 
 import logging
 import math
-from typing import Dict, Any, Optional, List
+from statistics import NormalDist
+from typing import Dict, Any, Optional, List, Union
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import date, datetime
 
+import numpy as np
+import pandas
+
+from app.utils.normal_distribution import norm_cdf, norm_ppf
+
 logger = logging.getLogger(__name__)
 
+ArrayLike = Union[float, List[float], np.ndarray]
+
 
 class CreditRiskService:
     """
@@ -56,6 +64,11 @@ class CreditRiskService:
         "default": Decimal("1.00"),  # 100% default
     }
     
+    # Upper PD bound of each rating bucket used by _get_risk_weight (aaa..b; above is ccc)
+    _RATING_PD_THRESHOLDS = np.array([0.0001, 0.0005, 0.002, 0.01, 0.05, 0.15])
+    # One PD inside each bucket, to build vectorized risk weight tables
+    _RATING_REPRESENTATIVE_PDS = (0.0001, 0.0005, 0.002, 0.01, 0.05, 0.15, 1.0)
+    
     def __init__(self):
         """Initialize credit risk service."""
         pass
@@ -160,50 +173,213 @@ class CreditRiskService:
         return k
     
     def _normal_cdf(self, x: float) -> float:
-        """Cumulative standard normal distribution (approximation)."""
-        # Abramowitz and Stegun approximation
-        a1 = 0.254829592
-        a2 = -0.284496736
-        a3 = 1.421413741
-        a4 = -1.453152027
-        a5 = 1.061405429
-        p = 0.3275911
-        
-        sign = 1
-        if x < 0:
-            sign = -1
-        x = abs(x) / math.sqrt(2.0)
-        
-        t = 1.0 / (1.0 + p * x)
-        y = 1.0 - (((((a5 * t + a4) * t) + a3) * t + a2) * t + a1) * t * math.exp(-x * x)
-        
-        return 0.5 * (1.0 + sign * y)
+        """Cumulative standard normal distribution."""
+        return 0.5 * math.erfc(-x / math.sqrt(2.0))
     
     def _inverse_normal_cdf(self, p: float) -> float:
-        """Inverse cumulative standard normal distribution (approximation)."""
-        # Beasley-Springer-Moro algorithm approximation
+        """Inverse cumulative standard normal distribution (Wichura AS241)."""
         if p <= 0 or p >= 1:
             raise ValueError("p must be between 0 and 1")
         
-        # Approximation for inverse normal CDF
-        if p < 0.5:
-            return -self._inverse_normal_cdf_approx(1 - p)
-        else:
-            return self._inverse_normal_cdf_approx(p)
+        return NormalDist().inv_cdf(p)
+    
+    def calculate_rwa_batch(
+        self,
+        exposure: ArrayLike,
+        pd: ArrayLike,
+        lgd: ArrayLike,
+        maturity: ArrayLike = 1.0,
+        asset_class: Union[str, ArrayLike] = "corporate",
+        approach: str = "irb"
+    ) -> np.ndarray:
+        """
+        Calculate Risk-Weighted Assets for a whole portfolio at once.
+        
+        Vectorized counterpart of calculate_rwa(): inputs are arrays (or
+        scalars, broadcast against the arrays) and the result is an unrounded
+        float64 array. Round totals at the edge, e.g. with
+        calculate_portfolio_capital().
+        
+        Args:
+            exposure: Exposures at Default (EAD)
+            pd: Probabilities of Default (0-1)
+            lgd: Losses Given Default (0-1)
+            maturity: Maturities in years (default: 1.0)
+            asset_class: Asset class, or one asset class per exposure
+            approach: Calculation approach ("irb" or "standardized")
+            
+        Returns:
+            Risk-weighted assets, one per exposure
+        """
+        exposure = np.asarray(exposure, dtype=np.float64)
+        
+        if approach.lower() == "irb":
+            k = self._calculate_capital_requirement_k_batch(pd, lgd, maturity, asset_class)
+            return exposure * k * 12.5
+        
+        risk_weight = self._get_risk_weight_batch(asset_class, pd)
+        return exposure * risk_weight
+    
+    def _calculate_capital_requirement_k_batch(
+        self,
+        pd: ArrayLike,
+        lgd: ArrayLike,
+        maturity: ArrayLike,
+        asset_class: Union[str, ArrayLike]
+    ) -> np.ndarray:
+        """
+        Vectorized _calculate_capital_requirement_k().
+        
+        Args:
+            pd: Probabilities of Default (0-1)
+            lgd: Losses Given Default (0-1)
+            maturity: Maturities in years
+            asset_class: Asset class, or one asset class per exposure
+            
+        Returns:
+            Capital requirement K per exposure (0-1)
+        """
+        pd = np.asarray(pd, dtype=np.float64)
+        lgd = np.asarray(lgd, dtype=np.float64)
+        maturity = np.asarray(maturity, dtype=np.float64)
+        
+        r = self.asset_correlation_batch(pd, asset_class)
+        
+        # Maturity adjustment
+        b = (0.11852 - 0.05478 * np.log(pd)) ** 2
+        maturity_adj = (1 + (maturity - 2.5) * b) / (1 - 1.5 * b)
+        
+        inner_term = (norm_ppf(pd) + np.sqrt(r) * norm_ppf(0.999)) / np.sqrt(1 - r)
+        k = (lgd * norm_cdf(inner_term) - pd * lgd) * maturity_adj
+        
+        # Ensure K is non-negative
+        return np.maximum(k, 0.0)
+    
+    def asset_correlation_batch(self, pd: ArrayLike, asset_class: Union[str, ArrayLike] = "corporate") -> np.ndarray:
+        """
+        Basel III IRB asset correlation R per exposure.
+        
+        Args:
+            pd: Probabilities of Default (0-1)
+            asset_class: Asset class, or one asset class per exposure
+            
+        Returns:
+            Correlation R per exposure (0.04 for retail, 0.12-0.24 for corporate by PD)
+        """
+        pd = np.asarray(pd, dtype=np.float64)
+        weight = -np.expm1(-50 * pd) / -math.expm1(-50)
+        r = 0.12 * weight + 0.24 * (1 - weight)
+        return np.where(self._asset_class_mask(asset_class, "retail"), 0.04, r)
+    
+    @staticmethod
+    def _asset_class_mask(asset_class: Union[str, ArrayLike], name: str) -> np.ndarray:
+        """Boolean mask of exposures in an asset class (a scalar bool for a single class)."""
+        if isinstance(asset_class, str):
+            return np.bool_(asset_class.lower() == name)
+        codes, classes = pandas.factorize(np.ravel(asset_class))
+        mask = np.array([str(c).lower() == name for c in classes], dtype=bool)[codes]
+        return mask.reshape(np.shape(asset_class))
+    
+    def _get_risk_weight_batch(self, asset_class: Union[str, ArrayLike], pd: ArrayLike) -> np.ndarray:
+        """Vectorized _get_risk_weight(): standardized risk weights per exposure."""
+        pd = np.asarray(pd, dtype=np.float64)
+        # Rating buckets as in _get_risk_weight: pd <= threshold selects the rating
+        ratings = np.searchsorted(self._RATING_PD_THRESHOLDS, pd, side="left")
+        
+        if isinstance(asset_class, str):
+            table = self._risk_weight_table(asset_class)
+            return table[ratings]
+        
+        codes, classes = pandas.factorize(np.ravel(asset_class))
+        tables = np.stack([self._risk_weight_table(str(c)) for c in classes])
+        return tables[codes.reshape(np.shape(asset_class)), ratings]
+    
+    def _risk_weight_table(self, asset_class: str) -> np.ndarray:
+        """Risk weight per rating bucket (aaa..ccc) for one asset class."""
+        return np.array(
+            [float(self._get_risk_weight(asset_class, pd)) for pd in self._RATING_REPRESENTATIVE_PDS],
+            dtype=np.float64
+        )
+    
+    def calculate_portfolio_capital(
+        self,
+        exposure: ArrayLike,
+        pd: ArrayLike,
+        lgd: ArrayLike,
+        maturity: ArrayLike = 1.0,
+        asset_class: Union[str, ArrayLike] = "corporate",
+        approach: str = "irb",
+        tier1_capital: Optional[Decimal] = None
+    ) -> Dict[str, Any]:
+        """
+        Calculate portfolio RWA and capital requirements in one vectorized pass.
+        
+        Per-exposure values stay in float64; Decimal rounding is applied only
+        to the portfolio totals.
+        
+        Args:
+            exposure: Exposures at Default (EAD)
+            pd: Probabilities of Default (0-1)
+            lgd: Losses Given Default (0-1)
+            maturity: Maturities in years (default: 1.0)
+            asset_class: Asset class, or one asset class per exposure
+            approach: Calculation approach ("irb" or "standardized")
+            tier1_capital: Optional Tier 1 capital for the leverage ratio
+            
+        Returns:
+            Dictionary with exposure_count, total_exposure, total_rwa,
+            capital_requirement, tier1_requirement and (if tier1_capital is
+            given) leverage_ratio, all as Decimal
+        """
+        rwa = self.calculate_rwa_batch(exposure, pd, lgd, maturity, asset_class, approach)
+        return self.summarize_portfolio_rwa(exposure, rwa, tier1_capital)
+    
+    def summarize_portfolio_rwa(
+        self,
+        exposure: ArrayLike,
+        rwa: np.ndarray,
+        tier1_capital: Optional[Decimal] = None
+    ) -> Dict[str, Any]:
+        """
+        Total per-exposure RWA (from calculate_rwa_batch) into portfolio capital figures.
+        
+        Args:
+            exposure: Exposures at Default (EAD)
+            rwa: Risk-weighted assets, one per exposure
+            tier1_capital: Optional Tier 1 capital for the leverage ratio
+            
+        Returns:
+            Same dictionary as calculate_portfolio_capital()
+        """
+        rwa = np.asarray(rwa, dtype=np.float64)
+        exposure = np.broadcast_to(np.asarray(exposure, dtype=np.float64), rwa.shape)
+        
+        total_exposure = self._to_decimal(self._accurate_sum(exposure))
+        total_rwa = self._to_decimal(self._accurate_sum(rwa))
+        
+        result = {
+            "exposure_count": int(rwa.size),
+            "total_exposure": total_exposure,
+            "total_rwa": total_rwa,
+            "capital_requirement": self.calculate_capital_requirement(total_rwa),
+            "tier1_requirement": self.calculate_tier1_capital_requirement(total_rwa),
+        }
+        if tier1_capital is not None:
+            result["leverage_ratio"] = self.calculate_leverage_ratio(tier1_capital, total_exposure)
+        return result
+    
+    @staticmethod
+    def _accurate_sum(values: np.ndarray) -> float:
+        """Sum with error bounded by a few ulps of the total (pairwise blocks, exact fsum across blocks)."""
+        values = np.ravel(values)
+        if values.size == 0:
+            return 0.0
+        return math.fsum(np.add.reduceat(values, np.arange(0, values.size, 256)).tolist())
     
-    def _inverse_normal_cdf_approx(self, p: float) -> float:
-        """Approximation for inverse normal CDF (p >= 0.5)."""
-        # Winitzki approximation
-        c0 = 2.515517
-        c1 = 0.802853
-        c2 = 0.010328
-        d1 = 1.432788
-        d2 = 0.189269
-        d3 = 0.001308
-        
-        t = math.sqrt(-2 * math.log(1 - p))
-        x = t - (c0 + c1 * t + c2 * t * t) / (1 + d1 * t + d2 * t * t + d3 * t * t * t)
-        return x
+    @staticmethod
+    def _to_decimal(value: float) -> Decimal:
+        """Convert a float total to Decimal rounded to cents."""
+        return Decimal(repr(value)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
     
     def _get_risk_weight(self, asset_class: str, pd: Optional[float] = None) -> Decimal:
         """
@@ -8,7 +8,7 @@ import logging
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func
 
 from app.db.models import (
     User, Document, Workflow, AuditLog, PolicyDecision,
@@ -62,36 +62,43 @@ class DataRetentionService:
         self.db = db
         self.policy = DataRetentionPolicy()
     
-    def cleanup_audit_logs(self, dry_run: bool = True) -> Dict[str, Any]:
-        """Clean up old audit logs based on retention policy.
+    def cleanup_audit_logs(self, dry_run: bool = True, batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """Archive old audit logs to cold storage based on retention policy.
+        
+        Expired logs are first folded into the audit statistics rollups, then
+        moved in batches into compressed, hash-chained segment files (see
+        AuditLogArchive) and deleted from the database once each segment is
+        on disk. AuditService.get_audit_logs keeps returning them.
         
         Args:
-            dry_run: If True, only report what would be deleted
+            dry_run: If True, only report what would be archived
+            batch_size: Logs moved per batch (defaults to settings.AUDIT_ARCHIVE_BATCH_SIZE)
             
         Returns:
             Dictionary with cleanup summary
         """
-        cutoff_date = datetime.utcnow() - timedelta(days=self.policy.AUDIT_LOGS_RETENTION_DAYS)
+        from app.services.audit_archive_service import get_audit_archive
+        from app.services.audit_statistics_service import AuditStatisticsService
         
-        old_logs = self.db.query(AuditLog).filter(
-            AuditLog.created_at < cutoff_date
-        ).all()
+        cutoff_date = datetime.utcnow() - timedelta(days=self.policy.AUDIT_LOGS_RETENTION_DAYS)
         
-        count = len(old_logs)
+        count = self.db.query(func.count(AuditLog.id)).filter(
+            AuditLog.occurred_at < cutoff_date
+        ).scalar() or 0
         
+        archived = segments = 0
         if not dry_run and count > 0:
-            # Archive before deletion (optional - implement if needed)
-            # For now, we'll keep audit logs for compliance
-            # In production, consider archiving to cold storage
-            logger.warning(f"Audit logs older than {self.policy.AUDIT_LOGS_RETENTION_DAYS} days found. "
-                          f"Consider archiving instead of deletion for compliance.")
-            # self.db.query(AuditLog).filter(AuditLog.created_at < cutoff_date).delete()
-            # self.db.commit()
+            AuditStatisticsService().roll_up_audit_logs(self.db)
+            archived, segments = get_audit_archive().archive_expired(
+                self.db, cutoff_date, batch_size or settings.AUDIT_ARCHIVE_BATCH_SIZE
+            )
         
         return {
             "type": "audit_logs",
             "cutoff_date": cutoff_date.isoformat(),
             "records_found": count,
+            "records_archived": archived,
+            "segments_written": segments,
             "action": "archive" if not dry_run else "would_archive",
             "retention_days": self.policy.AUDIT_LOGS_RETENTION_DAYS
         }
@@ -297,7 +297,7 @@ The document contains placeholder content representing a credit agreement.
             # Validate and migrate profile data against UserProfileData schema for all users
             if not dry_run:
                 users = self.db.query(User).filter(
-                    User.email.in_([u["email"] for u in DEMO_USERS])
+                    User.email_bidx.in_([u["email"] for u in DEMO_USERS])
                 ).all()
                 
                 for user in users:
@@ -0,0 +1,249 @@
+"""
+Persistent, content-addressed embedding cache for CreditNexus.
+
+Embeddings are keyed by (model name, sha256 of text) and stored as float32
+blobs in a local SQLite database, with an in-memory LRU hot tier in front of
+it. Storage, TTL expiry and LRU eviction (bounded by
+EMBEDDING_CACHE_MAX_ENTRIES) come from app.core.sqlite_cache.
+
+CachedEmbeddings wraps any LangChain Embeddings instance so that callers of
+get_embeddings_model() go through the cache transparently.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.core.sqlite_cache import SQLiteCache
+
+logger = logging.getLogger(__name__)
+
+# Global cache instance
+_cache_instance: Optional['EmbeddingCache'] = None
+_cache_lock = threading.Lock()
+
+# Rough characters-per-token ratio used to estimate tokens saved by cache hits
+CHARS_PER_TOKEN = 4
+
+
+def embedding_cache_key(model_name: str, text: str) -> str:
+    """Content-addressed cache key for a (model, text) pair."""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{model_name}:{digest}"
+
+
+class EmbeddingCache(SQLiteCache):
+    """Two-tier (memory LRU + SQLite) embedding cache."""
+
+    table = "embedding_cache"
+    payload_column = "vector"
+    payload_type = "BLOB"
+    extra_columns = ("model",)
+    index_prefix = "embedding"
+
+    def __init__(
+        self,
+        cache_db_path: Optional[str] = None,
+        max_entries: int = 200_000,
+        memory_entries: int = 10_000,
+        ttl_seconds: int = 90 * 86400
+    ):
+        """
+        Initialize embedding cache.
+
+        Args:
+            cache_db_path: Path to SQLite cache database (default: in-memory)
+            max_entries: Maximum rows kept on disk before LRU eviction
+            memory_entries: Maximum vectors kept in the in-memory hot tier
+            ttl_seconds: Time-to-live in seconds (default: 90 days)
+        """
+        super().__init__(cache_db_path, ttl_seconds, max_entries)
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._stats["memory_hits"] = 0
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        """Insert into the memory tier, evicting the least recently used entry."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Look up embeddings for several texts.
+
+        Args:
+            model_name: Embeddings model identifier
+            texts: Texts to look up
+
+        Returns:
+            One vector per text, or None where the text is not cached
+        """
+        keys = [embedding_cache_key(model_name, text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(keys)
+
+        with self._lock:
+            pending: List[int] = []
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    results[i] = vector
+                else:
+                    pending.append(i)
+
+            if pending:
+                found = self._get_payloads([keys[i] for i in pending])
+                vectors = {
+                    key: np.frombuffer(blob, dtype=np.float32).tolist() for key, blob in found.items()
+                }
+                for key, vector in vectors.items():
+                    self._remember(key, vector)
+                for i in pending:
+                    results[i] = vectors.get(keys[i])
+
+        return results
+
+    def put_many(self, model_name: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """
+        Store embeddings for several texts.
+
+        Args:
+            model_name: Embeddings model identifier
+            texts: Embedded texts
+            vectors: Embeddings, aligned with texts
+        """
+        rows: List[Tuple[str, bytes, int, str]] = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = embedding_cache_key(model_name, text)
+                vector = list(vector)
+                self._remember(key, vector)
+                blob = np.asarray(vector, dtype=np.float32).tobytes()
+                rows.append((key, blob, len(text) // CHARS_PER_TOKEN, model_name))
+            self._put_payloads(rows)
+
+    def clear(self) -> None:
+        """Remove all cached embeddings."""
+        with self._lock:
+            self._memory.clear()
+            super().clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Hit/miss counters, hit rate and tier sizes
+        """
+        stats = super().get_stats()
+        with self._lock:
+            memory_entries = len(self._memory)
+        disk_hits = stats.pop("hits")
+        hits = stats["memory_hits"] + disk_hits
+        lookups = hits + stats["misses"]
+        stats.update({
+            "disk_hits": disk_hits,
+            "lookups": lookups,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": memory_entries,
+            "disk_entries": stats.pop("entries"),
+            "cache_db_path": self.cache_db_path,
+        })
+        return stats
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves repeated texts from an EmbeddingCache."""
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model_name: Optional[str] = None):
+        """
+        Initialize cached embeddings.
+
+        Args:
+            embeddings: Underlying embeddings model
+            cache: Embedding cache to read through
+            model_name: Cache namespace (defaults to the model's configured name)
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_name = model_name or self._resolve_model_name(embeddings)
+
+    @staticmethod
+    def _resolve_model_name(embeddings: Embeddings) -> str:
+        for attr in ("model", "model_name", "repo_id"):
+            value = getattr(embeddings, attr, None)
+            if isinstance(value, str) and value:
+                return value
+        return type(embeddings).__name__
+
+    def __getattr__(self, name):
+        # Expose attributes of the wrapped model (e.g. model, client)
+        if name == "embeddings":
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+    def _split(self, texts: List[str]) -> Tuple[List[Optional[List[float]]], List[str]]:
+        cached = self.cache.get_many(self.model_name, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        return cached, missing
+
+    @staticmethod
+    def _merge(texts: List[str], cached: List[Optional[List[float]]], missing: List[str], computed) -> List[List[float]]:
+        by_text = dict(zip(missing, computed))
+        return [vector if vector is not None else by_text[text] for text, vector in zip(texts, cached)]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, calling the model once for the uncached ones."""
+        cached, missing = self._split(texts)
+        computed = self.embeddings.embed_documents(missing) if missing else []
+        if missing:
+            self.cache.put_many(self.model_name, missing, computed)
+        return self._merge(texts, cached, missing, computed)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single text, serving it from the cache when possible."""
+        (vector,) = self.cache.get_many(self.model_name, [text])
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put_many(self.model_name, [text], [vector])
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Async variant of embed_documents."""
+        cached, missing = self._split(texts)
+        computed = await self.embeddings.aembed_documents(missing) if missing else []
+        if missing:
+            self.cache.put_many(self.model_name, missing, computed)
+        return self._merge(texts, cached, missing, computed)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Async variant of embed_query."""
+        (vector,) = self.cache.get_many(self.model_name, [text])
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            self.cache.put_many(self.model_name, [text], [vector])
+        return vector
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the global embedding cache instance."""
+    global _cache_instance
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                from app.core.config import settings
+                _cache_instance = EmbeddingCache(
+                    cache_db_path=settings.EMBEDDING_CACHE_PATH,
+                    max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+                    memory_entries=settings.EMBEDDING_CACHE_MEMORY_ENTRIES,
+                    ttl_seconds=settings.EMBEDDING_CACHE_TTL
+                )
+    return _cache_instance
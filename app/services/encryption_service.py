@@ -8,12 +8,16 @@ This service provides encryption/decryption functionality for:
 Uses Fernet (symmetric encryption) for application-level encryption.
 """
 
+import hashlib
+import hmac
 import logging
 import os
+import re
 from pathlib import Path
-from typing import Optional, Union, Dict, Any
+from typing import Callable, Optional, Union, Dict, Any
 from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.backends import default_backend
 import base64
@@ -281,8 +285,102 @@ class EncryptionService:
             raise ValueError(f"Failed to decrypt file: {e}")
 
 
+def _normalize_email(value: str) -> str:
+    return value.strip().lower()
+
+
+def _normalize_name(value: str) -> str:
+    return re.sub(r"\s+", " ", value).strip().casefold()
+
+
+def _normalize_identifier(value: str) -> str:
+    return re.sub(r"\s+", "", value).upper()
+
+
+# Blind-index normalizers: equal values after normalization produce equal digests
+BLIND_INDEX_NORMALIZERS: Dict[str, Callable[[str], str]] = {
+    "email": _normalize_email,
+    "name": _normalize_name,
+    "identifier": _normalize_identifier,
+    "exact": lambda value: value,
+}
+
+# Fallback key so blind indexes stay stable in development without any keys configured
+_DEV_BLIND_INDEX_SECRET = b"creditnexus-development-blind-index"
+
+
+class BlindIndexService:
+    """
+    Keyed HMAC-SHA256 blind indexes for equality search on encrypted columns.
+    
+    Fernet encryption is randomized, so ciphertexts cannot be compared in SQL.
+    A blind index stores HMAC(key, normalize(plaintext)) next to the encrypted
+    value; lookups compute the same digest and hit a regular B-tree index.
+    
+    Each column uses its own context string, which is mixed into the key via
+    HKDF so digests cannot be correlated across columns.
+    """
+
+    def __init__(self, secret: Optional[bytes] = None):
+        """
+        Initialize blind index service.
+        
+        Args:
+            secret: Optional root secret (defaults to BLIND_INDEX_KEY, then ENCRYPTION_KEY)
+        """
+        self._secret = secret or self._resolve_secret()
+        self._context_keys: Dict[str, bytes] = {}
+
+    @staticmethod
+    def _resolve_secret() -> bytes:
+        """Pick the root secret from configuration."""
+        for configured in (settings.BLIND_INDEX_KEY, settings.ENCRYPTION_KEY):
+            if configured:
+                value = configured.get_secret_value() if hasattr(configured, "get_secret_value") else configured
+                if value:
+                    return value.encode() if isinstance(value, str) else value
+        
+        logger.warning(
+            "Neither BLIND_INDEX_KEY nor ENCRYPTION_KEY is set; using a development blind-index key. "
+            "Set BLIND_INDEX_KEY in production and re-run scripts/backfill_blind_indexes.py."
+        )
+        return _DEV_BLIND_INDEX_SECRET
+
+    def _key_for(self, context: str) -> bytes:
+        """Derive (and memoize) the per-column HMAC key."""
+        key = self._context_keys.get(context)
+        if key is None:
+            key = HKDF(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=None,
+                info=f"creditnexus-blind-index:{context}".encode(),
+                backend=default_backend()
+            ).derive(self._secret)
+            self._context_keys[context] = key
+        return key
+
+    def compute(self, value: Optional[str], context: str, normalizer: str = "exact") -> Optional[str]:
+        """
+        Compute the blind index of a plaintext value.
+        
+        Args:
+            value: Plaintext value (None yields None)
+            context: Column identifier, e.g. "users.email"
+            normalizer: Key into BLIND_INDEX_NORMALIZERS
+            
+        Returns:
+            64-character hex digest, or None if value is None
+        """
+        if value is None:
+            return None
+        normalized = BLIND_INDEX_NORMALIZERS[normalizer](str(value))
+        return hmac.new(self._key_for(context), normalized.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
 # Global encryption service instance
 _encryption_service: Optional[EncryptionService] = None
+_blind_index_service: Optional[BlindIndexService] = None
 
 
 def get_encryption_service() -> EncryptionService:
@@ -298,7 +396,21 @@ def get_encryption_service() -> EncryptionService:
     return _encryption_service
 
 
+def get_blind_index_service() -> BlindIndexService:
+    """
+    Get or create the global blind index service instance.
+    
+    Returns:
+        BlindIndexService instance
+    """
+    global _blind_index_service
+    if _blind_index_service is None:
+        _blind_index_service = BlindIndexService()
+    return _blind_index_service
+
+
 def reset_encryption_service():
-    """Reset the global encryption service instance (for testing)."""
-    global _encryption_service
+    """Reset the global encryption and blind index service instances (for testing)."""
+    global _encryption_service, _blind_index_service
     _encryption_service = None
+    _blind_index_service = None
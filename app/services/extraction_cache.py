@@ -0,0 +1,116 @@
+"""
+Chunk-level extraction result cache for CreditNexus.
+
+Caches structured LLM extraction results (e.g. PartialCreditAgreement for one
+article) keyed by (namespace, prompt version, model, sha256 of chunk text), so
+re-extracting a corrected agreement only sends the changed articles to the
+LLM. Storage, TTL expiry and LRU eviction come from app.core.sqlite_cache.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from app.core.sqlite_cache import SQLiteCache
+
+logger = logging.getLogger(__name__)
+
+# Global cache instance
+_cache_instance: Optional['ExtractionCache'] = None
+_cache_lock = threading.Lock()
+
+# Rough characters-per-token ratio used to estimate tokens saved by cache hits
+CHARS_PER_TOKEN = 4
+
+
+def prompt_version(*parts: Any) -> str:
+    """Derive a short, stable version id from prompt text, schemas, etc."""
+    payload = json.dumps([str(part) for part in parts], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def current_model_id() -> str:
+    """Identifier of the configured chat model (provider/model)."""
+    from app.core.config import settings
+    provider = settings.LLM_PROVIDER.value if hasattr(settings.LLM_PROVIDER, "value") else settings.LLM_PROVIDER
+    return f"{provider}/{settings.LLM_MODEL}"
+
+
+class ExtractionCache(SQLiteCache):
+    """Cache service for chunk extraction results using SQLite."""
+
+    table = "extraction_cache"
+    payload_column = "result"
+    extra_columns = ("namespace",)
+    index_prefix = "extraction"
+
+    def __init__(
+        self,
+        cache_db_path: Optional[str] = None,
+        ttl_seconds: int = 30 * 86400,
+        max_entries: int = 50_000
+    ):
+        """
+        Initialize extraction cache.
+
+        Args:
+            cache_db_path: Path to SQLite cache database (default: in-memory)
+            ttl_seconds: Time-to-live in seconds (default: 30 days)
+            max_entries: Maximum cached results before LRU eviction
+        """
+        super().__init__(cache_db_path, ttl_seconds, max_entries)
+
+    @staticmethod
+    def _make_key(namespace: str, version: str, model: str, text: str) -> str:
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{namespace}|{version}|{model}|{text_hash}".encode("utf-8")).hexdigest()
+
+    def get(self, namespace: str, version: str, model: str, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached extraction result.
+
+        Args:
+            namespace: Extraction kind (e.g. "map_reduce.partial")
+            version: Prompt version (see prompt_version())
+            model: Model identifier (see current_model_id())
+            text: Chunk text that was extracted
+
+        Returns:
+            Cached JSON-serializable result, or None on a miss
+        """
+        result = self._get_payload(self._make_key(namespace, version, model, text))
+        return None if result is None else json.loads(result)
+
+    def set(self, namespace: str, version: str, model: str, text: str, result: Dict[str, Any]) -> None:
+        """
+        Store an extraction result.
+
+        Args:
+            namespace: Extraction kind (e.g. "map_reduce.partial")
+            version: Prompt version (see prompt_version())
+            model: Model identifier (see current_model_id())
+            text: Chunk text that was extracted
+            result: JSON-serializable extraction result
+        """
+        payload = json.dumps(result, default=str)
+        tokens = (len(text) + len(payload)) // CHARS_PER_TOKEN
+        self._put_payload(self._make_key(namespace, version, model, text), payload, tokens, namespace)
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """Get or create the global extraction cache instance (None if disabled)."""
+    global _cache_instance
+    from app.core.config import settings
+    if not settings.EXTRACTION_CACHE_ENABLED:
+        return None
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = ExtractionCache(
+                    cache_db_path=settings.EXTRACTION_CACHE_PATH,
+                    ttl_seconds=settings.EXTRACTION_CACHE_TTL,
+                    max_entries=settings.EXTRACTION_CACHE_MAX_ENTRIES
+                )
+    return _cache_instance
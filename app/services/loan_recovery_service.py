@@ -13,11 +13,12 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 from decimal import Decimal
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import and_, or_, cast, update, String
 
 from app.db.models import (
     LoanDefault, RecoveryAction, BorrowerContact, Deal, LoanAsset, 
-    PaymentEvent, User
+    PaymentEvent, User, DetectionCheckpoint
 )
 from app.models.cdm_events import generate_cdm_loan_default, generate_cdm_recovery_action
 from app.services.twilio_service import TwilioService
@@ -25,6 +26,25 @@ from app.services.recovery_template_service import RecoveryTemplateService
 
 logger = logging.getLogger(__name__)
 
+# Payments are due this many days after creation (no PaymentSchedule table yet)
+PAYMENT_DUE_DAYS = 30
+# Rows fetched per round trip while streaming detection results
+DETECTION_FETCH_SIZE = 10_000
+ACTIVE_DEFAULT_STATUSES = ("open", "in_recovery")
+PAYMENT_DEFAULT_CHECKPOINT = "payment_defaults"
+COVENANT_BREACH_CHECKPOINT = "covenant_breaches"
+
+
+def _payment_default_severity(days_past_due: int) -> str:
+    """Determine severity based on days past due."""
+    if days_past_due <= 7:
+        return "low"
+    elif days_past_due <= 30:
+        return "medium"
+    elif days_past_due <= 60:
+        return "high"
+    return "critical"
+
 
 class LoanRecoveryService:
     """Service for managing loan recovery workflows."""
@@ -40,194 +60,247 @@ class LoanRecoveryService:
         self.twilio_service = TwilioService()
         self.template_service = RecoveryTemplateService()
     
-    def detect_payment_defaults(self, deal_id: Optional[int] = None) -> List[LoanDefault]:
+    def _get_checkpoint(self, name: str) -> DetectionCheckpoint:
+        """Get (or create) the detection checkpoint with the given name."""
+        checkpoint = self.db.query(DetectionCheckpoint).filter(DetectionCheckpoint.name == name).first()
+        if not checkpoint:
+            checkpoint = DetectionCheckpoint(name=name, last_run_count=0)
+            self.db.add(checkpoint)
+        return checkpoint
+    
+    def _insert_defaults(self, rows: List[Dict[str, Any]]) -> List[LoanDefault]:
+        """
+        Insert LoanDefault rows in one batch, then attach their CDM events in one pass.
+        
+        Args:
+            rows: LoanDefault column values, plus an optional cdm_default_reason
+            
+        Returns:
+            Inserted LoanDefault records
+        """
+        defaults = [
+            LoanDefault(**{k: v for k, v in row.items() if not k.startswith("cdm_")}, status="open")
+            for row in rows
+        ]
+        self.db.add_all(defaults)
+        self.db.flush()  # Batched INSERT ... RETURNING assigns the IDs
+        
+        events = [
+            [
+                generate_cdm_loan_default(
+                    default_id=str(loan_default.id),
+                    loan_id=loan_default.loan_id,
+                    deal_id=str(loan_default.deal_id) if loan_default.deal_id else None,
+                    default_type=loan_default.default_type,
+                    default_date=loan_default.default_date,
+                    amount_overdue=float(loan_default.amount_overdue) if loan_default.amount_overdue is not None else None,
+                    days_past_due=loan_default.days_past_due,
+                    severity=loan_default.severity,
+                    default_reason=row.get("cdm_default_reason")
+                )
+            ]
+            for loan_default, row in zip(defaults, rows)
+        ]
+        if defaults:
+            # One bulk UPDATE by primary key instead of one unit-of-work UPDATE per default
+            self.db.execute(
+                update(LoanDefault),
+                [{"id": d.id, "cdm_events": e} for d, e in zip(defaults, events)]
+            )
+            for loan_default, cdm_events in zip(defaults, events):
+                set_committed_value(loan_default, "cdm_events", cdm_events)
+        return defaults
+    
+    def detect_payment_defaults(
+        self,
+        deal_id: Optional[int] = None,
+        incremental: bool = False
+    ) -> List[LoanDefault]:
         """
         Detect payment defaults from overdue PaymentEvent records.
         
+        Runs a single anti-join: pending payments past due with no open or
+        in-recovery payment default for the same deal/loan. Incremental runs
+        only scan payments that became due or changed since the last run.
+        
         Args:
             deal_id: Optional deal ID to filter by
+            incremental: Only scan payments since the payment_defaults checkpoint
+                (ignored when deal_id is given)
             
         Returns:
             List of detected LoanDefault records
         """
-        defaults = []
         now = datetime.utcnow()
+        # PaymentEvent doesn't have scheduled_date: payments are due PAYMENT_DUE_DAYS
+        # after creation. In production, use a PaymentSchedule table.
+        # A payment defaults once it is at least one full day past due.
+        overdue_window = timedelta(days=PAYMENT_DUE_DAYS + 1)
+        
+        active_default = (
+            self.db.query(LoanDefault.id)
+            .filter(
+                LoanDefault.default_type == "payment_default",
+                LoanDefault.status.in_(ACTIVE_DEFAULT_STATUSES),
+                LoanDefault.deal_id.is_not_distinct_from(PaymentEvent.related_deal_id),
+                or_(
+                    PaymentEvent.related_loan_id.is_(None),
+                    LoanDefault.loan_id == cast(PaymentEvent.related_loan_id, String)
+                )
+            )
+            .exists()
+        )
+        query = self.db.query(
+            PaymentEvent.id,
+            PaymentEvent.related_deal_id,
+            PaymentEvent.related_loan_id,
+            PaymentEvent.payment_type,
+            PaymentEvent.amount,
+            PaymentEvent.created_at
+        ).filter(
+            PaymentEvent.payment_status == "pending",
+            PaymentEvent.created_at <= now - overdue_window,
+            ~active_default
+        )
         
+        checkpoint = None
+        if deal_id:
+            query = query.filter(PaymentEvent.related_deal_id == deal_id)
+        elif incremental:
+            checkpoint = self._get_checkpoint(PAYMENT_DEFAULT_CHECKPOINT)
+            if checkpoint.high_water_mark:
+                # Became due since the last run, or changed (e.g. back to pending) since it
+                since = checkpoint.high_water_mark
+                query = query.filter(or_(
+                    PaymentEvent.created_at > since - overdue_window,
+                    PaymentEvent.updated_at > since
+                ))
+        
+        rows = []
+        deals_with_default, loans_with_default = set(), set()
         try:
-            # Query PaymentEvent for pending payments that are overdue
-            # Note: PaymentEvent doesn't have scheduled_date, so we'll use created_at + expected_days
-            # In production, you'd have a PaymentSchedule table with scheduled_date
-            query = self.db.query(PaymentEvent).filter(
-                PaymentEvent.payment_status == "pending"
-            )
-            
-            if deal_id:
-                query = query.filter(PaymentEvent.related_deal_id == deal_id)
-            
-            pending_payments = query.all()
-            logger.info(f"Found {len(pending_payments)} pending payments for deal_id={deal_id}")
+            for payment in query.order_by(PaymentEvent.id).yield_per(DETECTION_FETCH_SIZE):
+                loan_id = str(payment.related_loan_id) if payment.related_loan_id else None
+                # One active default per deal/loan, as if each default were
+                # visible to the payments after it
+                if (payment.related_deal_id, loan_id) in loans_with_default:
+                    continue
+                if loan_id is None and payment.related_deal_id in deals_with_default:
+                    continue
+                deals_with_default.add(payment.related_deal_id)
+                loans_with_default.add((payment.related_deal_id, loan_id))
+                
+                payment_due_date = payment.created_at + timedelta(days=PAYMENT_DUE_DAYS)
+                days_past_due = (now - payment_due_date).days
+                rows.append({
+                    "loan_id": loan_id,
+                    "deal_id": payment.related_deal_id,
+                    "default_type": "payment_default",
+                    "default_date": payment_due_date,
+                    "default_reason": f"Payment overdue: {payment.payment_type}",
+                    "amount_overdue": payment.amount,
+                    "days_past_due": days_past_due,
+                    "severity": _payment_default_severity(days_past_due)
+                })
         except Exception as e:
             logger.error(f"Error querying PaymentEvent: {e}", exc_info=True)
             raise
         
-        for payment in pending_payments:
-            # Calculate days past due (assuming payment was due 30 days after creation)
-            # In production, use actual scheduled_date from PaymentSchedule
-            payment_due_date = payment.created_at + timedelta(days=30)
-            days_past_due = (now - payment_due_date).days
-            
-            if days_past_due > 0:
-                # Check if default already exists for this payment
-                query = self.db.query(LoanDefault).filter(
-                    LoanDefault.deal_id == payment.related_deal_id,
-                    LoanDefault.default_type == "payment_default",
-                    LoanDefault.status.in_(["open", "in_recovery"])
-                )
-                if payment.related_loan_id:
-                    query = query.filter(LoanDefault.loan_id == str(payment.related_loan_id))
-                existing_default = query.first()
-                
-                if not existing_default:
-                    # Determine severity based on days past due
-                    if days_past_due <= 7:
-                        severity = "low"
-                    elif days_past_due <= 30:
-                        severity = "medium"
-                    elif days_past_due <= 60:
-                        severity = "high"
-                    else:
-                        severity = "critical"
-                    
-                    # Create LoanDefault record
-                    loan_default = LoanDefault(
-                        loan_id=str(payment.related_loan_id) if payment.related_loan_id else None,
-                        deal_id=payment.related_deal_id,
-                        default_type="payment_default",
-                        default_date=payment_due_date,
-                        default_reason=f"Payment overdue: {payment.payment_type}",
-                        amount_overdue=payment.amount,
-                        days_past_due=days_past_due,
-                        severity=severity,
-                        status="open"
-                    )
-                    
-                    # Generate CDM event
-                    cdm_event = generate_cdm_loan_default(
-                        default_id=str(loan_default.id) if loan_default.id else f"default_{payment.id}",
-                        loan_id=str(payment.related_loan_id) if payment.related_loan_id else None,
-                        deal_id=str(payment.related_deal_id) if payment.related_deal_id else None,
-                        default_type="payment_default",
-                        default_date=payment_due_date,
-                        amount_overdue=float(payment.amount),
-                        days_past_due=days_past_due,
-                        severity=severity
-                    )
-                    
-                    loan_default.cdm_events = [cdm_event]
-                    
-                    self.db.add(loan_default)
-                    self.db.flush()  # Get the ID
-                    
-                    # Update default_id in CDM event
-                    cdm_event = generate_cdm_loan_default(
-                        default_id=str(loan_default.id),
-                        loan_id=str(payment.related_loan_id) if payment.related_loan_id else None,
-                        deal_id=str(payment.related_deal_id) if payment.related_deal_id else None,
-                        default_type="payment_default",
-                        default_date=payment_due_date,
-                        amount_overdue=float(payment.amount),
-                        days_past_due=days_past_due,
-                        severity=severity
-                    )
-                    loan_default.cdm_events = [cdm_event]
-                    
-                    defaults.append(loan_default)
-                    logger.info(f"Detected payment default: loan_id={loan_default.loan_id}, days_past_due={days_past_due}, severity={severity}")
-        
+        defaults = self._insert_defaults(rows)
+        if checkpoint is not None:
+            checkpoint.high_water_mark = now
+            checkpoint.last_run_count = len(defaults)
         self.db.commit()
+        
+        logger.info(
+            f"Detected {len(defaults)} payment defaults for deal_id={deal_id} "
+            f"({'incremental' if checkpoint is not None else 'full'} scan)"
+        )
         return defaults
     
-    def detect_covenant_breaches(self, deal_id: Optional[int] = None) -> List[LoanDefault]:
+    def detect_covenant_breaches(
+        self,
+        deal_id: Optional[int] = None,
+        incremental: bool = False
+    ) -> List[LoanDefault]:
         """
         Detect covenant breaches from LoanAsset records with BREACH status.
         
+        Runs a single anti-join: breached assets with no open or in-recovery
+        covenant breach recorded on or after their last verification.
+        
         Args:
             deal_id: Optional deal ID to filter by
+            incremental: Only scan assets verified since the covenant_breaches checkpoint
             
         Returns:
             List of detected LoanDefault records
         """
-        defaults = []
         now = datetime.utcnow()
         
-        # Query LoanAsset for BREACH status
-        query = self.db.query(LoanAsset).filter(
-            LoanAsset.risk_status == "BREACH"
+        current_breach = (
+            self.db.query(LoanDefault.id)
+            .filter(
+                LoanDefault.loan_id == LoanAsset.loan_id,
+                LoanDefault.default_type == "covenant_breach",
+                LoanDefault.status.in_(ACTIVE_DEFAULT_STATUSES),
+                or_(
+                    LoanAsset.last_verified_at.is_(None),
+                    LoanDefault.default_date >= LoanAsset.last_verified_at
+                )
+            )
+            .exists()
         )
-        
         # Note: LoanAsset doesn't have deal_id directly, so we'd need to join through deals
         # For now, check all breaches
-        breached_assets = query.all()
-        
-        for asset in breached_assets:
-            # Check if breach is new (compare last_verified_at with existing defaults)
-            existing_default = self.db.query(LoanDefault).filter(
-                LoanDefault.loan_id == asset.loan_id,
-                LoanDefault.default_type == "covenant_breach",
-                LoanDefault.status.in_(["open", "in_recovery"])
-            ).first()
-            
-            if not existing_default or (asset.last_verified_at and existing_default.default_date < asset.last_verified_at):
-                # Determine severity based on breach type (simplified)
-                severity = "high"  # Breaches are typically high severity
-                
-                # Create LoanDefault record
-                loan_default = LoanDefault(
-                    loan_id=asset.loan_id,
-                    deal_id=None,  # Would need to join to get deal_id
-                    default_type="covenant_breach",
-                    default_date=asset.last_verified_at or now,
-                    default_reason=f"Covenant breach detected: {asset.risk_status}",
-                    amount_overdue=None,
-                    days_past_due=0,
-                    severity=severity,
-                    status="open"
-                )
-                
-                # Generate CDM event
-                cdm_event = generate_cdm_loan_default(
-                    default_id=str(loan_default.id) if loan_default.id else f"breach_{asset.id}",
-                    loan_id=asset.loan_id,
-                    deal_id=None,
-                    default_type="covenant_breach",
-                    default_date=asset.last_verified_at or now,
-                    days_past_due=0,
-                    severity=severity,
-                    default_reason=f"Covenant breach: {asset.risk_status}"
-                )
-                
-                loan_default.cdm_events = [cdm_event]
-                
-                self.db.add(loan_default)
-                self.db.flush()
-                
-                # Update with actual ID
-                cdm_event = generate_cdm_loan_default(
-                    default_id=str(loan_default.id),
-                    loan_id=asset.loan_id,
-                    deal_id=None,
-                    default_type="covenant_breach",
-                    default_date=asset.last_verified_at or now,
-                    days_past_due=0,
-                    severity=severity,
-                    default_reason=f"Covenant breach: {asset.risk_status}"
-                )
-                loan_default.cdm_events = [cdm_event]
-                
-                defaults.append(loan_default)
-                logger.info(f"Detected covenant breach: loan_id={asset.loan_id}, severity={severity}")
+        query = self.db.query(
+            LoanAsset.loan_id,
+            LoanAsset.risk_status,
+            LoanAsset.last_verified_at
+        ).filter(
+            LoanAsset.risk_status == "BREACH",
+            ~current_breach
+        )
         
+        checkpoint = None
+        if incremental:
+            checkpoint = self._get_checkpoint(COVENANT_BREACH_CHECKPOINT)
+            if checkpoint.high_water_mark:
+                query = query.filter(or_(
+                    LoanAsset.last_verified_at.is_(None),
+                    LoanAsset.last_verified_at > checkpoint.high_water_mark
+                ))
+        
+        rows = []
+        seen_loans = set()
+        # Latest verification first, so it wins when several assets share a loan_id
+        ordered = query.order_by(LoanAsset.last_verified_at.desc(), LoanAsset.id)
+        for asset in ordered.yield_per(DETECTION_FETCH_SIZE):
+            if asset.loan_id in seen_loans:
+                continue
+            seen_loans.add(asset.loan_id)
+            rows.append({
+                "loan_id": asset.loan_id,
+                "deal_id": None,  # Would need to join to get deal_id
+                "default_type": "covenant_breach",
+                "default_date": asset.last_verified_at or now,
+                "default_reason": f"Covenant breach detected: {asset.risk_status}",
+                "amount_overdue": None,
+                "days_past_due": 0,
+                "severity": "high",  # Breaches are typically high severity
+                "cdm_default_reason": f"Covenant breach: {asset.risk_status}"
+            })
+        
+        defaults = self._insert_defaults(rows)
+        if checkpoint is not None:
+            checkpoint.high_water_mark = now
+            checkpoint.last_run_count = len(defaults)
         self.db.commit()
+        
+        logger.info(
+            f"Detected {len(defaults)} covenant breaches "
+            f"({'incremental' if checkpoint is not None else 'full'} scan)"
+        )
         return defaults
     
     def get_active_defaults(
@@ -420,7 +493,7 @@ class LoanRecoveryService:
                 result = self.twilio_service.send_sms(
                     to_phone=action.recipient_phone,
                     message=action.message_content,
-                    status_callback=action.metadata.get("status_callback") if action.metadata else None
+                    status_callback=action.action_metadata.get("status_callback") if action.action_metadata else None
                 )
                 
                 if result["status"] == "sent":
@@ -438,7 +511,7 @@ class LoanRecoveryService:
                 result = self.twilio_service.make_voice_call(
                     to_phone=action.recipient_phone,
                     message=action.message_content,
-                    status_callback=action.metadata.get("status_callback") if action.metadata else None
+                    status_callback=action.action_metadata.get("status_callback") if action.action_metadata else None
                 )
                 
                 if result["status"] in ["queued", "ringing", "in-progress"]:
@@ -470,9 +543,7 @@ class LoanRecoveryService:
             )
             
             # Store CDM event in action metadata
-            if not action.metadata:
-                action.metadata = {}
-            action.metadata["cdm_event"] = cdm_event
+            action.action_metadata = {**(action.action_metadata or {}), "cdm_event": cdm_event}
             
             # Update loan default status
             if loan_default.status == "open":
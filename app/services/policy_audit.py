@@ -7,11 +7,12 @@ and compliance reporting.
 
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, insert
 
 from app.db.models import PolicyDecision as PolicyDecisionModel
+from app.models.cdm_events import generate_cdm_policy_evaluation
 from app.services.policy_service import PolicyDecision
 
 logger = logging.getLogger(__name__)
@@ -82,6 +83,79 @@ def log_policy_decision(
         raise
 
 
+def log_policy_decisions_batch(
+    db: Session,
+    entries: List[Tuple[PolicyDecision, str, str]],
+    user_id: Optional[int] = None,
+    include_cdm_events: bool = True,
+    chunk_size: int = 1000
+) -> int:
+    """
+    Bulk-insert policy decisions to the audit trail in one transaction.
+    
+    Rows are written with multi-row INSERTs of ``chunk_size`` and committed
+    once, so either the whole batch is recorded or none of it is.
+    ``document_id``, ``loan_asset_id`` and ``deal_id`` are taken from each
+    decision's metadata when present.
+    
+    Args:
+        db: Database session
+        entries: (policy_decision, transaction_id, transaction_type) tuples
+        user_id: Optional user ID recorded on every row
+        include_cdm_events: Attach a CDM PolicyEvaluation event to each row
+        chunk_size: Rows per INSERT statement
+        
+    Returns:
+        Number of rows inserted
+    """
+    if not entries:
+        return 0
+    
+    try:
+        inserted = 0
+        for start in range(0, len(entries), chunk_size):
+            rows = []
+            for policy_decision, transaction_id, transaction_type in entries[start:start + chunk_size]:
+                metadata = policy_decision.metadata or {}
+                cdm_events = []
+                if include_cdm_events:
+                    cdm_events.append(generate_cdm_policy_evaluation(
+                        transaction_id=transaction_id,
+                        transaction_type=transaction_type,
+                        decision=policy_decision.decision,
+                        rule_applied=policy_decision.rule_applied,
+                        evaluation_trace=policy_decision.trace,
+                        matched_rules=policy_decision.matched_rules
+                    ))
+                rows.append({
+                    "transaction_id": transaction_id,
+                    "transaction_type": transaction_type,
+                    "decision": policy_decision.decision,
+                    "rule_applied": policy_decision.rule_applied,
+                    "trace_id": policy_decision.trace_id,
+                    "trace": policy_decision.trace,
+                    "matched_rules": policy_decision.matched_rules,
+                    "additional_metadata": metadata,
+                    "cdm_events": cdm_events,
+                    "document_id": metadata.get("document_id"),
+                    "loan_asset_id": metadata.get("loan_asset_id"),
+                    "deal_id": metadata.get("deal_id"),
+                    "user_id": user_id,
+                    "created_at": datetime.utcnow()
+                })
+            db.execute(insert(PolicyDecisionModel), rows)
+            inserted += len(rows)
+        
+        db.commit()
+        logger.info(f"Policy decisions logged in batch: {inserted} row(s)")
+        return inserted
+        
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to log policy decision batch: {e}", exc_info=True)
+        raise
+
+
 def get_policy_decisions(
     db: Session,
     transaction_id: Optional[str] = None,
@@ -7,20 +7,28 @@ through a vendor-agnostic interface.
 """
 
 import logging
-from typing import Optional
+import threading
+from typing import Dict, Optional
 from pathlib import Path
 
 from app.services.policy_engine_interface import PolicyEngineInterface, MockPolicyEngine
+from app.services.compiled_policy_engine import CompiledPolicyEngine
 
 logger = logging.getLogger(__name__)
 
+# Process-wide engines keyed by vendor; rules are compiled once and shared
+_shared_engines: Dict[str, PolicyEngineInterface] = {}
+_shared_engines_lock = threading.Lock()
+
 
 def get_policy_engine(vendor: Optional[str] = None) -> PolicyEngineInterface:
     """
-    Get a policy engine instance (convenience wrapper for create_policy_engine).
+    Get the shared policy engine instance for a vendor.
     
-    This function provides a consistent interface for obtaining policy engine
-    instances. It reads the vendor from environment configuration if not provided.
+    The first call creates the engine via create_policy_engine and loads the
+    configured YAML rules into it; later calls return the same instance, so
+    rules are compiled once per process rather than once per request.
+    It reads the vendor from environment configuration if not provided.
     
     Args:
         vendor: Policy engine vendor identifier (defaults to environment setting or "default")
@@ -37,7 +45,49 @@ def get_policy_engine(vendor: Optional[str] = None) -> PolicyEngineInterface:
             # If config not available, use default
             vendor = "default"
     
-    return create_policy_engine(vendor=vendor)
+    key = (vendor or "default").lower()
+    engine = _shared_engines.get(key)
+    if engine is not None:
+        return engine
+    
+    with _shared_engines_lock:
+        engine = _shared_engines.get(key)
+        if engine is None:
+            engine = create_policy_engine(vendor=vendor)
+            _load_configured_rules(engine)
+            _shared_engines[key] = engine
+    return engine
+
+
+def set_policy_engine(engine: PolicyEngineInterface, vendor: Optional[str] = None) -> None:
+    """
+    Register an already-initialized engine as the shared instance for a vendor.
+    
+    Used at application startup so get_policy_engine() returns the engine the
+    server loaded (and hot-reloads) instead of building a second one.
+    
+    Args:
+        engine: Policy engine with rules loaded
+        vendor: Policy engine vendor identifier (defaults to "default")
+    """
+    with _shared_engines_lock:
+        _shared_engines[(vendor or "default").lower()] = engine
+
+
+def _load_configured_rules(engine: PolicyEngineInterface) -> None:
+    """Load rules from the configured policy directory into an engine."""
+    try:
+        from app.core.config import settings
+        from app.core.policy_config import PolicyConfigLoader
+        
+        if not settings.POLICY_ENABLED:
+            return
+        rules_yaml = PolicyConfigLoader(settings).load_all_rules()
+    except Exception as e:
+        logger.error(f"Failed to load policy rules for shared engine: {e}")
+        return
+    
+    engine.load_rules(rules_yaml)
 
 
 def create_policy_engine(vendor: Optional[str] = None) -> PolicyEngineInterface:
@@ -45,7 +95,8 @@ def create_policy_engine(vendor: Optional[str] = None) -> PolicyEngineInterface:
     Create a policy engine instance based on vendor configuration.
     
     Supported vendors:
-    - "default" or None: MockPolicyEngine (for development/testing)
+    - "default" or None: CompiledPolicyEngine (in-process compiled rules)
+    - "mock": MockPolicyEngine (always ALLOW, for testing)
     - "aspasia": Aspasia policy engine (if available)
     - "custom": Custom policy engine implementation
     
@@ -63,7 +114,13 @@ def create_policy_engine(vendor: Optional[str] = None) -> PolicyEngineInterface:
     vendor_lower = vendor.lower()
     
     if vendor_lower == "default":
-        logger.info("Creating default (mock) policy engine")
+        logger.info("Creating default (compiled) policy engine")
+        # Registers the sanctions reference lists used by the bundled rules
+        import app.services.sanctions_screening  # noqa: F401
+        return CompiledPolicyEngine()
+    
+    elif vendor_lower == "mock":
+        logger.info("Creating mock policy engine")
         return MockPolicyEngine()
     
     elif vendor_lower == "aspasia":
@@ -80,7 +137,7 @@ def create_policy_engine(vendor: Optional[str] = None) -> PolicyEngineInterface:
     else:
         raise ValueError(
             f"Unsupported policy engine vendor: {vendor}. "
-            f"Supported vendors: 'default', 'aspasia', 'custom'"
+            f"Supported vendors: 'default', 'mock', 'aspasia', 'custom'"
         )
 
 
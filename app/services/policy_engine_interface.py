@@ -55,6 +55,25 @@ class PolicyEngineInterface(ABC):
         """
         pass
     
+    def evaluate_batch(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Evaluate many transactions against policy rules.
+        
+        Engines can override this to share work across transactions (e.g.
+        grouping by candidate rule set); the default evaluates one at a time.
+        
+        Args:
+            transactions: Policy transaction dictionaries (see evaluate)
+            
+        Returns:
+            List of decision dictionaries (see evaluate), in input order
+            
+        Raises:
+            ValueError: If any transaction structure is invalid
+            RuntimeError: If policy engine is not properly initialized
+        """
+        return [self.evaluate(transaction) for transaction in transactions]
+    
     @abstractmethod
     def load_rules(self, rules_yaml: str) -> None:
         """
@@ -21,6 +21,7 @@ from app.models.cdm import CreditAgreement
 from app.models.loan_asset import LoanAsset
 from app.models.cdm_events import generate_cdm_policy_evaluation
 from app.services.policy_engine_interface import PolicyEngineInterface
+from app.services.sanctions_screening import get_sanctions_screener
 from app.services.credit_risk_service import CreditRiskService
 from app.services.credit_risk_mapper import CreditRiskMapper
 
@@ -239,6 +240,141 @@ class PolicyService:
             metadata={"trade_id": trade_id}
         )
     
+    # Batch evaluation (portfolio-wide re-screening)
+    def evaluate_facility_creation_batch(
+        self,
+        credit_agreements: List[CreditAgreement],
+        document_ids: Optional[List[Optional[int]]] = None,
+        db: Optional[Session] = None,
+        user_id: Optional[int] = None
+    ) -> List[PolicyDecision]:
+        """
+        Evaluate many loan facilities in one engine call.
+        
+        Args:
+            credit_agreements: Extracted CDM CreditAgreements
+            document_ids: Optional document IDs, aligned with credit_agreements
+            db: Optional session; if given, decisions are bulk-inserted in one transaction
+            user_id: Optional user ID for the audit rows
+            
+        Returns:
+            PolicyDecisions in input order
+        """
+        document_ids = document_ids or [None] * len(credit_agreements)
+        transactions = [
+            self._cdm_to_policy_transaction(credit_agreement=ca, transaction_type="facility_creation")
+            for ca in credit_agreements
+        ]
+        return self._evaluate_batch(
+            transactions,
+            trace_prefixes=[f"facility_{doc_id}" if doc_id else "facility" for doc_id in document_ids],
+            metadatas=[{"document_id": doc_id} for doc_id in document_ids],
+            db=db,
+            user_id=user_id
+        )
+    
+    def evaluate_trade_execution_batch(
+        self,
+        cdm_events: List[Dict[str, Any]],
+        credit_agreement: Optional[CreditAgreement] = None,
+        db: Optional[Session] = None,
+        user_id: Optional[int] = None
+    ) -> List[PolicyDecision]:
+        """
+        Evaluate many CDM TradeExecution events in one engine call.
+        
+        Args:
+            cdm_events: CDM TradeExecution event dictionaries
+            credit_agreement: Optional source credit agreement
+            db: Optional session; if given, decisions are bulk-inserted in one transaction
+            user_id: Optional user ID for the audit rows
+            
+        Returns:
+            PolicyDecisions in input order
+        """
+        transactions = [
+            self._cdm_trade_event_to_policy_transaction(event, credit_agreement)
+            for event in cdm_events
+        ]
+        return self._evaluate_batch(
+            transactions,
+            trace_prefixes=[f"trade_{tx['transaction_id']}" for tx in transactions],
+            metadatas=[
+                {"cdm_event_type": "TradeExecution", "trade_id": tx["transaction_id"]}
+                for tx in transactions
+            ],
+            db=db,
+            user_id=user_id
+        )
+    
+    def evaluate_loan_asset_batch(
+        self,
+        loan_assets: List[LoanAsset],
+        db: Optional[Session] = None,
+        user_id: Optional[int] = None
+    ) -> List[PolicyDecision]:
+        """
+        Evaluate many loan assets in one engine call.
+        
+        Args:
+            loan_assets: LoanAsset model instances
+            db: Optional session; if given, decisions are bulk-inserted in one transaction
+            user_id: Optional user ID for the audit rows
+            
+        Returns:
+            PolicyDecisions in input order
+        """
+        transactions = [self._loan_asset_to_policy_transaction(asset) for asset in loan_assets]
+        return self._evaluate_batch(
+            transactions,
+            trace_prefixes=[f"asset_{asset.loan_id}" for asset in loan_assets],
+            metadatas=[
+                {"loan_asset_id": asset.id, "loan_id": asset.loan_id}
+                for asset in loan_assets
+            ],
+            db=db,
+            user_id=user_id
+        )
+    
+    def _evaluate_batch(
+        self,
+        transactions: List[Dict[str, Any]],
+        trace_prefixes: List[str],
+        metadatas: List[Dict[str, Any]],
+        db: Optional[Session] = None,
+        user_id: Optional[int] = None
+    ) -> List[PolicyDecision]:
+        """Run engine.evaluate_batch and optionally persist the decisions in bulk."""
+        results = self.engine.evaluate_batch(transactions)
+        
+        # One timestamp per batch; the position suffix keeps trace_ids unique
+        timestamp = datetime.utcnow().isoformat()
+        decisions = [
+            PolicyDecision(
+                decision=result["decision"],
+                rule_applied=result.get("rule"),
+                trace_id=f"{prefix}_{timestamp}_{i}",
+                trace=result.get("trace", []),
+                matched_rules=result.get("matched_rules", []),
+                metadata=metadata
+            )
+            for i, (result, prefix, metadata) in enumerate(zip(results, trace_prefixes, metadatas))
+        ]
+        
+        if db is not None:
+            from app.services.policy_audit import log_policy_decisions_batch
+            
+            log_policy_decisions_batch(
+                db,
+                [
+                    (decision, tx["transaction_id"], tx["transaction_type"])
+                    for decision, tx in zip(decisions, transactions)
+                ],
+                user_id=user_id
+            )
+        
+        return decisions
+    
     def evaluate_filing_requirements(
         self,
         credit_agreement: CreditAgreement,
@@ -905,7 +1041,66 @@ class PolicyService:
             Dictionary with validation results
         """
         return self.credit_risk_service.validate_collateral(collateral_data, facility_amount)
-    
+
+    def evaluate_stress_test_results(
+        self,
+        portfolio_id: str,
+        scenario_results: List[Dict[str, Any]],
+        capital: float,
+        stressed_rwa: List[float],
+        deal_ids: Optional[List[str]] = None
+    ) -> List[PolicyDecision]:
+        """
+        Evaluate simulated stress scenarios against the stress testing rules.
+
+        Each scenario is evaluated as a "stress_test" transaction. The
+        stressed capital ratio deducts the simulated Value at Risk at the
+        highest confidence level from capital, so the policy decision rests on
+        the Monte Carlo tail loss rather than the analytic expected loss.
+
+        Args:
+            portfolio_id: Identifier of the simulated portfolio (used in trace IDs)
+            scenario_results: CreditLossSimulator results, one per scenario
+            capital: Available capital before stress losses
+            stressed_rwa: RWA under each scenario, aligned with scenario_results
+            deal_ids: Deals making up the portfolio (recorded in decision metadata)
+
+        Returns:
+            PolicyDecisions in scenario order
+        """
+        transactions = []
+        for result, rwa in zip(scenario_results, stressed_rwa):
+            confidence = max(result["value_at_risk"], key=float)
+            value_at_risk = float(result["value_at_risk"][confidence])
+            exposure = result["total_exposure"]
+            transactions.append({
+                "transaction_id": f"{portfolio_id}_{result['scenario']}",
+                "transaction_type": "stress_test",
+                "portfolio_id": portfolio_id,
+                "portfolio_exposure": exposure,
+                "stress_test_completed": True,
+                "stress_test_scenario": result["scenario"],
+                "stress_test_scenario_count": len(scenario_results),
+                "stress_test_expected_loss": result["expected_loss"],
+                "stress_test_confidence_level": float(confidence),
+                "stress_test_value_at_risk": value_at_risk,
+                "stress_test_expected_shortfall": float(result["expected_shortfall"][confidence]),
+                "stress_test_loss_rate": value_at_risk / exposure if exposure > 0 else 0.0,
+                "stress_test_capital_ratio": (capital - value_at_risk) / rwa if rwa > 0 else 0.0,
+            })
+        return self._evaluate_batch(
+            transactions,
+            trace_prefixes=[f"stress_{tx['transaction_id']}" for tx in transactions],
+            metadatas=[
+                {"portfolio_id": portfolio_id,
+                 "deal_ids": deal_ids or [],
+                 "stress_test_scenario": tx["stress_test_scenario"],
+                 "stress_test_value_at_risk": tx["stress_test_value_at_risk"],
+                 "stress_test_capital_ratio": tx["stress_test_capital_ratio"]}
+                for tx in transactions
+            ]
+        )
+
     def _extract_rate_from_cdm(self, cdm_event: Dict[str, Any]) -> Optional[float]:
         """Extract interest rate from CDM event (helper method)."""
         try:
@@ -1559,6 +1754,15 @@ class PolicyService:
         # Convert profile to policy transaction format
         tx = self._profile_to_policy_transaction(profile, profile_type)
         
+        # Screen the profile subject against the sanctions lists (LEI and fuzzy name)
+        screener = get_sanctions_screener()
+        if profile_type == "business":
+            sanctions_hits = screener.screen_party(profile.get("business_name"), profile.get("business_lei"))
+        else:
+            sanctions_hits = screener.screen_party(profile.get("person_name"))
+        tx["sanctions_match"] = bool(sanctions_hits)
+        tx["sanctions_match_score"] = max((hit.score for hit in sanctions_hits), default=0.0)
+        
         # Evaluate using policy engine
         result = self.engine.evaluate(tx)
         
@@ -1577,7 +1781,8 @@ class PolicyService:
                 "deal_id": deal_id,
                 "individual_profile_id": individual_profile_id,
                 "business_profile_id": business_profile_id,
-                "profile_name": profile.get("person_name") or profile.get("business_name", "unknown")
+                "profile_name": profile.get("person_name") or profile.get("business_name", "unknown"),
+                "sanctions_hits": [hit.to_dict() for hit in sanctions_hits]
             }
         )
     
@@ -0,0 +1,132 @@
+"""
+Batched, off-loop reranking for WebSearchService.
+
+CrossEncoder ``predict`` is CPU/GPU bound; calling it on the event loop stalls
+every other request for the duration of the forward pass. ``RerankerWorker``
+collects (query, passage) pairs from concurrent searches for a short window,
+scores them in a single ``predict`` call on a worker thread (torch releases
+the GIL during inference), and hands each caller back its slice of scores.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Pair = Tuple[str, str]
+
+
+class RerankerWorker:
+    """
+    Micro-batching front end for a cross-encoder model.
+
+    Batches are flushed when the collection window elapses or once they hold
+    ``max_batch_pairs`` pairs, whichever comes first. Callers on any event
+    loop may share one worker.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        batch_window_ms: float = 5.0,
+        max_batch_pairs: int = 128,
+        max_workers: int = 1,
+        executor: Optional[ThreadPoolExecutor] = None
+    ):
+        """
+        Initialize the reranker worker.
+
+        Args:
+            model: Object with a ``predict(pairs) -> scores`` method (e.g. CrossEncoder)
+            batch_window_ms: How long to wait for more pairs before scoring
+            max_batch_pairs: Flush immediately once this many pairs are pending
+            max_workers: Threads running ``predict`` (ignored if executor is given)
+            executor: Optional executor to run predictions in
+        """
+        self.model = model
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_pairs = max_batch_pairs
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="reranker"
+        )
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[List[Pair], asyncio.Future]] = []
+        self._pending_pairs = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.batches = 0
+
+    async def score(self, pairs: Sequence[Pair]) -> List[float]:
+        """
+        Score (query, passage) pairs, batched with other concurrent callers.
+
+        Args:
+            pairs: Pairs to score
+
+        Returns:
+            One relevance score per pair, in input order
+        """
+        if not pairs:
+            return []
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            self._pending.append((list(pairs), future))
+            self._pending_pairs += len(pairs)
+            if self._pending_pairs >= self.max_batch_pairs:
+                batch = self._take_batch()
+            else:
+                batch = None
+                if self._timer is None:
+                    self._timer = loop.call_later(self.batch_window, self._flush)
+        if batch:
+            self._submit(batch)
+        return await future
+
+    def _take_batch(self) -> List[Tuple[List[Pair], asyncio.Future]]:
+        # Caller holds self._lock
+        batch, self._pending, self._pending_pairs = self._pending, [], 0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _flush(self) -> None:
+        with self._lock:
+            batch = self._take_batch()
+        if batch:
+            self._submit(batch)
+
+    def _submit(self, batch: List[Tuple[List[Pair], asyncio.Future]]) -> None:
+        pairs = [pair for request_pairs, _ in batch for pair in request_pairs]
+        self.batches += 1
+        logger.debug(f"Reranking {len(pairs)} pairs from {len(batch)} request(s)")
+        self._executor.submit(self.model.predict, pairs).add_done_callback(
+            lambda done: self._resolve(batch, done)
+        )
+
+    @staticmethod
+    def _resolve(batch: List[Tuple[List[Pair], asyncio.Future]], done: Future) -> None:
+        # Runs on the executor thread; futures are completed on their own loops
+        error = done.exception()
+        scores = None if error else [float(score) for score in done.result()]
+        offset = 0
+        for request_pairs, future in batch:
+            if error:
+                result = (future.set_exception, error)
+            else:
+                result = (future.set_result, scores[offset:offset + len(request_pairs)])
+                offset += len(request_pairs)
+            future.get_loop().call_soon_threadsafe(_settle, future, *result)
+
+    def shutdown(self) -> None:
+        """Stop the worker threads once in-flight batches finish."""
+        self._executor.shutdown(wait=False)
+
+
+def _settle(future: asyncio.Future, setter, value) -> None:
+    # The caller may have been cancelled while its batch was being scored
+    if not future.done():
+        setter(value)
@@ -0,0 +1,884 @@
+"""
+Sanctions and high-risk-jurisdiction screening for CreditNexus.
+
+Loads local list files (``SANCTIONS_LISTS_DIR``) into an in-memory index:
+
+- Listed LEIs go into a hash map for exact lookups.
+- Listed names and aliases are normalized (case, accents, punctuation, legal
+  form suffixes such as LTD/LLC/PLC, word order) into an exact-name map and
+  an inverted index of phonetic token codes and token-code bigrams. Fuzzy
+  party-name matching only scores the handful of entries that share the
+  query's rarest keys, so lookups stay fast on lists with millions of names.
+- Sanctioned and high-risk jurisdictions go into normalized sets.
+
+Supported list files:
+
+- ``*.csv`` with a header. Entity lists have a name column (``name``,
+  ``sdn_name``, ``entity_name``, ``full_name`` or ``whole_name``) plus
+  optional ``lei``, ``aliases`` (``;``-separated), ``id``, ``list``/``program``,
+  ``type`` and ``country`` columns. Files without a name column but with a
+  ``jurisdiction``/``country``/``code`` column are jurisdiction lists. Their
+  optional ``category`` column holds ``sanctioned`` or ``high_risk``; without
+  it, a file whose name contains "high_risk" is a high-risk list and any other
+  file is a sanctioned list.
+- Headerless ``*.csv`` in the OFAC SDN layout (ent_num, name, type, program, ...)
+- ``*.xml`` UN consolidated lists (INDIVIDUAL/ENTITY) and EU financial
+  sanctions exports (sanctionEntity/nameAlias)
+
+Every load builds a new immutable SanctionsIndex and swaps it in atomically,
+so screening calls in flight finish against the snapshot they started with.
+"""
+
+import csv
+import difflib
+import itertools
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+import xml.etree.ElementTree as ET
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from app.services.compiled_policy_engine import register_reference_list
+
+logger = logging.getLogger(__name__)
+
+# Global screener instance
+_screener_instance: Optional['SanctionsScreener'] = None
+_screener_lock = threading.Lock()
+
+# Placeholder values policy rules use with the "in" operator to reference the lists
+SANCTIONED_LEI_LIST = "SANCTIONED_LEI_LIST"
+SANCTIONED_NAMES_LIST = "SANCTIONED_NAMES_LIST"
+SANCTIONED_COUNTRIES_LIST = "SANCTIONED_COUNTRIES_LIST"
+HIGH_RISK_JURISDICTIONS_LIST = "HIGH_RISK_JURISDICTIONS_LIST"
+REFERENCE_LISTS = frozenset({
+    SANCTIONED_LEI_LIST, SANCTIONED_NAMES_LIST, SANCTIONED_COUNTRIES_LIST, HIGH_RISK_JURISDICTIONS_LIST,
+})
+
+DEFAULT_NAME_MATCH_THRESHOLD = 0.85
+# Whole-name similarity a candidate needs (threshold minus this) before token scoring
+PREFILTER_MARGIN = 0.1
+# Minimum similarity of two tokens with the same phonetic code (MOHAMMED / MUHAMMAD)
+PHONETIC_MATCH_SCORE = 0.8
+
+# Candidates that share the most index keys with a query are scored in full
+MAX_SCORED_CANDIDATES = 12
+# Stop collecting candidates before reading more than this many postings, so a
+# very common token (e.g. BANK) cannot turn a lookup into a list scan
+MAX_CANDIDATE_POSTINGS = 2000
+
+# Legal form and filler tokens dropped before matching
+_IGNORED_TOKENS = frozenset({
+    "THE", "AND", "OF", "LTD", "LIMITED", "LLC", "LLP", "LP", "INC", "INCORPORATED", "CORP", "CORPORATION",
+    "CO", "COMPANY", "PLC", "SA", "SAS", "SARL", "AG", "GMBH", "BV", "NV", "SPA", "SRL", "JSC", "PJSC",
+    "OJSC", "CJSC", "OOO", "OAO", "ZAO", "PTE", "PTY", "AB", "AS", "OY", "KG", "SE", "HOLDING", "HOLDINGS",
+})
+_NON_ALNUM = re.compile(r"[^A-Z0-9]+")
+_SOUNDEX_CODES = {
+    **dict.fromkeys("BFPV", "1"), **dict.fromkeys("CGJKQSXZ", "2"), **dict.fromkeys("DT", "3"),
+    "L": "4", **dict.fromkeys("MN", "5"), "R": "6",
+}
+
+_NAME_COLUMNS = ("name", "sdn_name", "entity_name", "full_name", "whole_name")
+_JURISDICTION_COLUMNS = ("jurisdiction", "country", "country_name", "code", "country_code", "iso2", "iso3")
+_COLUMN_ALIASES = {
+    "lei": ("lei", "lei_code"),
+    "aliases": ("aliases", "alias", "aka"),
+    "entry_id": ("id", "uid", "ent_num", "entry_id", "reference"),
+    "list_name": ("list", "list_name", "program", "programme", "source"),
+    "entry_type": ("type", "sdn_type", "entity_type"),
+    "country": ("country", "jurisdiction", "nationality", "country_code"),
+    "category": ("category", "risk", "status", "list_type"),
+}
+
+
+@dataclass(frozen=True)
+class SanctionsEntry:
+    """A listed person or entity."""
+    entry_id: str
+    name: str
+    list_name: str
+    lei: Optional[str] = None
+    aliases: Tuple[str, ...] = ()
+    entry_type: Optional[str] = None
+    country: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ScreeningHit:
+    """A list entry matched by a screening query."""
+    entry_id: str
+    name: str  # Listed name or alias that matched
+    list_name: str
+    score: float  # 1.0 for LEI and exact (normalized) name matches
+    match_type: str  # "lei", "exact_name" or "fuzzy_name"
+    query: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "entry_id": self.entry_id,
+            "name": self.name,
+            "list_name": self.list_name,
+            "score": round(self.score, 4),
+            "match_type": self.match_type,
+            "query": self.query,
+        }
+
+
+def normalize_name(name: str) -> Tuple[str, ...]:
+    """
+    Normalize a party name into sorted match tokens.
+
+    Args:
+        name: Party or listed name (e.g., "ACME Trading Co., Ltd.")
+
+    Returns:
+        Sorted tokens with accents, punctuation and legal forms removed
+        (e.g., ("ACME", "TRADING"))
+    """
+    folded = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").upper()
+    # Dotted abbreviations ("S.A.", "N.V.") collapse into one token
+    tokens = [t for t in _NON_ALNUM.split(folded.replace(".", "")) if t and t not in _IGNORED_TOKENS]
+    return tuple(sorted(tokens))
+
+
+def normalize_lei(lei: Optional[str]) -> Optional[str]:
+    """Normalize an LEI the way the CDM Party validator does (uppercase alphanumerics)."""
+    if not lei:
+        return None
+    return "".join(c for c in str(lei).upper() if c.isalnum()) or None
+
+
+def normalize_jurisdiction(jurisdiction: Optional[str]) -> Optional[str]:
+    """Normalize a jurisdiction name or code for set membership."""
+    if not jurisdiction:
+        return None
+    folded = unicodedata.normalize("NFKD", str(jurisdiction)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(_NON_ALNUM.split(folded.upper())).strip() or None
+
+
+def phonetic_code(token: str) -> str:
+    """
+    Soundex code of a token; digits-only tokens are returned unchanged.
+
+    Args:
+        token: Uppercase name token
+
+    Returns:
+        Four-character code (e.g., "MOHAMMED" and "MUHAMMAD" -> "M530")
+    """
+    if token.isdigit():
+        return token
+    first = token[0]
+    code = first
+    previous = _SOUNDEX_CODES.get(first, "")
+    for char in token[1:]:
+        digit = _SOUNDEX_CODES.get(char, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if char not in "HW":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def _index_keys(tokens: Tuple[str, ...]) -> List[str]:
+    """Phonetic unigram and bigram keys for a normalized name."""
+    codes = sorted(set(phonetic_code(t) for t in tokens))
+    return codes + [f"{a} {b}" for a, b in zip(codes, codes[1:])]
+
+
+class SanctionsIndex:
+    """
+    Immutable screening snapshot built from list entries.
+
+    Build instances directly from entries or with load_sanctions_lists();
+    SanctionsScreener swaps whole snapshots, never mutates one.
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[SanctionsEntry] = (),
+        sanctioned_jurisdictions: Iterable[str] = (),
+        high_risk_jurisdictions: Iterable[str] = (),
+        source: Optional[Tuple[Tuple[str, int, int], ...]] = None
+    ):
+        """
+        Build the index.
+
+        Args:
+            entries: Listed persons and entities
+            sanctioned_jurisdictions: Comprehensively sanctioned jurisdictions
+            high_risk_jurisdictions: High-risk jurisdictions (e.g., FATF lists)
+            source: (path, mtime_ns, size) of the files the index was loaded from
+        """
+        self.entries: List[SanctionsEntry] = []
+        self.leis: Dict[str, int] = {}
+        # One row per listed name or alias: normalized key, display name, entry position
+        self._name_keys: List[str] = []
+        self._name_display: List[str] = []
+        self._name_entry: List[int] = []
+        self._exact: Dict[str, List[int]] = {}
+        self._postings: Dict[str, List[int]] = {}
+
+        for entry in entries:
+            position = len(self.entries)
+            self.entries.append(entry)
+            lei = normalize_lei(entry.lei)
+            if lei:
+                self.leis.setdefault(lei, position)
+            for name in dict.fromkeys((entry.name,) + tuple(entry.aliases)):
+                self._add_name(name, position)
+
+        self.sanctioned_jurisdictions: FrozenSet[str] = frozenset(
+            filter(None, map(normalize_jurisdiction, sanctioned_jurisdictions))
+        )
+        self.high_risk_jurisdictions: FrozenSet[str] = frozenset(
+            filter(None, map(normalize_jurisdiction, high_risk_jurisdictions))
+        )
+        self.source = source or ()
+        self.loaded_at = time.time()
+
+    def _add_name(self, name: str, position: int) -> None:
+        tokens = normalize_name(name or "")
+        if not tokens:
+            return
+        row = len(self._name_keys)
+        key = " ".join(tokens)
+        self._name_keys.append(key)
+        self._name_display.append(name)
+        self._name_entry.append(position)
+        self._exact.setdefault(key, []).append(row)
+        postings = self._postings
+        for index_key in _index_keys(tokens):
+            posting = postings.get(index_key)
+            if posting is None:
+                postings[index_key] = [row]
+            else:
+                posting.append(row)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _hit(self, row: int, score: float, match_type: str, query: str) -> ScreeningHit:
+        entry = self.entries[self._name_entry[row]]
+        return ScreeningHit(entry.entry_id, self._name_display[row], entry.list_name, score, match_type, query)
+
+    def screen_lei(self, lei: Optional[str]) -> Optional[ScreeningHit]:
+        """
+        Look up an LEI.
+
+        Args:
+            lei: Legal Entity Identifier
+
+        Returns:
+            ScreeningHit for the listed entry, or None if the LEI is not listed
+        """
+        position = self.leis.get(normalize_lei(lei)) if lei else None
+        if position is None:
+            return None
+        entry = self.entries[position]
+        return ScreeningHit(entry.entry_id, entry.name, entry.list_name, 1.0, "lei", lei)
+
+    def screen_name(
+        self,
+        name: Optional[str],
+        threshold: float = DEFAULT_NAME_MATCH_THRESHOLD,
+        limit: int = 5
+    ) -> List[ScreeningHit]:
+        """
+        Match a party name against listed names and aliases.
+
+        Args:
+            name: Party name
+            threshold: Minimum similarity score (0-1) for a fuzzy hit
+            limit: Maximum number of hits returned
+
+        Returns:
+            Hits ordered by score (best first), at most one per list entry
+        """
+        tokens = normalize_name(name or "")
+        if not tokens:
+            return []
+        key = " ".join(tokens)
+
+        exact_rows = self._exact.get(key, ())
+        hits = [self._hit(row, 1.0, "exact_name", name) for row in exact_rows]
+
+        # Count shared keys over the rarest postings first; common keys are skipped
+        postings = self._postings
+        keyed = sorted(
+            (len(posting), posting) for posting in (postings.get(k) for k in _index_keys(tokens)) if posting
+        )
+        shared: Counter = Counter()
+        read = 0
+        for size, posting in keyed:
+            if read + size > MAX_CANDIDATE_POSTINGS:
+                break
+            read += size
+            shared.update(posting)
+
+        if shared:
+            exact = set(exact_rows)
+            name_keys = self._name_keys
+            matcher = difflib.SequenceMatcher(autojunk=False)
+            matcher.set_seq2(key)
+            cutoff = threshold - PREFILTER_MARGIN
+            for row, _ in shared.most_common(MAX_SCORED_CANDIDATES):
+                if row in exact:
+                    continue
+                matcher.set_seq1(name_keys[row])
+                if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff or matcher.ratio() < cutoff:
+                    continue
+                score = self._token_score(tokens, tuple(name_keys[row].split()))
+                if score >= threshold:
+                    hits.append(self._hit(row, score, "fuzzy_name", name))
+
+        hits.sort(key=lambda hit: -hit.score)
+        seen = set()
+        unique = []
+        for hit in hits:
+            if hit.entry_id not in seen:
+                seen.add(hit.entry_id)
+                unique.append(hit)
+        return unique[:limit]
+
+    def _token_weight(self, token: str) -> float:
+        """Rarer tokens (by phonetic code frequency) weigh more than common ones such as BANK."""
+        return 1.0 / math.log(2 + len(self._postings.get(phonetic_code(token), ())))
+
+    def _token_score(self, query: Tuple[str, ...], candidate: Tuple[str, ...]) -> float:
+        """
+        Rarity-weighted token alignment score, averaged over both directions.
+
+        Each token is scored against its most similar token on the other side
+        (1.0 when equal, at least PHONETIC_MATCH_SCORE when the phonetic codes
+        agree), so a shared common word cannot carry an otherwise different
+        name over the threshold, and extra words on either side count against
+        the match.
+        """
+        similarity: Dict[Tuple[str, str], float] = {}
+
+        def aligned(tokens: Tuple[str, ...], others: Tuple[str, ...]) -> float:
+            total = weights = 0.0
+            for token in tokens:
+                best = 0.0
+                if token in others:
+                    best = 1.0
+                else:
+                    for other in others:
+                        pair = (token, other) if token < other else (other, token)
+                        score = similarity.get(pair)
+                        if score is None:
+                            score = difflib.SequenceMatcher(None, token, other, autojunk=False).ratio()
+                            if phonetic_code(token) == phonetic_code(other):
+                                score = max(score, PHONETIC_MATCH_SCORE)
+                            similarity[pair] = score
+                        best = max(best, score)
+                weight = self._token_weight(token)
+                total += weight * best
+                weights += weight
+            return total / weights
+
+        return (aligned(query, candidate) + aligned(candidate, query)) / 2
+
+    def is_sanctioned_jurisdiction(self, jurisdiction: Optional[str]) -> bool:
+        return normalize_jurisdiction(jurisdiction) in self.sanctioned_jurisdictions
+
+    def is_high_risk_jurisdiction(self, jurisdiction: Optional[str]) -> bool:
+        return normalize_jurisdiction(jurisdiction) in self.high_risk_jurisdictions
+
+
+def _cell(row: List[str], column: Optional[int]) -> Optional[str]:
+    if column is None or column >= len(row):
+        return None
+    value = row[column].strip()
+    return value if value and value != "-0-" else None
+
+
+def _column(header: List[str], names: Tuple[str, ...]) -> Optional[int]:
+    for name in names:
+        if name in header:
+            return header.index(name)
+    return None
+
+
+def _read_csv(path: Path) -> Tuple[List[SanctionsEntry], List[str], List[str]]:
+    """Read an entity or jurisdiction CSV list (see module docstring)."""
+    entries: List[SanctionsEntry] = []
+    sanctioned: List[str] = []
+    high_risk: List[str] = []
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        first = next(reader, None)
+        if first is None:
+            return entries, sanctioned, high_risk
+        header = [h.strip().lower() for h in first]
+        name_column = _column(header, _NAME_COLUMNS)
+        jurisdiction_columns = [i for i, h in enumerate(header) if h in _JURISDICTION_COLUMNS]
+
+        if name_column is None and jurisdiction_columns:
+            category_column = _column(header, _COLUMN_ALIASES["category"])
+            default_high_risk = "high_risk" in path.stem.lower().replace("-", "_")
+            for row in reader:
+                category = (_cell(row, category_column) or "").lower()
+                high = "high" in category if category else default_high_risk
+                target = high_risk if high else sanctioned
+                target.extend(filter(None, (_cell(row, i) for i in jurisdiction_columns)))
+            return entries, sanctioned, high_risk
+
+        if name_column is None:
+            # Headerless OFAC SDN layout: ent_num, SDN_Name, SDN_Type, Program, ...
+            rows: Iterable[List[str]] = itertools.chain([first], reader)
+            columns = {"entry_id": 0, "entry_type": 2, "list_name": 3}
+            name_column, default_list = 1, "OFAC"
+        else:
+            rows = reader
+            columns = {key: _column(header, names) for key, names in _COLUMN_ALIASES.items()}
+            default_list = path.stem
+
+        for line, row in enumerate(rows, start=1):
+            name = _cell(row, name_column)
+            if not name:
+                continue
+            aliases = _cell(row, columns.get("aliases"))
+            entries.append(SanctionsEntry(
+                entry_id=_cell(row, columns.get("entry_id")) or f"{path.stem}:{line}",
+                name=name,
+                list_name=_cell(row, columns.get("list_name")) or default_list,
+                lei=_cell(row, columns.get("lei")),
+                aliases=tuple(a.strip() for a in aliases.split(";") if a.strip()) if aliases else (),
+                entry_type=(_cell(row, columns.get("entry_type")) or "").lower() or None,
+                country=_cell(row, columns.get("country")),
+            ))
+
+    return entries, sanctioned, high_risk
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element: ET.Element, name: str) -> Optional[str]:
+    for child in element:
+        if _local(child.tag) == name and child.text and child.text.strip():
+            return child.text.strip()
+    return None
+
+
+class _ClosedElements(ET.TreeBuilder):
+    """TreeBuilder that refuses DTDs (so entity declarations) and collects closed elements."""
+
+    def __init__(self):
+        super().__init__()
+        self.closed: List[ET.Element] = []
+
+    def doctype(self, name, pubid, system):
+        raise ET.ParseError(f"DTD '{name}' is not allowed in sanctions list XML")
+
+    def end(self, tag):
+        element = super().end(tag)
+        self.closed.append(element)
+        return element
+
+
+def _iter_xml_elements(path: Path, chunk_size: int = 64 * 1024) -> Iterator[ET.Element]:
+    """Yield elements as they close, like iterparse "end" events, refusing DTDs and entities."""
+    target = _ClosedElements()
+    # Hardened: the target rejects any DOCTYPE and expat rejects undeclared entities
+    parser = ET.XMLParser(target=target)  # noqa: S314
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            parser.feed(chunk)
+            closed, target.closed = target.closed, []
+            yield from closed
+    parser.close()
+    yield from target.closed
+
+
+def _read_xml(path: Path) -> List[SanctionsEntry]:
+    """Read a UN consolidated list or an EU financial sanctions export."""
+    entries: List[SanctionsEntry] = []
+    for element in _iter_xml_elements(path):
+        tag = _local(element.tag)
+
+        if tag in ("INDIVIDUAL", "ENTITY"):
+            # UN consolidated list
+            name = " ".join(filter(None, (
+                _child_text(element, part) for part in ("FIRST_NAME", "SECOND_NAME", "THIRD_NAME", "FOURTH_NAME")
+            )))
+            aliases = tuple(
+                alias for alias in (
+                    _child_text(child, "ALIAS_NAME") for child in element if _local(child.tag).endswith("_ALIAS")
+                ) if alias
+            )
+            nationality = next((_child_text(c, "VALUE") for c in element if _local(c.tag) == "NATIONALITY"), None)
+            if name:
+                entries.append(SanctionsEntry(
+                    entry_id=_child_text(element, "DATAID") or _child_text(element, "REFERENCE_NUMBER")
+                    or f"{path.stem}:{len(entries) + 1}",
+                    name=name,
+                    list_name=_child_text(element, "UN_LIST_TYPE") or "UN",
+                    aliases=aliases,
+                    entry_type=tag.lower(),
+                    country=nationality,
+                ))
+            element.clear()
+
+        elif tag == "sanctionEntity":
+            # EU financial sanctions export
+            names = [
+                child.get("wholeName").strip()
+                for child in element if _local(child.tag) == "nameAlias" and (child.get("wholeName") or "").strip()
+            ]
+            lei = next((
+                child.get("number") for child in element
+                if _local(child.tag) == "identification" and "lei" in (child.get("identificationTypeCode") or "").lower()
+            ), None)
+            subject = next((c for c in element if _local(c.tag) == "subjectType"), None)
+            regulation = next((c for c in element if _local(c.tag) == "regulation"), None)
+            country = next((
+                child.get("countryDescription") for child in element
+                if _local(child.tag) in ("citizenship", "address") and child.get("countryDescription")
+            ), None)
+            if names:
+                entries.append(SanctionsEntry(
+                    entry_id=element.get("logicalId") or element.get("euReferenceNumber") or f"{path.stem}:{len(entries) + 1}",
+                    name=names[0],
+                    list_name=f"EU {regulation.get('programme')}" if regulation is not None and regulation.get("programme") else "EU",
+                    lei=lei,
+                    aliases=tuple(names[1:]),
+                    entry_type=subject.get("code") if subject is not None else None,
+                    country=country,
+                ))
+            element.clear()
+
+    return entries
+
+
+def _list_files(directory: Path) -> List[Path]:
+    if not directory.is_dir():
+        return []
+    return sorted(p for p in directory.iterdir() if p.is_file() and p.suffix.lower() in (".csv", ".xml"))
+
+
+def _signature(files: List[Path]) -> Tuple[Tuple[str, int, int], ...]:
+    signature = []
+    for path in files:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def load_sanctions_lists(directory: Path) -> SanctionsIndex:
+    """
+    Load every list file in a directory into a new index.
+
+    Args:
+        directory: Directory holding CSV/XML list files
+
+    Returns:
+        SanctionsIndex (empty if the directory does not exist)
+
+    Raises:
+        ValueError: If a list file cannot be parsed
+    """
+    files = _list_files(Path(directory))
+    signature = _signature(files)
+    entries: List[SanctionsEntry] = []
+    sanctioned: List[str] = []
+    high_risk: List[str] = []
+
+    for path in files:
+        try:
+            if path.suffix.lower() == ".xml":
+                entries.extend(_read_xml(path))
+            else:
+                file_entries, file_sanctioned, file_high_risk = _read_csv(path)
+                entries.extend(file_entries)
+                sanctioned.extend(file_sanctioned)
+                high_risk.extend(file_high_risk)
+        except (csv.Error, ET.ParseError, UnicodeDecodeError) as e:
+            raise ValueError(f"Failed to parse sanctions list {path}: {e}") from e
+
+    start = time.perf_counter()
+    index = SanctionsIndex(entries, sanctioned, high_risk, source=signature)
+    logger.info(
+        f"Loaded {len(index.entries)} sanctions list entries, {len(index.sanctioned_jurisdictions)} sanctioned and "
+        f"{len(index.high_risk_jurisdictions)} high-risk jurisdiction(s) from {len(files)} file(s) "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return index
+
+
+class SanctionsScreener:
+    """
+    Screens parties and jurisdictions against the current SanctionsIndex.
+
+    The index is replaced as a whole (load(), swap(), refresh_if_changed()),
+    so screening is lock-free. With a refresh interval, screening calls
+    periodically check the list files and rebuild changed lists on a
+    background thread while the previous snapshot keeps serving.
+    """
+
+    def __init__(
+        self,
+        lists_dir: Optional[Path] = None,
+        name_threshold: float = DEFAULT_NAME_MATCH_THRESHOLD,
+        refresh_interval: int = 0
+    ):
+        """
+        Initialize the screener with an empty index.
+
+        Args:
+            lists_dir: Directory holding list files (None = no file-backed lists)
+            name_threshold: Minimum similarity score for a fuzzy name hit
+            refresh_interval: Seconds between list-file change checks (0 = never)
+        """
+        self.lists_dir = Path(lists_dir) if lists_dir else None
+        self.name_threshold = name_threshold
+        self.refresh_interval = refresh_interval
+        self._index = SanctionsIndex()
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._last_check = time.monotonic()
+
+    @property
+    def index(self) -> SanctionsIndex:
+        """Current snapshot (checks for list changes when a refresh interval is set)."""
+        if self.refresh_interval and time.monotonic() - self._last_check >= self.refresh_interval:
+            self.refresh_if_changed(background=True)
+        return self._index
+
+    def load(self) -> SanctionsIndex:
+        """
+        Load the list files and swap the new index in.
+
+        Returns:
+            The new SanctionsIndex
+        """
+        index = load_sanctions_lists(self.lists_dir) if self.lists_dir else SanctionsIndex()
+        self.swap(index)
+        return index
+
+    def swap(self, index: SanctionsIndex) -> None:
+        """Atomically replace the current index."""
+        with self._lock:
+            self._index = index
+
+    def refresh_if_changed(self, background: bool = False) -> bool:
+        """
+        Reload the lists if any list file was added, removed or modified.
+
+        Args:
+            background: Rebuild on a daemon thread and return immediately
+
+        Returns:
+            True if a reload was started (or, in the foreground, completed)
+        """
+        self._last_check = time.monotonic()
+        if not self.lists_dir:
+            return False
+        if _signature(_list_files(self.lists_dir)) == self._index.source:
+            return False
+
+        with self._lock:
+            if self._reloading:
+                return False
+            self._reloading = True
+
+        def reload() -> None:
+            try:
+                self.load()
+            except Exception as e:
+                logger.error(f"Failed to reload sanctions lists, keeping the previous index: {e}")
+            finally:
+                self._reloading = False
+
+        if background:
+            threading.Thread(target=reload, name="sanctions-list-reload", daemon=True).start()
+        else:
+            reload()
+        return True
+
+    def is_sanctioned_lei(self, lei: Optional[str]) -> bool:
+        """Whether an LEI is on a sanctions list (exact match)."""
+        return self.index.screen_lei(lei) is not None
+
+    def screen_name(self, name: Optional[str], threshold: Optional[float] = None, limit: int = 5) -> List[ScreeningHit]:
+        """
+        Fuzzy-match a party name against listed names and aliases.
+
+        Args:
+            name: Party name
+            threshold: Minimum similarity score (defaults to the screener's threshold)
+            limit: Maximum number of hits returned
+
+        Returns:
+            Hits ordered by score (best first)
+        """
+        return self.index.screen_name(name, self.name_threshold if threshold is None else threshold, limit)
+
+    def screen_party(self, name: Optional[str] = None, lei: Optional[str] = None) -> List[ScreeningHit]:
+        """
+        Screen one party by LEI and name.
+
+        Args:
+            name: Party name
+            lei: Party LEI
+
+        Returns:
+            LEI hit (if any) followed by name hits
+        """
+        index = self.index
+        lei_hit = index.screen_lei(lei)
+        name_hits = index.screen_name(name, self.name_threshold)
+        if lei_hit is None:
+            return name_hits
+        return [lei_hit] + [hit for hit in name_hits if hit.entry_id != lei_hit.entry_id]
+
+    def screen_parties(self, parties: Iterable[Any]) -> Dict[str, List[ScreeningHit]]:
+        """
+        Screen a set of parties (CDM Party objects or dicts with name/lei).
+
+        Args:
+            parties: Parties to screen
+
+        Returns:
+            Dictionary mapping each party name with hits to its hits
+        """
+        results: Dict[str, List[ScreeningHit]] = {}
+        for party in parties or []:
+            if isinstance(party, dict):
+                name, lei = party.get("name"), party.get("lei")
+            else:
+                name, lei = getattr(party, "name", None), getattr(party, "lei", None)
+            hits = self.screen_party(name, lei)
+            if hits:
+                results[name or lei] = hits
+        return results
+
+    def is_sanctioned_jurisdiction(self, jurisdiction: Optional[str]) -> bool:
+        return self.index.is_sanctioned_jurisdiction(jurisdiction)
+
+    def is_high_risk_jurisdiction(self, jurisdiction: Optional[str]) -> bool:
+        return self.index.is_high_risk_jurisdiction(jurisdiction)
+
+    @property
+    def high_risk_jurisdictions(self) -> FrozenSet[str]:
+        """Normalized high-risk jurisdiction names and codes."""
+        return self.index.high_risk_jurisdictions
+
+    def contains(self, list_name: str, value: Any) -> bool:
+        """
+        Membership test for a referenced list (see REFERENCE_LISTS).
+
+        Args:
+            list_name: List reference, e.g. "SANCTIONED_LEI_LIST"
+            value: LEI, party name or jurisdiction to test
+
+        Returns:
+            True if the value is on the list (names: a hit above the threshold)
+        """
+        if not isinstance(value, str) or not value:
+            return False
+        if list_name == SANCTIONED_LEI_LIST:
+            return self.is_sanctioned_lei(value)
+        if list_name == SANCTIONED_NAMES_LIST:
+            return bool(self.screen_name(value, limit=1))
+        if list_name == SANCTIONED_COUNTRIES_LIST:
+            return self.is_sanctioned_jurisdiction(value)
+        if list_name == HIGH_RISK_JURISDICTIONS_LIST:
+            return self.is_high_risk_jurisdiction(value)
+        raise ValueError(f"Unknown sanctions list reference: {list_name}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        index = self._index
+        return {
+            "entries": len(index.entries),
+            "leis": len(index.leis),
+            "names": len(index._name_keys),
+            "index_keys": len(index._postings),
+            "sanctioned_jurisdictions": len(index.sanctioned_jurisdictions),
+            "high_risk_jurisdictions": len(index.high_risk_jurisdictions),
+            "files": len(index.source),
+            "loaded_at": index.loaded_at,
+        }
+
+
+def reference_list_membership(list_name: str) -> Callable[[Any], bool]:
+    """
+    Membership test against a referenced list, resolved on every call.
+
+    Registered with the policy engine for each of REFERENCE_LISTS (see
+    register_reference_list), so ``op: in`` conditions whose values name a
+    list (e.g. ``["SANCTIONED_LEI_LIST"]``) always see the current index
+    after a list refresh.
+
+    Args:
+        list_name: One of REFERENCE_LISTS
+
+    Returns:
+        Callable returning True if a value is on the list
+    """
+    if list_name not in REFERENCE_LISTS:
+        raise ValueError(f"Unknown sanctions list reference: {list_name}")
+
+    def is_listed(value: Any) -> bool:
+        return get_sanctions_screener().contains(list_name, value)
+
+    return is_listed
+
+
+def _register_reference_lists() -> None:
+    """Make the sanctions lists usable as ``op: in`` values in policy rules."""
+    for list_name in REFERENCE_LISTS:
+        register_reference_list(list_name, reference_list_membership(list_name))
+
+
+def get_sanctions_screener() -> SanctionsScreener:
+    """Get or create the global sanctions screener, loading the configured lists on first use."""
+    global _screener_instance
+    if _screener_instance is None:
+        with _screener_lock:
+            if _screener_instance is None:
+                try:
+                    from app.core.config import settings
+                    enabled = settings.SANCTIONS_SCREENING_ENABLED
+                    screener = SanctionsScreener(
+                        lists_dir=settings.SANCTIONS_LISTS_DIR if enabled else None,
+                        name_threshold=settings.SANCTIONS_NAME_MATCH_THRESHOLD,
+                        refresh_interval=settings.SANCTIONS_REFRESH_INTERVAL if enabled else 0
+                    )
+                except Exception as e:
+                    # CDM validation calls in here, so a missing configuration must not break it
+                    logger.warning(f"Sanctions screening configuration unavailable, no lists loaded: {e}")
+                    screener = SanctionsScreener()
+                try:
+                    screener.load()
+                except Exception as e:
+                    logger.error(f"Failed to load sanctions lists, screening against an empty index: {e}")
+                _screener_instance = screener
+    return _screener_instance
+
+
+def set_sanctions_screener(screener: Optional[SanctionsScreener]) -> None:
+    """Replace the global screener (None resets it to load from configuration on next use)."""
+    global _screener_instance
+    with _screener_lock:
+        _screener_instance = screener
+
+
+_register_reference_lists()
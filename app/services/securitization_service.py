@@ -1,11 +1,12 @@
 """Securitization service for structured finance products."""
 
 import logging
-from decimal import Decimal
+from decimal import Decimal, ROUND_DOWN
 from datetime import datetime, date
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
+import numpy as np
 
 from app.db.models import (
     SecuritizationPool, SecuritizationTranche, SecuritizationPoolAsset,
@@ -23,6 +24,10 @@ from app.models.cdm_events import (
 from app.services.wallet_service import WalletService
 from app.services.blockchain_service import BlockchainService
 from app.services.x402_payment_service import X402PaymentService
+from app.services.securitization_waterfall import (
+    CollateralPool, WaterfallAssumptions, WaterfallTranche,
+    add_months, allocate_period, project_collateral, run_waterfall
+)
 from app.services.notarization_service import NotarizationService
 from app.models.cdm_payment import PaymentEvent, PaymentType, PaymentMethod
 from app.db.models import PaymentEvent as PaymentEventModel
@@ -30,6 +35,8 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+CENT = Decimal("0.01")
+
 
 class SecuritizationService:
     """Service for managing securitization pools and structured finance products."""
@@ -356,7 +363,12 @@ class SecuritizationService:
         self.db.commit()
         
         # Initialize payment schedule metadata in pool CDM data
-        payment_schedule = self._calculate_payment_schedule(cdm_tranches, currency, pool.effective_date if hasattr(pool, 'effective_date') and pool.effective_date else date.today())
+        payment_schedule = self._calculate_payment_schedule(
+            cdm_tranches,
+            currency,
+            pool.effective_date if hasattr(pool, 'effective_date') and pool.effective_date else date.today(),
+            underlying_assets=validated_assets
+        )
         
         # Update pool CDM data with payment schedule
         pool_cdm_data = pool.cdm_data or {}
@@ -390,55 +402,102 @@ class SecuritizationService:
         self,
         tranches: List[Tranche],
         currency: Currency,
-        effective_date: date
+        effective_date: date,
+        underlying_assets: Optional[List[Dict[str, Any]]] = None,
+        principal_mode: str = "sequential"
     ) -> Dict[str, Any]:
         """Calculate payment schedule for securitization pool.
         
-        Creates payment schedule metadata based on tranche interest rates and payment priorities.
-        This is a simplified schedule - in production, you'd calculate based on actual payment dates.
+        Projects the collateral's level-payment amortization (base case: no
+        prepayments or defaults) and runs it through the tranche waterfall, so
+        each period carries the interest and principal each tranche expects.
         
         Args:
             tranches: List of CDM Tranche objects
             currency: Payment currency
             effective_date: Pool effective date
+            underlying_assets: Pool asset dicts (asset_value, optional interest_rate
+                and term_months); defaults to a single asset the size of the tranches
+            principal_mode: "sequential" or "pro_rata" principal allocation
             
         Returns:
             Payment schedule dictionary with payment dates and amounts per tranche
         """
-        from datetime import timedelta
-        
-        # Calculate payment schedule for each tranche
-        # For now, create monthly payment schedule for 12 months (simplified)
-        payment_dates = []
-        for month in range(1, 13):  # 12 months
-            payment_date = effective_date + timedelta(days=30 * month)
-            payment_dates.append(payment_date.isoformat())
+        if not underlying_assets:
+            underlying_assets = [{"asset_value": sum(t.size.amount for t in tranches)}]
+        collateral = CollateralPool.from_assets(underlying_assets)
+        cash_flows = project_collateral(collateral, WaterfallAssumptions(recovery_lag=0))
+        result = run_waterfall(
+            cash_flows,
+            [
+                WaterfallTranche(
+                    tranche_id=t.tranche_id,
+                    balance=float(t.size.amount),
+                    interest_rate=float(t.interest_rate),
+                    payment_priority=t.payment_priority
+                )
+                for t in tranches
+            ],
+            principal_mode=principal_mode,
+            keep_periods=True
+        )
+        n_periods = cash_flows.interest.shape[1]
+        payment_dates = [add_months(effective_date, month).isoformat() for month in range(1, n_periods + 1)]
         
-        # Create payment schedule entries for each tranche
         schedule_entries = []
-        for tranche in tranches:
-            # Calculate interest payment per period
-            interest_per_period = (tranche.size.amount * tranche.interest_rate) / Decimal("12")  # Monthly
-            
-            for payment_date in payment_dates:
-                schedule_entries.append({
-                    "tranche_id": tranche.tranche_id,
-                    "tranche_name": tranche.tranche_name,
-                    "payment_type": "interest",
-                    "amount": str(interest_per_period),
-                    "currency": currency.value,
-                    "due_date": payment_date,
-                    "payment_priority": tranche.payment_priority,
-                    "status": "pending"
-                })
+        for k, tranche in enumerate(tranches):
+            for payment_type in ("interest", "principal"):
+                amounts = result.periods[f"{payment_type}_paid"][0, k]
+                for t in np.flatnonzero(amounts >= 0.005):
+                    schedule_entries.append({
+                        "tranche_id": tranche.tranche_id,
+                        "tranche_name": tranche.tranche_name,
+                        "payment_type": payment_type,
+                        "amount": str(Decimal(str(amounts[t])).quantize(CENT)),
+                        "currency": currency.value,
+                        "due_date": payment_dates[t],
+                        "period": int(t) + 1,
+                        "payment_priority": tranche.payment_priority,
+                        "status": "pending"
+                    })
+        schedule_entries.sort(key=lambda e: (e["period"], e["payment_priority"], e["payment_type"]))
         
         return {
             "payment_frequency": "monthly",
-            "total_periods": 12,
+            "total_periods": n_periods,
             "effective_date": effective_date.isoformat(),
+            "principal_mode": principal_mode,
             "schedule_entries": schedule_entries
         }
     
+    def _pool_collateral_assets(self, pool: SecuritizationPool) -> List[Dict[str, Any]]:
+        """Pool assets as waterfall collateral dicts, with loan rates where the asset is a loan.
+        
+        Args:
+            pool: Pool database record
+            
+        Returns:
+            List of dicts with asset_value and, for loan assets, interest_rate
+        """
+        assets = (
+            self.db.query(SecuritizationPoolAsset)
+            .filter(SecuritizationPoolAsset.pool_id == pool.id)
+            .all()
+        )
+        loan_ids = [a.loan_asset_id for a in assets if a.loan_asset_id]
+        loan_rates = dict(
+            self.db.query(LoanAsset.id, LoanAsset.current_interest_rate)
+            .filter(LoanAsset.id.in_(loan_ids))
+            .all()
+        ) if loan_ids else {}
+        return [
+            {
+                "asset_value": a.allocation_amount or a.asset_value,
+                "interest_rate": loan_rates.get(a.loan_asset_id)
+            }
+            for a in assets
+        ]
+    
     def create_tranches(
         self,
         pool_id: int,
@@ -543,7 +602,8 @@ class SecuritizationService:
         payment_schedule = self._calculate_payment_schedule(
             all_cdm_tranches,
             Currency(pool.currency),
-            effective_date
+            effective_date,
+            underlying_assets=self._pool_collateral_assets(pool)
         )
         
         # Update pool CDM data
@@ -762,25 +822,51 @@ class SecuritizationService:
                 "warning": f"Token minting failed: {str(e)}"
             }
     
-    def distribute_payments(
+    def _waterfall_tranches(self, tranches: List[SecuritizationTranche]) -> List[WaterfallTranche]:
+        """Current tranche balances and unpaid interest as waterfall inputs."""
+        return [
+            WaterfallTranche(
+                tranche_id=t.tranche_id,
+                balance=float(t.principal_remaining if t.principal_remaining is not None else t.size),
+                interest_rate=float(t.interest_rate or 0),
+                payment_priority=t.payment_priority,
+                interest_shortfall=float(t.interest_accrued or 0)
+            )
+            for t in tranches
+        ]
+    
+    async def distribute_payments(
         self,
         pool_id: str,
         total_payment_amount: Decimal,
         payment_type: str = "interest",
-        payment_service: Optional[X402PaymentService] = None
-    ) -> List[Dict[str, Any]]:
+        payment_service: Optional[X402PaymentService] = None,
+        payment_payload: Optional[Dict[str, Any]] = None,
+        principal_mode: str = "sequential"
+    ) -> Dict[str, Any]:
         """
-        Distribute payments to tranche holders according to waterfall.
+        Distribute one period's collections to tranche holders according to the waterfall.
+        
+        Interest pays each tranche's monthly coupon plus any carried shortfall,
+        senior first (pro rata within a priority); unpaid interest stays in
+        interest_accrued. Principal reduces principal_remaining sequentially or
+        pro rata. All holder payouts for the period are settled in one x402 call.
         
         Args:
             pool_id: Pool identifier
             total_payment_amount: Total amount to distribute
             payment_type: Type of payment (interest, principal)
             payment_service: Optional x402 payment service
+            payment_payload: Optional x402 payment payload for the period's batch
+            principal_mode: "sequential" or "pro_rata" principal allocation
             
         Returns:
-            List of distribution results
+            Dictionary with per-tranche distributions, the batch settlement and
+            the undistributed residual
         """
+        if payment_type not in ("interest", "principal"):
+            raise ValueError(f"Unknown payment type: {payment_type}")
+        
         pool = (
             self.db.query(SecuritizationPool)
             .filter(SecuritizationPool.pool_id == pool_id)
@@ -797,138 +883,158 @@ class SecuritizationService:
             .all()
         )
         
-        distributions = []
-        remaining = total_payment_amount
+        amount = float(total_payment_amount)
+        allocation = allocate_period(
+            self._waterfall_tranches(tranches),
+            interest_available=amount if payment_type == "interest" else 0.0,
+            principal_available=amount if payment_type == "principal" else 0.0,
+            principal_mode=principal_mode
+        )
+        paid = allocation[f"{payment_type}_paid"][0]
         
-        # Distribute according to waterfall (simplified: pay in priority order)
-        for tranche in tranches:
-            if remaining <= 0:
-                break
-            
-            # Calculate payment for this tranche
+        distributions = []
+        payouts = []
+        distributed = Decimal("0")
+        for k, tranche in enumerate(tranches):
+            # Round down so the cents paid never exceed the collections
+            tranche_payment = Decimal(str(paid[k])).quantize(CENT, rounding=ROUND_DOWN)
             if payment_type == "interest":
-                tranche_payment = min(
-                    remaining,
-                    (tranche.tranche_size * tranche.interest_rate) / Decimal("100")
-                )
-            else:
-                # Principal payment
-                tranche_payment = min(remaining, tranche.tranche_size)
+                tranche.interest_accrued = Decimal(str(allocation["interest_due"][0, k])).quantize(CENT) - tranche_payment
+            elif tranche_payment > 0:
+                outstanding = tranche.principal_remaining if tranche.principal_remaining is not None else tranche.size
+                tranche.principal_remaining = outstanding - tranche_payment
+            if tranche_payment <= 0:
+                continue
+            distributed += tranche_payment
             
-            if tranche_payment > 0:
-                # Get tranche holders (owners of tokens for this tranche)
-                tranche_holders = []
-                # Check if tranche has owner_wallet_address (may not exist in schema yet)
-                owner_wallet = getattr(tranche, 'owner_wallet_address', None)
-                token_id = getattr(tranche, 'token_id', None)
-                
-                if owner_wallet:
-                    # Single owner (simplified - in production, would query all token owners)
-                    tranche_holders.append({
-                        "wallet_address": owner_wallet,
-                        "token_id": token_id,
-                        "ownership_percentage": Decimal("100")  # Simplified - would calculate from token supply
-                    })
-                
-                # Process payment distribution via smart contract if available
-                distribution_result = None
-                if tranche_holders and self.blockchain_service.is_connected():
-                    try:
-                        distribution_result = self.blockchain_service.distribute_payment_to_tranche(
-                            pool_id=pool_id,
-                            tranche_id=tranche.tranche_name,
-                            amount=tranche_payment,
-                            currency=pool.currency,
-                            payment_type=payment_type
-                        )
-                    except Exception as e:
-                        logger.warning(f"Smart contract distribution failed: {e}, falling back to manual distribution")
-                
-                # Process payments via x402 for each holder
-                payment_transactions = []
-                if payment_service and tranche_holders:
-                    for holder in tranche_holders:
-                        holder_payment = (tranche_payment * holder["ownership_percentage"]) / Decimal("100")
-                        
-                        payer = Party(
-                            id=f"pool_{pool_id}",
-                            name=pool.pool_name,
-                            lei=None
-                        )
-                        
-                        receiver = Party(
-                            id=holder["wallet_address"],
-                            name=f"Tranche Holder {holder['wallet_address'][:8]}",
-                            lei=None
-                        )
-                        
-                        try:
-                            import asyncio
-                            try:
-                                loop = asyncio.get_event_loop()
-                            except RuntimeError:
-                                loop = asyncio.new_event_loop()
-                                asyncio.set_event_loop(loop)
-                            
-                            payment_result = loop.run_until_complete(
-                                payment_service.process_payment_flow(
-                                    amount=holder_payment,
-                                    currency=Currency(pool.currency),
-                                    payer=payer,
-                                    receiver=receiver,
-                                    payment_type=f"tranche_{payment_type}",
-                                    payment_payload=None,  # Would be provided by holder
-                                    cdm_reference={
-                                        "pool_id": pool_id,
-                                        "tranche_id": tranche.tranche_name,
-                                        "token_id": holder.get("token_id")
-                                    }
-                                )
-                            )
-                            
-                            if payment_result.get("status") == "settled":
-                                payment_transactions.append({
-                                    "holder": holder["wallet_address"],
-                                    "amount": float(holder_payment),
-                                    "transaction_hash": payment_result.get("transaction_hash")
-                                })
-                        except Exception as e:
-                            logger.error(f"Failed to process payment for holder {holder['wallet_address']}: {e}")
-                
-                # Update tranche position metadata (accumulate payments)
-                # Store in cdm_tranche_data since we may not have a dedicated field yet
-                tranche_data = tranche.cdm_tranche_data or {}
-                if not isinstance(tranche_data, dict):
-                    tranche_data = {}
-                
-                total_payments = tranche_data.get("total_payments_received", {})
-                if payment_type not in total_payments:
-                    total_payments[payment_type] = Decimal("0")
-                else:
-                    total_payments[payment_type] = Decimal(str(total_payments[payment_type]))
-                
-                total_payments[payment_type] += tranche_payment
-                tranche_data["total_payments_received"] = {
-                    k: str(v) if isinstance(v, Decimal) else v 
-                    for k, v in total_payments.items()
-                }
-                tranche.cdm_tranche_data = tranche_data
-                
-                distributions.append({
-                    "tranche_id": tranche.tranche_name,
-                    "amount": float(tranche_payment),
-                    "currency": pool.currency,
-                    "payment_type": payment_type,
-                    "holders_count": len(tranche_holders),
-                    "payment_transactions": payment_transactions,
-                    "smart_contract_distribution": distribution_result,
-                    "status": "completed" if payment_transactions or distribution_result else "pending"
+            # Single owner per tranche token (simplified - in production, would query all token owners)
+            holders = [tranche.owner_wallet_address] if tranche.owner_wallet_address else []
+            for wallet_address in holders:
+                payouts.append({
+                    "receiver": Party(
+                        id=wallet_address,
+                        name=f"Tranche Holder {wallet_address[:8]}",
+                        lei=None
+                    ),
+                    "amount": tranche_payment,
+                    "reference": {"tranche_id": tranche.tranche_id, "token_id": tranche.token_id}
                 })
-                remaining -= tranche_payment
+            
+            # Process payment distribution via smart contract if available
+            distribution_result = None
+            if holders and self.blockchain_service.is_connected():
+                try:
+                    distribution_result = self.blockchain_service.distribute_payment_to_tranche(
+                        pool_id=pool_id,
+                        tranche_id=tranche.tranche_id,
+                        amount=tranche_payment,
+                        currency=pool.currency,
+                        payment_type=payment_type
+                    )
+                except Exception as e:
+                    logger.warning(f"Smart contract distribution failed: {e}, falling back to x402 settlement")
+            
+            distributions.append({
+                "tranche_id": tranche.tranche_id,
+                "tranche_name": tranche.tranche_name,
+                "amount": float(tranche_payment),
+                "currency": pool.currency,
+                "payment_type": payment_type,
+                "holders_count": len(holders),
+                "principal_remaining": str(tranche.principal_remaining),
+                "interest_accrued": str(tranche.interest_accrued),
+                "smart_contract_distribution": distribution_result,
+                "status": "completed" if distribution_result else "pending"
+            })
+        
+        # One x402 settlement for every holder paid this period
+        settlement = None
+        if payment_service and payouts:
+            try:
+                settlement = await payment_service.process_batch_payment_flow(
+                    payouts=payouts,
+                    currency=Currency(pool.currency),
+                    payer=Party(id=f"pool_{pool_id}", name=pool.pool_name, lei=None),
+                    payment_type=f"tranche_{payment_type}",
+                    payment_payload=payment_payload,
+                    cdm_reference={"pool_id": pool_id}
+                )
+            except Exception as e:
+                logger.error(f"Failed to settle {len(payouts)} payouts for pool {pool_id}: {e}")
+            if settlement and settlement.get("status") == "settled":
+                for distribution in distributions:
+                    if distribution["holders_count"]:
+                        distribution["status"] = "completed"
+                        distribution["transaction_hash"] = settlement.get("transaction_hash")
         
         # Commit tranche updates
         self.db.commit()
         
-        logger.info(f"Distributed {total_payment_amount} {pool.currency} to {len(distributions)} tranches in pool {pool_id}")
+        logger.info(f"Distributed {distributed} of {total_payment_amount} {pool.currency} to {len(distributions)} tranches in pool {pool_id}")
+        
+        return {
+            "distributions": distributions,
+            "settlement": settlement,
+            "payouts_count": len(payouts),
+            "distributed": str(distributed),
+            "residual": str(total_payment_amount - distributed)
+        }
+    
+    def run_waterfall_scenarios(
+        self,
+        pool_id: str,
+        assumptions: WaterfallAssumptions,
+        principal_mode: str = "sequential",
+        percentiles: Sequence[float] = (50, 95, 99)
+    ) -> Dict[str, Any]:
+        """
+        Run the pool's collateral and tranches through many CPR/CDR/severity scenarios.
+        
+        Args:
+            pool_id: Pool identifier
+            assumptions: Scenario assumptions (scalars or one value per scenario)
+            principal_mode: "sequential" or "pro_rata" principal allocation
+            percentiles: Loss percentiles to report per tranche
+            
+        Returns:
+            Dictionary with per-tranche loss/WAL distribution and collateral totals
+        """
+        pool = (
+            self.db.query(SecuritizationPool)
+            .filter(SecuritizationPool.pool_id == pool_id)
+            .first()
+        )
+        if not pool:
+            raise ValueError(f"Pool {pool_id} not found")
+        
+        tranches = (
+            self.db.query(SecuritizationTranche)
+            .filter(SecuritizationTranche.pool_id == pool.id)
+            .order_by(SecuritizationTranche.payment_priority.asc())
+            .all()
+        )
+        if not tranches:
+            raise ValueError(f"Pool {pool_id} has no tranches")
         
-        return distributions
+        collateral = CollateralPool.from_assets(self._pool_collateral_assets(pool))
+        if not collateral.balance.size:
+            raise ValueError(f"Pool {pool_id} has no collateral")
+        
+        waterfall_tranches = self._waterfall_tranches(tranches)
+        cash_flows = project_collateral(collateral, assumptions)
+        result = run_waterfall(cash_flows, waterfall_tranches, principal_mode=principal_mode)
+        
+        return {
+            "pool_id": pool_id,
+            "n_scenarios": int(cash_flows.interest.shape[0]),
+            "n_periods": int(cash_flows.interest.shape[1]),
+            "n_loans": int(collateral.balance.size),
+            "principal_mode": principal_mode,
+            "collateral": {
+                "expected_losses": float(cash_flows.losses.sum(axis=1).mean()),
+                "expected_prepayments": float(cash_flows.prepayments.sum(axis=1).mean()),
+                "expected_interest": float(cash_flows.interest.sum(axis=1).mean()),
+            },
+            "expected_residual": float(result.residual.mean()),
+            "tranches": result.summary([t.balance for t in waterfall_tranches], percentiles)
+        }
@@ -1,125 +1,137 @@
 """Web search analytics service vendored from dev/analytics.py.
 
 Follows repository patterns:
-- File-based storage with configurable directory
-- Thread-safe operations using filelock
-- Integration with settings for data directory
+- Requests are recorded into the shared metrics registry (app.core.metrics),
+  an in-memory buffer flushed periodically to an append-only SQLite store
+- Daily reports read pre-bucketed aggregates instead of raw history
+- Counts and durations from the legacy JSON files are imported once
 """
 
-import os
 import json
+import logging
+import os
+import threading
 from datetime import datetime, timedelta, timezone
-from filelock import FileLock
+
 import pandas as pd
+from filelock import FileLock
 
 from app.core.config import settings
+from app.core.metrics import get_metrics, get_metrics_store, get_metrics_writer
 
-# Determine data directory following repository patterns
+logger = logging.getLogger(__name__)
+
+REQUESTS_METRIC = "web_search.requests"
+DURATION_METRIC = "web_search.duration_seconds"
+
+# Legacy analytics directory (JSON files written by earlier versions)
 # 1. Check for environment variable override
 # 2. Use settings.WEB_SEARCH_ANALYTICS_DIR if configured
 # 3. Use ./data for local development
 DATA_DIR = os.getenv("WEB_SEARCH_ANALYTICS_DIR")
 if not DATA_DIR:
-    if hasattr(settings, "WEB_SEARCH_ANALYTICS_DIR"):
+    if getattr(settings, "WEB_SEARCH_ANALYTICS_DIR", None):
         DATA_DIR = str(settings.WEB_SEARCH_ANALYTICS_DIR)
     elif os.path.exists("/data") and os.access("/data", os.W_OK):
         DATA_DIR = "/data"
     else:
         DATA_DIR = "./data"
 
-os.makedirs(DATA_DIR, exist_ok=True)
-
 COUNTS_FILE = os.path.join(DATA_DIR, "web_search_request_counts.json")
 TIMES_FILE = os.path.join(DATA_DIR, "web_search_request_times.json")
 LOCK_FILE = os.path.join(DATA_DIR, "web_search_analytics.lock")
 
-
-def _load() -> dict:
-    """Load request counts from file."""
-    if not os.path.exists(COUNTS_FILE):
-        return {}
-    with open(COUNTS_FILE) as f:
-        return json.load(f)
+_legacy_lock = threading.Lock()
+_legacy_imported = False
+
+
+def _import_legacy_files() -> None:
+    """Move counts and durations from the legacy JSON files into the metrics store (once)."""
+    global _legacy_imported
+    with _legacy_lock:
+        if _legacy_imported:
+            return
+        _legacy_imported = True
+        if not os.path.exists(COUNTS_FILE) and not os.path.exists(TIMES_FILE):
+            return
+        metrics = get_metrics()
+        # Other workers may be importing too; whoever gets the lock first renames the files
+        with FileLock(LOCK_FILE):
+            for path, record in ((COUNTS_FILE, _import_counts), (TIMES_FILE, _import_times)):
+                if not os.path.exists(path):
+                    continue
+                try:
+                    with open(path) as f:
+                        for day, value in json.load(f).items():
+                            at = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+                            record(metrics, at, value)
+                    get_metrics_writer().flush_sync()
+                    os.replace(path, path + ".imported")
+                    logger.info(f"Imported legacy web search analytics from {path}")
+                except Exception as e:
+                    logger.warning(f"Failed to import legacy web search analytics from {path}: {e}")
+
+
+def _import_counts(metrics, at: float, count: int) -> None:
+    for _ in range(count):
+        metrics.increment(REQUESTS_METRIC, at=at)
+
+
+def _import_times(metrics, at: float, durations) -> None:
+    for duration in durations:
+        metrics.observe(DURATION_METRIC, duration, at=at)
 
 
-def _save(data: dict):
-    """Save request counts to file."""
-    with open(COUNTS_FILE, "w") as f:
-        json.dump(data, f)
-
-
-def _load_times() -> dict:
-    """Load request times from file."""
-    if not os.path.exists(TIMES_FILE):
-        return {}
-    with open(TIMES_FILE) as f:
-        return json.load(f)
+async def record_request(duration: float = None, num_results: int = None) -> None:
+    """
+    Count a request (UTC day buckets) and optionally record its duration.
 
+    Only updates the in-memory metrics buffer; the metrics writer persists it.
+    """
+    metrics = get_metrics()
+    metrics.increment(REQUESTS_METRIC)
 
-def _save_times(data: dict):
-    """Save request times to file."""
-    with open(TIMES_FILE, "w") as f:
-        json.dump(data, f)
+    # Only record times for default requests (num_results=4)
+    if duration is not None and (num_results is None or num_results == 4):
+        metrics.observe(DURATION_METRIC, duration)
 
 
-async def record_request(duration: float = None, num_results: int = None) -> None:
-    """
-    Increment today's counter (UTC) atomically and optionally record request duration.
-    
-    Follows pattern from dev/analytics.py.
-    """
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    with FileLock(LOCK_FILE):
-        # Update counts
-        data = _load()
-        data[today] = data.get(today, 0) + 1
-        _save(data)
-        
-        # Only record times for default requests (num_results=4)
-        if duration is not None and (num_results is None or num_results == 4):
-            times = _load_times()
-            if today not in times:
-                times[today] = []
-            times[today].append(round(duration, 2))
-            _save_times(times)
+def _daily(metric: str, n: int):
+    """Flush buffered metrics and return (days, aggregates keyed by day start)."""
+    _import_legacy_files()
+    get_metrics_writer().flush_sync()
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    days = [today - timedelta(days=n - 1 - i) for i in range(n)]
+    rows = get_metrics_store().aggregate(
+        metric, days[0].timestamp(), (today + timedelta(days=1)).timestamp(), interval="day"
+    )
+    return days, {row["bucket_start"]: row for row in rows}
 
 
 def last_n_days_df(n: int = 30) -> pd.DataFrame:
     """Return a DataFrame with a row for each of the past *n* days."""
-    now = datetime.now(timezone.utc)
-    with FileLock(LOCK_FILE):
-        data = _load()
+    days, rows = _daily(REQUESTS_METRIC, n)
     records = []
-    for i in range(n):
-        day = (now - timedelta(days=n - 1 - i))
-        day_str = day.strftime("%Y-%m-%d")
-        display_date = day.strftime("%b %d")
+    for day in days:
+        row = rows.get(int(day.timestamp()))
         records.append({
-            "date": display_date,
-            "count": data.get(day_str, 0),
-            "full_date": day_str
+            "date": day.strftime("%b %d"),
+            "count": row["count"] if row else 0,
+            "full_date": day.strftime("%Y-%m-%d")
         })
     return pd.DataFrame(records)
 
 
 def last_n_days_avg_time_df(n: int = 30) -> pd.DataFrame:
     """Return a DataFrame with average request time for each of the past *n* days."""
-    now = datetime.now(timezone.utc)
-    with FileLock(LOCK_FILE):
-        times = _load_times()
+    days, rows = _daily(DURATION_METRIC, n)
     records = []
-    for i in range(n):
-        day = (now - timedelta(days=n - 1 - i))
-        day_str = day.strftime("%Y-%m-%d")
-        display_date = day.strftime("%b %d")
-        
-        day_times = times.get(day_str, [])
-        avg_time = round(sum(day_times) / len(day_times), 2) if day_times else 0
-        
+    for day in days:
+        row = rows.get(int(day.timestamp()))
         records.append({
-            "date": display_date,
-            "avg_time": avg_time,
-            "request_count": len(day_times),
-            "full_date": day_str
+            "date": day.strftime("%b %d"),
+            "avg_time": round(row["sum"] / row["count"], 2) if row else 0,
+            "request_count": row["count"] if row else 0,
+            "full_date": day.strftime("%Y-%m-%d")
         })
     return pd.DataFrame(records)
@@ -5,6 +5,7 @@ Follows existing service layer patterns:
 - Rate limiting using limits library
 - Analytics integration
 - CDM event generation for search operations
+- Pooled keep-alive HTTP client (app.core.http_client) shared across searches
 """
 
 import logging
@@ -22,6 +23,8 @@ from limits.aio.storage import MemoryStorage
 from limits.aio.strategies import MovingWindowRateLimiter
 
 from app.core.config import settings
+from app.core.http_client import fetch_public_url, get_async_http_client
+from app.services.reranker_worker import RerankerWorker
 from app.services.web_search_analytics import (
     record_request,
     last_n_days_df,
@@ -85,6 +88,7 @@ class WebSearchService:
         
         # Initialize reranking model if using local
         self._reranker = None
+        self._rerank_worker: Optional[RerankerWorker] = None
         if self.use_local_reranking:
             self._init_local_reranker()
     
@@ -102,6 +106,12 @@ class WebSearchService:
                 self.reranking_model,
                 device=self.reranking_device
             )
+            self._rerank_worker = RerankerWorker(
+                self._reranker,
+                batch_window_ms=settings.RERANKING_BATCH_WINDOW_MS,
+                max_batch_pairs=settings.RERANKING_MAX_BATCH_PAIRS,
+                max_workers=settings.RERANKING_WORKERS
+            )
         except ImportError:
             logger.warning(
                 "sentence-transformers not available for local reranking. "
@@ -180,12 +190,12 @@ class WebSearchService:
                 payload["page"] = 1
             
             # Execute search
-            async with httpx.AsyncClient(timeout=15) as client:
-                headers = {
-                    "X-API-KEY": self.serper_api_key,
-                    "Content-Type": "application/json"
-                }
-                resp = await client.post(endpoint, headers=headers, json=payload)
+            client = get_async_http_client()
+            headers = {
+                "X-API-KEY": self.serper_api_key,
+                "Content-Type": "application/json"
+            }
+            resp = await client.post(endpoint, headers=headers, json=payload, timeout=15)
             
             if resp.status_code != 200:
                 duration = time.time() - start_time
@@ -214,23 +224,15 @@ class WebSearchService:
             
             # Fetch and extract content
             urls = [r["link"] for r in results]
-            async with httpx.AsyncClient(timeout=20, follow_redirects=True) as client:
-                tasks = [client.get(u) for u in urls]
-                responses = await asyncio.gather(*tasks, return_exceptions=True)
+            bodies = await asyncio.gather(
+                *(self._fetch_content(client, u) for u in urls),
+                return_exceptions=True
+            )
             
-            # Extract content with trafilatura
+            # Format extracted content
             chunks = []
-            for meta, response in zip(results, responses):
-                if isinstance(response, Exception):
-                    continue
-                
-                body = trafilatura.extract(
-                    response.text,
-                    include_formatting=True,
-                    include_comments=False
-                )
-                
-                if not body:
+            for meta, body in zip(results, bodies):
+                if isinstance(body, Exception) or not body:
                     continue
                 
                 # Format chunk
@@ -303,6 +305,41 @@ class WebSearchService:
             logger.error(f"Web search failed: {e}")
             raise
     
+    async def _fetch_content(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+        """
+        Fetch a page and extract its main content with trafilatura.
+        
+        Pages on non-public hosts (including redirect targets) are refused.
+        Extraction parses the whole HTML document, so it runs in a worker
+        thread to keep the event loop responsive.
+        
+        Args:
+            client: Pooled HTTP client
+            url: Page URL
+            
+        Returns:
+            Extracted text, or None if nothing could be extracted
+        """
+        response = await fetch_public_url(client, url, timeout=20)
+        return await asyncio.to_thread(
+            trafilatura.extract,
+            response.text,
+            include_formatting=True,
+            include_comments=False
+        )
+    
+    async def read_url(self, url: str) -> Optional[str]:
+        """
+        Fetch a single page and extract its main content.
+        
+        Args:
+            url: Page URL
+            
+        Returns:
+            Extracted text, or None if nothing could be extracted
+        """
+        return await self._fetch_content(get_async_http_client(), url)
+    
     async def _rerank_results(
         self,
         query: str,
@@ -323,8 +360,8 @@ class WebSearchService:
         if not chunks:
             return []
         
-        if self.use_local_reranking and self._reranker:
-            # Local reranking using CrossEncoder
+        if self.use_local_reranking and self._rerank_worker:
+            # Local reranking using CrossEncoder, batched off the event loop
             try:
                 # Prepare pairs: (query, content) for each chunk
                 pairs = [
@@ -333,7 +370,7 @@ class WebSearchService:
                 ]
                 
                 # Get reranking scores
-                scores = self._reranker.predict(pairs)
+                scores = await self._rerank_worker.score(pairs)
                 
                 # Sort by score (descending)
                 scored_chunks = list(zip(chunks, scores))
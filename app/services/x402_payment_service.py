@@ -5,12 +5,13 @@ Handles payment processing using x402 standard, integrated with CDM domain model
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from decimal import Decimal
 from datetime import datetime
 from fastapi import HTTPException, status, Request
 import httpx
 
+from app.core.http_client import get_async_http_client
 from app.models.cdm import CreditAgreement, Money, Currency, Party
 
 logger = logging.getLogger(__name__)
@@ -41,7 +42,11 @@ class X402PaymentService:
         self.facilitator_url = facilitator_url.rstrip('/')
         self.network = network
         self.token = token
-        self.client = httpx.AsyncClient(timeout=30.0)
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client shared with the rest of the application."""
+        return get_async_http_client()
     
     async def request_payment(
         self,
@@ -225,6 +230,55 @@ class X402PaymentService:
             "transaction_hash": settlement.get("transaction_hash")
         }
     
+    async def process_batch_payment_flow(
+        self,
+        payouts: List[Dict[str, Any]],
+        currency: Currency,
+        payer: Party,
+        payment_type: str,
+        payment_payload: Optional[Dict[str, Any]] = None,
+        cdm_reference: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Settle many payouts from one payer with a single request → verify → settle.
+        
+        Args:
+            payouts: Dicts with receiver (CDM Party), amount and optional reference
+            currency: Payment currency
+            payer: Payer party
+            payment_type: Type of payment
+            payment_payload: Optional payment payload covering the batch total
+            cdm_reference: Optional CDM event reference
+        
+        Returns:
+            Complete payment result; payment_request lists every payout
+        """
+        total = sum((Decimal(str(p["amount"])) for p in payouts), Decimal("0"))
+        reference = dict(cdm_reference or {})
+        reference["payouts"] = [
+            {
+                "receiver_id": p["receiver"].id,
+                "wallet_address": getattr(p["receiver"], "wallet_address", None) or p["receiver"].id,
+                "amount": str(p["amount"]),
+                "reference": p.get("reference") or {}
+            }
+            for p in payouts
+        ]
+        receiver = Party(
+            id=f"batch_{payer.id}",
+            name=f"{len(payouts)} recipients",
+            lei=None
+        )
+        return await self.process_payment_flow(
+            amount=total,
+            currency=currency,
+            payer=payer,
+            receiver=receiver,
+            payment_type=payment_type,
+            payment_payload=payment_payload,
+            cdm_reference=reference
+        )
+    
     def _get_token_address(self, currency: Currency) -> str:
         """Get token address for currency on network."""
         # Map CDM currencies to token addresses
@@ -236,8 +290,8 @@ class X402PaymentService:
         return token_map.get(currency, token_map[Currency.USD])
     
     async def close(self):
-        """Close HTTP client."""
-        await self.client.aclose()
+        """Release resources (the shared HTTP pool is closed on application shutdown)."""
+        logger.debug("x402 Payment service released the shared HTTP client")
 
 
 def get_x402_payment_service(request: Request) -> Optional[X402PaymentService]:
@@ -3,15 +3,47 @@
 This module provides intelligent splitting strategies for long credit agreement
 documents, focusing on splitting by Articles (Article I, Article II, etc.)
 which is the standard structure for legal credit agreements.
+
+CreditAgreementSplitter.iter_chunks() consumes text incrementally (e.g. the
+pages yielded by app.utils.pdf_extractor.iter_pdf_pages) and emits chunks as
+soon as an article boundary is confirmed. Chunk sizes are budgeted in tokens;
+text without article headers is split into overlapping windows.
 """
 
 import re
 import logging
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# Fallback characters-per-token ratio when no tokenizer is available
+CHARS_PER_TOKEN = 4
+# Text longer than budget * MAX_CHARS_PER_TOKEN is treated as over budget without tokenizing it
+MAX_CHARS_PER_TOKEN = 16
+# Slice size used to feed a whole document through iter_chunks
+SPLIT_SLICE_CHARS = 64 * 1024
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Load the tiktoken encoding once; None if tiktoken or its BPE file is unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.info(f"tiktoken unavailable ({e}), estimating tokens as chars/{CHARS_PER_TOKEN}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens in text (cl100k_base when available, otherwise a chars/4 estimate)."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
 
 @dataclass
 class DocumentChunk:
@@ -37,138 +69,180 @@ class CreditAgreementSplitter:
         re.IGNORECASE | re.MULTILINE
     )
     
-    def __init__(self, min_chunk_size: int = 500, max_chunk_size: int = 8000):
+    def __init__(
+        self,
+        min_chunk_size: int = 500,
+        max_chunk_size: int = 8000,
+        max_chunk_tokens: Optional[int] = None,
+        overlap_tokens: int = 200,
+        token_counter: Optional[Callable[[str], int]] = None
+    ):
         """Initialize the splitter.
         
         Args:
-            min_chunk_size: Minimum characters per chunk (default: 500)
+            min_chunk_size: Minimum characters for a preamble chunk (default: 500)
             max_chunk_size: Maximum characters per chunk (default: 8000, fits in context)
+            max_chunk_tokens: Token budget per chunk used by iter_chunks
+                (default: max_chunk_size / CHARS_PER_TOKEN)
+            overlap_tokens: Overlap between windows of text without article headers
+            token_counter: Token counting function (default: count_tokens)
         """
         self.min_chunk_size = min_chunk_size
         self.max_chunk_size = max_chunk_size
+        self.max_chunk_tokens = max_chunk_tokens or max(1, max_chunk_size // CHARS_PER_TOKEN)
+        self.overlap_tokens = min(overlap_tokens, self.max_chunk_tokens // 2)
+        self.count_tokens = token_counter or count_tokens
     
-    def split_by_articles(self, text: str) -> List[DocumentChunk]:
-        """Split document by Article sections.
+    def iter_chunks(self, pages: Iterable[str], separator: str = "\n") -> Iterator[DocumentChunk]:
+        """Incrementally split a document given as a stream of text pages.
+        
+        An article is emitted once the next article header (or the end of the
+        stream) is seen; articles over the token budget are emitted in
+        paragraph-aligned pieces as soon as each piece is complete. Text
+        before the first header (or the whole document, if it has none) is
+        emitted in overlapping windows instead of being truncated.
         
         Args:
-            text: The full document text.
+            pages: Iterable of page texts, in document order.
+            separator: String placed between consecutive pages.
             
-        Returns:
-            List of DocumentChunk objects, each representing an Article section.
+        Yields:
+            DocumentChunk objects in document order, with absolute offsets.
         """
-        chunks: List[DocumentChunk] = []
+        buffer = ""
+        offset = 0  # absolute position of buffer[0]
+        header: Optional[re.Match] = None  # header of the current section, None before the first
+        header_end = 0  # absolute end of the current header line
+        chunk_index = 0
         
-        # Find all Article headers
-        article_matches = list(self.ARTICLE_PATTERN.finditer(text))
+        def emit(end: int, final: bool) -> Iterator[DocumentChunk]:
+            """Emit buffer[:end] as the rest of the current section (final) or its complete leading pieces."""
+            nonlocal buffer, offset, chunk_index
+            section = buffer[:end]
+            if header is None and final and end < len(buffer) and len(section.strip()) < self.min_chunk_size:
+                # Short preamble before the first article (cover page, TOC heading)
+                pieces, consumed = [], end
+            else:
+                pieces, consumed = self._window(section, final, self.overlap_tokens if header is None else 0)
+            for start, stop in pieces:
+                text = section[start:stop].strip()
+                if not text:
+                    continue
+                yield DocumentChunk(
+                    text=text,
+                    article_number=self._parse_article_number(header.group(1)) if header else None,
+                    article_title=header.group(2).strip() if header else None,
+                    chunk_index=chunk_index,
+                    start_char=offset + start,
+                    end_char=offset + stop
+                )
+                chunk_index += 1
+            buffer = buffer[consumed:]
+            offset += consumed
         
-        if not article_matches:
-            # No articles found, split by paragraphs or return as single chunk
-            logger.warning("No Article sections found, returning document as single chunk")
-            return [DocumentChunk(
-                text=text[:self.max_chunk_size],
-                article_number=None,
-                article_title=None,
-                chunk_index=0,
-                start_char=0,
-                end_char=min(len(text), self.max_chunk_size)
-            )]
+        def split_headers(at_end: bool) -> Iterator[DocumentChunk]:
+            """Close the current section at each confirmed header in the buffer."""
+            nonlocal header, header_end
+            while True:
+                # Until the stream ends, a header on the last (possibly incomplete) line is not confirmed
+                match = next(
+                    (m for m in self.ARTICLE_PATTERN.finditer(buffer, max(0, header_end - offset))
+                     if at_end or m.end() < len(buffer)),
+                    None
+                )
+                if match is None:
+                    return
+                yield from emit(match.start(), final=True)
+                header = self.ARTICLE_PATTERN.match(buffer)
+                header_end = offset + header.end()
         
-        # Process each Article section
-        for idx, match in enumerate(article_matches):
-            article_num_str = match.group(1)
-            article_title = match.group(2).strip()
-            
-            # Determine start and end positions
-            start_pos = match.start()
+        for page_number, page in enumerate(pages):
+            buffer += page if page_number == 0 else separator + page
+            yield from split_headers(at_end=False)
             
-            # End position is either the start of the next article, or end of document
-            if idx + 1 < len(article_matches):
-                end_pos = article_matches[idx + 1].start()
-            else:
-                end_pos = len(text)
-            
-            # Extract the article text
-            article_text = text[start_pos:end_pos].strip()
-            
-            # If article is too long, split it further
-            if len(article_text) > self.max_chunk_size:
-                sub_chunks = self._split_large_article(
-                    article_text,
-                    article_num_str,
-                    article_title,
-                    start_pos
-                )
-                chunks.extend(sub_chunks)
-            else:
-                # Convert article number (Roman or Arabic) to integer for sorting
-                article_number = self._parse_article_number(article_num_str)
-                
-                chunks.append(DocumentChunk(
-                    text=article_text,
-                    article_number=article_number,
-                    article_title=article_title,
-                    chunk_index=len(chunks),
-                    start_char=start_pos,
-                    end_char=end_pos
-                ))
+            # Flush complete, full-budget pieces of a long section without waiting for its end
+            last_line = buffer.rfind("\n")
+            if last_line > 0:
+                yield from emit(last_line, final=False)
         
-        return chunks
+        yield from split_headers(at_end=True)
+        yield from emit(len(buffer), final=True)
+        if header is None:
+            logger.warning("No Article sections found, split document into overlapping windows")
     
-    def _split_large_article(
-        self,
-        article_text: str,
-        article_num_str: str,
-        article_title: str,
-        base_start_pos: int
-    ) -> List[DocumentChunk]:
-        """Split a large article into smaller chunks.
+    def window_spans(self, text: str, overlap: bool = True) -> List[Tuple[int, int]]:
+        """Split text into (start, end) spans within the token budget.
         
-        Uses paragraph boundaries to maintain semantic coherence.
+        Args:
+            text: Text to split (article headers are not treated specially).
+            overlap: Overlap consecutive spans by overlap_tokens.
+            
+        Returns:
+            Paragraph/line/word-aligned spans covering text, in order.
         """
-        chunks = []
-        paragraphs = article_text.split('\n\n')
-        
-        current_chunk = []
-        current_size = 0
-        chunk_start = 0
-        
-        article_number = self._parse_article_number(article_num_str)
+        spans, _ = self._window(text, final=True, overlap=self.overlap_tokens if overlap else 0)
+        return spans
+    
+    def _window(self, text: str, final: bool, overlap: int) -> Tuple[List[Tuple[int, int]], int]:
+        """Cut text into pieces within the token budget.
         
-        for para in paragraphs:
-            para_size = len(para)
-            
-            # If adding this paragraph would exceed max size, finalize current chunk
-            if current_size + para_size > self.max_chunk_size and current_chunk:
-                chunk_text = '\n\n'.join(current_chunk)
-                if len(chunk_text) >= self.min_chunk_size:
-                    chunks.append(DocumentChunk(
-                        text=chunk_text,
-                        article_number=article_number,
-                        article_title=article_title,
-                        chunk_index=len(chunks),
-                        start_char=base_start_pos + chunk_start,
-                        end_char=base_start_pos + chunk_start + len(chunk_text)
-                    ))
-                    chunk_start += len(chunk_text)
-                    current_chunk = []
-                    current_size = 0
+        Args:
+            text: Section text.
+            final: Whether the section is complete (emit the remainder too).
+            overlap: Tokens of overlap between consecutive pieces.
             
-            current_chunk.append(para)
-            current_size += para_size + 2  # +2 for '\n\n'
-        
-        # Add remaining chunk
-        if current_chunk:
-            chunk_text = '\n\n'.join(current_chunk)
-            chunks.append(DocumentChunk(
-                text=chunk_text,
-                article_number=article_number,
-                article_title=article_title,
-                chunk_index=len(chunks),
-                start_char=base_start_pos + chunk_start,
-                end_char=base_start_pos + chunk_start + len(chunk_text)
-            ))
+        Returns:
+            (start, end) spans of the pieces, and how many leading characters
+            of text are fully consumed (the rest must be kept for later).
+        """
+        pieces: List[Tuple[int, int]] = []
+        start = 0
+        while start < len(text):
+            remaining = text[start:]
+            if self._fits(remaining, self.max_chunk_tokens):
+                if not final:
+                    break
+                pieces.append((start, len(text)))
+                return pieces, len(text)
+            stop = start + self._cut(remaining, self.max_chunk_tokens)
+            pieces.append((start, stop))
+            next_start = stop
+            if overlap:
+                tail = text[start:stop]
+                next_start = max(start + 1, stop - self._cut(tail[::-1], overlap))
+            start = next_start
+        return pieces, start if not final else len(text)
+    
+    def _fits(self, text: str, budget: int) -> bool:
+        return len(text) <= budget * MAX_CHARS_PER_TOKEN and self.count_tokens(text) <= budget
+    
+    def _cut(self, text: str, budget: int) -> int:
+        """Largest paragraph/line/word-aligned prefix length of text within budget tokens."""
+        text = text[:budget * MAX_CHARS_PER_TOKEN]
+        ratio = len(text) / max(1, self.count_tokens(text))
+        limit = min(len(text), max(1, int(budget * ratio)))
+        while True:
+            cut = limit
+            for boundary in ("\n\n", "\n", " "):
+                pos = text.rfind(boundary, 0, limit)
+                if pos > limit // 2:
+                    cut = pos + len(boundary)
+                    break
+            if cut <= 1 or self.count_tokens(text[:cut]) <= budget:
+                return cut
+            limit = max(1, int(limit * 0.9))
+    
+    def split_by_articles(self, text: str) -> List[DocumentChunk]:
+        """Split document by Article sections.
         
-        return chunks
+        Args:
+            text: The full document text.
+            
+        Returns:
+            List of DocumentChunk objects, each representing an Article section.
+        """
+        slices = (text[i:i + SPLIT_SLICE_CHARS] for i in range(0, len(text), SPLIT_SLICE_CHARS))
+        return list(self.iter_chunks(slices, separator=""))
     
     def _parse_article_number(self, article_num_str: str) -> int:
         """Parse article number from Roman numeral or Arabic numeral.
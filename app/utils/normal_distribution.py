@@ -0,0 +1,134 @@
+"""Vectorized standard normal CDF and inverse CDF (NumPy, double precision).
+
+norm_cdf uses Hart's algorithm 5666 as given by West (2005), "Better
+approximations to cumulative normal functions", accurate to ~1e-16
+absolute.
+norm_ppf uses Wichura's AS241 (PPND16), the same algorithm as
+statistics.NormalDist.inv_cdf, accurate to ~1e-16.
+
+Both accept scalars or arrays and return float64 arrays, so whole
+portfolios can be evaluated without per-exposure Python calls.
+"""
+
+import numpy as np
+
+_SQRT_2PI = 2.5066282746310002
+
+
+def norm_cdf(x) -> np.ndarray:
+    """Standard normal cumulative distribution function N(x)."""
+    x = np.asarray(x, dtype=np.float64)
+    ax = np.abs(x)
+    exponential = np.exp(-0.5 * ax * ax)
+
+    # |x| < 7.07: rational approximation
+    num = 3.52624965998911e-02 * ax + 0.700383064443688
+    num = num * ax + 6.37396220353165
+    num = num * ax + 33.912866078383
+    num = num * ax + 112.079291497871
+    num = num * ax + 221.213596169931
+    num = num * ax + 220.206867912376
+    den = 8.83883476483184e-02 * ax + 1.75566716318264
+    den = den * ax + 16.064177579207
+    den = den * ax + 86.7807322029461
+    den = den * ax + 296.564248779674
+    den = den * ax + 637.333633378831
+    den = den * ax + 793.826512519948
+    den = den * ax + 440.413735824752
+    tail = exponential * num / den
+
+    # |x| >= 7.07: continued fraction (rare, so only evaluated where needed)
+    far = ax >= 7.07106781186547
+    if np.any(far):
+        af = ax[far]
+        cf = af + 0.65
+        cf = af + 4.0 / cf
+        cf = af + 3.0 / cf
+        cf = af + 2.0 / cf
+        cf = af + 1.0 / cf
+        tail[far] = np.where(af > 37.0, 0.0, exponential[far] / cf / _SQRT_2PI)
+    return np.where(x > 0, 1.0 - tail, tail)
+
+
+def norm_ppf(p) -> np.ndarray:
+    """Inverse standard normal cumulative distribution function G(p).
+
+    Raises:
+        ValueError: If any p is outside the open interval (0, 1).
+    """
+    p = np.asarray(p, dtype=np.float64)
+    if np.any((p <= 0.0) | (p >= 1.0)) or np.any(np.isnan(p)):
+        raise ValueError("p must be between 0 and 1")
+
+    q = p - 0.5
+    x = np.empty_like(q)
+    central = np.abs(q) <= 0.425
+
+    # Central region: |p - 0.5| <= 0.425
+    qc = q[central]
+    r = 0.180625 - qc * qc
+    num = (((((((2.5090809287301226727e+3 * r +
+                 3.3430575583588128105e+4) * r +
+                 6.7265770927008700853e+4) * r +
+                 4.5921953931549871457e+4) * r +
+                 1.3731693765509461125e+4) * r +
+                 1.9715909503065514427e+3) * r +
+                 1.3314166789178437745e+2) * r +
+                 3.3871328727963666080e+0) * qc
+    den = (((((((5.2264952788528545610e+3 * r +
+                 2.8729085735721942674e+4) * r +
+                 3.9307895800092710610e+4) * r +
+                 2.1213794301586595867e+4) * r +
+                 5.3941960214247511077e+3) * r +
+                 6.8718700749205790830e+2) * r +
+                 4.2313330701600911252e+1) * r +
+                 1.0)
+    x[central] = num / den
+
+    # Tails: r = sqrt(-log(min(p, 1 - p)))
+    tails = ~central
+    qt = q[tails]
+    r = np.sqrt(-np.log(np.where(qt <= 0.0, p[tails], 1.0 - p[tails])))
+    xt = np.empty_like(r)
+    near = r <= 5.0
+
+    r1 = r[near] - 1.6
+    num = (((((((7.74545014278341407640e-4 * r1 +
+                 2.27238449892691845833e-2) * r1 +
+                 2.41780725177450611770e-1) * r1 +
+                 1.27045825245236838258e+0) * r1 +
+                 3.64784832476320460504e+0) * r1 +
+                 5.76949722146069140550e+0) * r1 +
+                 4.63033784615654529590e+0) * r1 +
+                 1.42343711074968357734e+0)
+    den = (((((((1.05075007164441684324e-9 * r1 +
+                 5.47593808499534494600e-4) * r1 +
+                 1.51986665636164571966e-2) * r1 +
+                 1.48103976427480074590e-1) * r1 +
+                 6.89767334985100004550e-1) * r1 +
+                 1.67638483018380384940e+0) * r1 +
+                 2.05319162663775882187e+0) * r1 +
+                 1.0)
+    xt[near] = num / den
+
+    r2 = r[~near] - 5.0
+    num = (((((((2.01033439929228813265e-7 * r2 +
+                 2.71155556874348757815e-5) * r2 +
+                 1.24266094738807843860e-3) * r2 +
+                 2.65321895265761230930e-2) * r2 +
+                 2.96560571828504891230e-1) * r2 +
+                 1.78482653991729133580e+0) * r2 +
+                 5.46378491116411436990e+0) * r2 +
+                 6.65790464350110377720e+0)
+    den = (((((((2.04426310338993978564e-15 * r2 +
+                 1.42151175831644588870e-7) * r2 +
+                 1.84631831751005468180e-5) * r2 +
+                 7.86869131145613259100e-4) * r2 +
+                 1.48753612908506148525e-2) * r2 +
+                 1.36929880922735805310e-1) * r2 +
+                 5.99832206555887937690e-1) * r2 +
+                 1.0)
+    xt[~near] = num / den
+
+    x[tails] = np.where(qt < 0.0, -xt, xt)
+    return x
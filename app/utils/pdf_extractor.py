@@ -1,30 +1,254 @@
-"""PDF text extraction utilities for credit agreements."""
+"""PDF text extraction utilities for credit agreements.
 
+iter_pdf_pages() is the primary entry point: a PyMuPDF-backed generator that
+extracts pages in a shared process pool and yields them in page order as soon
+as they are ready, so downstream splitting can start before the last page is
+read. Only a bounded window of pages is in flight at any time, and page text
+is cached by (file hash, page number).
+
+extract_text_from_pdf() is kept for callers that need the whole document as
+one string; it falls back to PyPDF2 when PyMuPDF is unavailable.
+"""
+
+import hashlib
 import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Deque, Dict, Iterator, Optional, Tuple, Union
+
+from app.core.process_pool import default_workers, get_process_pool
 
 logger = logging.getLogger(__name__)
 
+try:
+    import pymupdf
+    PYMUPDF_SUPPORT = True
+except ImportError:
+    PYMUPDF_SUPPORT = False
+
 try:
     import PyPDF2
     PDF_SUPPORT = True
 except ImportError:
-    PDF_SUPPORT = False
-    logger.warning("PyPDF2 not installed. PDF extraction will not be available. Install with: pip install PyPDF2")
+    PDF_SUPPORT = PYMUPDF_SUPPORT
+    if not PYMUPDF_SUPPORT:
+        logger.warning("PyPDF2 not installed. PDF extraction will not be available. Install with: pip install PyPDF2")
+
+# Documents with fewer pages are extracted in-process (pool dispatch costs more than it saves)
+PARALLEL_MIN_PAGES = 32
+# Pages submitted to the pool per worker ahead of the consumer
+IN_FLIGHT_PER_WORKER = 4
+# Upper bound on cached page text, in characters
+PAGE_CACHE_MAX_CHARS = 50_000_000
+
+PdfSource = Union[str, Path, bytes]
+
+
+@dataclass
+class PdfPage:
+    """Text of a single PDF page."""
+    number: int  # 1-based page number
+    text: str
+
+
+class PageTextCache:
+    """In-memory LRU cache of page text keyed by (file hash, page number)."""
+
+    def __init__(self, max_chars: int = PAGE_CACHE_MAX_CHARS):
+        self.max_chars = max_chars
+        self._pages: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_hash: str, page_number: int) -> Optional[str]:
+        key = (file_hash, page_number)
+        with self._lock:
+            text = self._pages.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def set(self, file_hash: str, page_number: int, text: str) -> None:
+        key = (file_hash, page_number)
+        with self._lock:
+            previous = self._pages.pop(key, None)
+            if previous is not None:
+                self._chars -= len(previous)
+            self._pages[key] = text
+            self._chars += len(text)
+            while self._chars > self.max_chars and self._pages:
+                _, evicted = self._pages.popitem(last=False)
+                self._chars -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+            self._chars = 0
+
+
+_page_cache = PageTextCache()
+
+# Per-worker-process handle on the most recently opened document
+_worker_doc: Dict[str, object] = {}
+
+
+def get_page_cache() -> PageTextCache:
+    """Get the global page text cache."""
+    return _page_cache
+
+
+def _extract_page_in_worker(path: str, page_index: int) -> str:
+    """Pool task: extract one page, keeping the document open between tasks."""
+    doc = _worker_doc.get(path)
+    if doc is None:
+        for stale in _worker_doc.values():
+            stale.close()
+        _worker_doc.clear()
+        doc = pymupdf.open(path)
+        _worker_doc[path] = doc
+    return doc[page_index].get_text()
+
+
+def _read_source(source: PdfSource) -> bytes:
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    path = Path(source)
+    if not path.exists():
+        raise FileNotFoundError(f"PDF file not found: {path}")
+    return path.read_bytes()
+
+
+def iter_pdf_pages(
+    source: PdfSource,
+    max_workers: Optional[int] = None,
+    use_cache: bool = True
+) -> Iterator[PdfPage]:
+    """Yield the text of each PDF page, in order, as soon as it is extracted.
+
+    Args:
+        source: PDF path or raw bytes.
+        max_workers: Workers to keep busy in the shared process pool, which bounds
+            the pages in flight (default: CPU count, capped at 8).
+        use_cache: Serve and store page text in the (file hash, page) cache.
+
+    Yields:
+        PdfPage objects in page order.
+
+    Raises:
+        ImportError: If PyMuPDF is not installed.
+        FileNotFoundError: If the PDF file doesn't exist.
+        ValueError: If the PDF cannot be opened, has no pages, or a page
+            fails to extract (sequential and pooled extraction alike).
+    """
+    if not PYMUPDF_SUPPORT:
+        raise ImportError("PyMuPDF is required for streaming PDF extraction. Install with: pip install pymupdf")
+
+    content = _read_source(source)
+    file_hash = hashlib.sha256(content).hexdigest()
+
+    try:
+        doc = pymupdf.open(stream=content, filetype="pdf")
+    except Exception as e:
+        raise ValueError(f"Failed to open PDF: {e}") from e
+
+    try:
+        page_count = doc.page_count
+        if page_count == 0:
+            raise ValueError("Invalid PDF file: Document has no pages.")
+
+        workers = max_workers or default_workers()
+        cache = _page_cache if use_cache else None
+
+        if page_count < PARALLEL_MIN_PAGES or workers <= 1:
+            for index in range(page_count):
+                text = cache.get(file_hash, index + 1) if cache else None
+                if text is None:
+                    try:
+                        text = doc[index].get_text()
+                    except Exception as e:
+                        raise ValueError(f"Failed to extract text from page {index + 1}: {e}") from e
+                    if cache:
+                        cache.set(file_hash, index + 1, text)
+                yield PdfPage(number=index + 1, text=text)
+            return
+    finally:
+        doc.close()
+
+    yield from _iter_pages_parallel(content, file_hash, page_count, workers, cache)
+
+
+def _iter_pages_parallel(
+    content: bytes,
+    file_hash: str,
+    page_count: int,
+    workers: int,
+    cache: Optional[PageTextCache]
+) -> Iterator[PdfPage]:
+    """Extract pages in the process pool with a bounded in-flight window."""
+    # Workers open the document by path, so it crosses the process boundary once per worker
+    fd, path = tempfile.mkstemp(suffix=".pdf", prefix=f"cn_{file_hash[:12]}_")
+    pending: Deque[Tuple[int, Union[Future, str]]] = deque()
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+
+        pool = get_process_pool()
+        window = workers * IN_FLIGHT_PER_WORKER
+        next_index = 0
+
+        logger.info(f"Extracting {page_count} PDF pages with {workers} workers")
+        while next_index < page_count or pending:
+            while next_index < page_count and len(pending) < window:
+                cached = cache.get(file_hash, next_index + 1) if cache else None
+                if cached is not None:
+                    pending.append((next_index, cached))
+                else:
+                    pending.append((next_index, pool.submit(_extract_page_in_worker, path, next_index)))
+                next_index += 1
+
+            index, item = pending.popleft()
+            if isinstance(item, Future):
+                try:
+                    text = item.result()
+                except Exception as e:
+                    raise ValueError(f"Failed to extract text from page {index + 1}: {e}") from e
+                if cache:
+                    cache.set(file_hash, index + 1, text)
+            else:
+                text = item
+            yield PdfPage(number=index + 1, text=text)
+    finally:
+        # Consumer stopped early (or failed): drop work it will never read
+        for _, item in pending:
+            if isinstance(item, Future):
+                item.cancel()
+        try:
+            os.unlink(path)
+        except OSError as e:
+            logger.warning(f"Failed to remove temporary PDF {path}: {e}")
 
 
 def extract_text_from_pdf(pdf_path: str | Path) -> str:
     """Extract text content from a PDF file.
-    
+
     Args:
         pdf_path: Path to the PDF file.
-        
+
     Returns:
         Extracted text content as a string.
-        
+
     Raises:
-        ImportError: If PyPDF2 is not installed.
+        ImportError: If neither PyMuPDF nor PyPDF2 is installed.
         FileNotFoundError: If the PDF file doesn't exist.
         ValueError: If PDF extraction fails.
     """
@@ -32,36 +256,44 @@ def extract_text_from_pdf(pdf_path: str | Path) -> str:
         raise ImportError(
             "PyPDF2 is required for PDF extraction. Install with: pip install PyPDF2"
         )
-    
+
     pdf_path = Path(pdf_path)
     if not pdf_path.exists():
         raise FileNotFoundError(f"PDF file not found: {pdf_path}")
-    
+
     try:
-        text_parts = []
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            
-            logger.info(f"Extracting text from PDF: {len(pdf_reader.pages)} pages")
-            
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                try:
-                    page_text = page.extract_text()
-                    if page_text.strip():
-                        text_parts.append(page_text)
-                    logger.debug(f"Extracted text from page {page_num}")
-                except Exception as e:
-                    logger.warning(f"Failed to extract text from page {page_num}: {e}")
-                    continue
-        
+        if PYMUPDF_SUPPORT:
+            text_parts = [page.text for page in iter_pdf_pages(pdf_path) if page.text.strip()]
+        else:
+            text_parts = _extract_pages_pypdf2(pdf_path)
+
         full_text = "\n\n".join(text_parts)
-        
+
         if not full_text.strip():
             raise ValueError("No text could be extracted from the PDF")
-        
+
         logger.info(f"Successfully extracted {len(full_text)} characters from PDF")
         return full_text
-        
+
     except Exception as e:
         raise ValueError(f"Failed to extract text from PDF: {e}") from e
 
+
+def _extract_pages_pypdf2(pdf_path: Path) -> list:
+    """Extract non-empty page texts with PyPDF2 (fallback when PyMuPDF is missing)."""
+    text_parts = []
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+
+        logger.info(f"Extracting text from PDF: {len(pdf_reader.pages)} pages")
+
+        for page_num, page in enumerate(pdf_reader.pages, 1):
+            try:
+                page_text = page.extract_text()
+                if page_text.strip():
+                    text_parts.append(page_text)
+                logger.debug(f"Extracted text from page {page_num}")
+            except Exception as e:
+                logger.warning(f"Failed to extract text from page {page_num}: {e}")
+                continue
+    return text_parts
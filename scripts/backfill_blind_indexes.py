@@ -0,0 +1,105 @@
+"""
+Populate (or re-key) blind-index columns for encrypted lookup fields.
+
+This script:
+1. Walks users and documents in primary-key order, in batches
+2. Decrypts the indexed columns (email, borrower_name, borrower_lei)
+3. Recomputes their HMAC blind indexes with the current BLIND_INDEX_KEY
+4. Commits once per batch
+
+Run it after applying the add_blind_index_columns migration, and again
+whenever BLIND_INDEX_KEY (or ENCRYPTION_KEY, if no BLIND_INDEX_KEY is set)
+changes. It is idempotent.
+
+Usage:
+    python scripts/backfill_blind_indexes.py [--batch-size 1000] [--dry-run]
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import logging
+from sqlalchemy.orm import Session
+from app.db import SessionLocal
+from app.db.models import User, Document
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# model -> [(encrypted attribute, blind index attribute)]
+BLIND_INDEXED_COLUMNS = {
+    User: [("email", "email_bidx")],
+    Document: [("borrower_name", "borrower_name_bidx"), ("borrower_lei", "borrower_lei_bidx")],
+}
+
+
+def backfill_model(db: Session, model, columns, batch_size: int = 1000, dry_run: bool = False) -> int:
+    """Recompute blind indexes for one model; returns the number of changed rows."""
+    logger.info(f"Backfilling blind indexes for {model.__tablename__}...")
+    changed = 0
+    last_id = 0
+    
+    while True:
+        rows = (
+            db.query(model)
+            .filter(model.id > last_id)
+            .order_by(model.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        
+        for row in rows:
+            row_changed = False
+            for source, index in columns:
+                index_type = getattr(model, index).property.columns[0].type
+                try:
+                    digest = index_type.digest(getattr(row, source))
+                except Exception as e:
+                    logger.error(f"Failed to index {model.__tablename__}.{source} for id {row.id}: {e}")
+                    continue
+                if getattr(row, index) != digest:
+                    setattr(row, index, digest)
+                    row_changed = True
+            changed += row_changed
+        
+        last_id = rows[-1].id
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+        db.expunge_all()
+    
+    action = "Would update" if dry_run else "Updated"
+    logger.info(f"{action} {changed} {model.__tablename__} rows")
+    return changed
+
+
+def main():
+    """Main entry point."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Backfill blind-index columns")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per batch")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing")
+    args = parser.parse_args()
+    
+    if SessionLocal is None:
+        logger.error("Database is not configured")
+        sys.exit(1)
+    
+    db = SessionLocal()
+    try:
+        for model, columns in BLIND_INDEXED_COLUMNS.items():
+            backfill_model(db, model, columns, batch_size=args.batch_size, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark the audit statistics dashboard with and without hourly rollups.
+
+This script:
+1. Loads N audit logs spread over the last D days
+2. Times the dashboard queries (overview, daily timeline, top users, top
+   actions, anomaly detection) against the raw audit_logs table
+3. Runs the rollup task and times the same queries again
+
+Uses a throwaway SQLite database unless --database-url points at a scratch
+PostgreSQL database (the tables are created and dropped by the script).
+
+Usage:
+    python scripts/benchmark_audit_statistics.py [--logs 1000000] [--days 90] [--database-url URL]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.db.models import AuditLog, AuditLogRollup, AuditUserRollup, DetectionCheckpoint, User
+from app.services.audit_statistics_service import AuditStatisticsService
+
+TABLES = [
+    User.__table__, AuditLog.__table__, AuditLogRollup.__table__, AuditUserRollup.__table__,
+    DetectionCheckpoint.__table__
+]
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+def load_logs(engine, n_logs: int, days: int, seed: int) -> None:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    batch = []
+    with engine.begin() as conn:
+        for _ in range(n_logs):
+            batch.append({
+                "user_id": rng.randrange(1, 501),
+                "action": rng.choice(["create", "update", "delete", "login", "export"]),
+                "target_type": rng.choice(["deal", "document", "user"]),
+                "occurred_at": now - timedelta(seconds=rng.uniform(0, days * 86400)),
+            })
+            if len(batch) == 50_000:
+                conn.execute(insert(AuditLog.__table__), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(AuditLog.__table__), batch)
+
+
+def dashboard(service, db, days: int) -> float:
+    end = datetime.utcnow()
+    start = end - timedelta(days=days)
+    begin = time.perf_counter()
+    service.get_overview_statistics(db, start, end)
+    service.get_activity_timeline(db, start, end, interval="day")
+    service.get_top_users(db, start, end)
+    service.get_top_actions(db, start, end)
+    service.get_anomaly_detection(db, start, end)
+    return time.perf_counter() - begin
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark audit statistics with hourly rollups")
+    parser.add_argument("--logs", type=int, default=1_000_000, help="Audit logs to load")
+    parser.add_argument("--days", type=int, default=90, help="Days of history")
+    parser.add_argument("--database-url", default=None, help="Scratch database URL (default: temporary SQLite file)")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    args = parser.parse_args()
+
+    tmp_path = None
+    if args.database_url is None:
+        fd, tmp_path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        args.database_url = f"sqlite:///{tmp_path}"
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine, tables=TABLES)
+
+    try:
+        start = time.perf_counter()
+        load_logs(engine, args.logs, args.days, args.seed)
+        print(f"Loaded {args.logs:,} audit logs over {args.days} days in {time.perf_counter() - start:.1f}s")
+
+        service = AuditStatisticsService()
+        session = sessionmaker(bind=engine)()
+        print(f"Dashboard on raw rows: {dashboard(service, session, args.days):.2f}s")
+
+        start = time.perf_counter()
+        result = service.roll_up_audit_logs(session)
+        buckets = sum(table["buckets"] for table in result.values())
+        print(f"Initial rollup: {time.perf_counter() - start:.2f}s, {buckets:,} buckets")
+
+        start = time.perf_counter()
+        service.roll_up_audit_logs(session)
+        print(f"Incremental rollup (nothing new): {time.perf_counter() - start:.3f}s")
+
+        print(f"Dashboard on rollups: {dashboard(service, session, args.days):.2f}s")
+        session.close()
+    finally:
+        Base.metadata.drop_all(engine, tables=TABLES)
+        engine.dispose()
+        if tmp_path:
+            os.unlink(tmp_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark require_auth overhead with request tracing.
+
+This script:
+1. Issues a valid access token for a stub user (no database needed)
+2. Runs batches of concurrent require_auth calls on one event loop
+3. Compares the legacy per-request debug-file appends against sampled
+   tracing at several sample rates (with the background writer running)
+4. Reports p50/p99 per-call latency and total throughput
+
+Usage:
+    python scripts/benchmark_auth_tracing.py [--concurrency 1000] [--rounds 20]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Awaitable, Callable, List
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.auth.jwt_auth import create_access_token, decode_access_token, require_auth
+from app.core.config import settings
+from app.core.tracing import TraceWriter, get_trace_buffer
+
+
+class _StubQuery:
+    def __init__(self, user):
+        self._user = user
+
+    def filter(self, *args):
+        return self
+
+    def first(self):
+        return self._user
+
+
+class _StubSession:
+    """Session stand-in returning one active user for any query."""
+
+    def __init__(self, user):
+        self._user = user
+
+    def query(self, model):
+        return _StubQuery(self._user)
+
+
+async def legacy_require_auth(credentials, db, log_path: Path):
+    """Pre-tracing require_auth: three synchronous debug-file appends per call."""
+    log_data = {"location": "jwt_auth.py:require_auth", "data": {"has_credentials": True}}
+    with open(log_path, "a") as f:
+        f.write(json.dumps(log_data) + "\n")
+    payload = decode_access_token(credentials.credentials)
+    log_data["data"] = {"payload_found": payload is not None}
+    with open(log_path, "a") as f:
+        f.write(json.dumps(log_data) + "\n")
+    user = db.query(None).filter().first()
+    log_data["data"] = {"user_found": user is not None}
+    with open(log_path, "a") as f:
+        f.write(json.dumps(log_data) + "\n")
+    return user
+
+
+async def measure(call: Callable[[], Awaitable], concurrency: int, rounds: int) -> List[float]:
+    """Run ``rounds`` batches of ``concurrency`` concurrent calls; return per-call latencies in ms."""
+    latencies: List[float] = []
+
+    async def timed():
+        start = time.perf_counter()
+        await call()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    for _ in range(rounds):
+        await asyncio.gather(*(timed() for _ in range(concurrency)))
+    return latencies
+
+
+def report(label: str, latencies: List[float], elapsed: float) -> None:
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:28s} p50 {p50 * 1000:8.1f} us   p99 {p99 * 1000:8.1f} us   {len(latencies) / elapsed:>10,.0f} req/s")
+
+
+async def main_async(concurrency: int, rounds: int) -> None:
+    user = SimpleNamespace(id=1, is_active=True)
+    db = _StubSession(user)
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_access_token({"sub": "1", "email": "bench@example.com"})
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_log = Path(tmp) / "debug.log"
+        start = time.perf_counter()
+        latencies = await measure(lambda: legacy_require_auth(credentials, db, legacy_log), concurrency, rounds)
+        report("legacy debug-file writes", latencies, time.perf_counter() - start)
+
+        writer = TraceWriter(path=str(Path(tmp) / "traces.jsonl"), interval=0.05)
+        writer.start()
+        for rate in (0.0, 0.01, 1.0):
+            settings.TRACE_SAMPLE_RATE = rate
+            start = time.perf_counter()
+            latencies = await measure(lambda: require_auth(credentials, db), concurrency, rounds)
+            report(f"tracing sample_rate={rate}", latencies, time.perf_counter() - start)
+        await writer.stop()
+        print(f"traces dropped from buffer: {get_trace_buffer().dropped}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark require_auth tracing overhead")
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.concurrency, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
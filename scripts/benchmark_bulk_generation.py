@@ -0,0 +1,205 @@
+"""
+Benchmark bulk document generation against one generate_document() call per document.
+
+This script:
+1. Creates a throwaway SQLite database with --templates LMA-style templates
+   (--clauses clauses of boilerplate each, mapped header/table/body fields) and
+   --deals source documents holding CDM data
+2. Builds a closing pack of --documents items cycling over every (template, deal) pair
+3. Generates the pack sequentially with DocumentGenerationService.generate_document()
+4. Generates it again with BulkDocumentGenerationService (shared template/CDM/field
+   loading, rendering in a process pool, batched writes)
+5. Reports documents per second for both
+
+AI sections are served from a fixed in-memory clause set (the clause cache hit
+path) so the benchmark measures generation overhead, not LLM latency.
+
+Usage:
+    python scripts/benchmark_bulk_generation.py [--documents 500] [--templates 10] [--deals 5] [--processes 0]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from docx import Document as DocxDocument
+from sqlalchemy import JSON, create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.process_pool import shutdown_process_pool
+from app.db.encrypted_types import EncryptedJSON
+from app.db.models import Document, GeneratedDocument, LMATemplate, TemplateFieldMapping, User
+from app.generation import populator
+from app.generation.bulk import BulkDocumentGenerationService, BulkGenerationItem
+from app.generation.populator import AIFieldPopulator
+from app.generation.service import DocumentGenerationService
+from app.models.cdm import (
+    CreditAgreement, Currency, FloatingRateOption, Frequency, InterestRatePayout, LoanFacility, Money, Party,
+    PeriodEnum,
+)
+from app.templates import storage
+from app.utils.json_serializer import serialize_cdm_data
+
+BOILERPLATE = (
+    "The Borrower shall ensure that each Obligor complies with the undertakings in this Clause, save to the "
+    "extent the Majority Lenders otherwise agree in writing, and that no Default is continuing or would result. "
+)
+MAPPINGS = {
+    "[BORROWER_NAME]": "parties[role='Borrower'].name",
+    "[FACILITY_NAME]": "facilities[0].facility_name",
+    "[COMMITMENT_AMOUNT]": "facilities[0].commitment_amount.amount",
+    "[CURRENCY]": "facilities[0].commitment_amount.currency",
+    "[MATURITY_DATE]": "facilities[0].maturity_date",
+    "[AGREEMENT_DATE]": "agreement_date",
+}
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+# EncryptedJSON wraps JSONB, which has no SQLite bind processing of its own
+EncryptedJSON.load_dialect_impl = lambda self, dialect: dialect.type_descriptor(JSON())
+
+
+def make_template(path: Path, title: str, clauses: int) -> None:
+    doc = DocxDocument()
+    doc.sections[0].header.paragraphs[0].text = "[BORROWER_NAME] - " + title
+    doc.sections[0].footer.paragraphs[0].text = "Dated [AGREEMENT_DATE]"
+    doc.add_heading(title, 0)
+    doc.add_paragraph("Borrower: [BORROWER_NAME]")
+    table = doc.add_table(rows=3, cols=2)
+    for row, (label, placeholder) in enumerate([
+        ("Facility", "[FACILITY_NAME]"), ("Commitment", "[COMMITMENT_AMOUNT] [CURRENCY]"), ("Maturity", "[MATURITY_DATE]"),
+    ]):
+        table.cell(row, 0).text = label
+        table.cell(row, 1).text = placeholder
+    for clause in range(1, clauses + 1):
+        doc.add_heading(f"{clause}. CLAUSE {clause}", 1)
+        for paragraph in range(1, 11):
+            doc.add_paragraph(f"{clause}.{paragraph} " + BOILERPLATE * 2)
+        if clause == 1:
+            doc.add_paragraph("[COVENANTS]")
+    doc.save(str(path))
+
+
+def make_cdm(i: int) -> CreditAgreement:
+    return CreditAgreement(
+        deal_id=f"DEAL_{i:03d}",
+        loan_identification_number=f"LOAN_{i:03d}",
+        agreement_date=date(2025, 3, 10),
+        parties=[Party(id="p1", name=f"Borrower {i} plc", role="Borrower")],
+        facilities=[
+            LoanFacility(
+                facility_name="Term Facility",
+                commitment_amount=Money(amount=10_000_000 + i * 1000, currency=Currency.GBP),
+                interest_terms=InterestRatePayout(
+                    rate_option=FloatingRateOption(benchmark="SONIA", spread_bps=200.0),
+                    payment_frequency=Frequency(period=PeriodEnum.Month, period_multiplier=3),
+                ),
+                maturity_date=date(2030, 3, 10),
+            )
+        ],
+    )
+
+
+def seed(db, tmp: Path, templates: int, deals: int, clauses: int):
+    user = User(email="agent@bank.example", display_name="Agent", role="banker")
+    db.add(user)
+    db.flush()
+    template_ids = []
+    for t in range(templates):
+        code = f"LMA-DOC-{t:02d}"
+        make_template(tmp / "templates" / f"{code}-2024.1.docx", f"DOCUMENT {t}", clauses)
+        template = LMATemplate(
+            template_code=code, name=f"Document {t}", category="Facility Agreement", version="2024.1",
+            file_path=f"templates/{code}.docx", ai_generated_sections=["covenants"],
+        )
+        db.add(template)
+        db.flush()
+        db.add_all([
+            TemplateFieldMapping(template_id=template.id, template_field=field, cdm_field=path, mapping_type="direct")
+            for field, path in MAPPINGS.items()
+        ])
+        template_ids.append(template.id)
+    document_ids = []
+    for d in range(deals):
+        document = Document(title=f"deal_{d}.pdf", uploaded_by=user.id, source_cdm_data=serialize_cdm_data(make_cdm(d)))
+        db.add(document)
+        db.flush()
+        document_ids.append(document.id)
+    db.commit()
+    return user.id, template_ids, document_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk document generation")
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--templates", type=int, default=10)
+    parser.add_argument("--deals", type=int, default=5)
+    parser.add_argument("--clauses", type=int, default=30)
+    parser.add_argument("--processes", type=int, default=0, help="Rendering processes (0 = CPU count, capped at 8)")
+    args = parser.parse_args()
+
+    populator.get_chat_model = lambda: None
+    AIFieldPopulator.populate_ai_fields = lambda self, cdm_data, template, mapped_fields, **kwargs: {
+        "[COVENANTS]": "The Borrower shall maintain Leverage below 3.5:1. " * 20
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        storage.TEMPLATE_BASE_PATH = tmp / "templates"
+        storage.GENERATED_BASE_PATH = tmp / "generated"
+        storage.TEMPLATE_BASE_PATH.mkdir()
+
+        engine = create_engine(f"sqlite:///{tmp / 'bench.db'}")
+        for model in (User, LMATemplate, TemplateFieldMapping, Document, GeneratedDocument):
+            model.__table__.create(engine)
+        db = sessionmaker(bind=engine)()
+        user_id, template_ids, document_ids = seed(db, tmp, args.templates, args.deals, args.clauses)
+
+        pairs = [(t, d) for d in document_ids for t in template_ids]
+        items = [
+            BulkGenerationItem(template_id=t, document_id=d)
+            for t, d in (pairs[i % len(pairs)] for i in range(args.documents))
+        ]
+        print(f"Pack: {len(items)} documents from {len(template_ids)} templates x {len(document_ids)} deals")
+
+        # Sequential: what N calls to /templates/generate do (parse CDM, load template and mappings per call)
+        service = DocumentGenerationService()
+        start = time.perf_counter()
+        for item in items:
+            document = db.query(Document).filter(Document.id == item.document_id).first()
+            service.generate_document(
+                db=db, template_id=item.template_id, cdm_data=CreditAgreement(**document.source_cdm_data),
+                user_id=user_id, source_document_id=item.document_id,
+            )
+        sequential = time.perf_counter() - start
+        print(f"sequential  {len(items)} documents in {sequential:7.2f}s ({len(items) / sequential:7.1f} docs/s)")
+
+        bulk_service = BulkDocumentGenerationService(processes=args.processes or None)
+        start = time.perf_counter()
+        try:
+            completed = list(bulk_service.generate(db, items, user_id=user_id))[-1]
+        finally:
+            shutdown_process_pool()
+        elapsed = time.perf_counter() - start
+        print(f"bulk        {completed['generated']} documents in {elapsed:7.2f}s ({completed['generated'] / elapsed:7.1f} docs/s, "
+              f"{bulk_service.processes} processes, {completed['failed']} failed)")
+        print(f"Speedup: {sequential / elapsed:.1f}x")
+
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark set-based payment default detection.
+
+This script:
+1. Loads N payment events spread over L loans (a share pending and overdue)
+2. Runs a full detection scan (anti-join + bulk LoanDefault insert)
+3. Marks a small share of payments as changed and runs an incremental scan
+4. Runs an incremental scan with nothing changed
+
+Uses a throwaway SQLite database unless --database-url points at a scratch
+PostgreSQL database (the tables are created and dropped by the script).
+
+Usage:
+    python scripts/benchmark_default_detection.py [--payments 1000000] [--loans 50000] [--database-url URL]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.db.models import PaymentEvent, LoanDefault, LoanAsset, DetectionCheckpoint
+from app.services.loan_recovery_service import LoanRecoveryService
+
+TABLES = [PaymentEvent.__table__, LoanDefault.__table__, LoanAsset.__table__, DetectionCheckpoint.__table__]
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+def load_payments(engine, n_payments: int, n_loans: int, pending_share: float, seed: int) -> None:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    batch = []
+    with engine.begin() as conn:
+        for i in range(n_payments):
+            created_at = now - timedelta(days=rng.uniform(0, 365))
+            loan = rng.randrange(n_loans)
+            batch.append({
+                "payment_id": f"PAY-{i}",
+                "payment_type": "interest",
+                "amount": 1000,
+                "currency": "USD",
+                "payment_status": "pending" if rng.random() < pending_share else "paid",
+                "related_deal_id": loan // 10,
+                "related_loan_id": loan,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            if len(batch) == 50_000:
+                conn.execute(insert(PaymentEvent), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(PaymentEvent), batch)
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label}: {time.perf_counter() - start:.2f}s, {len(result)} new defaults")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark set-based payment default detection")
+    parser.add_argument("--payments", type=int, default=1_000_000, help="Payment events to load")
+    parser.add_argument("--loans", type=int, default=50_000, help="Distinct loans (10 per deal)")
+    parser.add_argument("--pending-share", type=float, default=0.05, help="Share of payments still pending")
+    parser.add_argument("--changed-share", type=float, default=0.01, help="Share of payments touched before the incremental run")
+    parser.add_argument("--database-url", default=None, help="Scratch database URL (default: temporary SQLite file)")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    args = parser.parse_args()
+
+    tmp_path = None
+    if args.database_url is None:
+        fd, tmp_path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        args.database_url = f"sqlite:///{tmp_path}"
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine, tables=TABLES)
+
+    try:
+        start = time.perf_counter()
+        load_payments(engine, args.payments, args.loans, args.pending_share, args.seed)
+        print(f"Loaded {args.payments:,} payments over {args.loans:,} loans in {time.perf_counter() - start:.1f}s")
+
+        session = sessionmaker(bind=engine)()
+        service = LoanRecoveryService(session)
+
+        timed("Full scan", lambda: service.detect_payment_defaults(incremental=True))
+        session.expunge_all()
+
+        # Resolve a share of defaults and touch a share of payments
+        n_changed = int(args.payments * args.changed_share)
+        session.execute(
+            update(LoanDefault).where(LoanDefault.id % 10 == 0).values(status="resolved")
+        )
+        session.execute(
+            update(PaymentEvent).where(PaymentEvent.id <= n_changed).values(updated_at=datetime.utcnow())
+        )
+        session.commit()
+
+        timed(f"Incremental scan ({n_changed:,} changed payments)", lambda: service.detect_payment_defaults(incremental=True))
+        session.expunge_all()
+        timed("Incremental scan (nothing changed)", lambda: service.detect_payment_defaults(incremental=True))
+        session.close()
+    finally:
+        Base.metadata.drop_all(engine, tables=TABLES)
+        engine.dispose()
+        if tmp_path:
+            os.unlink(tmp_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark compiled template rendering against a full document traversal.
+
+This script:
+1. Generates a synthetic LMA facility agreement template (--clauses clauses
+   of --paragraphs boilerplate paragraphs each, a parties table, header and
+   footer, plus bracket and CDM-path placeholders)
+2. Renders --documents documents the way generation used to: load the .docx,
+   walk every paragraph/table/header/footer, save to bytes
+3. Renders the same documents with render_template_to_bytes() (compiled once,
+   then only the recorded placeholder nodes are patched)
+4. Checks both produce the same package parts and reports the speedup
+
+Usage:
+    python scripts/benchmark_document_renderer.py [--documents 1000] [--clauses 40] [--paragraphs 15]
+"""
+
+import argparse
+import io
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import date
+from pathlib import Path
+
+from docx import Document
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.generation.renderer import DocumentRenderer
+from app.models.cdm import (
+    CreditAgreement, Currency, FloatingRateOption, Frequency, InterestRatePayout, LoanFacility, Money, Party,
+    PeriodEnum,
+)
+
+BOILERPLATE = (
+    "The Borrower shall ensure that each Obligor complies with the undertakings in this Clause, save to the "
+    "extent the Majority Lenders otherwise agree in writing, and that no Default is continuing or would result. "
+)
+
+
+def make_template(path: Path, clauses: int, paragraphs: int) -> None:
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "[BORROWER_NAME] - [FACILITY_NAME]"
+    doc.sections[0].footer.paragraphs[0].text = "Dated [AGREEMENT_DATE]"
+    doc.add_heading("FACILITY AGREEMENT", 0)
+    doc.add_paragraph("Borrower: [BORROWER_NAME] (LEI [BORROWER_LEI])")
+    doc.add_paragraph("Facility: {{facilities[0].facility_name}} of [COMMITMENT_AMOUNT] [CURRENCY]")
+    table = doc.add_table(rows=4, cols=2)
+    for row, (label, placeholder) in enumerate([
+        ("Borrower", "[BORROWER_NAME]"), ("Commitment", "[COMMITMENT_AMOUNT]"),
+        ("Maturity", "[MATURITY_DATE]"), ("Governing law", "[GOVERNING_LAW]"),
+    ]):
+        table.cell(row, 0).text = label
+        table.cell(row, 1).text = placeholder
+    sections = ["[REPRESENTATIONS_AND_WARRANTIES]", "[CONDITIONS_PRECEDENT]", "[COVENANTS]", "[EVENTS_OF_DEFAULT]"]
+    for clause in range(1, clauses + 1):
+        doc.add_heading(f"{clause}. CLAUSE {clause}", 1)
+        for paragraph in range(1, paragraphs + 1):
+            doc.add_paragraph(f"{clause}.{paragraph} " + BOILERPLATE * 2)
+        if clause % 10 == 1 and sections:
+            doc.add_paragraph(sections.pop(0))
+    doc.save(str(path))
+
+
+def field_values(i: int) -> dict:
+    return {
+        "[BORROWER_NAME]": f"Borrower {i} plc",
+        "[BORROWER_LEI]": f"5493001KJTIIGC8Y{i:04d}",
+        "[FACILITY_NAME]": "Term Facility",
+        "[COMMITMENT_AMOUNT]": f"{10_000_000 + i * 1000:,.2f}",
+        "[CURRENCY]": "GBP",
+        "[MATURITY_DATE]": "10 March 2030",
+        "[GOVERNING_LAW]": "English",
+        "[AGREEMENT_DATE]": "10 March 2025",
+        "[REPRESENTATIONS_AND_WARRANTIES]": "Each Obligor makes the representations in this Clause. " * 20,
+        "[CONDITIONS_PRECEDENT]": "The Agent has received the documents listed in Schedule 2. " * 20,
+        "[COVENANTS]": "The Borrower shall maintain Leverage below 3.5:1. " * 20,
+        "[EVENTS_OF_DEFAULT]": "Each of the events in this Clause is an Event of Default. " * 20,
+    }
+
+
+def make_cdm() -> CreditAgreement:
+    return CreditAgreement(
+        deal_id="DEAL_BENCH",
+        loan_identification_number="LOAN_BENCH",
+        agreement_date=date(2025, 3, 10),
+        parties=[Party(id="p1", name="Borrower plc", role="Borrower")],
+        facilities=[
+            LoanFacility(
+                facility_name="Term Facility",
+                commitment_amount=Money(amount=10_000_000, currency=Currency.GBP),
+                interest_terms=InterestRatePayout(
+                    rate_option=FloatingRateOption(benchmark="SONIA", spread_bps=200.0),
+                    payment_frequency=Frequency(period=PeriodEnum.Month, period_multiplier=3),
+                ),
+                maturity_date=date(2030, 3, 10),
+            )
+        ],
+    )
+
+
+def render_full(renderer: DocumentRenderer, template: str, values: dict, cdm: CreditAgreement) -> bytes:
+    """Previous behaviour: load the file, walk the whole document, save."""
+    doc = renderer.render_document(Document(template), values, cdm)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def parts(package: bytes) -> dict:
+    with zipfile.ZipFile(io.BytesIO(package)) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compiled template rendering")
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--clauses", type=int, default=40)
+    parser.add_argument("--paragraphs", type=int, default=15)
+    args = parser.parse_args()
+
+    renderer = DocumentRenderer()
+    cdm = make_cdm()
+    with tempfile.TemporaryDirectory() as tmp:
+        template = str(Path(tmp) / "CL-FA-EN-2024.1.docx")
+        make_template(Path(template), args.clauses, args.paragraphs)
+        print(f"Template: {args.clauses * (args.paragraphs + 1) + 8} paragraphs, "
+              f"{Path(template).stat().st_size / 1024:.0f} KiB")
+
+        start = time.perf_counter()
+        compiled = renderer.compile_template(template)
+        print(f"Compile:      {(time.perf_counter() - start) * 1000:8.1f} ms "
+              f"({len(compiled.sites)} placeholder sites)")
+
+        assert parts(render_full(renderer, template, field_values(0), cdm)) == \
+            parts(renderer.render_template_to_bytes(template, field_values(0), cdm)), "outputs differ"
+
+        results = {}
+        for label, render in (("full", render_full), ("compiled", DocumentRenderer.render_template_to_bytes)):
+            start = time.perf_counter()
+            size = 0
+            for i in range(args.documents):
+                size += len(render(renderer, template, field_values(i), cdm))
+            elapsed = time.perf_counter() - start
+            results[label] = elapsed
+            print(f"{label:12s} {args.documents} documents in {elapsed:7.2f}s "
+                  f"({elapsed / args.documents * 1000:7.2f} ms/doc, {size / args.documents / 1024:.0f} KiB/doc)")
+
+    print(f"Speedup: {results['full'] / results['compiled']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Benchmark sanctions screening of credit agreement parties against large lists.
+
+This script:
+1. Generates --entries synthetic list entries (2-4 token person and entity
+   names with legal forms, some aliases and LEIs) and builds a SanctionsIndex
+2. Generates --agreements agreements of --parties parties; every fifth
+   agreement has a party whose name is a listed name with a typo, reordered
+   tokens or a different legal form, and one party carries a listed LEI
+3. Screens every agreement (LEI set lookup plus fuzzy name matching for each
+   party, governing law against the high-risk jurisdictions) and reports
+   latency percentiles and hit counts
+4. Screens a few names by scanning every listed name with difflib, for scale
+
+Usage:
+    python scripts/benchmark_sanctions_screening.py [--entries 1000000] [--agreements 2000] [--parties 5]
+"""
+
+import argparse
+import difflib
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.sanctions_screening import (
+    SanctionsEntry, SanctionsIndex, SanctionsScreener, normalize_name,
+)
+
+SYLLABLES = [
+    "al", "an", "ar", "ba", "bel", "ca", "dan", "de", "dor", "el", "fa", "gar", "ha", "ib", "ka", "kov", "la",
+    "lin", "ma", "mir", "na", "nov", "or", "pa", "ra", "rash", "sa", "sen", "ta", "tor", "us", "va", "vich",
+    "wen", "ya", "zan", "zhu", "ko", "ri", "mo",
+]
+LEGAL_FORMS = ["LLC", "Ltd", "PLC", "JSC", "GmbH", "SA", "Trading Co", "Holdings", ""]
+SECTORS = ["Shipping", "Petroleum", "Metals", "Logistics", "Finance", "Industrial", "Energy", "Trading"]
+
+
+def make_word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+
+
+def make_lei(rng: random.Random) -> str:
+    return "".join(rng.choice("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(20))
+
+
+def make_entries(count: int, rng: random.Random):
+    entries = []
+    for i in range(count):
+        if rng.random() < 0.5:
+            name = " ".join(make_word(rng) for _ in range(rng.randint(2, 3)))
+            entry_type, lei = "individual", None
+        else:
+            name = f"{make_word(rng)} {rng.choice(SECTORS)} {rng.choice(LEGAL_FORMS)}".strip()
+            entry_type, lei = "entity", make_lei(rng) if rng.random() < 0.3 else None
+        aliases = (" ".join(make_word(rng) for _ in range(2)),) if rng.random() < 0.1 else ()
+        entries.append(SanctionsEntry(f"E{i}", name, "SYNTHETIC", lei=lei, aliases=aliases, entry_type=entry_type))
+    return entries
+
+
+def perturb(name: str, rng: random.Random) -> str:
+    tokens = name.split()
+    kind = rng.choice(["typo", "reorder", "legal_form"])
+    if kind == "typo":
+        word = max(range(len(tokens)), key=lambda i: len(tokens[i]))
+        token = tokens[word]
+        at = rng.randrange(1, len(token))
+        tokens[word] = token[:at] + token[at + 1:]
+    elif kind == "reorder":
+        tokens.reverse()
+    else:
+        tokens.append(rng.choice(["Limited", "Inc", "Corp"]))
+    return " ".join(tokens)
+
+
+def make_agreements(entries, count: int, parties: int, rng: random.Random):
+    listed_leis = [e for e in entries if e.lei]
+    agreements = []
+    for a in range(count):
+        # Unlisted counterparties share the list's sector words, so their lookups
+        # still read large postings before being rejected
+        agreement = [
+            {"name": f"Counterparty {rng.randrange(10 ** 6)} {rng.choice(SECTORS)} {rng.choice(['plc', 'Inc', 'AG'])}",
+             "lei": make_lei(rng)}
+            for _ in range(parties)
+        ]
+        if a % 5 == 0:
+            agreement[0] = {"name": perturb(rng.choice(entries).name, rng), "lei": None}
+            agreement[1]["lei"] = rng.choice(listed_leis).lei
+        agreements.append(agreement)
+    return agreements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sanctions screening")
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--agreements", type=int, default=2000)
+    parser.add_argument("--parties", type=int, default=5)
+    parser.add_argument("--scan-queries", type=int, default=3, help="Names screened by a full difflib scan")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    entries = make_entries(args.entries, rng)
+    print(f"Generated {len(entries)} list entries in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    index = SanctionsIndex(entries, ["Iran", "KP"], ["Myanmar", "MM"])
+    screener = SanctionsScreener()
+    screener.swap(index)
+    stats = screener.get_stats()
+    print(f"Built index in {time.perf_counter() - start:.1f}s: {stats['names']} names, "
+          f"{stats['leis']} LEIs, {stats['index_keys']} index keys")
+
+    agreements = make_agreements(entries, args.agreements, args.parties, rng)
+    timings = []
+    hit_agreements = 0
+    for agreement in agreements:
+        start = time.perf_counter()
+        hits = screener.screen_parties(agreement)
+        screener.is_high_risk_jurisdiction("English")
+        timings.append((time.perf_counter() - start) * 1000)
+        hit_agreements += bool(hits)
+
+    timings.sort()
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"indexed     {len(agreements)} agreements x {args.parties} parties: "
+          f"mean {statistics.mean(timings):.2f} ms, p50 {timings[len(timings) // 2]:.2f} ms, "
+          f"p99 {p99:.2f} ms, max {timings[-1]:.2f} ms per agreement")
+    print(f"            {hit_agreements} agreements with hits "
+          f"({len([a for i, a in enumerate(agreements) if i % 5 == 0])} seeded with a listed name and LEI)")
+
+    keys = [" ".join(normalize_name(e.name)) for e in entries]
+    scan = []
+    for agreement in agreements[:args.scan_queries]:
+        query = " ".join(normalize_name(agreement[0]["name"]))
+        start = time.perf_counter()
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(query)
+        for key in keys:
+            matcher.set_seq1(key)
+            if matcher.real_quick_ratio() >= 0.85 and matcher.quick_ratio() >= 0.85:
+                matcher.ratio()
+        scan.append((time.perf_counter() - start) * 1000)
+    if scan:
+        print(f"full scan   {statistics.mean(scan):.0f} ms per party name ({len(scan)} names)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark the securitization cash-flow waterfall engine.
+
+This script:
+1. Generates a random collateral pool of N loans (balance, rate, term)
+2. Projects collateral cash flows under S random CPR/CDR/severity scenarios
+3. Runs a three-tranche sequential waterfall over every scenario
+4. Reports projection and waterfall time and the tranche loss distribution
+
+Usage:
+    python scripts/benchmark_securitization_waterfall.py [--loans 1000] [--scenarios 5000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from app.services.securitization_waterfall import (
+    CollateralPool, WaterfallAssumptions, WaterfallTranche, project_collateral, run_waterfall
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the securitization waterfall engine")
+    parser.add_argument("--loans", type=int, default=1000, help="Loans in the pool")
+    parser.add_argument("--scenarios", type=int, default=5000, help="CPR/CDR/severity scenarios")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    pool = CollateralPool(
+        balance=rng.uniform(1e5, 5e6, args.loans),
+        rate=rng.uniform(4.0, 12.0, args.loans),
+        term_months=rng.integers(24, 121, args.loans)
+    )
+    assumptions = WaterfallAssumptions(
+        cpr=rng.uniform(0.0, 0.3, args.scenarios),
+        cdr=rng.uniform(0.0, 0.1, args.scenarios),
+        severity=rng.uniform(0.2, 0.7, args.scenarios)
+    )
+    total = pool.balance.sum()
+    tranches = [
+        WaterfallTranche("senior", total * 0.75, 4.5, 1),
+        WaterfallTranche("mezzanine", total * 0.15, 7.5, 2),
+        WaterfallTranche("equity", total * 0.10, 12.0, 3),
+    ]
+
+    print(f"Pool: {args.loans} loans, {total:,.0f} total balance; {args.scenarios} scenarios")
+
+    start = time.perf_counter()
+    flows = project_collateral(pool, assumptions)
+    projection_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = run_waterfall(flows, tranches)
+    waterfall_time = time.perf_counter() - start
+
+    print(f"Collateral projection: {projection_time:.2f}s ({flows.interest.shape[1]} periods)")
+    print(f"Waterfall: {waterfall_time:.2f}s")
+    for row in result.summary([t.balance for t in tranches]):
+        print(
+            f"  {row['tranche_id']:<10} EL {row['expected_loss_pct']:6.2f}%  "
+            f"P99 {row['loss_pct_percentiles']['99']:6.2f}%  "
+            f"P(loss) {row['probability_of_loss']:.3f}  WAL {row['expected_wal_years']:.2f}y"
+        )
+
+
+if __name__ == "__main__":
+    main()
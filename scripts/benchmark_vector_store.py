@@ -0,0 +1,95 @@
+"""
+Benchmark TradeVectorStore semantic search at portfolio scale.
+
+This script:
+1. Fills a TradeVectorStore with N synthetic, normalized embeddings
+   (bypassing the embeddings model so only search cost is measured)
+2. Times semantic_search for random queries (p50/p99)
+3. Optionally round-trips the index through save()/load() with np.memmap
+
+Usage:
+    python scripts/benchmark_vector_store.py [--events 1000000] [--dim 384] [--queries 50] [--mmap-dir /tmp]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.agents.vector_store import TradeVectorStore
+
+
+class _RandomEmbeddings:
+    """Embeddings stand-in returning random vectors of a fixed dimension."""
+
+    def __init__(self, dim: int, seed: int = 0):
+        self.dim = dim
+        self.rng = np.random.default_rng(seed)
+
+    def embed_query(self, text):
+        return self.rng.standard_normal(self.dim).tolist()
+
+    def embed_documents(self, texts):
+        return self.rng.standard_normal((len(texts), self.dim)).tolist()
+
+
+def build_store(events: int, dim: int, chunk: int = 100_000) -> TradeVectorStore:
+    store = TradeVectorStore()
+    store.embeddings_model = _RandomEmbeddings(dim)
+    store.embedding_dim = dim
+    rng = np.random.default_rng(1)
+    for start in range(0, events, chunk):
+        count = min(chunk, events - start)
+        with store._lock:
+            store._append_vectors(rng.standard_normal((count, dim), dtype=np.float32))
+        store.metadata.extend({"id": str(i), "type": "TradeExecution", "json": {}, "narrative": ""} for i in range(start, start + count))
+        store.ids.extend(str(i) for i in range(start, start + count))
+    return store
+
+
+def time_queries(store: TradeVectorStore, queries: int, top_k: int) -> None:
+    store.semantic_search("warmup", top_k=top_k)
+    timings = []
+    for i in range(queries):
+        start = time.perf_counter()
+        store.semantic_search(f"query {i}", top_k=top_k)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p99 = timings[max(0, int(len(timings) * 0.99) - 1)]
+    print(f"  search top_k={top_k}: p50 {statistics.median(timings):7.2f} ms   p99 {p99:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TradeVectorStore search")
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--mmap-dir", type=str, default=None, help="Also benchmark a memmap-loaded index")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = build_store(args.events, args.dim)
+    print(f"Indexed {len(store):,} events (dim {args.dim}) in {time.perf_counter() - start:.1f} s")
+    time_queries(store, args.queries, args.top_k)
+
+    if args.mmap_dir is not None:
+        with tempfile.TemporaryDirectory(dir=args.mmap_dir) as tmp:
+            path = str(Path(tmp) / "trades")
+            store.save(path)
+            loaded = TradeVectorStore.load(path, mmap=True)
+            loaded.embeddings_model = store.embeddings_model
+            print("memmap-loaded index:")
+            time_queries(loaded, args.queries, args.top_k)
+            del loaded
+
+
+if __name__ == "__main__":
+    main()
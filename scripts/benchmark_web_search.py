@@ -0,0 +1,264 @@
+"""
+Benchmark WebSearchService latency under concurrent searches.
+
+This script:
+1. Starts a local HTTPS stub server (self-signed certificate, separate process)
+   that answers the Serper search endpoint and serves the result pages
+2. Runs R rounds of C concurrent searches with a simulated cross-encoder
+   (CPU time per pair, GIL released like a torch forward pass)
+3. Compares the previous behaviour (new HTTP client per search, reranker
+   called on the event loop) with the shared keep-alive pool and the batching
+   reranker worker, reporting p50/p99 latency and TLS handshakes
+
+Search analytics are disabled for the run so only the request path is timed.
+
+The stub sleeps one round trip per response and two more per new connection,
+so connection reuse shows up as it would against a remote host.
+
+Usage:
+    python scripts/benchmark_web_search.py [--concurrency 50] [--rounds 5] [--results 4] [--rtt-ms 20] [--rerank-ms-per-pair 2]
+"""
+
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import multiprocessing
+import os
+import ssl
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+PAGE = (
+    "<html><head><title>Result {n}</title></head><body><article><h1>Result {n}</h1>"
+    + "<p>Leverage covenants in syndicated credit agreements are tested quarterly. </p>" * 40
+    + "</article></body></html>"
+)
+
+
+def write_self_signed_cert(directory: str):
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+    return cert_path, key_path
+
+
+async def handle_connection(reader, writer, results, rtt, handshakes):
+    """Minimal HTTP/1.1 keep-alive handler (the TLS handshake is already done)."""
+    with handshakes.get_lock():
+        handshakes.value += 1
+    # A new connection costs two extra round trips (TCP connect + TLS 1.3)
+    await asyncio.sleep(2 * rtt)
+    port = writer.get_extra_info("sockname")[1]
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            method, path, _ = head.split(b"\r\n", 1)[0].decode().split(" ", 2)
+            length = 0
+            for line in head.decode().split("\r\n")[1:]:
+                if line.lower().startswith("content-length:"):
+                    length = int(line.split(":", 1)[1])
+            await reader.readexactly(length)
+            if method == "POST":
+                links = ",".join(
+                    f'{{"title": "Result {n}", "link": "https://127.0.0.1:{port}/page/{n}"}}'
+                    for n in range(results)
+                )
+                body, content_type = f'{{"organic": [{links}]}}'.encode(), "application/json"
+            else:
+                body, content_type = PAGE.format(n=path.rsplit("/", 1)[-1]).encode(), "text/html"
+            await asyncio.sleep(rtt)
+            writer.write(
+                f"HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def serve(cert_path, key_path, results, rtt, handshakes, ports):
+    """Run the stub server (single-threaded asyncio, so it scales to many keep-alive connections)."""
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+
+    async def main():
+        server = await asyncio.start_server(
+            lambda r, w: handle_connection(r, w, results, rtt, handshakes),
+            "127.0.0.1", 0, ssl=context, backlog=1024,
+        )
+        ports.put(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+    asyncio.run(main())
+
+
+class SimulatedCrossEncoder:
+    """Sleeps per pair (releasing the GIL, like torch inference) plus a fixed per-call overhead."""
+
+    def __init__(self, ms_per_pair: float, ms_per_call: float):
+        self.per_pair = ms_per_pair / 1000
+        self.per_call = ms_per_call / 1000
+
+    def predict(self, pairs):
+        time.sleep(self.per_call + self.per_pair * len(pairs))
+        return [float(len(passage)) for _, passage in pairs]
+
+
+class InlineReranker:
+    """Previous behaviour: predict runs directly on the event loop."""
+
+    def __init__(self, model):
+        self.model = model
+
+    async def score(self, pairs):
+        return list(self.model.predict(pairs))
+
+
+async def run_rounds(service, concurrency: int, rounds: int, results: int):
+    latencies = []
+
+    async def one(i):
+        start = time.perf_counter()
+        await service.search_web(f"covenant query {i}", num_results=results, top_k_after_rerank=results)
+        latencies.append(time.perf_counter() - start)
+
+    for r in range(rounds):
+        await asyncio.gather(*(one(r * concurrency + i) for i in range(concurrency)))
+    return latencies
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+async def measure(label, handshakes, service, args, per_search_clients: bool):
+    from app.core.http_client import close_http_clients, get_async_http_client
+    from app.services import web_search_service
+
+    created = []
+
+    def new_client_per_search():
+        client = httpx.AsyncClient(timeout=20)
+        created.append(client)
+        return client
+
+    web_search_service.get_async_http_client = (
+        new_client_per_search if per_search_clients else get_async_http_client
+    )
+    # Warm up (trafilatura imports, first connections) outside the timed rounds
+    await run_rounds(service, 1, 1, args.results)
+    handshakes.value = 0
+
+    start = time.perf_counter()
+    latencies = await run_rounds(service, args.concurrency, args.rounds, args.results)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label}: p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+        f"p99 {percentile(latencies, 99) * 1000:.0f} ms, "
+        f"{len(latencies) / elapsed:.1f} searches/sec, {handshakes.value} TLS handshakes"
+    )
+    for client in created:
+        await client.aclose()
+    await close_http_clients()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark web search latency under concurrency")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent searches per round")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds of concurrent searches")
+    parser.add_argument("--results", type=int, default=4, help="Results (pages fetched and reranked) per search")
+    parser.add_argument("--rtt-ms", type=float, default=20.0, help="Simulated network round trip to the stub server")
+    parser.add_argument("--rerank-ms-per-pair", type=float, default=2.0, help="Simulated cross-encoder cost per pair")
+    parser.add_argument("--rerank-ms-per-call", type=float, default=10.0, help="Simulated cross-encoder cost per predict call")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cert_path, key_path = write_self_signed_cert(tmp)
+        # httpx honours SSL_CERT_FILE, so both client setups trust the stub
+        os.environ["SSL_CERT_FILE"] = cert_path
+        os.environ.setdefault("WEB_SEARCH_ANALYTICS_DIR", tmp)
+
+        from app.core.config import settings
+        from app.core import http_client
+        from app.services import web_search_service
+        from app.services.reranker_worker import RerankerWorker
+
+        async def no_analytics(duration, num_results):
+            return None
+
+        web_search_service.record_request = no_analytics
+        # The stub server listens on loopback, which result-page fetches refuse
+        http_client.is_public_address = lambda address: True
+        # The global 360/hour search limit would stop the run after a few rounds
+        web_search_service.limiter.hit = lambda *a, **kw: asyncio.sleep(0, result=True)
+
+        # Serve from another process so the stub's TLS work doesn't compete for our GIL
+        handshakes, ports = multiprocessing.Value("i", 0), multiprocessing.Queue()
+        server = multiprocessing.Process(
+            target=serve,
+            args=(cert_path, key_path, args.results, args.rtt_ms / 1000, handshakes, ports),
+            daemon=True,
+        )
+        server.start()
+        base_url = f"https://127.0.0.1:{ports.get(timeout=30)}"
+        model = SimulatedCrossEncoder(args.rerank_ms_per_pair, args.rerank_ms_per_call)
+        service = web_search_service.WebSearchService(serper_api_key="benchmark", use_local_reranking=False)
+        service.use_local_reranking = True
+        service.serper_search_endpoint = f"{base_url}/search"
+
+        print(
+            f"{args.rounds} rounds x {args.concurrency} concurrent searches, {args.results} pages each"
+        )
+        try:
+            service._rerank_worker = InlineReranker(model)
+            asyncio.run(measure("Client per search, inline rerank", handshakes, service, args, per_search_clients=True))
+
+            service._rerank_worker = RerankerWorker(
+                model,
+                batch_window_ms=settings.RERANKING_BATCH_WINDOW_MS,
+                max_batch_pairs=settings.RERANKING_MAX_BATCH_PAIRS,
+                max_workers=settings.RERANKING_WORKERS,
+            )
+            asyncio.run(measure("Shared pool, batched rerank worker", handshakes, service, args, per_search_clients=False))
+            service._rerank_worker.shutdown()
+        finally:
+            server.terminate()
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -37,7 +37,7 @@ def create_demo_user():
     
     try:
         # Check if demo user already exists
-        existing_user = db.query(User).filter(User.email == DEMO_EMAIL).first()
+        existing_user = db.query(User).filter(User.email_bidx == DEMO_EMAIL).first()
         if existing_user:
             logger.info(f"Demo user already exists: {DEMO_EMAIL}")
             logger.info("You can log in with:")
@@ -19,7 +19,7 @@ def update_demo_user_email():
     
     try:
         # Find user with old email
-        old_user = db.query(User).filter(User.email == "demo@creditnexus.local").first()
+        old_user = db.query(User).filter(User.email_bidx == "demo@creditnexus.local").first()
         if old_user:
             old_user.email = "demo@creditnexus.app"
             db.commit()
@@ -28,7 +28,7 @@ def update_demo_user_email():
             print("No user with email demo@creditnexus.local found")
         
         # Verify new email exists
-        new_user = db.query(User).filter(User.email == "demo@creditnexus.app").first()
+        new_user = db.query(User).filter(User.email_bidx == "demo@creditnexus.app").first()
         if new_user:
             print(f"Demo user exists with email: {new_user.email}")
             print("Login credentials:")
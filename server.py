@@ -61,11 +61,30 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize LLM client configuration: {e}", exc_info=True)
         raise
     
+    # Start background writer for sampled request traces
+    if settings.TRACE_SAMPLE_RATE > 0:
+        from app.core.tracing import get_trace_writer
+        get_trace_writer().start()
+        logger.info(f"Request tracing enabled: sample_rate={settings.TRACE_SAMPLE_RATE}")
+    
+    # Start background writer for buffered metrics
+    from app.core.metrics import get_metrics_writer
+    get_metrics_writer().start()
+    
+    # Load sanctions lists up front so the first screening call does not pay for it
+    if settings.SANCTIONS_SCREENING_ENABLED:
+        from app.services.sanctions_screening import get_sanctions_screener
+        sanctions_stats = get_sanctions_screener().get_stats()
+        logger.info(
+            f"Sanctions screening initialized: {sanctions_stats['entries']} list entries, "
+            f"{sanctions_stats['high_risk_jurisdictions']} high-risk jurisdiction(s) from {settings.SANCTIONS_LISTS_DIR}"
+        )
+    
     # Initialize Policy Engine with YAML rule loading
     if settings.POLICY_ENABLED:
         try:
             from app.core.policy_config import PolicyConfigLoader
-            from app.services.policy_engine_factory import create_policy_engine
+            from app.services.policy_engine_factory import create_policy_engine, set_policy_engine
             from app.services.policy_service import PolicyService
             
             # Create policy config loader
@@ -95,6 +114,9 @@ async def lifespan(app: FastAPI):
             # Load rules into engine
             policy_engine.load_rules(rules_yaml)
             
+            # Share the loaded engine with get_policy_engine() callers
+            set_policy_engine(policy_engine, settings.POLICY_ENGINE_VENDOR)
+            
             # Create policy service instance
             policy_service = PolicyService(policy_engine)
             
@@ -174,16 +196,7 @@ async def lifespan(app: FastAPI):
                     from app.db.models import User
                     db = SessionLocal()
                     try:
-                        # Workaround for non-deterministic encryption: fetch and filter
-                        demo_user = None
-                        all_users = db.query(User).all()
-                        for u in all_users:
-                            try:
-                                if u.email == "demo@creditnexus.app":
-                                    demo_user = u
-                                    break
-                            except Exception:
-                                continue
+                        demo_user = db.query(User).filter(User.email_bidx == "demo@creditnexus.app").first()
                         
                         if not demo_user:
                             logger.info("No demo user found. Creating demo user...")
@@ -427,6 +440,16 @@ async def lifespan(app: FastAPI):
     
     # Cleanup
     try:
+        if settings.TRACE_SAMPLE_RATE > 0:
+            from app.core.tracing import get_trace_writer
+            await get_trace_writer().stop()
+        
+        from app.core.metrics import get_metrics_writer
+        await get_metrics_writer().stop()
+        
+        from app.core.process_pool import shutdown_process_pool
+        shutdown_process_pool()
+        
         if settings.POLICY_ENABLED and hasattr(app.state, 'policy_config_loader'):
             policy_config_loader = app.state.policy_config_loader
             if policy_config_loader:
@@ -444,6 +467,11 @@ async def lifespan(app: FastAPI):
                     raise
                 except Exception as e:
                     logger.error(f"Error closing x402 payment service: {e}")
+
+        # Close the shared HTTP connection pools
+        from app.core.http_client import close_http_clients
+        await close_http_clients()
+        logger.info("Shared HTTP client pool closed")
     except asyncio.CancelledError:
         logger.warning("Shutdown cleanup was cancelled")
         raise
@@ -0,0 +1,42 @@
+"""
+Shared pytest fixtures.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def sqlite_tables():
+    """Models whose tables sqlite_db creates; override in a test module (default: none)."""
+    return ()
+
+
+@pytest.fixture
+def sqlite_db(request, sqlite_tables):
+    """
+    In-memory SQLite session with the given models' tables.
+
+    The models come from the sqlite_tables fixture, or from indirect
+    parametrization, e.g.
+    @pytest.mark.parametrize("sqlite_db", [(User, AuditLog)], indirect=True).
+    """
+    tables = getattr(request, "param", sqlite_tables)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[model.__table__ for model in tables])
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
@@ -0,0 +1,151 @@
+"""
+Tests for concurrent AI section generation with batched clause caching.
+"""
+
+import threading
+import time
+from datetime import date
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate
+from sqlalchemy import event
+
+from app.db.models import ClauseCache, LMATemplate, User
+from app.generation import populator
+from app.generation.populator import AIFieldPopulator
+from app.models.cdm import (
+    CreditAgreement, Currency, FloatingRateOption, Frequency, GoverningLaw, InterestRatePayout,
+    LoanFacility, Money, Party, PeriodEnum,
+)
+
+SECTIONS = ["representations_and_warranties", "covenants", "conditions_precedent", "events_of_default", "esg_spt"]
+LATENCY = 0.2
+
+
+class SlowLLM:
+    """Chat model stand-in with a fixed latency that tracks peak concurrency."""
+
+    def __init__(self):
+        self.calls = []
+        self.in_flight = self.peak = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(LATENCY)
+        with self._lock:
+            self.in_flight -= 1
+        section = messages[0].content
+        self.calls.append(section)
+        if section == "events_of_default":
+            raise TimeoutError("LLM timed out")
+        return AIMessage(content=f"  Clause for {section}  ")
+
+
+class StubPromptLoader:
+    def get_prompt_for_section(self, template_category, section_name):
+        return ChatPromptTemplate.from_messages([("human", section_name)])
+
+
+@pytest.fixture
+def sqlite_tables():
+    return (User, LMATemplate, ClauseCache)
+
+
+@pytest.fixture
+def statements(sqlite_db):
+    statements = []
+    event.listen(sqlite_db.bind, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+@pytest.fixture
+def template(sqlite_db):
+    template = LMATemplate(
+        template_code="LMA-FA-01", name="Facility Agreement", category="Facility Agreement",
+        version="1.0", file_path="templates/fa.docx", ai_generated_sections=SECTIONS,
+    )
+    sqlite_db.add(template)
+    sqlite_db.commit()
+    return template
+
+
+@pytest.fixture
+def agreement():
+    return CreditAgreement(
+        deal_id="DEAL_001",
+        loan_identification_number="LOAN_001",
+        agreement_date=date(2025, 3, 10),
+        governing_law=GoverningLaw.ENGLISH,
+        parties=[Party(id="party_1", name="UK Corp Ltd", role="Borrower", lei="11111111111111111111")],
+        facilities=[
+            LoanFacility(
+                facility_name="Term Loan",
+                commitment_amount=Money(amount=2000000.00, currency=Currency.GBP),
+                interest_terms=InterestRatePayout(
+                    rate_option=FloatingRateOption(benchmark="SONIA", spread_bps=200.0),
+                    payment_frequency=Frequency(period=PeriodEnum.Month, period_multiplier=3),
+                ),
+                maturity_date=date(2030, 3, 10),
+            )
+        ],
+        sustainability_linked=False,
+    )
+
+
+@pytest.fixture
+def make_populator(monkeypatch):
+    llm = SlowLLM()
+    monkeypatch.setattr(populator, "get_chat_model", lambda: llm)
+
+    def make(db):
+        instance = AIFieldPopulator(db=db)
+        instance.prompt_loader = StubPromptLoader()
+        return instance
+
+    return make, llm
+
+
+def test_sections_are_generated_concurrently_and_cached_in_batches(
+    sqlite_db, statements, template, agreement, make_populator
+):
+    db = sqlite_db
+    make, llm = make_populator
+
+    started = time.perf_counter()
+    fields = make(db).populate_ai_fields(agreement, template, mapped_fields={})
+    elapsed = time.perf_counter() - started
+
+    # Five sections take about as long as the slowest one, not the sum
+    assert llm.peak == len(SECTIONS)
+    assert elapsed < 2 * LATENCY
+    # Output keeps template order; failed sections are skipped and not cached
+    assert list(fields) == ["[REPRESENTATIONS_AND_WARRANTIES]", "[COVENANTS]", "[CONDITIONS_PRECEDENT]", "[ESG_SPT]"]
+    assert fields["[COVENANTS]"] == "Clause for covenants"
+    assert db.query(ClauseCache).count() == 4
+
+    statements.clear()
+    llm.calls.clear()
+    fields_again = make(db).populate_ai_fields(agreement, template, mapped_fields={})
+
+    assert fields_again == fields
+    assert llm.calls == ["events_of_default"]
+    clause_queries = [s for s in statements if "clause_cache" in s]
+    # One lookup, one batched usage update (the failed section leaves nothing to save)
+    assert len([s for s in clause_queries if s.lstrip().startswith("SELECT")]) == 1
+    assert len([s for s in clause_queries if s.lstrip().startswith("UPDATE")]) == 1
+    assert {c.usage_count for c in db.query(ClauseCache)} == {1}
+    assert all(c.last_used_at is not None for c in db.query(ClauseCache))
+
+
+def test_concurrency_is_bounded(template, agreement, make_populator, monkeypatch):
+    make, llm = make_populator
+    monkeypatch.setattr(populator.settings, "DOCUMENT_GENERATION_MAX_CONCURRENCY", 2)
+
+    make(None).populate_ai_fields(agreement, template, mapped_fields={})
+
+    assert llm.peak == 2
+    assert sorted(llm.calls) == sorted(SECTIONS)
@@ -0,0 +1,200 @@
+"""
+Tests for cold-storage archival of audit logs.
+"""
+
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.db.models import AuditLog, AuditLogRollup, AuditUserRollup, DetectionCheckpoint, User
+from app.services import audit_archive_service
+from app.services.audit_archive_service import RAW_COLUMNS, AuditLogArchive
+from app.services.audit_export_service import AuditExportService
+from app.services.audit_service import AuditService
+from app.services.data_retention_service import DataRetentionService
+
+OLD = datetime.utcnow() - timedelta(days=365 * 8)
+
+
+@pytest.fixture
+def sqlite_tables():
+    return (User, AuditLog, AuditLogRollup, AuditUserRollup, DetectionCheckpoint)
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    archive = AuditLogArchive(str(tmp_path))
+    monkeypatch.setattr(audit_archive_service, "_audit_archive", archive)
+    return archive
+
+
+def _seed(db, n_old=40, n_recent=10):
+    logs = [
+        AuditLog(
+            action="update" if i % 3 else "create",
+            target_type="deal",
+            target_id=i,
+            ip_address=f"10.0.0.{i}",
+            # Old logs span four days, eight hours apart
+            occurred_at=OLD + timedelta(hours=8 * (i % 12), minutes=i),
+        )
+        for i in range(n_old)
+    ]
+    logs += [
+        AuditLog(action="create", target_type="document", target_id=i, occurred_at=datetime.utcnow() - timedelta(hours=i + 1))
+        for i in range(n_recent)
+    ]
+    db.add_all(logs)
+    db.commit()
+
+
+def test_cleanup_moves_expired_logs_into_segments(sqlite_db, archive):
+    _seed(sqlite_db)
+
+    dry_run = DataRetentionService(sqlite_db).cleanup_audit_logs(dry_run=True)
+    assert dry_run["records_found"] == 40
+    assert sqlite_db.query(AuditLog).count() == 50
+
+    result = DataRetentionService(sqlite_db).cleanup_audit_logs(dry_run=False, batch_size=7)
+
+    assert result["records_archived"] == 40
+    assert sqlite_db.query(AuditLog).count() == 10
+    manifests = archive.manifests()
+    assert len(manifests) == result["segments_written"]
+    assert {m["partition"] for m in manifests} == {(OLD + timedelta(hours=8 * k)).date().isoformat() for k in range(12)}
+    assert sum(m["row_count"] for m in manifests) == 40
+    assert archive.verify() == {"segments": len(manifests), "rows": 40, "valid": True, "errors": []}
+
+    # Encrypted columns stay encrypted inside the segment
+    with gzip.open(manifests[0]["path"], "rt") as f:
+        record = json.loads(f.readline())
+    assert record["ip_address"] and not record["ip_address"].startswith("10.0.0.")
+
+
+def test_get_audit_logs_pages_across_live_and_archived_logs(sqlite_db, archive):
+    _seed(sqlite_db)
+    service = AuditService()
+    expected, expected_total = service.get_audit_logs(sqlite_db, limit=100)
+    expected = [(log.id, log.action, log.ip_address) for log in expected]
+
+    DataRetentionService(sqlite_db).cleanup_audit_logs(dry_run=False, batch_size=16)
+
+    pages = []
+    for offset in range(0, 50, 6):
+        logs, total = service.get_audit_logs(sqlite_db, limit=6, offset=offset, exact_total=True)
+        assert total == expected_total == 50
+        pages.extend((log.id, log.action, log.ip_address) for log in logs)
+    assert pages == expected
+
+    updates, total = service.get_audit_logs(sqlite_db, action="update", limit=100)
+    assert total == len(updates) == sum(1 for _, action, _ in expected if action == "update")
+
+    start, end = OLD + timedelta(hours=20), OLD + timedelta(hours=60)
+    in_range, total = service.get_audit_logs(sqlite_db, start_date=start, end_date=end, target_id=15)
+    assert [log.target_id for log in in_range] == [15] and total == 1
+    assert in_range[0].ip_address == "10.0.0.15"
+    assert in_range[0] not in sqlite_db
+
+
+def test_streaming_export_chains_archived_logs_before_live_ones(sqlite_db, archive):
+    _seed(sqlite_db)
+    service = AuditExportService()
+    expected = b"".join(service.stream_ndjson(sqlite_db, page_size=7))
+    expected_updates = b"".join(service.stream_csv(sqlite_db, action="update"))
+    start, end = OLD + timedelta(hours=20), OLD + timedelta(hours=60)
+    expected_range = b"".join(service.stream_csv(sqlite_db, start_date=start, end_date=end))
+
+    # The last batch of an interrupted run is both archived and live; it is exported once
+    last_batch = select(*RAW_COLUMNS).where(AuditLog.occurred_at < OLD + timedelta(days=30))
+    rows = [dict(row) for row in sqlite_db.execute(
+        last_batch.order_by(AuditLog.occurred_at.desc(), AuditLog.id.desc()).limit(8)
+    ).mappings()]
+    DataRetentionService(sqlite_db).cleanup_audit_logs(dry_run=False, batch_size=16)
+    sqlite_db.execute(AuditLog.__table__.insert(), rows)
+    sqlite_db.commit()
+
+    pages = list(service.iter_audit_log_pages(sqlite_db, page_size=7))
+    assert all(len(page) <= 7 for page in pages)
+    assert b"".join(service.stream_ndjson(sqlite_db, page_size=7)) == expected
+    assert b"".join(service.stream_csv(sqlite_db, action="update")) == expected_updates
+    assert b"".join(service.stream_csv(sqlite_db, start_date=start, end_date=end)) == expected_range
+
+    live = b"".join(service.stream_ndjson(sqlite_db, include_archived=False)).decode("utf-8").splitlines()
+    assert len(live) == 18
+
+
+def test_archive_read_only_when_needed(sqlite_db, archive, monkeypatch):
+    _seed(sqlite_db)
+    sqlite_db.query(AuditLog).filter(AuditLog.target_id.in_([4, 8, 12])).update({"user_id": 7})
+    sqlite_db.commit()
+    DataRetentionService(sqlite_db).cleanup_audit_logs(dry_run=False, batch_size=16)
+    service = AuditService()
+
+    # A page filled from live logs does not touch the archive unless an exact total is requested
+    queries = []
+    query = archive.query
+    monkeypatch.setattr(archive, "query", lambda **kw: queries.append(kw) or query(**kw))
+    logs, total = service.get_audit_logs(sqlite_db, limit=5)
+    assert len(logs) == 5 and total == 10 and not queries
+    assert service.get_audit_logs(sqlite_db, limit=5, exact_total=True)[1] == 50
+    assert queries[-1]["limit"] == 0
+
+    # Manifests are listed once and re-read only after a segment is written
+    globs = []
+    load = archive._load_manifests
+    monkeypatch.setattr(archive, "_load_manifests", lambda: globs.append(1) or load())
+    archive.manifests()
+    archive.manifests()
+    assert globs == []
+
+    # Per-segment user and target keys answer filtered counts without reading
+    # (and decrypting) segments that cannot match
+    reads = []
+    read_segment = archive.read_segment
+    monkeypatch.setattr(archive, "read_segment", lambda m: reads.append(m["sequence"]) or read_segment(m))
+    assert service.get_audit_logs(sqlite_db, user_id=7, limit=0, exact_total=True)[1] == 5  # 2 live, 3 archived
+    assert reads == []
+    logs, total = service.get_audit_logs(sqlite_db, target_id=15, limit=10)
+    assert [log.target_id for log in logs] == [15] and total == 1
+    assert len(reads) == 1
+
+    rows = [dict(row) for row in sqlite_db.execute(select(*RAW_COLUMNS).limit(1)).mappings()]
+    archive.append_batch(rows)
+    archive.manifests()
+    assert globs == [1]
+
+
+def test_verify_detects_tampering(sqlite_db, archive, tmp_path):
+    _seed(sqlite_db)
+    DataRetentionService(sqlite_db).cleanup_audit_logs(dry_run=False, batch_size=16)
+    manifests = archive.manifests()
+
+    with open(manifests[1]["path"], "r+b") as f:
+        f.seek(20)
+        f.write(b"\x00")
+    report = archive.verify()
+    assert not report["valid"]
+    assert any("does not match its manifest" in error for error in report["errors"])
+
+    tail = AuditLogArchive(str(tmp_path))
+    last = manifests[-1]
+    manifest_path = last["path"].replace(".ndjson.gz", ".manifest.json")
+    with open(manifest_path, "w") as f:
+        json.dump({**{k: v for k, v in last.items() if k != "path"}, "row_count": 1}, f)
+    assert any("was modified" in error for error in tail.verify()["errors"])
+
+
+def test_interrupted_batch_is_deleted_on_next_run(sqlite_db, archive):
+    _seed(sqlite_db)
+    rows = [dict(row) for row in sqlite_db.execute(select(*RAW_COLUMNS).where(AuditLog.occurred_at < OLD + timedelta(days=1))).mappings()]
+    # Segment written and fsynced, but the process stopped before the delete
+    archive.append_batch(rows)
+
+    result = DataRetentionService(sqlite_db).cleanup_audit_logs(dry_run=False)
+
+    assert result["records_archived"] == 40 - len(rows)
+    assert sqlite_db.query(AuditLog).count() == 10
+    assert archive.verify()["rows"] == 40
@@ -0,0 +1,115 @@
+"""
+Tests for the keyset-paged streaming audit log export.
+"""
+
+import csv
+import io
+import json
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.db.models import AuditLog, User
+from app.services import audit_archive_service
+from app.services.audit_archive_service import AuditLogArchive
+from app.services.audit_export_service import AuditExportService
+
+
+@pytest.fixture
+def sqlite_tables():
+    return (User, AuditLog)
+
+
+@pytest.fixture(autouse=True)
+def empty_archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_archive_service, "_audit_archive", AuditLogArchive(str(tmp_path)))
+
+
+def _seed(db, n_logs=25):
+    users = [User(email=f"user{i}@example.com", display_name=f"User {i}") for i in range(3)]
+    db.add_all(users)
+    db.flush()
+    base = datetime(2025, 1, 1)
+    for i in range(n_logs):
+        db.add(AuditLog(
+            # Pairs share a timestamp so the id tie-breaker is exercised
+            user_id=users[i % 3].id if i % 5 else None,
+            action="update" if i % 2 else "create",
+            target_type="deal",
+            target_id=i,
+            ip_address="10.0.0.1",
+            occurred_at=base + timedelta(minutes=i // 2),
+        ))
+    db.commit()
+    return users
+
+
+def test_keyset_pages_cover_every_row_once_in_order(sqlite_db):
+    _seed(sqlite_db)
+    service = AuditExportService()
+
+    pages = [[log.id for log in page] for page in service.iter_audit_log_pages(sqlite_db, page_size=4)]
+    ids = [log_id for page in pages for log_id in page]
+
+    assert all(len(page) <= 4 for page in pages)
+    assert sorted(ids) == list(range(1, 26))
+    assert len(ids) == len(set(ids))
+
+    updates = [log.id for page in service.iter_audit_log_pages(sqlite_db, page_size=4, action="update") for log in page]
+    assert updates == list(range(2, 26, 2))
+
+
+def test_stream_csv_matches_in_memory_export(sqlite_db):
+    _seed(sqlite_db)
+    service = AuditExportService()
+
+    streamed = b"".join(service.stream_csv(sqlite_db, page_size=7)).decode("utf-8")
+    logs = sqlite_db.query(AuditLog).order_by(AuditLog.occurred_at, AuditLog.id).all()
+    in_memory = service.export_to_csv(sqlite_db, logs).decode("utf-8")
+
+    assert streamed == in_memory
+    rows = list(csv.reader(io.StringIO(streamed)))
+    assert rows[0][-1] == "Metadata"
+    assert len(rows) == 26
+    assert rows[2][2:4] == ["User 1", "user1@example.com"]
+    assert rows[1][2:4] == ["", ""]
+
+
+def test_stream_ndjson_emits_one_object_per_log(sqlite_db):
+    _seed(sqlite_db, n_logs=10)
+    service = AuditExportService()
+
+    lines = b"".join(service.stream_ndjson(sqlite_db, page_size=3)).decode("utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+
+    assert [r["id"] for r in records] == list(range(1, 11))
+    assert records[1]["user_email"] == "user1@example.com"
+    assert records[1]["ip_address"] == "10.0.0.1"
+    assert records[1]["metadata"] is None
+
+    without = b"".join(service.stream_ndjson(sqlite_db, include_metadata=False)).decode("utf-8")
+    assert "metadata" not in json.loads(without.splitlines()[0])
+
+
+def test_users_are_looked_up_once_per_export(sqlite_db):
+    users = _seed(sqlite_db, n_logs=30)
+    service = AuditExportService()
+    statements = []
+
+    @event.listens_for(sqlite_db.bind, "before_cursor_execute")
+    def _count(conn, cursor, statement, *args):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    b"".join(service.stream_csv(sqlite_db, page_size=5))
+    # Every user appears in the first page, later pages hit the LRU
+    assert len(statements) == 1
+
+    # Least recently used users are evicted first; unknown ids are cached as None
+    cache = OrderedDict()
+    for user_id in (users[0].id, users[1].id, users[0].id):
+        service._lookup_users(sqlite_db, [user_id], cache, cache_size=2)
+    assert service._lookup_users(sqlite_db, [999], cache, cache_size=2) == {999: None}
+    assert list(cache) == [users[0].id, 999]
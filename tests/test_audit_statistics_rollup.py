@@ -0,0 +1,107 @@
+"""
+Tests for the hourly audit log rollups behind AuditStatisticsService.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete
+
+from app.db.models import AuditLog, AuditLogRollup, AuditUserRollup, DetectionCheckpoint, User
+from app.services.audit_statistics_service import AuditStatisticsService
+
+NOW = datetime(2025, 3, 10, 12, 34, 56)
+
+
+@pytest.fixture
+def sqlite_tables():
+    return (User, AuditLog, AuditLogRollup, AuditUserRollup, DetectionCheckpoint)
+
+
+def _seed(db, n_logs=600, days=10, seed=3):
+    rng = random.Random(seed)
+    users = [User(email=f"user{i}@example.com", display_name=f"User {i}") for i in range(4)]
+    db.add_all(users)
+    db.flush()
+    db.add_all(
+        AuditLog(
+            user_id=rng.choice([None] + [u.id for u in users]),
+            action=rng.choice(["create", "update", "delete"]),
+            target_type=rng.choice(["deal", "document"]),
+            occurred_at=NOW - timedelta(seconds=rng.uniform(0, days * 86400)),
+        )
+        for _ in range(n_logs)
+    )
+    db.commit()
+
+
+def _snapshot(service, db, start, end):
+    return (
+        service.get_overview_statistics(db, start, end),
+        service.get_activity_timeline(db, start, end, interval="day"),
+        service.get_activity_timeline(db, start, end, interval="hour"),
+        service.get_activity_timeline(db, start, end, interval="week"),
+        service.get_top_users(db, start, end),
+        service.get_top_actions(db, start, end),
+    )
+
+
+@pytest.mark.parametrize("start,end", [
+    (None, None),
+    (NOW - timedelta(days=3, minutes=17), NOW - timedelta(hours=5, minutes=3)),
+    (NOW - timedelta(days=12), NOW),
+    (NOW - timedelta(hours=2, minutes=30), NOW),
+    (NOW - timedelta(days=2, hours=20), NOW - timedelta(days=1, hours=1)),
+])
+def test_rollups_match_raw_statistics(sqlite_db, start, end):
+    _seed(sqlite_db)
+    service = AuditStatisticsService()
+    before = _snapshot(service, sqlite_db, start, end)
+
+    result = service.roll_up_audit_logs(sqlite_db, now=NOW)
+
+    assert result["audit_log_rollups"]["watermark"] == "2025-03-10T12:00:00"
+    assert result["audit_user_rollups"]["watermark"] == "2025-03-10T00:00:00"
+    assert 0 < result["audit_log_rollups"]["logs"] < 600
+    assert _snapshot(service, sqlite_db, start, end) == before
+
+
+def test_rollups_are_read_instead_of_raw_rows(sqlite_db):
+    _seed(sqlite_db)
+    service = AuditStatisticsService()
+    total = service.get_overview_statistics(sqlite_db)["total_logs"]
+
+    service.roll_up_audit_logs(sqlite_db, now=NOW)
+    overview = service.get_overview_statistics(sqlite_db)
+    # Rolled-up days no longer need their raw rows
+    sqlite_db.execute(delete(AuditLog).where(AuditLog.occurred_at < datetime(2025, 3, 10)))
+    sqlite_db.commit()
+
+    assert overview["total_logs"] == total
+    assert service.get_overview_statistics(sqlite_db) == overview
+
+
+def test_rollup_advances_watermark_once_per_closed_hour(sqlite_db):
+    _seed(sqlite_db)
+    service = AuditStatisticsService()
+    first = service.roll_up_audit_logs(sqlite_db, now=NOW)
+
+    # Same hour (and within the settle window of the next): nothing to do
+    assert service.roll_up_audit_logs(sqlite_db, now=NOW)["audit_log_rollups"]["logs"] == 0
+    assert service.roll_up_audit_logs(sqlite_db, now=datetime(2025, 3, 10, 13, 5))["audit_log_rollups"]["logs"] == 0
+
+    sqlite_db.add(AuditLog(action="create", target_type="deal", occurred_at=datetime(2025, 3, 10, 12, 50)))
+    sqlite_db.commit()
+    later = service.roll_up_audit_logs(sqlite_db, now=datetime(2025, 3, 10, 14))["audit_log_rollups"]
+
+    rolled = sum(count for (count,) in sqlite_db.query(AuditLogRollup.count))
+    raw_before_watermark = sqlite_db.query(AuditLog).filter(AuditLog.occurred_at < datetime(2025, 3, 10, 13)).count()
+    assert later["watermark"] == "2025-03-10T13:00:00"
+    assert first["audit_log_rollups"]["logs"] + later["logs"] == rolled == raw_before_watermark
+
+    # Per-user counts only cover closed days and skip logs without a user
+    user_rolled = sum(count for (count,) in sqlite_db.query(AuditUserRollup.count))
+    assert user_rolled == sqlite_db.query(AuditLog).filter(
+        AuditLog.occurred_at < datetime(2025, 3, 10), AuditLog.user_id.isnot(None)
+    ).count()
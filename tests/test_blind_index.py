@@ -0,0 +1,74 @@
+"""
+Unit tests for HMAC blind indexes on encrypted columns.
+"""
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.encrypted_types import BlindIndex, BlindIndexDigest
+from app.db.models import User, Document
+from app.services.encryption_service import BlindIndexService
+
+
+def test_digest_is_normalized_and_deterministic():
+    service = BlindIndexService(secret=b"test-secret")
+
+    first = service.compute("Jane@Example.com ", "users.email", "email")
+    second = service.compute("jane@example.com", "users.email", "email")
+
+    assert first == second
+    assert len(first) == 64
+    assert service.compute(None, "users.email", "email") is None
+
+
+def test_contexts_and_keys_are_separated():
+    service = BlindIndexService(secret=b"test-secret")
+    other = BlindIndexService(secret=b"other-secret")
+
+    email = service.compute("ACME", "users.email")
+    name = service.compute("ACME", "documents.borrower_name")
+
+    assert email != name
+    assert other.compute("ACME", "users.email") != email
+
+
+def test_digest_values_are_not_rehashed():
+    index = BlindIndex("users.email", normalizer="email")
+
+    digest = index.digest("jane@example.com")
+
+    assert isinstance(digest, BlindIndexDigest)
+    assert index.process_bind_param(digest, None) == digest
+    assert index.process_bind_param("JANE@example.com", None) == digest
+
+
+def test_models_keep_blind_indexes_in_sync():
+    user = User(email="Jane@Example.com", display_name="Jane")
+    document = Document(title="Agreement", borrower_name="ACME  Corp", borrower_lei="5299 00abc")
+
+    assert user.email_bidx == User.email_bidx.type.digest("jane@example.com")
+    assert document.borrower_name_bidx == Document.borrower_name_bidx.type.digest("acme corp")
+    assert document.borrower_lei_bidx == Document.borrower_lei_bidx.type.digest("529900ABC")
+
+    user.email = "new@example.com"
+    assert user.email_bidx == User.email_bidx.type.digest("new@example.com")
+
+
+def test_equality_lookup_uses_blind_index():
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        session.add(User(email="jane@example.com", display_name="Jane"))
+        session.add(User(email="john@example.com", display_name="John"))
+        session.commit()
+
+        found = session.query(User).filter(User.email_bidx == "JANE@example.com").first()
+        both = session.query(User).filter(User.email_bidx.in_(["jane@example.com", "john@example.com"])).count()
+
+        assert found is not None
+        assert found.email == "jane@example.com"
+        assert both == 2
+    finally:
+        session.close()
+        engine.dispose()
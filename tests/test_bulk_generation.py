@@ -0,0 +1,209 @@
+"""
+Tests for bulk document generation jobs.
+"""
+
+from datetime import date
+
+import pytest
+from docx import Document as DocxDocument
+from sqlalchemy import JSON, event
+
+from app.core.process_pool import shutdown_process_pool
+from app.db.models import (
+    AuditLog, ClauseCache, Deal, Document, DocumentVersion, GeneratedDocument, LMATemplate, TemplateFieldMapping, User,
+)
+from app.db.encrypted_types import EncryptedJSON
+from app.generation import bulk, populator
+from app.generation.bulk import BulkDocumentGenerationService, BulkGenerationItem
+from app.generation.populator import AIFieldPopulator
+from app.models.cdm import (
+    CreditAgreement, Currency, FloatingRateOption, Frequency, InterestRatePayout, LoanFacility, Money, Party,
+    PeriodEnum,
+)
+from app.templates import storage
+from app.templates.registry import TemplateRegistry
+from app.utils.json_serializer import serialize_cdm_data
+
+
+def _agreement(borrower: str) -> CreditAgreement:
+    return CreditAgreement(
+        deal_id="DEAL_001",
+        loan_identification_number="LOAN_001",
+        agreement_date=date(2025, 3, 10),
+        parties=[Party(id="p1", name=borrower, role="Borrower")],
+        facilities=[
+            LoanFacility(
+                facility_name="Term Loan A",
+                commitment_amount=Money(amount=10000000, currency=Currency.USD),
+                interest_terms=InterestRatePayout(
+                    rate_option=FloatingRateOption(benchmark="Term SOFR", spread_bps=250.0),
+                    payment_frequency=Frequency(period=PeriodEnum.Month, period_multiplier=3),
+                ),
+                maturity_date=date(2030, 3, 10),
+            )
+        ],
+    )
+
+
+@pytest.fixture
+def sqlite_tables(monkeypatch):
+    # EncryptedJSON wraps JSONB, which has no SQLite bind processing of its own
+    monkeypatch.setattr(EncryptedJSON, "load_dialect_impl", lambda self, dialect: dialect.type_descriptor(JSON()))
+    return (User, LMATemplate, TemplateFieldMapping, Deal, Document, DocumentVersion, GeneratedDocument,
+            ClauseCache, AuditLog)
+
+
+@pytest.fixture
+def commits(sqlite_db):
+    commits = []
+    event.listen(sqlite_db, "after_commit", lambda s: commits.append(1))
+    return commits
+
+
+@pytest.fixture
+def seeded(sqlite_db, tmp_path, monkeypatch):
+    db = sqlite_db
+    monkeypatch.setattr(storage, "TEMPLATE_BASE_PATH", tmp_path / "templates")
+    monkeypatch.setattr(storage, "GENERATED_BASE_PATH", tmp_path / "generated")
+    (tmp_path / "templates").mkdir()
+
+    owner = User(email="agent@bank.example", display_name="Agent", role="banker")
+    other = User(email="other@bank.example", display_name="Other", role="banker")
+    db.add_all([owner, other])
+    db.flush()
+    deal = Deal(deal_id="DEAL-2025-001", applicant_id=owner.id, status="draft")
+    db.add(deal)
+    db.flush()
+
+    templates = []
+    for code, heading in (("LMA-FA", "FACILITY AGREEMENT"), ("LMA-FEE", "FEE LETTER")):
+        doc = DocxDocument()
+        doc.add_heading(heading, 0)
+        doc.add_paragraph("Borrower: [BORROWER_NAME]")
+        doc.add_paragraph("Covenants: [COVENANTS]")
+        doc.save(tmp_path / "templates" / f"{code}-2024.1.docx")
+        template = LMATemplate(
+            template_code=code, name=heading.title(), category="Facility Agreement", version="2024.1",
+            file_path=f"templates/{code}.docx", ai_generated_sections=["covenants"],
+        )
+        db.add(template)
+        db.flush()
+        db.add(TemplateFieldMapping(
+            template_id=template.id, template_field="[BORROWER_NAME]",
+            cdm_field="parties[role='Borrower'].name", mapping_type="direct",
+        ))
+        templates.append(template)
+
+    documents = {}
+    for name, borrower, uploaded_by in (("acme", "ACME Corp", owner.id), ("globex", "Globex plc", owner.id),
+                                        ("private", "Initech", other.id)):
+        document = Document(
+            title=f"{name}.pdf", uploaded_by=uploaded_by, deal_id=deal.id if name == "acme" else None,
+            source_cdm_data=serialize_cdm_data(_agreement(borrower)),
+        )
+        db.add(document)
+        db.flush()
+        documents[name] = document
+    db.commit()
+    return owner, deal, templates, documents
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    calls = {"get_template": 0, "populate_ai_fields": 0}
+    get_template = TemplateRegistry.get_template
+
+    def counting_get_template(db, template_id):
+        calls["get_template"] += 1
+        return get_template(db, template_id)
+
+    def populate_ai_fields(self, cdm_data, template, mapped_fields, **kwargs):
+        calls["populate_ai_fields"] += 1
+        return {"[COVENANTS]": f"{template.template_code} covenants for {mapped_fields['[BORROWER_NAME]']}"}
+
+    monkeypatch.setattr(TemplateRegistry, "get_template", staticmethod(counting_get_template))
+    monkeypatch.setattr(populator, "get_chat_model", lambda: None)
+    monkeypatch.setattr(AIFieldPopulator, "populate_ai_fields", populate_ai_fields)
+    monkeypatch.setattr(bulk.DocumentGenerationService, "load_deal_context", lambda self, db, deal_id: (None, []))
+    return calls
+
+
+def _paragraphs(path):
+    return [p.text for p in DocxDocument(path).paragraphs]
+
+
+def test_bulk_job_shares_context_and_writes_in_batches(sqlite_db, commits, seeded, counted):
+    db = sqlite_db
+    owner, deal, (fa, fee), documents = seeded
+    items = [
+        BulkGenerationItem(template_id=fa.id, document_id=documents["acme"].id, deal_id=deal.id),
+        BulkGenerationItem(template_id=fee.id, document_id=documents["acme"].id),
+        BulkGenerationItem(template_id=fa.id, document_id=documents["globex"].id),
+        BulkGenerationItem(template_id=fee.id, document_id=documents["globex"].id),
+        BulkGenerationItem(template_id=fa.id, deal_id=deal.id),
+        BulkGenerationItem(template_id=fa.id, document_id=documents["acme"].id,
+                           field_overrides={"parties[0].name": "ACME Holdings"}),
+        BulkGenerationItem(template_id=999, document_id=documents["acme"].id),
+        BulkGenerationItem(template_id=fa.id, document_id=documents["private"].id),
+    ]
+    commits.clear()
+
+    events = list(BulkDocumentGenerationService(processes=1, batch_size=2).generate(db, items, user_id=owner.id))
+
+    assert events[0]["event"] == "started" and events[0]["total"] == 8
+    assert events[-1]["event"] == "completed"
+    assert (events[-1]["generated"], events[-1]["failed"]) == (6, 2)
+    results = {e["index"]: e for e in events if e["event"] == "result"}
+    assert sorted(results) == list(range(8))
+    assert "not found" in results[6]["error"]
+    assert "do not have access" in results[7]["error"]
+
+    # Three batches of two, one commit each, with progress after every batch
+    assert len(commits) == 3
+    assert [e["completed"] for e in events if e["event"] == "progress"] == [2, 4, 6]
+
+    # Templates and CDM-derived fields are loaded once and shared
+    assert counted["get_template"] == 3  # two templates plus the missing one
+    # (fa, acme, deal), (fee, acme), (fa, globex), (fee, globex), (fa, deal), override item
+    assert counted["populate_ai_fields"] == 6
+
+    assert _paragraphs(results[0]["file_path"])[1:] == [
+        "Borrower: ACME Corp", "Covenants: LMA-FA covenants for ACME Corp"
+    ]
+    assert _paragraphs(results[3]["file_path"])[1:] == [
+        "Borrower: Globex plc", "Covenants: LMA-FEE covenants for Globex plc"
+    ]
+    assert _paragraphs(results[4]["file_path"])[1] == "Borrower: ACME Corp"
+    assert _paragraphs(results[5]["file_path"])[1] == "Borrower: ACME Holdings"
+    assert all(results[i]["valid"] for i in range(6))
+
+    generated = db.query(GeneratedDocument).order_by(GeneratedDocument.id).all()
+    assert len(generated) == 6
+    assert {g.generation_summary["bulk_job_id"] for g in generated} == {events[0]["job_id"]}
+    assert generated[0].source_document_id == documents["acme"].id
+    # Deal items are linked to the deal and audited
+    linked = db.query(Document).filter(Document.is_generated.is_(True)).all()
+    assert sorted(d.id for d in linked) == sorted([results[0]["deal_document_id"], results[4]["deal_document_id"]])
+    assert all(d.deal_id == deal.id for d in linked)
+    assert db.query(AuditLog).count() == 2
+
+
+def test_process_pool_rendering_matches_in_process(sqlite_db, seeded, counted):
+    db = sqlite_db
+    owner, deal, (fa, fee), documents = seeded
+    items = [
+        BulkGenerationItem(template_id=template.id, document_id=documents[name].id)
+        for template in (fa, fee) for name in ("acme", "globex")
+    ]
+
+    try:
+        pooled = list(BulkDocumentGenerationService(processes=2).generate(db, items, user_id=owner.id))
+    finally:
+        shutdown_process_pool()
+    in_process = list(BulkDocumentGenerationService(processes=1).generate(db, items, user_id=owner.id))
+
+    def rendered(events):
+        return [_paragraphs(e["file_path"]) for e in events if e["event"] == "result"]
+
+    assert pooled[-1]["generated"] == 4
+    assert rendered(pooled) == rendered(in_process)
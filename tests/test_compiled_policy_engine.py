@@ -0,0 +1,280 @@
+"""
+Unit tests for CompiledPolicyEngine.
+"""
+
+import pytest
+
+from app.services import compiled_policy_engine
+from app.services.compiled_policy_engine import CompiledPolicyEngine, register_reference_list
+from app.services.policy_engine_factory import create_policy_engine
+from app.services.policy_engine_interface import MockPolicyEngine
+
+
+RULES_YAML = """
+- name: block_sanctioned_parties
+  when:
+    any:
+      - field: originator.lei
+        op: in
+        value: ["BAD_LEI_1", "BAD_LEI_2"]
+      - field: beneficiary.lei
+        op: in
+        value: ["BAD_LEI_1", "BAD_LEI_2"]
+  action: block
+  priority: 100
+  description: "Block sanctioned parties"
+
+- name: flag_excessive_commitment
+  when:
+    all:
+      - field: transaction_type
+        op: eq
+        value: "facility_creation"
+      - field: amount
+        op: greater_than
+        value: 1000000000
+  action: flag
+  priority: 30
+  description: "Flag large facilities"
+
+- name: block_unhosted_wallets
+  when:
+    all:
+      - field: transaction_type
+        op: equals
+        value: "trade_execution"
+      - field: originator.kyc_status
+        op: eq
+        value: false
+  action: block
+  priority: 90
+  description: "Block non-KYC trades"
+
+- name: flag_urgent_deadline
+  when:
+    all:
+      - field: transaction_type
+        op: eq
+        value: "filing_submission"
+      - field: days_until_deadline
+        op: between
+        value: [2, 3]
+  action: flag
+  priority: 30
+  description: "Flag filings due soon"
+"""
+
+
+@pytest.fixture
+def engine():
+    """Compiled engine loaded with the test rules."""
+    engine = CompiledPolicyEngine()
+    engine.load_rules(RULES_YAML)
+    return engine
+
+
+def _tx(**fields):
+    return {"transaction_id": "tx_1", **fields}
+
+
+def test_allows_when_no_rule_matches(engine):
+    result = engine.evaluate(_tx(transaction_type="facility_creation", amount=5_000_000))
+
+    assert result["decision"] == "ALLOW"
+    assert result["rule"] is None
+    assert result["matched_rules"] == []
+
+
+def test_indexed_rule_matches(engine):
+    result = engine.evaluate(_tx(transaction_type="facility_creation", amount=2_000_000_000))
+
+    assert result["decision"] == "FLAG"
+    assert result["rule"] == "flag_excessive_commitment"
+
+
+def test_index_excludes_other_transaction_types(engine):
+    result = engine.evaluate(_tx(transaction_type="trade_execution", amount=2_000_000_000))
+
+    assert result["decision"] == "ALLOW"
+    assert result["trace"][0]["rules_checked"] == 2  # sanctions rule + trade rule
+
+
+def test_higher_priority_wins(engine):
+    result = engine.evaluate(_tx(
+        transaction_type="facility_creation",
+        amount=2_000_000_000,
+        originator={"lei": "BAD_LEI_1"}
+    ))
+
+    assert result["decision"] == "BLOCK"
+    assert result["rule"] == "block_sanctioned_parties"
+    assert result["matched_rules"] == ["block_sanctioned_parties"]
+
+
+def test_full_match_collects_all_matching_rules():
+    engine = CompiledPolicyEngine(short_circuit=False)
+    engine.load_rules(RULES_YAML)
+
+    result = engine.evaluate(_tx(
+        transaction_type="facility_creation",
+        amount=2_000_000_000,
+        originator={"lei": "BAD_LEI_1"}
+    ))
+
+    assert result["rule"] == "block_sanctioned_parties"
+    assert result["matched_rules"] == ["block_sanctioned_parties", "flag_excessive_commitment"]
+
+
+def test_nested_fields_and_missing_values(engine):
+    blocked = engine.evaluate(_tx(transaction_type="trade_execution", originator={"kyc_status": False}))
+    missing = engine.evaluate(_tx(transaction_type="trade_execution", beneficiary=None))
+
+    assert blocked["rule"] == "block_unhosted_wallets"
+    assert missing["decision"] == "ALLOW"
+
+
+def test_between_operator(engine):
+    due = engine.evaluate(_tx(transaction_type="filing_submission", days_until_deadline=3))
+    later = engine.evaluate(_tx(transaction_type="filing_submission", days_until_deadline=10))
+
+    assert due["decision"] == "FLAG"
+    assert later["decision"] == "ALLOW"
+
+
+def test_equal_priority_prefers_more_severe_action():
+    engine = CompiledPolicyEngine()
+    engine.load_rules("""
+- name: flag_it
+  when: {}
+  action: flag
+  priority: 10
+- name: block_it
+  when: {}
+  action: block
+  priority: 10
+""")
+
+    assert engine.evaluate(_tx())["rule"] == "block_it"
+
+
+def test_in_operator_uses_registered_reference_lists(monkeypatch):
+    monkeypatch.setattr(compiled_policy_engine, "_reference_lists", {})
+    watchlist = {"ACME"}
+    register_reference_list("WATCHLIST", lambda value: value in watchlist)
+    engine = CompiledPolicyEngine()
+    engine.load_rules("""
+- name: flag_watchlist
+  when:
+    all:
+      - field: counterparty
+        op: in
+        value: ["WATCHLIST", "LOCAL"]
+  action: flag
+  priority: 10
+""")
+
+    def decide(counterparty):
+        return engine.evaluate(_tx(counterparty=counterparty))["decision"]
+
+    assert decide("ACME") == decide("LOCAL") == "FLAG"
+    assert decide("WATCHLIST") == decide("Other") == "ALLOW"
+    # The list is resolved on every evaluation
+    watchlist.add("Other")
+    assert decide("Other") == "FLAG"
+
+
+def test_reload_replaces_rules(engine):
+    engine.load_rules("""
+- name: block_everything
+  when: {}
+  action: block
+  priority: 1
+""")
+
+    result = engine.evaluate(_tx(transaction_type="facility_creation", amount=2_000_000_000))
+
+    assert result["rule"] == "block_everything"
+    assert engine.get_stats()["rules_loaded"] == 1
+
+
+def test_stats_track_decisions(engine):
+    engine.evaluate(_tx(transaction_type="facility_creation", amount=1))
+    engine.evaluate(_tx(transaction_type="facility_creation", amount=2_000_000_000))
+
+    stats = engine.get_stats()
+    assert stats["total_processed"] == 2
+    assert stats["decisions"]["ALLOW"] == 1
+    assert stats["decisions"]["FLAG"] == 1
+    assert stats["rules_loaded"] == 4
+
+
+def test_invalid_rules_rejected():
+    engine = CompiledPolicyEngine()
+
+    with pytest.raises(ValueError):
+        engine.load_rules("- name: no_action\n  priority: 1\n")
+    with pytest.raises(RuntimeError):
+        engine.load_rules("""
+- name: bad_op
+  when:
+    all:
+      - field: amount
+        op: roughly
+        value: 1
+  action: flag
+  priority: 1
+""")
+
+
+def test_invalid_transaction_rejected(engine):
+    with pytest.raises(ValueError):
+        engine.evaluate({"transaction_type": "facility_creation"})
+
+
+def test_factory_vendors():
+    assert isinstance(create_policy_engine("default"), CompiledPolicyEngine)
+    assert isinstance(create_policy_engine("mock"), MockPolicyEngine)
+
+
+@pytest.mark.parametrize("short_circuit", [True, False])
+def test_evaluate_batch_matches_single_evaluation(short_circuit):
+    engine = CompiledPolicyEngine(short_circuit=short_circuit)
+    engine.load_rules(RULES_YAML)
+    transactions = [
+        _tx(transaction_type="facility_creation", amount=2_000_000_000, originator={"lei": "BAD_LEI_2"}),
+        _tx(transaction_type="facility_creation", amount=10),
+        _tx(transaction_type="trade_execution", originator={"kyc_status": False}),
+        _tx(transaction_type="filing_submission", days_until_deadline=2),
+        _tx(transaction_type=["unhashable"]),
+        _tx(),
+    ]
+
+    assert engine.evaluate_batch(transactions) == [engine.evaluate(tx) for tx in transactions]
+    assert engine.get_stats()["total_processed"] == 2 * len(transactions)
+
+
+def test_interface_default_evaluate_batch():
+    engine = MockPolicyEngine()
+
+    results = engine.evaluate_batch([_tx(), _tx()])
+
+    assert [r["decision"] for r in results] == ["ALLOW", "ALLOW"]
+
+
+@pytest.mark.parametrize("short_circuit", [True, False])
+def test_evaluate_batch_matches_single_evaluation_on_large_groups(short_circuit):
+    engine = CompiledPolicyEngine(short_circuit=short_circuit)
+    engine.load_rules(RULES_YAML)
+    transactions = []
+    for i in range(64):
+        transactions += [
+            _tx(transaction_type="facility_creation", amount=i * 50_000_000,
+                originator={"lei": "BAD_LEI_1" if i % 7 == 0 else f"LEI{i}"}),
+            _tx(transaction_type="trade_execution", originator={"kyc_status": bool(i % 3)}),
+            _tx(transaction_type="trade_execution", originator=None,
+                beneficiary={"lei": "BAD_LEI_2"}),
+            _tx(transaction_type="filing_submission", days_until_deadline=i % 5),
+            _tx(transaction_type="filing_submission", days_until_deadline=[i]),
+        ]
+
+    assert engine.evaluate_batch(transactions) == [engine.evaluate(tx) for tx in transactions]
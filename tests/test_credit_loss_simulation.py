@@ -0,0 +1,115 @@
+"""
+Tests for the Monte Carlo portfolio credit loss simulator.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.core.process_pool import shutdown_process_pool
+from app.services import credit_loss_simulation
+from app.services.credit_loss_simulation import CreditLossSimulator, LossHistogram, STRESS_SCENARIOS
+from app.services.compiled_policy_engine import CompiledPolicyEngine
+from app.services.credit_risk_service import CreditRiskService
+from app.services.policy_service import PolicyService
+from app.utils.normal_distribution import norm_cdf, norm_ppf
+
+
+def test_histogram_quantiles_and_merge():
+    losses = np.random.default_rng(3).exponential(10.0, 200_000)
+    whole = LossHistogram(max_loss=losses.max())
+    whole.add(losses)
+    merged = LossHistogram(max_loss=losses.max())
+    for part in np.array_split(losses, 7):
+        sketch = LossHistogram(max_loss=losses.max())
+        sketch.add(part)
+        merged.merge(sketch)
+
+    assert merged.n == whole.n
+    assert np.array_equal(merged.counts, whole.counts)
+    for q in (0.5, 0.99, 0.999):
+        assert merged.quantile(q) == pytest.approx(np.quantile(losses, q), abs=2 * whole.bin_width)
+    tail = np.sort(losses)[-200:]
+    assert merged.expected_shortfall(0.999) == pytest.approx(tail.mean(), rel=1e-3)
+    assert merged.mean() == pytest.approx(losses.mean())
+    assert merged.std() == pytest.approx(losses.std(ddof=1))
+
+
+def test_results_do_not_depend_on_processes(monkeypatch):
+    monkeypatch.setattr(credit_loss_simulation, "SCENARIOS_PER_CHUNK", 2_000)
+    rng = np.random.default_rng(5)
+    kwargs = dict(
+        exposure=rng.uniform(1e5, 1e7, 50), pd=rng.uniform(0.001, 0.1, 50), lgd=0.45,
+        n_scenarios=6_000, seed=11
+    )
+    simulator = CreditLossSimulator()
+
+    serial = simulator.simulate(**kwargs)
+    try:
+        parallel = simulator.simulate(processes=2, **kwargs)
+    finally:
+        shutdown_process_pool()
+
+    assert serial == parallel
+    assert simulator.simulate(**{**kwargs, "seed": 12}) != serial
+
+
+def test_var_matches_vasicek_limit_for_granular_portfolio():
+    n, pd, lgd = 1_000, 0.02, 0.5
+    r = float(CreditRiskService().asset_correlation_batch(pd))
+
+    result = CreditLossSimulator().simulate(np.ones(n), pd, lgd, n_scenarios=20_000, seed=1)
+
+    assert result["expected_loss"] == pytest.approx(n * pd * lgd)
+    assert result["simulated_mean_loss"] == pytest.approx(result["expected_loss"], rel=0.03)
+    # Large homogeneous portfolio: loss quantile ~ the asymptotic single-factor (IRB) quantile
+    vasicek = n * lgd * float(norm_cdf((norm_ppf(pd) + np.sqrt(r) * norm_ppf(0.99)) / np.sqrt(1 - r)))
+    assert result["value_at_risk"]["0.99"] == pytest.approx(vasicek, rel=0.05)
+    assert result["economic_capital"] == pytest.approx(result["value_at_risk"]["0.999"] - result["expected_loss"])
+
+
+def test_stress_scenarios_and_sector_concentration():
+    exposure = [4e6, 3e6, 2e6, 1e6]
+    sector = ["energy", "energy", "retail", "tech"]
+    results = CreditLossSimulator().run_stress_scenarios(
+        [STRESS_SCENARIOS[name] for name in ("baseline", "adverse", "severe")],
+        exposure=exposure, pd=0.03, lgd=0.4, sector=sector, n_scenarios=5_000
+    )
+
+    losses = [r["expected_loss"] for r in results]
+    tail = [r["expected_shortfall"]["0.999"] for r in results]
+    assert losses == sorted(losses) and tail == sorted(tail)
+    assert results[0]["sector_concentrations"] == {"energy": 0.7, "retail": 0.2, "tech": 0.1}
+    assert results[0]["sector_hhi"] == pytest.approx(0.54)
+    assert results[2]["expected_loss"] == pytest.approx(1e7 * 0.075 * 0.5)
+
+
+def test_stress_test_policy_uses_simulated_var():
+    results = CreditLossSimulator().run_stress_scenarios(
+        [STRESS_SCENARIOS[name] for name in ("baseline", "adverse", "severe")],
+        exposure=[5e4] * 200, pd=0.02, lgd=0.4, n_scenarios=5_000
+    )
+    engine = CompiledPolicyEngine()
+    engine.load_rules((Path(__file__).parent.parent / "app/policies/credit_risk/stress_testing.yaml").read_text())
+    # Capital covers every scenario's expected loss but not the severe tail loss
+    rwa = 5e6
+    capital = results[2]["expected_loss"] + 0.08 * rwa
+    assert capital < results[2]["value_at_risk"]["0.999"] + 0.08 * rwa
+
+    decisions = PolicyService(engine).evaluate_stress_test_results(
+        portfolio_id="DEAL_001", scenario_results=results, capital=capital, stressed_rwa=[rwa] * 3,
+        deal_ids=["DEAL_001"]
+    )
+
+    assert decisions[0].decision == "ALLOW"
+    assert decisions[2].decision == "FLAG"
+    assert decisions[2].rule_applied in ("flag_portfolio_stress_capital_breach", "flag_portfolio_high_stress_loss")
+    assert decisions[2].metadata["stress_test_capital_ratio"] == pytest.approx(
+        (capital - results[2]["value_at_risk"]["0.999"]) / rwa
+    )
+    assert decisions[2].metadata["deal_ids"] == ["DEAL_001"]
+    # Facility-creation rules do not fire on a portfolio stress test
+    assert not any(
+        rule.startswith("block_missing") for d in decisions for rule in d.matched_rules or []
+    )
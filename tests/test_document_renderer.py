@@ -0,0 +1,174 @@
+"""
+Tests for compiled template rendering in DocumentRenderer.
+"""
+
+import io
+import os
+import zipfile
+from datetime import date
+
+import pytest
+from docx import Document
+from docx.oxml.parser import parse_xml
+
+from app.generation.renderer import DocumentRenderer
+from app.models.cdm import (
+    CreditAgreement, Currency, FloatingRateOption, Frequency, InterestRatePayout, LoanFacility, Money, Party,
+    PeriodEnum,
+)
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+A = 'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+
+FIELD_VALUES = {
+    "[BORROWER_NAME]": "ACME Corp",
+    "[COMMITMENT_AMOUNT]": "10,000,000.00",
+    "[CURRENCY]": "USD",
+    "[AGREEMENT_DATE]": "10 March 2025",
+    "[REPRESENTATIONS_AND_WARRANTIES]": "1. The Borrower represents that {no default} is continuing.",
+    "GOVERNING_LAW": "English",
+}
+
+
+def _write_template(path):
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "[BORROWER_NAME] - Facility Agreement"
+    doc.sections[0].footer.paragraphs[0].text = "Dated [AGREEMENT_DATE] ({unmatched})"
+    doc.add_heading("FACILITY AGREEMENT", 0)
+    doc.add_paragraph("Borrower: [BORROWER_NAME]; Lender: [LENDER_NAME]")
+    doc.add_paragraph("Facility {{facilities[0].facility_name}} for {facilities[0].commitment_amount.amount} [CURRENCY]")
+    doc.add_paragraph("{{representations_and_warranties}}")
+    doc.add_paragraph("Boilerplate clause without placeholders.")
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Borrower"
+    table.cell(0, 1).text = "[BORROWER_NAME]"
+    merged = table.cell(1, 0).merge(table.cell(1, 1))
+    merged.text = "Amount: [COMMITMENT_AMOUNT]"
+    body = doc.element.body
+    sect_pr = body[-1]
+    # Block-level content control and a paragraph holding a run-level one
+    sect_pr.addprevious(parse_xml(
+        f'<w:sdt {W}><w:sdtContent><w:p><w:r><w:t>Law: [GOVERNING_LAW]</w:t></w:r></w:p></w:sdtContent></w:sdt>'
+    ))
+    sect_pr.addprevious(parse_xml(
+        f'<w:p {W}><w:r><w:t>Agent [BORROWER_NAME] </w:t></w:r>'
+        f'<w:sdt><w:sdtContent><w:r><w:t>[CURRENCY]</w:t></w:r></w:sdtContent></w:sdt></w:p>'
+    ))
+    # Text box / shape text
+    sect_pr.addprevious(parse_xml(
+        f'<w:p {W} {A}><w:r><a:txBody><a:p><a:r><a:t>Box: [BORROWER_NAME]</a:t></a:r></a:p></a:txBody></w:r></w:p>'
+    ))
+    doc.save(path)
+
+
+@pytest.fixture
+def template_path(tmp_path):
+    path = tmp_path / "CL-FA-EN-2024.1.docx"
+    _write_template(path)
+    return str(path)
+
+
+@pytest.fixture
+def cdm_data():
+    return CreditAgreement(
+        deal_id="DEAL_001",
+        loan_identification_number="LOAN_001",
+        agreement_date=date(2025, 3, 10),
+        parties=[Party(id="p1", name="ACME Corp", role="Borrower")],
+        facilities=[
+            LoanFacility(
+                facility_name="Term Loan A",
+                commitment_amount=Money(amount=10000000, currency=Currency.USD),
+                interest_terms=InterestRatePayout(
+                    rate_option=FloatingRateOption(benchmark="Term SOFR", spread_bps=250.0),
+                    payment_frequency=Frequency(period=PeriodEnum.Month, period_multiplier=3),
+                ),
+                maturity_date=date(2030, 3, 10),
+            )
+        ],
+    )
+
+
+@pytest.fixture(autouse=True)
+def empty_compile_cache(monkeypatch):
+    monkeypatch.setattr(DocumentRenderer, "_compiled_templates", type(DocumentRenderer._compiled_templates)())
+
+
+def _parts(package: bytes):
+    with zipfile.ZipFile(io.BytesIO(package)) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+def test_compiled_rendering_matches_full_traversal(template_path, cdm_data):
+    renderer = DocumentRenderer()
+
+    expected = io.BytesIO()
+    renderer.render_document(Document(template_path), FIELD_VALUES, cdm_data).save(expected)
+    rendered = renderer.render_template_to_bytes(template_path, FIELD_VALUES, cdm_data)
+
+    assert _parts(rendered) == _parts(expected.getvalue())
+    document_xml = _parts(rendered)["word/document.xml"]
+    # Content controls and text boxes
+    assert b"Law: English" in document_xml and b"Box: ACME Corp" in document_xml
+
+    doc = renderer.render_template(template_path, FIELD_VALUES, cdm_data)
+    texts = [p.text for p in doc.paragraphs]
+    assert "Borrower: ACME Corp; Lender: [LENDER_NAME]" in texts
+    assert "Facility Term Loan A for 10000000 USD" in texts
+    assert FIELD_VALUES["[REPRESENTATIONS_AND_WARRANTIES]"] in texts
+    assert doc.tables[0].cell(1, 0).text == "Amount: 10,000,000.00"
+    assert doc.sections[0].header.paragraphs[0].text == "ACME Corp - Facility Agreement"
+
+
+def test_renders_reuse_the_compiled_template(template_path, cdm_data, monkeypatch):
+    renderer = DocumentRenderer()
+    compiled = renderer.compile_template(template_path)
+    # Two body paragraphs and the table are unchanged boilerplate; only placeholder sites are recorded
+    assert len(compiled.sites) == 12
+
+    compiles = []
+    original = DocumentRenderer._compile
+    monkeypatch.setattr(DocumentRenderer, "_compile", lambda self, path: compiles.append(path) or original(self, path))
+    first = renderer.render_template_to_bytes(template_path, FIELD_VALUES, cdm_data)
+    other = renderer.render_template_to_bytes(template_path, {**FIELD_VALUES, "[BORROWER_NAME]": "Globex"}, cdm_data)
+    assert compiles == []
+    # Renders patch copies; the compiled template itself is untouched
+    assert renderer.render_template_to_bytes(template_path, FIELD_VALUES, cdm_data) == first
+    assert b"Globex" in _parts(other)["word/document.xml"]
+
+    # Editing the template file recompiles it
+    doc = Document(template_path)
+    doc.add_paragraph("Signed by [BORROWER_NAME]")
+    doc.save(template_path)
+    stat = os.stat(template_path)
+    os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    rendered = renderer.render_template(template_path, FIELD_VALUES, cdm_data)
+    assert len(compiles) == 1
+    assert rendered.paragraphs[-1].text == "Signed by ACME Corp"
+
+
+def test_missing_and_corrupt_templates(tmp_path):
+    renderer = DocumentRenderer()
+    with pytest.raises(FileNotFoundError):
+        renderer.render_template(str(tmp_path / "missing.docx"), FIELD_VALUES)
+
+    corrupt = tmp_path / "corrupt.docx"
+    corrupt.write_bytes(b"not a zip file")
+    with pytest.raises(IOError, match="Failed to render template"):
+        renderer.render_template_to_bytes(str(corrupt), FIELD_VALUES)
+
+
+def test_compiled_validation_matches_full_validation(template_path, cdm_data):
+    renderer = DocumentRenderer()
+    partial = {k: v for k, v in FIELD_VALUES.items() if k not in ("[COMMITMENT_AMOUNT]", "[AGREEMENT_DATE]")}
+
+    for field_values in (FIELD_VALUES, partial, {}):
+        content, validation = renderer.render_template_with_validation(template_path, field_values, cdm_data)
+        assert content == renderer.render_template_to_bytes(template_path, field_values, cdm_data)
+        assert validation == renderer.validate_rendered_document(Document(io.BytesIO(content)))
+
+    # Merged cells are reported once per grid column, as python-docx iterates them
+    assert validation["placeholder_locations"]["[COMMITMENT_AMOUNT]"] == [
+        "table_0_row_1_cell_0", "table_0_row_1_cell_1"
+    ]
+    assert "footer_para_0" in validation["placeholder_locations"]["[AGREEMENT_DATE]"]
@@ -0,0 +1,78 @@
+"""
+Unit tests for the incremental, token-budgeted article splitter.
+"""
+
+from app.chains.agentic_pipeline import Config, DocumentStructureAnalyzer
+from app.utils.document_splitter import CreditAgreementSplitter
+
+
+def _tokens(text):
+    return (len(text) + 3) // 4
+
+
+def _splitter(**kwargs):
+    kwargs.setdefault("min_chunk_size", 50)
+    kwargs.setdefault("max_chunk_tokens", 100)
+    kwargs.setdefault("overlap_tokens", 20)
+    return CreditAgreementSplitter(token_counter=_tokens, **kwargs)
+
+
+def _agreement():
+    preamble = "This CREDIT AGREEMENT is entered into by Borrower Inc. and the lenders party hereto. " * 3
+    definitions = "ARTICLE I: DEFINITIONS\n" + ("Defined term means something specific. " * 10 + "\n\n") * 4
+    credits = "ARTICLE II. THE CREDITS\nThe lenders agree to make loans.\n"
+    return preamble + "\n" + definitions + credits + "ARTICLE III: CONDITIONS"
+
+
+def test_streamed_pages_match_whole_text_split():
+    text = _agreement()
+    pages = [text[i:i + 37] for i in range(0, len(text), 37)]
+    splitter = _splitter()
+
+    streamed = list(splitter.iter_chunks(pages, separator=""))
+    whole = splitter.split_by_articles(text)
+
+    assert [(c.text, c.start_char, c.end_char) for c in streamed] == [(c.text, c.start_char, c.end_char) for c in whole]
+    assert [c.article_number for c in whole] == [None, 1, 1, 1, 1, 1, 2, 3]
+    assert [c.chunk_index for c in whole] == list(range(len(whole)))
+    assert all(_tokens(c.text) <= 100 for c in whole)
+    assert all(text[c.start_char:c.end_char].strip() == c.text for c in whole)
+
+
+def test_articles_are_emitted_before_the_stream_ends():
+    consumed = []
+
+    def pages():
+        for page in ["ARTICLE I: DEFINITIONS\nTerms.\n", "ARTICLE II: THE CREDITS\nLoans.\n", "ARTICLE III: MISC\n"]:
+            consumed.append(page)
+            yield page
+
+    chunks = _splitter().iter_chunks(pages())
+    first = next(chunks)
+
+    assert first.article_number == 1
+    assert len(consumed) == 2
+
+
+def test_headerless_text_is_windowed_with_overlap_not_truncated():
+    text = " ".join(f"word{i}" for i in range(400))
+
+    chunks = _splitter().split_by_articles(text)
+
+    assert len(chunks) > 1
+    assert chunks[0].start_char == 0 and chunks[-1].end_char == len(text)
+    assert all(b.start_char < a.end_char for a, b in zip(chunks, chunks[1:]))
+    assert all(c.article_number is None for c in chunks)
+
+
+def test_agentic_analyzer_windows_long_articles():
+    body = ("The Borrower shall repay each Term Loan on the Maturity Date. " * 40 + "\n\n") * 20
+    text = "ARTICLE II: THE CREDITS\n" + body
+
+    sections = DocumentStructureAnalyzer().analyze(text)
+    parts = [s for s in sections if s.section_type == "article"]
+
+    assert len(parts) > 1
+    assert parts[0].title.startswith("Article II: THE CREDITS (part ")
+    assert all(len(s.content) <= Config.MAX_CHUNK_CHARS * 1.2 for s in parts)
+    assert max(s.end_char for s in parts) == len(text)
@@ -0,0 +1,85 @@
+"""
+Unit tests for the persistent embedding cache.
+"""
+
+import asyncio
+
+from langchain_core.embeddings import Embeddings
+
+from app.services.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+class _CountingEmbeddings(Embeddings):
+    """Deterministic embeddings that count model calls."""
+
+    model = "counting-model"
+
+    def __init__(self):
+        self.calls = []
+
+    def _vector(self, text):
+        return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        self.calls.append([text])
+        return self._vector(text)
+
+
+def test_reembedding_unchanged_corpus_costs_no_model_calls(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    model = _CountingEmbeddings()
+    corpus = ["alpha", "beta", "alpha", "gamma"]
+
+    first = CachedEmbeddings(model, EmbeddingCache(path)).embed_documents(corpus)
+    assert model.calls == [["alpha", "beta", "gamma"]]
+
+    # A fresh process (new cache object) reads the vectors back from disk
+    reopened = EmbeddingCache(path)
+    second = CachedEmbeddings(model, reopened).embed_documents(corpus)
+    query = CachedEmbeddings(model, reopened).embed_query("beta")
+
+    assert len(model.calls) == 1
+    assert second == first
+    assert query == first[1]
+    stats = reopened.get_stats()
+    assert stats["disk_hits"] == 4
+    assert stats["memory_hits"] == 1
+    assert stats["hit_rate"] == 1.0
+
+
+def test_cache_is_namespaced_by_model():
+    cache = EmbeddingCache()
+    model = _CountingEmbeddings()
+
+    CachedEmbeddings(model, cache, model_name="a").embed_query("text")
+    CachedEmbeddings(model, cache, model_name="b").embed_query("text")
+
+    assert len(model.calls) == 2
+
+
+def test_lru_eviction_bounds_both_tiers():
+    cache = EmbeddingCache(max_entries=3, memory_entries=2)
+
+    for i in range(5):
+        cache.put_many("m", [f"text-{i}"], [[float(i)]])
+
+    stats = cache.get_stats()
+    assert stats["disk_entries"] == 3
+    assert stats["memory_entries"] == 2
+    assert stats["evictions"] == 2
+    assert cache.get_many("m", ["text-0", "text-4"]) == [None, [4.0]]
+
+
+def test_async_paths_use_cache():
+    model = _CountingEmbeddings()
+    cached = CachedEmbeddings(model, EmbeddingCache())
+
+    asyncio.run(cached.aembed_documents(["one", "two"]))
+    asyncio.run(cached.aembed_query("one"))
+
+    assert model.calls == [["one", "two"]]
+    assert cached.model_name == "counting-model"
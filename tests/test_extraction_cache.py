@@ -0,0 +1,71 @@
+"""
+Unit tests for the chunk-level extraction cache.
+"""
+
+import time
+
+from app.services.extraction_cache import ExtractionCache, prompt_version
+
+
+def test_hit_requires_same_prompt_model_and_text():
+    cache = ExtractionCache()
+    cache.set("ns", "v1", "openai/gpt", "article text", {"governing_law": "NY"})
+
+    assert cache.get("ns", "v1", "openai/gpt", "article text") == {"governing_law": "NY"}
+    assert cache.get("ns", "v2", "openai/gpt", "article text") is None
+    assert cache.get("ns", "v1", "openai/other", "article text") is None
+    assert cache.get("ns", "v1", "openai/gpt", "article text!") is None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["tokens_saved"] > 0
+
+
+def test_entries_expire_after_ttl():
+    cache = ExtractionCache(ttl_seconds=0)
+    cache.set("ns", "v1", "m", "text", {"a": 1})
+    time.sleep(0.01)
+
+    assert cache.get("ns", "v1", "m", "text") is None
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_size_bound_evicts_least_recently_used():
+    cache = ExtractionCache(max_entries=2)
+    cache.set("ns", "v1", "m", "a", {"v": "a"})
+    cache.set("ns", "v1", "m", "b", {"v": "b"})
+    time.sleep(0.01)
+    cache.get("ns", "v1", "m", "a")
+    cache.set("ns", "v1", "m", "c", {"v": "c"})
+
+    assert cache.get("ns", "v1", "m", "b") is None
+    assert cache.get("ns", "v1", "m", "a") == {"v": "a"}
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_overwrites_do_not_count_towards_size_bound():
+    cache = ExtractionCache(max_entries=2)
+    cache.set("ns", "v1", "m", "a", {"v": 1})
+    cache.set("ns", "v1", "m", "b", {"v": "b"})
+    cache.set("ns", "v1", "m", "a", {"v": 2})
+
+    assert cache.get("ns", "v1", "m", "a") == {"v": 2}
+    assert cache.get("ns", "v1", "m", "b") == {"v": "b"}
+    assert cache.get_stats()["evictions"] == 0
+
+    cache.clear()
+    cache.set("ns", "v1", "m", "c", {"v": "c"})
+    assert cache.get_stats()["entries"] == 1
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "extraction.sqlite3")
+    ExtractionCache(path).set("ns", "v1", "m", "text", {"a": 1})
+
+    assert ExtractionCache(path).get("ns", "v1", "m", "text") == {"a": 1}
+
+
+def test_prompt_version_is_stable():
+    assert prompt_version("system", {"a": 1}) == prompt_version("system", {"a": 1})
+    assert prompt_version("system", {"a": 1}) != prompt_version("system v2", {"a": 1})
@@ -0,0 +1,139 @@
+"""
+Tests for compiled CDM field paths and one-pass mapping evaluation.
+"""
+
+from datetime import date
+
+import pytest
+
+from app.db.models import LMATemplate, TemplateFieldMapping
+from app.generation.field_parser import FieldPathParser, FieldPathSet, compile_field_path
+from app.generation.mapper import FieldMapper
+from app.models.cdm import (
+    CreditAgreement, Currency, FloatingRateOption, Frequency, InterestRatePayout, LoanFacility, Money, Party,
+    PeriodEnum,
+)
+
+PATHS = [
+    "parties[role='Borrower'].name",
+    "parties[role='borrower'].lei",
+    "parties[role='Lender'].name",
+    "parties[1].name",
+    "parties[5].name",
+    "facilities[0].facility_name",
+    "facilities[0].commitment_amount.amount",
+    "facilities[0].commitment_amount.currency",
+    "facilities[0].interest_terms.rate_option.spread_bps",
+    "facilities[0].interest_terms.payment_frequency",
+    "agreement_date",
+    "governing_law",
+    "no_such_field.name",
+]
+
+
+@pytest.fixture
+def cdm_data():
+    return CreditAgreement(
+        deal_id="DEAL_001",
+        loan_identification_number="LOAN_001",
+        agreement_date=date(2025, 3, 10),
+        governing_law="English",
+        parties=[
+            Party(id="p1", name="ACME Corp", role="Borrower", lei="5493001KJTIIGC8Y1R12"),
+            Party(id="p2", name="Big Bank", role="Lender"),
+        ],
+        facilities=[
+            LoanFacility(
+                facility_name="Term Loan A",
+                commitment_amount=Money(amount=10000000, currency=Currency.USD),
+                interest_terms=InterestRatePayout(
+                    rate_option=FloatingRateOption(benchmark="Term SOFR", spread_bps=250.0),
+                    payment_frequency=Frequency(period=PeriodEnum.Month, period_multiplier=3),
+                ),
+                maturity_date=date(2030, 3, 10),
+            )
+        ],
+    )
+
+
+def test_compiled_paths_resolve_objects_and_dicts(cdm_data):
+    assert FieldPathParser.get_nested_value(cdm_data, "parties[role='Borrower'].name") == "ACME Corp"
+    assert FieldPathParser.get_nested_value(cdm_data, "parties[role='borrower'].lei") == "5493001KJTIIGC8Y1R12"
+    assert FieldPathParser.get_nested_value(cdm_data, "parties[1].name") == "Big Bank"
+    assert FieldPathParser.get_nested_value(cdm_data, "parties[5].name") is None
+    assert FieldPathParser.get_nested_value(cdm_data, "parties[role='Guarantor'].name") is None
+    assert FieldPathParser.get_nested_value(cdm_data, "facilities[0].commitment_amount.currency") == Currency.USD
+    assert FieldPathParser.get_nested_value(None, "agreement_date") is None
+
+    cdm_dict = cdm_data.model_dump()
+    assert FieldPathParser.get_nested_value(cdm_dict, "parties[role='Lender'].name") == "Big Bank"
+    assert FieldPathParser.get_nested_value(cdm_dict, "facilities[0].facility_name") == "Term Loan A"
+
+    # Each path string is tokenized once and the accessor reused
+    assert compile_field_path("parties[role='Borrower'].name") is compile_field_path("parties[role='Borrower'].name")
+    assert compile_field_path("parties[role='Borrower'].name").segments == tuple(
+        FieldPathParser.parse_field_path("parties[role='Borrower'].name")
+    )
+
+
+def test_path_set_matches_individual_lookups(cdm_data):
+    path_set = FieldPathSet(PATHS + ["agreement_date", ""])
+    assert path_set.paths == tuple(PATHS)
+
+    values = path_set.evaluate(cdm_data)
+    assert values == {path: FieldPathParser.get_nested_value(cdm_data, path) for path in PATHS}
+    assert values["facilities[0].interest_terms.rate_option.spread_bps"] == 250.0
+    assert values["no_such_field.name"] is None
+
+    cdm_dict = cdm_data.model_dump()
+    assert path_set.evaluate(cdm_dict) == {path: FieldPathParser.get_nested_value(cdm_dict, path) for path in PATHS}
+    assert path_set.evaluate(None) == dict.fromkeys(PATHS)
+
+
+def test_set_nested_value_through_list_filter(cdm_data):
+    cdm_dict = cdm_data.model_dump()
+    FieldPathParser.set_nested_value(cdm_dict, "parties[role='Borrower'].name", "ACME Holdings")
+    FieldPathParser.set_nested_value(cdm_dict, "parties[role='Guarantor'].name", "ACME Parent")
+    FieldPathParser.set_nested_value(cdm_dict, "facilities[0].commitment_amount.amount", 5000000)
+
+    assert [(p["role"], p["name"]) for p in cdm_dict["parties"]] == [
+        ("Borrower", "ACME Holdings"), ("Lender", "Big Bank"), ("Guarantor", "ACME Parent"),
+    ]
+    assert cdm_dict["facilities"][0]["commitment_amount"]["amount"] == 5000000
+
+
+def test_mapper_resolves_mapping_set_once_per_agreement(cdm_data, monkeypatch):
+    template = LMATemplate(template_code="LMA-CL-FA-2024-EN", required_fields=["deal_id", "maturity_date"])
+    mappings = [
+        TemplateFieldMapping(template_field="[BORROWER_NAME]", cdm_field="parties[role='Borrower'].name",
+                             mapping_type="direct", is_required=True),
+        TemplateFieldMapping(template_field="[COMMITMENT_AMOUNT]", cdm_field="facilities[0].commitment_amount.amount",
+                             mapping_type="direct", is_required=True),
+        TemplateFieldMapping(template_field="[SPREAD]", cdm_field="facilities[0].interest_terms.rate_option.spread_bps",
+                             mapping_type="computed", transformation_rule="format_spread"),
+        TemplateFieldMapping(template_field="[PAYMENT_FREQUENCY]",
+                             cdm_field="facilities[0].interest_terms.payment_frequency", mapping_type="direct"),
+        TemplateFieldMapping(template_field="[GUARANTOR_NAME]", cdm_field="parties[role='Guarantor'].name",
+                             mapping_type="direct", is_required=True),
+        TemplateFieldMapping(template_field="[COVENANTS]", cdm_field="covenants", mapping_type="ai_generated"),
+    ]
+    mapper = FieldMapper(template, field_mappings=mappings)
+
+    evaluations = []
+    evaluate = FieldPathSet.evaluate
+    monkeypatch.setattr(FieldPathSet, "evaluate", lambda self, obj: evaluations.append(obj) or evaluate(self, obj))
+
+    assert mapper.validate_required_fields(cdm_data) == ["maturity_date", "parties[role='Guarantor'].name"]
+    assert mapper.map_cdm_to_template(cdm_data) == {
+        "[BORROWER_NAME]": "ACME Corp",
+        "[COMMITMENT_AMOUNT]": "$10,000,000.00 USD",
+        "[SPREAD]": "2.50%",
+        "[PAYMENT_FREQUENCY]": "Quarterly",
+    }
+    assert len(evaluations) == 1
+    # The template's required_fields column is not extended with mapping paths
+    assert template.required_fields == ["deal_id", "maturity_date"]
+
+    other = cdm_data.model_copy(update={"parties": [Party(id="p1", name="Globex plc", role="Borrower")]})
+    assert mapper.map_cdm_to_template(other)["[BORROWER_NAME]"] == "Globex plc"
+    assert len(evaluations) == 2
@@ -0,0 +1,141 @@
+"""
+Tests for the pooled LLM clients, the deterministic response cache and LLM call metrics.
+"""
+
+import asyncio
+from itertools import cycle
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+from pydantic import BaseModel
+
+from app.core import llm_client, metrics
+from app.core.config import settings
+from app.core.metrics import MetricsRegistry, MetricsStore, MetricsWriter
+from app.core import llm_response_cache
+from app.core.llm_response_cache import LLMResponseCache
+
+T0 = 0
+
+
+class Classification(BaseModel):
+    label: str
+
+
+class FakeChatModel(GenericFakeChatModel):
+    """Fake chat model that answers with JSON and supports with_structured_output()."""
+
+    def with_structured_output(self, schema, **kwargs):
+        return self | (lambda message: schema.model_validate_json(message.content))
+
+
+def reply(label: str) -> AIMessage:
+    return AIMessage(
+        content=f'{{"label": "{label}"}}',
+        usage_metadata={"input_tokens": 120, "output_tokens": 8, "total_tokens": 128},
+    )
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    created = []
+
+    def create_chat_model(provider, model, temperature=0, **kwargs):
+        kwargs = {k: v for k, v in kwargs.items() if k in ("callbacks", "cache")}
+        llm = FakeChatModel(messages=cycle([reply("senior_secured")]), **kwargs)
+        created.append((model, temperature, llm))
+        return llm
+
+    registry = MetricsRegistry(bucket_seconds=60)
+    monkeypatch.setattr(metrics, "_metrics", registry)
+    monkeypatch.setattr(llm_client, "create_chat_model", create_chat_model)
+    monkeypatch.setattr(llm_client, "_llm_config", {
+        "provider": "openai", "model": "gpt-4o", "temperature": 0.0, "api_key": "x", "base_url": None,
+    })
+    monkeypatch.setattr(llm_client, "_client_pool", {})
+    monkeypatch.setattr(llm_response_cache, "_cache_instance", LLMResponseCache())
+    monkeypatch.setattr(settings, "LLM_RESPONSE_CACHE_ENABLED", True)
+    return created, registry
+
+
+def totals(registry):
+    store = MetricsStore()
+    MetricsWriter(registry, store).flush_sync()
+    return {
+        name: store.aggregate(name, T0, 2 ** 40, interval=None, provider="openai", model="gpt-4o")
+        for name in ("llm.calls", "llm.cache_hits", "llm.prompt_tokens", "llm.completion_tokens", "llm.latency_seconds")
+    }
+
+
+def test_chat_models_are_pooled_by_model_temperature_and_kwargs(fake_llm):
+    created, _ = fake_llm
+
+    first = llm_client.get_chat_model(temperature=0)
+    assert llm_client.get_chat_model() is first
+    assert llm_client.get_chat_model(temperature=0.7) is not first
+    assert llm_client.get_chat_model(model="gpt-4o-mini") is not first
+    assert llm_client.get_chat_model(max_tokens=512) is not first
+    assert llm_client.get_chat_model(max_tokens=512) is llm_client.get_chat_model(max_tokens=512)
+    assert len(created) == 4
+
+    structured = llm_client.get_structured_chat_model(Classification)
+    assert llm_client.get_structured_chat_model(Classification) is structured
+
+    llm_client.clear_llm_client_pool()
+    assert llm_client.get_chat_model() is not first
+
+
+def test_temperature_zero_structured_calls_are_served_from_cache(fake_llm):
+    created, registry = fake_llm
+    chain = llm_client.get_structured_chat_model(Classification)
+    prompt = [HumanMessage(content="Classify facility A")]
+
+    assert chain.invoke(prompt) == Classification(label="senior_secured")
+    assert asyncio.run(chain.ainvoke(prompt)) == Classification(label="senior_secured")
+    chain.invoke([HumanMessage(content="Classify facility B")])
+
+    # Only the temperature-0 model has a cache attached
+    assert [llm.cache is not None for _, _, llm in created] == [True]
+    assert llm_client.get_structured_chat_model(Classification, temperature=0.7) is not chain
+    assert created[-1][2].cache is None
+
+    stats = llm_response_cache.get_llm_response_cache().get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+    assert stats["tokens_saved"] == 128
+
+    recorded = totals(registry)
+    assert recorded["llm.calls"][0]["count"] == 2
+    assert recorded["llm.cache_hits"][0]["count"] == 1
+    assert recorded["llm.prompt_tokens"][0]["sum"] == 240
+    assert recorded["llm.completion_tokens"][0]["sum"] == 16
+    assert recorded["llm.latency_seconds"][0]["count"] == 2
+
+
+def test_response_cache_persists_and_evicts(tmp_path):
+    path = str(tmp_path / "llm_responses.sqlite3")
+
+    cache = LLMResponseCache(path, max_entries=2)
+    for prompt in ("a", "b", "c"):
+        cache.update(prompt, "model=gpt-4o", [ChatGeneration(message=reply(prompt))])
+
+    reopened = LLMResponseCache(path, max_entries=2)
+    assert reopened.lookup("a", "model=gpt-4o") is None
+    assert reopened.lookup("c", "model=other") is None
+    (generation,) = reopened.lookup("c", "model=gpt-4o")
+    assert generation.message.content == '{"label": "c"}'
+    assert reopened.get_stats()["entries"] == 2
+
+
+def test_errors_are_counted(fake_llm, monkeypatch):
+    _, registry = fake_llm
+    llm = llm_client.get_chat_model(temperature=0.5)
+    monkeypatch.setattr(llm, "messages", iter([]))
+
+    with pytest.raises(Exception):
+        llm.invoke("hello")
+
+    store = MetricsStore()
+    MetricsWriter(registry, store).flush_sync()
+    assert store.aggregate("llm.errors", T0, 2 ** 40, interval=None)[0]["count"] == 1
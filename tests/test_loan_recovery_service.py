@@ -10,7 +10,7 @@ from sqlalchemy.orm import Session
 
 from app.services.loan_recovery_service import LoanRecoveryService
 from app.db.models import (
-    LoanDefault, RecoveryAction, BorrowerContact, Deal, LoanAsset, PaymentEvent
+    LoanDefault, RecoveryAction, BorrowerContact, Deal, LoanAsset, PaymentEvent, DetectionCheckpoint
 )
 
 
@@ -97,105 +97,145 @@ def recovery_service(mock_db):
         return service
 
 
+@pytest.fixture
+def sqlite_tables():
+    """Tables default detection touches."""
+    return (PaymentEvent, LoanDefault, LoanAsset, DetectionCheckpoint)
+
+
+@pytest.fixture
+def sqlite_recovery_service(sqlite_db):
+    """LoanRecoveryService on the SQLite session."""
+    with patch('app.services.loan_recovery_service.TwilioService'), \
+         patch('app.services.loan_recovery_service.RecoveryTemplateService'):
+        return LoanRecoveryService(sqlite_db)
+
+
+def _payment(payment_id, days_old, deal_id=1, loan_id=None, status="pending"):
+    created_at = datetime.utcnow() - timedelta(days=days_old)
+    return PaymentEvent(
+        payment_id=payment_id,
+        payment_type="interest",
+        amount=Decimal("1000.00"),
+        currency="USD",
+        payment_status=status,
+        related_deal_id=deal_id,
+        related_loan_id=loan_id,
+        created_at=created_at,
+        updated_at=created_at
+    )
+
+
 class TestDetectPaymentDefaults:
     """Test payment default detection."""
     
-    def test_detect_payment_defaults_no_overdue(self, recovery_service, mock_db):
+    def test_detect_payment_defaults_no_overdue(self, sqlite_recovery_service, sqlite_db):
         """Test detection when no payments are overdue."""
-        mock_db.query.return_value.filter.return_value.all.return_value = []
+        sqlite_db.add_all([_payment("P1", 10), _payment("P2", 90, status="paid")])
+        sqlite_db.commit()
         
-        defaults = recovery_service.detect_payment_defaults()
+        defaults = sqlite_recovery_service.detect_payment_defaults()
         
         assert defaults == []
     
-    def test_detect_payment_defaults_with_overdue(self, recovery_service, mock_db, mock_payment_event):
-        """Test detection of overdue payment."""
-        # Mock query chain
-        mock_query = Mock()
-        mock_db.query.return_value.filter.return_value = mock_query
-        mock_query.all.return_value = [mock_payment_event]
-        
-        # Mock existing default check (no existing default)
-        mock_default_query = Mock()
-        mock_db.query.return_value.filter.return_value.first.return_value = None
-        
-        # Mock add and commit
-        mock_db.add = Mock()
-        mock_db.commit = Mock()
-        mock_db.refresh = Mock()
-        
-        defaults = recovery_service.detect_payment_defaults()
-        
-        # Should create a new default
-        assert mock_db.add.called
-        assert mock_db.commit.called
+    def test_detect_payment_defaults_with_overdue(self, sqlite_recovery_service, sqlite_db):
+        """Test detection of overdue payments, one default per deal/loan."""
+        sqlite_db.add_all([
+            _payment("P1", 45, deal_id=1, loan_id=7),
+            _payment("P2", 50, deal_id=1, loan_id=7),
+            _payment("P3", 40, deal_id=2),
+            _payment("P4", 40, deal_id=2, loan_id=9),
+        ])
+        sqlite_db.commit()
+        
+        defaults = sqlite_recovery_service.detect_payment_defaults()
+        
+        assert [(d.deal_id, d.loan_id) for d in defaults] == [(1, "7"), (2, None), (2, "9")]
+        assert sqlite_db.query(LoanDefault).count() == 3
+        event = defaults[0].cdm_events[0]
+        assert str(defaults[0].id) in str(event)
+        
+        # Defaults already open are not raised again
+        assert sqlite_recovery_service.detect_payment_defaults() == []
     
-    def test_detect_payment_defaults_with_deal_id(self, recovery_service, mock_db):
+    def test_detect_payment_defaults_with_deal_id(self, sqlite_recovery_service, sqlite_db):
         """Test detection filtered by deal_id."""
-        # Mock query chain properly
-        mock_query1 = Mock()
-        mock_query2 = Mock()
-        mock_db.query.return_value.filter.return_value = mock_query1
-        mock_query1.filter.return_value = mock_query2
-        mock_query2.all.return_value = []
+        sqlite_db.add_all([_payment("P1", 45, deal_id=1), _payment("P2", 45, deal_id=2)])
+        sqlite_db.commit()
         
-        defaults = recovery_service.detect_payment_defaults(deal_id=1)
+        defaults = sqlite_recovery_service.detect_payment_defaults(deal_id=1)
         
-        # Verify deal_id filter was applied
-        assert mock_db.query.called
-        assert defaults == []
+        assert [d.deal_id for d in defaults] == [1]
     
-    def test_detect_payment_defaults_severity_calculation(self, recovery_service, mock_db, mock_payment_event):
+    def test_detect_payment_defaults_severity_calculation(self, sqlite_recovery_service, sqlite_db):
         """Test severity calculation based on days past due."""
-        # Mock payment that's 60 days overdue (should be "high" severity)
-        mock_payment_event.created_at = datetime.utcnow() - timedelta(days=60)
-        
-        mock_query = Mock()
-        mock_db.query.return_value.filter.return_value = mock_query
-        mock_query.all.return_value = [mock_payment_event]
-        
-        mock_db.query.return_value.filter.return_value.first.return_value = None
-        mock_db.add = Mock()
-        mock_db.commit = Mock()
-        
-        defaults = recovery_service.detect_payment_defaults()
-        
-        # Verify default was created with appropriate severity
-        assert mock_db.add.called
+        sqlite_db.add_all([
+            _payment("P1", 35, deal_id=1),
+            _payment("P2", 50, deal_id=2),
+            _payment("P3", 90, deal_id=3),
+            _payment("P4", 120, deal_id=4),
+        ])
+        sqlite_db.commit()
+        
+        defaults = sqlite_recovery_service.detect_payment_defaults()
+        
+        assert [d.severity for d in defaults] == ["low", "medium", "high", "critical"]
+        assert defaults[1].days_past_due == 20
+    
+    def test_incremental_detection_scans_only_new_and_changed_payments(self, sqlite_recovery_service, sqlite_db):
+        """Test that incremental runs skip payments already past due at the last run."""
+        sqlite_db.add(_payment("P1", 45, deal_id=1))
+        sqlite_db.commit()
+        assert len(sqlite_recovery_service.detect_payment_defaults(incremental=True)) == 1
+        
+        # Resolving the default does not make an unchanged payment reappear...
+        sqlite_db.query(LoanDefault).update({"status": "resolved"})
+        sqlite_db.add(_payment("P2", 40, deal_id=2))
+        sqlite_db.commit()
+        assert sqlite_recovery_service.detect_payment_defaults(incremental=True) == []
+        
+        # ...but a payment that became due, or changed, since the last run does
+        checkpoint = sqlite_db.query(DetectionCheckpoint).filter_by(name="payment_defaults").one()
+        checkpoint.high_water_mark -= timedelta(days=20)
+        sqlite_db.query(PaymentEvent).filter_by(payment_id="P1").update({"updated_at": datetime.utcnow()})
+        sqlite_db.commit()
+        defaults = sqlite_recovery_service.detect_payment_defaults(incremental=True)
+        assert sorted(d.deal_id for d in defaults) == [1, 2]
+        
+        # A full scan still finds everything
+        assert sqlite_recovery_service.detect_payment_defaults() == []
 
 
 class TestDetectCovenantBreaches:
     """Test covenant breach detection."""
     
-    def test_detect_covenant_breaches_no_breaches(self, recovery_service, mock_db):
+    def test_detect_covenant_breaches_no_breaches(self, sqlite_recovery_service, sqlite_db):
         """Test detection when no covenant breaches exist."""
-        mock_db.query.return_value.filter.return_value.all.return_value = []
+        sqlite_db.add(LoanAsset(loan_id="LOAN_001", risk_status="COMPLIANT"))
+        sqlite_db.commit()
         
-        breaches = recovery_service.detect_covenant_breaches()
+        breaches = sqlite_recovery_service.detect_covenant_breaches()
         
         assert breaches == []
     
-    def test_detect_covenant_breaches_with_breach(self, recovery_service, mock_db):
-        """Test detection of covenant breach."""
-        mock_loan_asset = Mock(spec=LoanAsset)
-        mock_loan_asset.id = 1
-        mock_loan_asset.loan_id = "LOAN_001"
-        mock_loan_asset.related_deal_id = 1
-        mock_loan_asset.risk_status = "BREACH"
-        mock_loan_asset.last_verified_at = datetime.utcnow()
-        
-        mock_query = Mock()
-        mock_db.query.return_value.filter.return_value = mock_query
-        mock_query.all.return_value = [mock_loan_asset]
-        
-        mock_db.query.return_value.filter.return_value.first.return_value = None
-        mock_db.add = Mock()
-        mock_db.commit = Mock()
-        
-        breaches = recovery_service.detect_covenant_breaches()
-        
-        # Should create a new default for breach
-        assert mock_db.add.called
+    def test_detect_covenant_breaches_with_breach(self, sqlite_recovery_service, sqlite_db):
+        """Test detection of covenant breach, re-raised only after a newer verification."""
+        verified_at = datetime.utcnow() - timedelta(days=1)
+        asset = LoanAsset(loan_id="LOAN_001", risk_status="BREACH", last_verified_at=verified_at)
+        sqlite_db.add(asset)
+        sqlite_db.commit()
+        
+        breaches = sqlite_recovery_service.detect_covenant_breaches()
+        
+        assert len(breaches) == 1
+        assert breaches[0].loan_id == "LOAN_001"
+        assert breaches[0].default_date == verified_at
+        assert breaches[0].severity == "high"
+        assert sqlite_recovery_service.detect_covenant_breaches() == []
+        
+        asset.last_verified_at = datetime.utcnow()
+        sqlite_db.commit()
+        assert len(sqlite_recovery_service.detect_covenant_breaches(incremental=True)) == 1
 
 
 class TestGetActiveDefaults:
@@ -0,0 +1,168 @@
+"""
+Unit tests for the concurrent MAP phase and hierarchical reduce.
+"""
+
+import threading
+import time
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from app.chains import agentic_pipeline, extraction_chain, map_reduce_chain
+from app.models.partial_cdm import PartialCreditAgreement
+from app.services.extraction_cache import ExtractionCache
+from app.utils.document_splitter import DocumentChunk
+
+
+@pytest.fixture(autouse=True)
+def no_extraction_cache(monkeypatch):
+    monkeypatch.setattr(map_reduce_chain, "get_extraction_cache", lambda: None)
+
+
+def _chunks(count):
+    return [
+        DocumentChunk(text=f"chunk-{i}", article_number=i + 1, article_title=None, chunk_index=i, start_char=0, end_char=0)
+        for i in range(count)
+    ]
+
+
+class _FakeExtractor:
+    """Stands in for the structured LLM; records concurrency and fails on demand."""
+
+    def __init__(self, delay=0.05, failures=None):
+        self.delay = delay
+        self.failures = dict(failures or {})
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, prompt_value):
+        text = prompt_value.to_string()
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            key = next((k for k in self.failures if k in text), None)
+            fail = key is not None and self.failures[key] > 0
+            if fail:
+                self.failures[key] -= 1
+        try:
+            time.sleep(self.delay)
+            if fail:
+                raise RuntimeError("transient LLM error")
+            return PartialCreditAgreement(governing_law=text.split("Document Section:")[-1].split()[0])
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_map_runs_concurrently_and_preserves_order(monkeypatch):
+    fake = _FakeExtractor()
+    monkeypatch.setattr(map_reduce_chain, "create_partial_extraction_chain", lambda: RunnableLambda(fake))
+
+    start = time.perf_counter()
+    partials = map_reduce_chain.map_partial_extractions(_chunks(16), max_concurrency=8, max_retries=1)
+    elapsed = time.perf_counter() - start
+
+    assert [p.governing_law for p in partials] == [f"chunk-{i}" for i in range(16)]
+    assert [p.source_section for p in partials] == [f"Article {i + 1}" for i in range(16)]
+    assert 1 < fake.peak <= 8
+    assert elapsed < 16 * fake.delay
+
+
+def test_map_retries_transient_failures_and_skips_persistent_ones(monkeypatch):
+    fake = _FakeExtractor(delay=0, failures={"chunk-1": 1, "chunk-2": 99})
+    monkeypatch.setattr(map_reduce_chain, "create_partial_extraction_chain", lambda: RunnableLambda(fake))
+    monkeypatch.setattr(
+        map_reduce_chain, "_with_retry",
+        lambda chain, attempts: chain.with_retry(stop_after_attempt=attempts, wait_exponential_jitter=False)
+    )
+
+    partials = map_reduce_chain.map_partial_extractions(_chunks(4), max_concurrency=2, max_retries=3)
+
+    assert [p.governing_law for p in partials] == ["chunk-0", "chunk-1", "chunk-3"]
+
+
+def test_tree_merge_reduces_until_prompt_fits(monkeypatch):
+    merges = []
+
+    def merge(prompt_value):
+        merges.append(prompt_value.to_string())
+        return PartialCreditAgreement(governing_law="merged")
+
+    monkeypatch.setattr(map_reduce_chain, "create_partial_merge_chain", lambda: RunnableLambda(merge))
+    partials = [PartialCreditAgreement(governing_law="x" * 200, source_section=f"Article {i}") for i in range(9)]
+    budget = len(map_reduce_chain._format_partials(partials[:3])) + 10
+
+    merged = map_reduce_chain.tree_merge_partials(partials, max_chars=budget, max_concurrency=4, max_retries=1)
+
+    assert len(map_reduce_chain._format_partials(merged)) <= budget
+    assert len(merged) < len(partials)
+    assert merged[0].source_section.startswith("Article 0 - ")
+    assert merged[-1].source_section.endswith("Article 8")
+
+
+def test_tree_merge_is_noop_when_partials_fit(monkeypatch):
+    monkeypatch.setattr(map_reduce_chain, "create_partial_merge_chain", lambda: (_ for _ in ()).throw(AssertionError))
+    partials = [PartialCreditAgreement(source_section="Article 1"), PartialCreditAgreement(source_section="Article 2")]
+
+    assert map_reduce_chain.tree_merge_partials(partials, max_chars=10_000) == partials
+
+
+def test_only_changed_chunks_are_re_extracted(monkeypatch):
+    cache = ExtractionCache()
+    monkeypatch.setattr(map_reduce_chain, "get_extraction_cache", lambda: cache)
+    fake = _FakeExtractor(delay=0)
+    calls = []
+    monkeypatch.setattr(
+        map_reduce_chain, "create_partial_extraction_chain",
+        lambda: RunnableLambda(lambda pv: calls.append(pv.to_string()) or fake(pv))
+    )
+    chunks = _chunks(5)
+
+    first = map_reduce_chain.map_partial_extractions(chunks, max_retries=1)
+    chunks[3].text = "chunk-3-revised"
+    second = map_reduce_chain.map_partial_extractions(chunks, max_retries=1)
+
+    assert len(calls) == 6
+    assert [p.governing_law for p in second] == ["chunk-0", "chunk-1", "chunk-2", "chunk-3-revised", "chunk-4"]
+    assert [p.source_section for p in second] == [p.source_section for p in first]
+    stats = cache.get_stats()
+    assert stats["hits"] == 4
+    assert stats["tokens_saved"] > 0
+
+
+def test_page_stream_dispatches_by_document_length(monkeypatch):
+    pulled = []
+
+    def pages(count):
+        for i in range(count):
+            pulled.append(i)
+            yield f"page-{i} " + "x" * 20000
+
+    calls = []
+
+    def fake_agentic(text):
+        calls.append(("agentic", text))
+        return {"status": "error"}
+
+    def fake_map_reduce(text):
+        calls.append(("map-reduce", text))
+        return "map-reduce"
+
+    monkeypatch.setattr(agentic_pipeline, "extract_with_agentic_pipeline", fake_agentic)
+    monkeypatch.setattr(extraction_chain, "extract_data_map_reduce", fake_map_reduce)
+    monkeypatch.setattr(extraction_chain, "extract_data", lambda text, max_retries=3: ("simple", text))
+
+    # Past AGENTIC_PIPELINE_THRESHOLD the whole document reaches the agentic pipeline
+    assert extraction_chain.extract_data_from_pages(pages(10)) == "map-reduce"
+    assert len(pulled) == 10
+    assert [strategy for strategy, _ in calls] == ["agentic", "map-reduce"]
+    assert [page.split()[0] for page in calls[0][1].split("\n")] == [f"page-{i}" for i in range(10)]
+
+    calls.clear()
+    assert extraction_chain.extract_data_from_pages(pages(3)) == "map-reduce"
+    assert [strategy for strategy, _ in calls] == ["map-reduce"]
+
+    assert extraction_chain.extract_data_from_pages(["a", "b"]) == ("simple", "a\nb")
+    with pytest.raises(ValueError):
+        extraction_chain.extract_data_from_pages(["", " \n"])
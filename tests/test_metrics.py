@@ -0,0 +1,141 @@
+"""
+Tests for buffered metrics and the web search analytics built on them.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core import metrics
+from app.core.metrics import MetricsRegistry, MetricsStore, MetricsWriter
+from app.services import web_search_analytics
+
+DAY = 86400
+T0 = datetime(2025, 3, 10, tzinfo=timezone.utc).timestamp()
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry(bucket_seconds=60)
+
+
+@pytest.fixture
+def store():
+    return MetricsStore()
+
+
+@pytest.fixture
+def global_metrics(monkeypatch, tmp_path):
+    monkeypatch.setattr(web_search_analytics, "COUNTS_FILE", str(tmp_path / "missing-counts.json"))
+    monkeypatch.setattr(web_search_analytics, "TIMES_FILE", str(tmp_path / "missing-times.json"))
+    registry = MetricsRegistry(bucket_seconds=60)
+    store = MetricsStore(str(tmp_path / "metrics.sqlite3"))
+    monkeypatch.setattr(metrics, "_metrics", registry)
+    monkeypatch.setattr(metrics, "_metrics_store", store)
+    monkeypatch.setattr(metrics, "_metrics_writer", MetricsWriter(registry, store))
+    monkeypatch.setattr(web_search_analytics, "_legacy_imported", False)
+    return registry, store
+
+
+def test_values_are_aggregated_per_bucket_until_drained(registry, store):
+    for i in range(100):
+        registry.observe("llm.latency_seconds", 0.2 + i / 1000, at=T0 + i, provider="openai")
+    registry.increment("filings.submitted", at=T0, jurisdiction="UK")
+    registry.increment("filings.submitted", value=3, at=T0 + DAY, jurisdiction="UK")
+
+    # 100 observations over two minutes plus two counter buckets
+    assert len(registry) == 4
+    assert store.append(registry.drain()) == 4
+    assert len(registry) == 0
+
+    (latency,) = store.aggregate("llm.latency_seconds", T0, T0 + DAY, interval=None)
+    assert latency["count"] == 100
+    assert latency["sum"] == pytest.approx(sum(0.2 + i / 1000 for i in range(100)))
+    assert (latency["min"], latency["max"]) == (pytest.approx(0.2), pytest.approx(0.299))
+
+    daily = store.aggregate("filings.submitted", T0, T0 + 2 * DAY, interval="day", jurisdiction="UK")
+    assert [(row["bucket_start"], row["sum"]) for row in daily] == [(T0, 1), (T0 + DAY, 3)]
+    assert store.aggregate("filings.submitted", T0, T0 + 2 * DAY, jurisdiction="US") == []
+
+    histogram = store.histogram("llm.latency_seconds", T0, T0 + DAY, provider="openai")
+    assert histogram["count"] == 100
+    assert (histogram["p50"], histogram["p99"]) == (0.25, 0.5)
+
+
+def test_compaction_merges_closed_buckets(registry, store):
+    writer = MetricsWriter(registry, store)
+    for flush in range(5):
+        for i in range(10):
+            registry.observe("web_search.duration_seconds", 1.0 + flush, at=T0 + i)
+            registry.increment("web_search.requests", at=T0 + i, source="api" if i % 2 else "agent")
+        writer.flush_sync()
+    registry.increment("web_search.requests", at=T0 + 10 * DAY)
+    store.append(registry.drain())
+
+    (rows,) = store._conn.execute("SELECT COUNT(*) FROM metric_points").fetchone()
+    # One row per closed series plus the open bucket's row
+    assert rows == 4
+    (total,) = store.aggregate("web_search.requests", T0, T0 + DAY, interval=None)
+    assert total["count"] == 50
+    (durations,) = store.aggregate("web_search.duration_seconds", T0, T0 + DAY, interval=None)
+    assert (durations["count"], durations["sum"], durations["min"], durations["max"]) == (50, 150.0, 1.0, 5.0)
+    assert store.histogram("web_search.duration_seconds", T0, T0 + DAY)["counts"][7:11] == [10, 10, 30, 0]
+
+
+def test_failed_flush_keeps_metrics_buffered(registry):
+    class BrokenStore(MetricsStore):
+        def append(self, series):
+            raise OSError("disk full")
+
+    registry.increment("policy.evaluations", at=T0, decision="allow")
+    writer = MetricsWriter(registry, BrokenStore())
+    with pytest.raises(OSError):
+        writer.flush_sync()
+    registry.increment("policy.evaluations", at=T0, decision="allow")
+
+    store = MetricsStore()
+    MetricsWriter(registry, store).flush_sync()
+    assert store.aggregate("policy.evaluations", T0, T0 + 60, interval=None)[0]["count"] == 2
+
+
+def test_web_search_analytics_reads_daily_aggregates(global_metrics):
+    registry, store = global_metrics
+
+    async def record():
+        await web_search_analytics.record_request(1.0, 4)
+        await web_search_analytics.record_request(2.0, None)
+        await web_search_analytics.record_request(5.0, 10)  # not timed
+        await web_search_analytics.record_request(None, 4)
+
+    asyncio.run(record())
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+    registry.increment(web_search_analytics.REQUESTS_METRIC, at=yesterday.timestamp())
+
+    counts = web_search_analytics.last_n_days_df(3)
+    times = web_search_analytics.last_n_days_avg_time_df(3)
+
+    assert list(counts["count"]) == [0, 1, 4]
+    assert list(counts["full_date"])[-1] == datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    assert list(times["avg_time"]) == [0, 0, 1.5]
+    assert list(times["request_count"]) == [0, 0, 2]
+    # Reads flushed the buffer into the store
+    assert len(registry) == 0
+
+
+def test_legacy_json_analytics_are_imported_once(global_metrics, tmp_path, monkeypatch):
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    counts_file, times_file = tmp_path / "counts.json", tmp_path / "times.json"
+    counts_file.write_text(json.dumps({today: 3}))
+    times_file.write_text(json.dumps({today: [0.5, 1.5]}))
+    monkeypatch.setattr(web_search_analytics, "COUNTS_FILE", str(counts_file))
+    monkeypatch.setattr(web_search_analytics, "TIMES_FILE", str(times_file))
+    monkeypatch.setattr(web_search_analytics, "LOCK_FILE", str(tmp_path / "analytics.lock"))
+
+    assert list(web_search_analytics.last_n_days_df(2)["count"]) == [0, 3]
+    assert list(web_search_analytics.last_n_days_avg_time_df(2)["avg_time"]) == [0, 1.0]
+    assert not counts_file.exists() and (tmp_path / "counts.json.imported").exists()
+
+    monkeypatch.setattr(web_search_analytics, "_legacy_imported", False)
+    assert list(web_search_analytics.last_n_days_df(2)["count"]) == [0, 3]
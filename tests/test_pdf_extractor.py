@@ -0,0 +1,115 @@
+"""
+Unit tests for streaming PDF page extraction.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pymupdf
+import pytest
+
+from app.core.process_pool import shutdown_process_pool
+from app.utils import pdf_extractor
+from app.utils.pdf_extractor import extract_text_from_pdf, get_page_cache, iter_pdf_pages
+
+
+def _make_pdf(pages: int) -> bytes:
+    doc = pymupdf.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"ARTICLE {i + 1} page body")
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    get_page_cache().clear()
+    yield
+    get_page_cache().clear()
+
+
+def test_pages_stream_in_order_in_process():
+    pages = list(iter_pdf_pages(_make_pdf(3)))
+
+    assert [p.number for p in pages] == [1, 2, 3]
+    assert "ARTICLE 2" in pages[1].text
+
+
+def test_pages_stream_in_order_from_pool(monkeypatch):
+    monkeypatch.setattr(pdf_extractor, "PARALLEL_MIN_PAGES", 1)
+    monkeypatch.setattr(pdf_extractor, "IN_FLIGHT_PER_WORKER", 1)
+
+    try:
+        pages = list(iter_pdf_pages(_make_pdf(6), max_workers=2))
+    finally:
+        shutdown_process_pool()
+
+    assert [p.number for p in pages] == list(range(1, 7))
+    assert all(f"ARTICLE {p.number} " in p.text for p in pages)
+
+
+def test_page_cache_serves_repeat_extractions():
+    content = _make_pdf(2)
+    list(iter_pdf_pages(content))
+    cache = get_page_cache()
+    hits = cache.hits
+
+    list(iter_pdf_pages(content))
+
+    assert cache.hits == hits + 2
+
+
+def test_page_cache_is_bounded():
+    cache = pdf_extractor.PageTextCache(max_chars=10)
+    cache.set("a", 1, "x" * 6)
+    cache.set("a", 2, "y" * 6)
+
+    assert cache.get("a", 1) is None
+    assert cache.get("a", 2) == "y" * 6
+
+
+def test_invalid_pdf_raises_value_error():
+    with pytest.raises(ValueError):
+        list(iter_pdf_pages(b"%PDF-not really"))
+
+
+def test_failed_page_raises_in_process(monkeypatch):
+    get_text = pymupdf.Page.get_text
+
+    def fail_second_page(page, *args, **kwargs):
+        if page.number == 1:
+            raise RuntimeError("corrupt content stream")
+        return get_text(page, *args, **kwargs)
+
+    monkeypatch.setattr(pymupdf.Page, "get_text", fail_second_page)
+
+    pages = iter_pdf_pages(_make_pdf(3))
+    assert next(pages).number == 1
+    with pytest.raises(ValueError, match="page 2"):
+        next(pages)
+
+
+def test_failed_page_raises_from_pool(monkeypatch):
+    def fail_third_page(path, page_index):
+        if page_index == 2:
+            raise RuntimeError("corrupt content stream")
+        return f"page {page_index + 1}"
+
+    monkeypatch.setattr(pdf_extractor, "PARALLEL_MIN_PAGES", 1)
+    monkeypatch.setattr(pdf_extractor, "_extract_page_in_worker", fail_third_page)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        monkeypatch.setattr(pdf_extractor, "get_process_pool", lambda: pool)
+
+        pages = iter_pdf_pages(_make_pdf(5), max_workers=2)
+        assert [next(pages).number, next(pages).number] == [1, 2]
+        with pytest.raises(ValueError, match="page 3"):
+            next(pages)
+
+
+def test_extract_text_from_pdf_path(tmp_path):
+    path = tmp_path / "agreement.pdf"
+    path.write_bytes(_make_pdf(2))
+
+    text = extract_text_from_pdf(path)
+
+    assert "ARTICLE 1" in text and "ARTICLE 2" in text
@@ -11,9 +11,8 @@ from decimal import Decimal
 from sqlalchemy.orm import Session
 
 from app.services.loan_recovery_service import LoanRecoveryService
-from app.services.twilio_service import TwilioService
 from app.db.models import (
-    LoanDefault, RecoveryAction, BorrowerContact, Deal, PaymentEvent, LoanAsset
+    LoanDefault, RecoveryAction, BorrowerContact, Deal, PaymentEvent, LoanAsset, DetectionCheckpoint
 )
 from app.models.cdm_events import generate_cdm_loan_default, generate_cdm_recovery_action
 
@@ -99,79 +98,48 @@ class TestEndToEndRecoveryWorkflow:
     
     @patch('app.services.loan_recovery_service.TwilioService')
     @patch('app.services.loan_recovery_service.RecoveryTemplateService')
-    def test_complete_recovery_workflow(self, mock_template_service, mock_twilio_service,
-                                       recovery_service, mock_db, mock_payment_event,
-                                       mock_loan_default, mock_borrower_contact):
+    def test_complete_recovery_workflow(self, mock_template_service, mock_twilio_service, sqlite_db):
         """Test complete workflow: detect default -> trigger actions -> execute action."""
-        
-        # Step 1: Mock payment default detection
-        mock_db.query.return_value.filter.return_value.all.return_value = [mock_payment_event]
-        mock_db.query.return_value.filter.return_value.first.return_value = None  # No existing default
-        
-        # Mock adding and committing new default
-        mock_db.add = Mock()
-        mock_db.commit = Mock()
-        mock_db.refresh = Mock()
-        
-        # Detect defaults
+        created_at = datetime.utcnow() - timedelta(days=35)
+        sqlite_db.add_all([
+            PaymentEvent(
+                payment_id="PAY_001", payment_type="interest", amount=Decimal("1000.00"), currency="USD",
+                payment_status="pending", related_deal_id=1, created_at=created_at, updated_at=created_at
+            ),
+            BorrowerContact(
+                deal_id=1, contact_name="Test Borrower", phone_number="+13022537220",
+                email="test@example.com", is_primary=True, is_active=True
+            ),
+        ])
+        sqlite_db.commit()
+        
+        mock_template_service.return_value.render_template.return_value = "Test recovery message"
+        twilio = mock_twilio_service.return_value
+        twilio.send_sms.return_value = {"status": "sent", "message_sid": "SM1234567890abcdef"}
+        twilio.make_voice_call.return_value = {"status": "queued", "call_sid": "CA1234567890"}
+        recovery_service = LoanRecoveryService(sqlite_db)
+        
+        # Step 1: Detect the overdue payment (5 days past due)
         defaults = recovery_service.detect_payment_defaults(deal_id=1)
-        
-        # Verify default was created
-        assert mock_db.add.called
-        assert mock_db.commit.called
-        
-        # Step 2: Mock getting the created default
-        mock_db.query.return_value.filter.return_value.first.side_effect = [
-            mock_loan_default,  # For default query
-            mock_borrower_contact  # For contact query
-        ]
-        
-        # Mock template service
-        mock_template_service.return_value.get_template.return_value = "Test recovery message"
-        
-        # Mock recovery action creation
-        mock_action = Mock(spec=RecoveryAction)
-        mock_action.id = 1
-        mock_action.loan_default_id = 1
-        mock_action.action_type = "sms_reminder"
-        mock_action.communication_method = "sms"
-        mock_action.recipient_phone = "+13022537220"
-        mock_action.status = "pending"
-        mock_action.to_dict = Mock(return_value={
-            "id": 1,
-            "loan_default_id": 1,
-            "action_type": "sms_reminder",
-            "communication_method": "sms",
-            "status": "pending"
-        })
-        
-        # Trigger recovery actions
-        actions = recovery_service.trigger_recovery_actions(default_id=1)
-        
-        # Verify actions were created
-        assert mock_db.add.called
-        
-        # Step 3: Execute recovery action
-        mock_db.query.return_value.filter.return_value.first.side_effect = [
-            mock_action,  # Action query
-            mock_loan_default,  # Default query
-            mock_borrower_contact  # Contact query
-        ]
-        
-        # Mock Twilio service response
-        mock_twilio = Mock(spec=TwilioService)
-        mock_twilio.send_sms.return_value = {
-            "status": "sent",
-            "message_sid": "SM1234567890abcdef"
-        }
-        recovery_service.twilio_service = mock_twilio
-        
-        # Execute action
-        executed_action = recovery_service.execute_recovery_action(action_id=1)
-        
-        # Verify SMS was sent
-        mock_twilio.send_sms.assert_called_once()
-        assert mock_db.commit.called
+        assert [(d.days_past_due, d.status) for d in defaults] == [(5, "open")]
+        
+        # Step 2: Trigger actions; SMS and voice are executed immediately
+        actions = recovery_service.trigger_recovery_actions(default_id=defaults[0].id)
+        
+        assert [(a.action_type, a.status) for a in actions] == [("sms_reminder", "sent"), ("voice_call", "sent")]
+        twilio.send_sms.assert_called_once()
+        assert twilio.send_sms.call_args.kwargs["to_phone"] == "+13022537220"
+        twilio.make_voice_call.assert_called_once()
+        stored = sqlite_db.query(RecoveryAction).order_by(RecoveryAction.id).all()
+        assert stored[0].twilio_message_sid == "SM1234567890abcdef"
+        assert stored[0].action_metadata["cdm_event"]["eventType"]
+        assert sqlite_db.query(LoanDefault).one().status == "in_recovery"
+        
+        # Step 3: The default is in recovery, so detection does not raise it again,
+        # and executing a sent action does not resend it
+        assert recovery_service.detect_payment_defaults(deal_id=1) == []
+        assert recovery_service.execute_recovery_action(action_id=stored[0].id).status == "sent"
+        twilio.send_sms.assert_called_once()
     
     @patch('app.services.loan_recovery_service.TwilioService')
     def test_recovery_workflow_with_real_twilio(self, mock_twilio_class, recovery_service,
@@ -229,43 +197,45 @@ class TestEndToEndRecoveryWorkflow:
             pytest.skip(f"Twilio not configured: {e}")
 
 
+@pytest.fixture
+def sqlite_tables():
+    """Tables default detection and recovery actions touch."""
+    return (PaymentEvent, LoanDefault, LoanAsset, DetectionCheckpoint, RecoveryAction, BorrowerContact)
+
+
 class TestDefaultDetectionWorkflow:
     """Test default detection workflow."""
     
-    def test_detect_payment_default_creates_default(self, recovery_service, mock_db, mock_payment_event):
+    def test_detect_payment_default_creates_default(self, sqlite_db):
         """Test that detecting payment default creates LoanDefault record."""
-        mock_db.query.return_value.filter.return_value.all.return_value = [mock_payment_event]
-        mock_db.query.return_value.filter.return_value.first.return_value = None
-        
-        mock_db.add = Mock()
-        mock_db.commit = Mock()
-        mock_db.refresh = Mock()
+        created_at = datetime.utcnow() - timedelta(days=40)
+        sqlite_db.add(PaymentEvent(
+            payment_id="PAY_001", payment_type="interest", amount=Decimal("1000.00"), currency="USD",
+            payment_status="pending", related_deal_id=1, created_at=created_at, updated_at=created_at
+        ))
+        sqlite_db.commit()
+        recovery_service = LoanRecoveryService(sqlite_db)
         
         defaults = recovery_service.detect_payment_defaults(deal_id=1)
         
-        # Verify default was created
-        assert mock_db.add.called
-        assert mock_db.commit.called
+        # Verify default was created with its CDM event
+        assert len(defaults) == 1
+        stored = sqlite_db.query(LoanDefault).one()
+        assert stored.default_type == "payment_default"
+        assert stored.amount_overdue == Decimal("1000.00")
+        assert stored.cdm_events and stored.cdm_events[0]["eventType"] == "Observation"
     
-    def test_detect_covenant_breach_creates_default(self, recovery_service, mock_db):
+    def test_detect_covenant_breach_creates_default(self, sqlite_db):
         """Test that detecting covenant breach creates LoanDefault record."""
-        mock_loan_asset = Mock(spec=LoanAsset)
-        mock_loan_asset.id = 1
-        mock_loan_asset.loan_id = "LOAN_001"
-        mock_loan_asset.related_deal_id = 1
-        mock_loan_asset.risk_status = "BREACH"
-        mock_loan_asset.last_verified_at = datetime.utcnow()
-        
-        mock_db.query.return_value.filter.return_value.all.return_value = [mock_loan_asset]
-        mock_db.query.return_value.filter.return_value.first.return_value = None
-        
-        mock_db.add = Mock()
-        mock_db.commit = Mock()
+        sqlite_db.add(LoanAsset(loan_id="LOAN_001", risk_status="BREACH", last_verified_at=datetime.utcnow()))
+        sqlite_db.commit()
+        recovery_service = LoanRecoveryService(sqlite_db)
         
         breaches = recovery_service.detect_covenant_breaches(deal_id=1)
         
         # Verify default was created for breach
-        assert mock_db.add.called
+        assert [b.loan_id for b in breaches] == ["LOAN_001"]
+        assert sqlite_db.query(LoanDefault).filter_by(default_type="covenant_breach").count() == 1
 
 
 class TestRecoveryActionWorkflow:
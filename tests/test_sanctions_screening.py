@@ -0,0 +1,269 @@
+"""
+Tests for sanctions list loading, screening and the policy/CDM integration.
+"""
+
+import os
+from datetime import date
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from app.models.cdm import CreditAgreement, Currency, LoanFacility, Money, Party
+from app.services.compiled_policy_engine import CompiledPolicyEngine
+from app.services.policy_service import PolicyService
+from app.services.sanctions_screening import (
+    SanctionsEntry, SanctionsIndex, SanctionsScreener, load_sanctions_lists, normalize_name, phonetic_code,
+    set_sanctions_screener,
+)
+
+SANCTIONED_LEI = "5493001KJTIIGC8Y1R12"
+
+ENTITIES_CSV = """entry_id,name,list,lei,aliases,type,country
+CSV-1,ACME Trading Co. Ltd,Internal,5493001KJTIIGC8Y1R12,Acme Intl Trading;ACME Holdings,entity,IR
+CSV-2,Global Bank of Commerce,Internal,,,entity,KP
+"""
+
+OFAC_SDN_CSV = """36,"AEROCARIBBEAN AIRLINES","-0-","CUBA","-0-","-0-","-0-","-0-","-0-","-0-","-0-","-0-"
+173,"Mohammed AL-RASHID","individual","SDGT","-0-","-0-","-0-","-0-","-0-","-0-","-0-","-0-"
+"""
+
+UN_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<CONSOLIDATED_LIST>
+  <INDIVIDUALS>
+    <INDIVIDUAL>
+      <DATAID>6908555</DATAID>
+      <FIRST_NAME>IVAN</FIRST_NAME>
+      <SECOND_NAME>PETROVICH</SECOND_NAME>
+      <THIRD_NAME>SIDOROV</THIRD_NAME>
+      <UN_LIST_TYPE>DPRK</UN_LIST_TYPE>
+      <NATIONALITY><VALUE>Russian Federation</VALUE></NATIONALITY>
+      <INDIVIDUAL_ALIAS><QUALITY>Good</QUALITY><ALIAS_NAME>Ivan Sidorov</ALIAS_NAME></INDIVIDUAL_ALIAS>
+    </INDIVIDUAL>
+  </INDIVIDUALS>
+  <ENTITIES>
+    <ENTITY>
+      <DATAID>110446</DATAID>
+      <FIRST_NAME>KOREA MINING DEVELOPMENT TRADING CORPORATION</FIRST_NAME>
+      <UN_LIST_TYPE>DPRK</UN_LIST_TYPE>
+    </ENTITY>
+  </ENTITIES>
+</CONSOLIDATED_LIST>
+"""
+
+EU_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<export xmlns="http://eu.europa.ec/fpi/fsd/export">
+  <sanctionEntity logicalId="13" euReferenceNumber="EU.27.28">
+    <regulation programme="IRQ"/>
+    <subjectType code="enterprise"/>
+    <nameAlias wholeName="Nordstream Petroleum Holdings GmbH"/>
+    <nameAlias wholeName="NSP Holdings"/>
+    <identification identificationTypeCode="lei" number="529900T8BM49AURSDO55"/>
+    <address countryDescription="IRAQ"/>
+  </sanctionEntity>
+</export>
+"""
+
+JURISDICTIONS_CSV = """country,code,category
+Iran,IR,sanctioned
+North Korea,KP,sanctioned
+Myanmar,MM,high_risk
+"""
+
+
+@pytest.fixture
+def lists_dir(tmp_path):
+    (tmp_path / "internal.csv").write_text(ENTITIES_CSV)
+    (tmp_path / "sdn.csv").write_text(OFAC_SDN_CSV)
+    (tmp_path / "un_consolidated.xml").write_text(UN_XML)
+    (tmp_path / "eu_fsf.xml").write_text(EU_XML)
+    (tmp_path / "jurisdictions.csv").write_text(JURISDICTIONS_CSV)
+    return tmp_path
+
+
+@pytest.fixture
+def screener(lists_dir):
+    """Global screener loaded from the test lists (reset afterwards)."""
+    screener = SanctionsScreener(lists_dir=lists_dir)
+    screener.load()
+    set_sanctions_screener(screener)
+    yield screener
+    set_sanctions_screener(None)
+
+
+def test_normalization():
+    assert normalize_name("ACME Trading Co., Ltd.") == ("ACME", "TRADING")
+    assert normalize_name("Société Générale S.A.") == ("GENERALE", "SOCIETE")
+    assert phonetic_code("MOHAMMED") == phonetic_code("MUHAMMAD")
+
+
+def test_loads_csv_ofac_un_and_eu_lists(lists_dir):
+    index = load_sanctions_lists(lists_dir)
+
+    by_id = {entry.entry_id: entry for entry in index.entries}
+    assert set(by_id) == {"CSV-1", "CSV-2", "36", "173", "6908555", "110446", "13"}
+    assert by_id["CSV-1"].aliases == ("Acme Intl Trading", "ACME Holdings")
+    assert by_id["173"].list_name == "SDGT"
+    assert by_id["6908555"].name == "IVAN PETROVICH SIDOROV"
+    assert by_id["6908555"].aliases == ("Ivan Sidorov",)
+    assert by_id["13"].lei == "529900T8BM49AURSDO55"
+    assert by_id["13"].list_name == "EU IRQ"
+    assert index.is_sanctioned_jurisdiction("north korea")
+    assert index.is_high_risk_jurisdiction("MM")
+    assert not index.is_high_risk_jurisdiction("English")
+
+    assert len(load_sanctions_lists(lists_dir / "missing").entries) == 0
+
+    (lists_dir / "broken.xml").write_text("<CONSOLIDATED_LIST><INDIVIDUAL>")
+    with pytest.raises(ValueError):
+        load_sanctions_lists(lists_dir)
+
+
+@pytest.mark.parametrize("document", [
+    '<?xml version="1.0"?><!DOCTYPE l [<!ENTITY a "aaaa"><!ENTITY b "&a;&a;&a;">]>'
+    '<CONSOLIDATED_LIST><INDIVIDUAL><FIRST_NAME>&b;</FIRST_NAME></INDIVIDUAL></CONSOLIDATED_LIST>',
+    '<?xml version="1.0"?><!DOCTYPE l SYSTEM "file:///etc/passwd"><CONSOLIDATED_LIST/>',
+    "<CONSOLIDATED_LIST><INDIVIDUAL><FIRST_NAME>&ext;</FIRST_NAME></INDIVIDUAL>"
+    "</CONSOLIDATED_LIST>",
+])
+def test_xml_lists_with_dtds_or_entities_are_refused(tmp_path, document):
+    (tmp_path / "un_consolidated.xml").write_text(document)
+
+    with pytest.raises(ValueError):
+        load_sanctions_lists(tmp_path)
+
+
+def test_screens_leis_and_names(screener):
+    assert screener.is_sanctioned_lei(SANCTIONED_LEI.lower())
+    assert screener.is_sanctioned_lei("529900T8BM49AURSDO55")
+    assert not screener.is_sanctioned_lei("12345678901234567890")
+
+    exact = screener.screen_name("Acme Trading Limited")
+    assert [(hit.entry_id, hit.match_type, hit.score) for hit in exact] == [("CSV-1", "exact_name", 1.0)]
+
+    fuzzy = {
+        "Muhammad Al Rashid": "173",
+        "ACME TRADNG LTD": "CSV-1",
+        "Sidorov Ivan": "6908555",
+        "Nordstream Petroleum Holding": "13",
+        "Global Bank of Comerce": "CSV-2",
+    }
+    for name, entry_id in fuzzy.items():
+        hits = screener.screen_name(name)
+        assert hits and hits[0].entry_id == entry_id, name
+        assert screener.name_threshold <= hits[0].score <= 1.0
+
+    for name in ["Globex plc", "Global Bank", "Barclays Bank PLC", "", None]:
+        assert screener.screen_name(name) == [], name
+
+    hits = screener.screen_party("ACME Holdings", SANCTIONED_LEI)
+    assert [(hit.entry_id, hit.match_type) for hit in hits] == [("CSV-1", "lei")]
+
+    results = screener.screen_parties([
+        Party(id="p1", name="Mohammed Al Rashid", role="Borrower"),
+        {"name": "Big Bank", "lei": "12345678901234567890"},
+        {"name": "Other Co", "lei": "529900T8BM49AURSDO55"},
+    ])
+    assert set(results) == {"Mohammed Al Rashid", "Other Co"}
+
+
+def test_refresh_swaps_index_when_lists_change(screener, lists_dir):
+    assert not screener.refresh_if_changed()
+    before = screener.index
+    assert not screener.screen_name("Orion Shipping LLC")
+
+    with open(lists_dir / "internal.csv", "a") as f:
+        f.write("CSV-3,Orion Shipping LLC,Internal,,,entity,\n")
+    os.utime(lists_dir / "internal.csv", ns=(0, 1))
+    assert screener.refresh_if_changed(background=False)
+    assert screener.index is not before
+    assert screener.screen_name("Orion Shipping LLC")[0].entry_id == "CSV-3"
+
+    # A broken list keeps the previous index serving
+    current = screener.index
+    (lists_dir / "internal.csv").write_bytes(b"\xff\xfe\x00broken")
+    assert screener.refresh_if_changed(background=False)
+    assert screener.index is current
+
+
+def test_policy_engine_in_operator_uses_reference_lists(screener):
+    engine = CompiledPolicyEngine()
+    engine.load_rules("""
+- name: block_sanctioned_parties
+  when:
+    any:
+      - field: originator.lei
+        op: in
+        value: ["SANCTIONED_LEI_LIST", "LOCAL_BAD_LEI"]
+      - field: originator.name
+        op: in
+        value: ["SANCTIONED_NAMES_LIST"]
+  action: block
+  priority: 100
+- name: flag_high_risk
+  when:
+    all:
+      - field: jurisdiction
+        op: in
+        value: ["HIGH_RISK_JURISDICTIONS_LIST"]
+  action: flag
+  priority: 50
+""")
+
+    def decide(**fields):
+        return engine.evaluate({"transaction_id": "tx_1", **fields})["decision"]
+
+    assert decide(originator={"lei": SANCTIONED_LEI, "name": "Someone Else"}) == "BLOCK"
+    assert decide(originator={"lei": "LOCAL_BAD_LEI"}) == "BLOCK"
+    assert decide(originator={"lei": "12345678901234567890", "name": "Muhammad Al Rashid"}) == "BLOCK"
+    assert decide(originator={"lei": "12345678901234567890", "name": "Big Bank"}) == "ALLOW"
+    assert decide(jurisdiction="Myanmar") == "FLAG"
+    assert decide(jurisdiction="UK") == "ALLOW"
+
+    # Compiled rules see a swapped index without recompiling
+    screener.swap(SanctionsIndex([SanctionsEntry("X", "Big Bank", "Internal", lei="12345678901234567890")]))
+    assert decide(originator={"lei": "12345678901234567890"}) == "BLOCK"
+    assert decide(originator={"lei": SANCTIONED_LEI}) == "ALLOW"
+
+
+def test_cdm_rejects_sanctioned_lei(screener):
+    def agreement(lei):
+        return CreditAgreement(
+            deal_id="DEAL_001",
+            loan_identification_number="LOAN_001",
+            agreement_date=date(2025, 3, 10),
+            governing_law="English",
+            parties=[Party(id="p1", name="ACME Corp", role="Borrower", lei=lei)],
+            facilities=[
+                LoanFacility(
+                    facility_name="Term Loan",
+                    commitment_amount=Money(amount=1000000, currency=Currency.USD),
+                    interest_terms={
+                        "rate_option": {"benchmark": "SOFR", "spread_bps": 250.0},
+                        "payment_frequency": {"period": "Month", "period_multiplier": 3},
+                    },
+                    maturity_date=date(2030, 3, 10),
+                )
+            ],
+        )
+
+    assert agreement("12345678901234567890").parties[0].lei == "12345678901234567890"
+    with pytest.raises(ValidationError, match="sanctions list"):
+        agreement(SANCTIONED_LEI)
+
+
+def test_kyc_compliance_blocks_sanctions_match(screener):
+    engine = CompiledPolicyEngine()
+    engine.load_rules((Path(__file__).parent.parent / "app/policies/compliance/kyc_compliance.yaml").read_text())
+    service = PolicyService(engine)
+
+    decision = service.evaluate_kyc_compliance(
+        {"business_name": "ACME Trading Company", "business_lei": "12345678901234567890"}, "business"
+    )
+    assert decision.decision == "BLOCK"
+    assert decision.rule_applied == "block_kyc_sanctions_match"
+    assert decision.metadata["sanctions_hits"][0]["entry_id"] == "CSV-1"
+
+    decision = service.evaluate_kyc_compliance({"person_name": "Jane Smith"}, "individual")
+    assert decision.rule_applied != "block_kyc_sanctions_match"
+    assert decision.metadata["sanctions_hits"] == []
@@ -0,0 +1,118 @@
+"""
+Tests for the securitization cash-flow waterfall engine.
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.services.securitization_waterfall import (
+    CollateralPool,
+    WaterfallAssumptions,
+    WaterfallTranche,
+    add_months,
+    allocate_period,
+    project_collateral,
+    run_waterfall,
+)
+
+
+def _tranches():
+    return [
+        WaterfallTranche("senior", 700.0, 4.0, 1),
+        WaterfallTranche("mezz", 200.0, 7.0, 2),
+        WaterfallTranche("equity", 100.0, 12.0, 3),
+    ]
+
+
+def test_level_payment_amortization_matches_annuity():
+    pool = CollateralPool(np.array([100.0]), np.array([6.0]), np.array([12]))
+    flows = project_collateral(pool)
+    r = 0.005
+    payment = 100.0 * r / (1 - (1 + r) ** -12)
+    assert flows.scheduled_principal.sum() == pytest.approx(100.0)
+    assert (flows.interest + flows.scheduled_principal)[0, :12] == pytest.approx(np.full(12, payment))
+    assert flows.balance[0, 11] == pytest.approx(0.0, abs=1e-9)
+
+
+def test_projection_matches_loan_by_loan_simulation():
+    pool = CollateralPool(np.array([300.0, 700.0]), np.array([5.0, 0.0]), np.array([6, 10]))
+    flows = project_collateral(pool, WaterfallAssumptions(cpr=0.2, cdr=0.1, recovery_lag=0))
+    smm, mdr = 1 - 0.8 ** (1 / 12), 1 - 0.9 ** (1 / 12)
+    expected = np.zeros((3, 10))
+    for balance, rate, term in zip(pool.balance, pool.rate / 1200, pool.term_months):
+        for t in range(term):
+            defaulted = balance * mdr
+            balance -= defaulted
+            n = term - t
+            payment = balance * rate / (1 - (1 + rate) ** -n) if rate else balance / n
+            scheduled = payment - balance * rate
+            prepaid = (balance - scheduled) * smm
+            expected[:, t] += [balance * rate, scheduled + prepaid, defaulted]
+            balance -= scheduled + prepaid
+    assert flows.interest[0] == pytest.approx(expected[0])
+    assert (flows.scheduled_principal + flows.prepayments)[0] == pytest.approx(expected[1])
+    assert flows.defaults[0] == pytest.approx(expected[2])
+
+
+def test_scenarios_match_individual_runs():
+    pool = CollateralPool(np.array([400.0, 600.0]), np.array([6.0, 9.0]), np.array([24, 36]))
+    cpr, cdr = [0.0, 0.1, 0.3], [0.0, 0.05, 0.2]
+    batch = project_collateral(pool, WaterfallAssumptions(cpr=cpr, cdr=cdr, severity=0.5, recovery_lag=3))
+    for s in range(3):
+        single = project_collateral(pool, WaterfallAssumptions(cpr=cpr[s], cdr=cdr[s], severity=0.5, recovery_lag=3))
+        assert batch.interest[s] == pytest.approx(single.interest[0])
+        assert batch.recoveries[s] == pytest.approx(single.recoveries[0])
+    # Every unit of collateral is repaid, prepaid or defaulted
+    repaid = batch.scheduled_principal + batch.prepayments + batch.defaults
+    assert repaid.sum(axis=1) == pytest.approx(np.full(3, 1000.0))
+
+
+def test_losses_hit_junior_tranches_first():
+    pool = CollateralPool(np.array([1000.0]), np.array([8.0]), np.array([60]))
+    flows = project_collateral(pool, WaterfallAssumptions(cdr=[0.0, 0.05, 0.5], severity=0.6))
+    result = run_waterfall(flows, _tranches())
+
+    assert result.writedowns[0] == pytest.approx(np.zeros(3))
+    total = result.principal_paid + result.writedowns
+    assert total == pytest.approx(np.tile([700.0, 200.0, 100.0], (3, 1)))
+    # Senior is only written down once the equity tranche is exhausted
+    assert result.writedowns[:, 2] == pytest.approx(np.minimum(flows.losses.sum(axis=1), 100.0))
+    assert result.writedowns[1, :2] == pytest.approx([0.0, 0.0])
+    assert result.writedowns[2, 0] > 0 and result.writedowns[2, 1] > 0
+
+
+def test_sequential_pays_senior_first_and_pro_rata_shares():
+    tranches = _tranches()
+    sequential = allocate_period(tranches, interest_available=0.0, principal_available=750.0)
+    assert sequential["principal_paid"][0] == pytest.approx([700.0, 50.0, 0.0])
+    pro_rata = allocate_period(tranches, 0.0, 500.0, principal_mode="pro_rata")
+    assert pro_rata["principal_paid"][0] == pytest.approx([350.0, 100.0, 50.0])
+    with pytest.raises(ValueError):
+        allocate_period(tranches, 0.0, 1.0, principal_mode="turbo")
+
+
+def test_interest_shortfall_is_carried_and_excess_goes_to_residual():
+    tranches = [WaterfallTranche("a", 1200.0, 10.0, 1), WaterfallTranche("b", 1200.0, 10.0, 1)]
+    short = allocate_period(tranches, interest_available=[10.0, 30.0], principal_available=0.0)
+    assert short["interest_paid"][0] == pytest.approx([5.0, 5.0])
+    assert short["interest_due"][0] - short["interest_paid"][0] == pytest.approx([5.0, 5.0])
+    assert short["residual"] == pytest.approx([0.0, 10.0])
+
+    tranches[0].interest_shortfall = 5.0
+    carried = allocate_period(tranches, interest_available=15.0, principal_available=0.0)
+    assert carried["interest_due"][0] == pytest.approx([15.0, 10.0])
+    assert carried["interest_paid"][0] == pytest.approx([9.0, 6.0])
+
+
+def test_collateral_from_assets_and_add_months():
+    pool = CollateralPool.from_assets([
+        {"asset_value": {"amount": "250.50", "currency": "USD"}, "interest_rate": 5.0},
+        {"asset_value": 0},
+        {"allocation_amount": 100, "term_months": 12},
+    ])
+    assert pool.balance.tolist() == [250.5, 100.0]
+    assert pool.term_months.tolist() == [60, 12]
+    assert add_months(date(2024, 1, 31), 1) == date(2024, 2, 29)
+    assert add_months(date(2024, 11, 15), 14) == date(2026, 1, 15)
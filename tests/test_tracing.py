@@ -0,0 +1,90 @@
+"""
+Unit tests for sampled request tracing.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.auth.jwt_auth import create_access_token, require_auth
+from app.core.tracing import TraceWriter, get_trace_buffer, span, start_trace
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer():
+    get_trace_buffer().drain()
+    yield
+    get_trace_buffer().drain()
+
+
+class _StubSession:
+    def __init__(self, user):
+        self.user = user
+
+    def query(self, model):
+        return self
+
+    def filter(self, *args):
+        return self
+
+    def first(self):
+        return self.user
+
+
+def _credentials(user_id="1"):
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": user_id}))
+
+
+def test_unsampled_trace_records_nothing():
+    with start_trace("op", sample_rate=0.0) as trace:
+        with span("step") as s:
+            s.set(value=1)
+
+    assert trace.__class__.__name__ == "_NoopSpan"
+    assert len(get_trace_buffer()) == 0
+
+
+def test_sampled_trace_records_spans_and_errors():
+    with pytest.raises(ValueError):
+        with start_trace("op", sample_rate=1.0, request="r1"):
+            with span("ok_step") as s:
+                s.set(value=1)
+            with span("bad_step"):
+                raise ValueError("boom")
+
+    (trace,) = get_trace_buffer().drain()
+    record = trace.to_dict()
+    assert record["status"] == "error"
+    assert record["attributes"] == {"request": "r1", "error_type": "ValueError"}
+    assert [(s["name"], s["status"]) for s in record["spans"]] == [("ok_step", "ok"), ("bad_step", "error")]
+    assert record["spans"][0]["attributes"] == {"value": 1}
+
+
+def test_require_auth_spans(monkeypatch):
+    monkeypatch.setattr("app.core.tracing.settings.TRACE_SAMPLE_RATE", 1.0)
+    user = SimpleNamespace(id=1, is_active=True)
+
+    assert asyncio.run(require_auth(_credentials(), _StubSession(user))) is user
+    with pytest.raises(HTTPException):
+        asyncio.run(require_auth(_credentials(), _StubSession(None)))
+
+    ok, missing = [t.to_dict() for t in get_trace_buffer().drain()]
+    assert [s["name"] for s in ok["spans"]] == ["token_decode", "user_lookup", "permission_check"]
+    assert missing["attributes"]["status_code"] == 401
+    assert missing["spans"][1]["attributes"]["user_found"] is False
+
+
+def test_writer_flushes_to_jsonl(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    with start_trace("op", sample_rate=1.0):
+        pass
+
+    written = asyncio.run(TraceWriter(path=str(path)).flush())
+
+    assert written == 1
+    assert json.loads(path.read_text().strip())["name"] == "op"
+    assert len(get_trace_buffer()) == 0
@@ -0,0 +1,114 @@
+"""
+Unit tests for the matrix-backed TradeVectorStore.
+"""
+
+import numpy as np
+
+from app.agents.vector_store import TradeVectorStore
+
+
+class _TableEmbeddings:
+    """Embeds texts by looking up fixed vectors, counting batch calls."""
+
+    def __init__(self, table, dim=4):
+        self.table = table
+        self.dim = dim
+        self.batch_calls = 0
+
+    def embed_query(self, text):
+        return self.table.get(text, [1.0] + [0.0] * (self.dim - 1))
+
+    def embed_documents(self, texts):
+        self.batch_calls += 1
+        return [self.embed_query(text) for text in texts]
+
+
+def _event(key, event_type="Custom"):
+    return {"eventType": event_type, "meta": {"globalKey": key}}
+
+
+def _store(table):
+    store = TradeVectorStore()
+    store.embeddings_model = _TableEmbeddings(table)
+    return store
+
+
+def _narrative(key):
+    return TradeVectorStore()._jsonify_to_narrative(_event(key))
+
+
+def test_batch_add_embeds_once_and_normalizes():
+    store = _store({_narrative("a"): [3.0, 4.0, 0.0, 0.0], _narrative("b"): [0.0, 2.0, 0.0, 0.0]})
+
+    assert store.add_trade_events([_event("a"), _event("b")]) == 2
+
+    assert store.embeddings_model.batch_calls == 1
+    assert store.vectors.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(store.vectors, axis=1), [1.0, 1.0], rtol=1e-6)
+    assert store.ids == ["a", "b"]
+
+
+def test_search_returns_top_k_by_cosine_similarity():
+    table = {
+        _narrative("x"): [1.0, 0.0, 0.0, 0.0],
+        _narrative("xy"): [1.0, 1.0, 0.0, 0.0],
+        _narrative("y"): [0.0, 1.0, 0.0, 0.0],
+        _narrative("z"): [0.0, 0.0, 1.0, 0.0],
+        "query": [10.0, 1.0, 0.0, 0.0],
+    }
+    store = _store(table)
+    store.add_trade_events([_event(k) for k in ("z", "y", "xy", "x")])
+
+    results = store.semantic_search("query", top_k=2)
+
+    assert [r["event"]["meta"]["globalKey"] for r in results] == ["x", "xy"]
+    assert results[0]["score"] > results[1]["score"]
+    assert len(store.semantic_search("query", top_k=10)) == 4
+
+
+def test_matrix_grows_beyond_initial_capacity():
+    store = _store({})
+    store.INITIAL_CAPACITY = 2
+
+    store.add_trade_events([_event(str(i)) for i in range(5)])
+    store.add_trade_event(_event("5"))
+
+    assert len(store) == 6
+    assert store.vectors.shape == (6, 4)
+
+
+def test_rows_are_published_after_their_metadata():
+    store = _store({})
+    seen = []
+    append = store._append_vectors
+
+    def append_and_search(vectors):
+        size = append(vectors)
+        # A concurrent search between writing rows and publishing them
+        seen.append((len(store), len(store.semantic_search("query", top_k=10))))
+        return size
+
+    store._append_vectors = append_and_search
+    store.add_trade_events([_event("a"), _event("b")])
+    store.add_trade_event(_event("c"))
+
+    assert seen == [(0, 0), (2, 2)]
+    assert len(store) == len(store.metadata) == 3
+
+
+def test_save_and_load_with_memmap(tmp_path):
+    table = {_narrative("a"): [0.0, 1.0, 0.0, 0.0], _narrative("b"): [1.0, 0.0, 0.0, 0.0], "q": [0.0, 1.0, 0.0, 0.0]}
+    store = _store(table)
+    store.add_trade_events([_event("a"), _event("b")])
+    path = str(tmp_path / "trades")
+
+    store.save(path)
+    loaded = TradeVectorStore.load(path)
+    loaded.embeddings_model = store.embeddings_model
+
+    assert isinstance(loaded._matrix, np.memmap)
+    assert loaded.semantic_search("q", top_k=1)[0]["event"]["meta"]["globalKey"] == "a"
+
+    loaded.add_trade_event(_event("c"))
+    assert len(loaded) == 3
+    assert not isinstance(loaded._matrix, np.memmap)
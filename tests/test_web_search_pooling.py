@@ -0,0 +1,227 @@
+"""
+Tests for the shared HTTP client pool and the batched reranker used by web search.
+"""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from app.core import http_client
+from app.services import web_search_service
+from app.services.reranker_worker import RerankerWorker
+from app.services.web_search_service import WebSearchService
+
+PAGE = "<html><body><article><h1>{title}</h1><p>{text}</p></article></body></html>"
+
+
+class _FakeCrossEncoder:
+    """Scores a pair by the length of its passage; records each predict call."""
+
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.threads = set()
+        self.delay = delay
+
+    def predict(self, pairs):
+        self.calls.append(list(pairs))
+        self.threads.add(threading.get_ident())
+        if self.delay:
+            threading.Event().wait(self.delay)
+        return [float(len(passage)) for _, passage in pairs]
+
+
+class _FailingCrossEncoder:
+    def predict(self, pairs):
+        raise RuntimeError("model exploded")
+
+
+def _stub_transport():
+    paragraphs = {
+        "a": "Short note about loan covenants. " * 8,
+        "b": "A much longer explanation of loan covenants and how lenders test them each quarter. " * 12,
+        "c": "Medium length discussion of leverage covenants in credit agreements. " * 8,
+    }
+
+    def handler(request):
+        if request.url.host == "google.serper.dev":
+            return httpx.Response(200, json={"organic": [
+                {"title": name, "link": f"https://example.com/{name}"} for name in paragraphs
+            ]})
+        name = request.url.path.strip("/")
+        return httpx.Response(200, text=PAGE.format(title=name, text=paragraphs[name]))
+
+    return httpx.MockTransport(handler)
+
+
+async def _public_resolver(host, port):
+    """Resolve *.example.com to a public address; IP literals to themselves."""
+    return ["93.184.216.34"] if host.endswith("example.com") else [host]
+
+
+@pytest.fixture
+def stub_search(monkeypatch):
+    async def _no_analytics(duration, num_results):
+        return None
+
+    monkeypatch.setattr(web_search_service, "record_request", _no_analytics)
+    monkeypatch.setattr(http_client, "_resolve", _public_resolver)
+    clients = []
+
+    def _client():
+        if not clients:
+            clients.append(httpx.AsyncClient(transport=_stub_transport()))
+        return clients[0]
+
+    monkeypatch.setattr(web_search_service, "get_async_http_client", _client)
+    return clients
+
+
+def test_concurrent_scores_share_one_predict_call():
+    model = _FakeCrossEncoder()
+    worker = RerankerWorker(model, batch_window_ms=20)
+
+    async def run():
+        return await asyncio.gather(
+            worker.score([("q", "aa"), ("q", "a")]),
+            worker.score([("q", "aaaa")]),
+            worker.score([("q", "aaa"), ("q", ""), ("q", "aaaaa")]),
+        )
+
+    results = asyncio.run(run())
+    worker.shutdown()
+
+    assert results == [[2.0, 1.0], [4.0], [3.0, 0.0, 5.0]]
+    assert len(model.calls) == worker.batches == 1
+    assert threading.get_ident() not in model.threads
+
+
+def test_full_batch_is_flushed_without_waiting_for_the_window():
+    model = _FakeCrossEncoder()
+    worker = RerankerWorker(model, batch_window_ms=60_000, max_batch_pairs=4)
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(worker.score([("q", "a")] * 2), worker.score([("q", "bb")] * 2)),
+            timeout=5,
+        )
+
+    assert asyncio.run(run()) == [[1.0, 1.0], [2.0, 2.0]]
+    worker.shutdown()
+
+
+def test_predict_errors_reach_every_caller_in_the_batch():
+    worker = RerankerWorker(_FailingCrossEncoder(), batch_window_ms=5)
+
+    async def run():
+        return await asyncio.gather(
+            worker.score([("q", "a")]), worker.score([("q", "b")]), return_exceptions=True
+        )
+
+    errors = asyncio.run(run())
+    worker.shutdown()
+    assert [str(e) for e in errors] == ["model exploded", "model exploded"]
+
+
+def test_event_loop_keeps_running_while_reranking():
+    worker = RerankerWorker(_FakeCrossEncoder(delay=0.2), batch_window_ms=1)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await worker.score([("q", "a")])
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(run()) >= 5
+    worker.shutdown()
+
+
+def test_search_reranks_through_worker(stub_search):
+    service = WebSearchService(serper_api_key="test-key", use_local_reranking=False)
+    service.use_local_reranking = True
+    # Window comfortably wider than the spread of four stubbed searches
+    service._rerank_worker = RerankerWorker(_FakeCrossEncoder(), batch_window_ms=500)
+
+    async def run():
+        try:
+            return await asyncio.gather(*(
+                service.search_web("loan covenants", num_results=3, top_k_after_rerank=2) for _ in range(4)
+            ))
+        finally:
+            await stub_search[0].aclose()
+
+    results = asyncio.run(run())
+    service._rerank_worker.shutdown()
+
+    for result in results:
+        assert [chunk["title"] for chunk in result["extracted_content"]] == ["b", "c"]
+    # Four concurrent searches were scored in a single batch
+    assert service._rerank_worker.batches == 1
+
+
+def test_shared_clients_are_reused_until_closed():
+    async def run():
+        first = http_client.get_async_http_client()
+        assert http_client.get_async_http_client() is first
+        sync_client = http_client.get_http_client()
+        assert http_client.get_http_client() is sync_client
+        await http_client.close_http_clients()
+        assert first.is_closed and sync_client.is_closed
+        replacement = http_client.get_async_http_client()
+        assert replacement is not first
+        await http_client.close_http_clients()
+        return first
+
+    first = asyncio.run(run())
+    # A different event loop gets its own client
+    async def other_loop():
+        client = http_client.get_async_http_client()
+        await http_client.close_http_clients()
+        return client
+
+    assert asyncio.run(other_loop()) is not first
+
+
+def test_read_url_refuses_non_public_hosts_and_redirects(monkeypatch):
+    monkeypatch.setattr(http_client, "_resolve", _public_resolver)
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        if request.url.path == "/metadata":
+            return httpx.Response(302, headers={"location": "http://169.254.169.254/latest/meta-data/"})
+        if request.url.path == "/moved":
+            return httpx.Response(301, headers={"location": "/a"})
+        return httpx.Response(200, text=PAGE.format(title="a", text="Loan covenants are tested quarterly. " * 10))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(web_search_service, "get_async_http_client", lambda: client)
+    service = WebSearchService(serper_api_key="test-key", use_local_reranking=False)
+
+    async def run():
+        try:
+            assert "Loan covenants" in await service.read_url("https://example.com/moved")
+            for url in [
+                "http://127.0.0.1:8000/admin",
+                "http://10.0.0.5/",
+                "http://[::ffff:192.168.1.1]/",
+                "file:///etc/passwd",
+                "https://example.com/metadata",
+            ]:
+                with pytest.raises(ValueError):
+                    await service.read_url(url)
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+    # The redirect to the metadata address was never followed
+    assert requested == ["https://example.com/moved", "https://example.com/a", "https://example.com/metadata"]